@@ -0,0 +1,116 @@
+"""Response compression for JSON and text responses.
+
+Responses of at least ``compression_minimum_size`` bytes are compressed with
+brotli when the client accepts it and the ``brotli`` package is installed,
+otherwise with gzip. Streaming responses (SSE job status, tile and upload
+proxies), images and responses that already carry a ``Content-Encoding`` are
+passed through untouched, so nothing is buffered that was meant to stream.
+"""
+
+import gzip
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/csv")
+
+# Larger bodies are compressed on a worker thread instead of the event loop
+THREAD_MINIMUM_SIZE = 256 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Preferred supported encoding in an ``Accept-Encoding`` header, if any."""
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    wildcard = weights.get("*", 0.0)
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    best = max(supported, key=lambda name: weights.get(name, wildcard))
+    return best if weights.get(best, wildcard) > 0 else None
+
+
+class CompressionMiddleware:
+    """Compress complete JSON/text responses with brotli or gzip."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                passthrough = True
+                if start is not None:
+                    await send(start)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            passthrough = True
+            if self._compressible(start, headers):
+                headers.add_vary_header("Accept-Encoding")
+                if not message.get("more_body", False) and len(body) >= self.minimum_size:
+                    if len(body) >= THREAD_MINIMUM_SIZE:
+                        body = await anyio.to_thread.run_sync(self._compress, body, encoding)
+                    else:
+                        body = self._compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(start: Message, headers: MutableHeaders) -> bool:
+        if start["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        return media_type in COMPRESSIBLE_TYPES or media_type.endswith("+json")
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
@@ -1,21 +1,40 @@
 """FastAPI dependencies for database, storage, and authentication."""
 
 import os
+from functools import lru_cache
 from typing import TYPE_CHECKING, Annotated, Any, Generator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, create_engine
 
 from api.config import settings
+from api.signing import CdnPrefixSigner, UrlSigner
 
 if TYPE_CHECKING:
     from google.cloud import pubsub_v1
 
 # Database engine - use constructed URL if in GCP
 database_url = settings.get_database_url()
-engine = create_engine(database_url, echo=settings.debug)
+
+
+def _pool_options() -> dict[str, Any]:
+    """Bounded pool settings; a dropped connection invalidates the pool on first error."""
+    if settings.db_external_pooler:
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": True,
+    }
+
+
+engine = create_engine(database_url, echo=settings.debug, **_pool_options())
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -66,8 +85,9 @@ OptionalUser = Annotated[dict | None, Depends(get_current_user)]
 
 
 # Storage client
+@lru_cache
 def get_storage_client():
-    """Get storage client based on configuration."""
+    """Get the shared storage client (one per process) based on configuration."""
     from io import BytesIO
 
     import boto3
@@ -144,6 +164,154 @@ class S3Storage:
         )
         return f"s3://{self.bucket_name}/{remote_path}"
 
+    def uri(self, remote_path: str) -> str:
+        """Storage URI of an object."""
+        return f"s3://{self.bucket_name}/{remote_path}"
+
+    def exists(self, remote_path: str) -> bool:
+        """Whether an object exists at the path."""
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket_name, Key=remote_path)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def open_upload(
+        self, remote_path: str, content_type: str, chunk_size: int
+    ) -> "S3MultipartWriter":
+        """Open a streaming upload; memory is bounded by one part of ``chunk_size``."""
+        return S3MultipartWriter(self, remote_path, content_type, chunk_size)
+
+    def create_resumable_upload(
+        self,
+        remote_path: str,
+        content_type: str,
+        size: int,
+        chunk_size: int,
+        expiration: int = 3600,
+        origin: str | None = None,
+    ) -> dict[str, Any]:
+        """Start a multipart upload the browser sends part by part.
+
+        Each part is PUT to its presigned URL; the client keeps the returned
+        ETags, retries failed parts, and completes the upload with them.
+        """
+        # S3 allows at most 10,000 parts
+        part_size = max(chunk_size, -(-size // 10000))
+        upload = self.client.create_multipart_upload(
+            Bucket=self.bucket_name, Key=remote_path, ContentType=content_type
+        )
+        part_urls = [
+            self._make_external(
+                self.client.generate_presigned_url(
+                    "upload_part",
+                    Params={
+                        "Bucket": self.bucket_name,
+                        "Key": remote_path,
+                        "UploadId": upload["UploadId"],
+                        "PartNumber": part_number,
+                    },
+                    ExpiresIn=expiration,
+                )
+            )
+            for part_number in range(1, max(1, -(-size // part_size)) + 1)
+        ]
+        return {
+            "protocol": "s3-multipart",
+            "upload_id": upload["UploadId"],
+            "part_size": part_size,
+            "part_urls": part_urls,
+        }
+
+    def complete_resumable_upload(
+        self, remote_path: str, upload_id: str | None, parts: list[dict[str, Any]]
+    ) -> str:
+        """Assemble the uploaded parts (``{"part_number", "etag"}``) into the object."""
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=remote_path,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                    for part in sorted(parts, key=lambda part: part["part_number"])
+                ]
+            },
+        )
+        return self.uri(remote_path)
+
+    def abort_resumable_upload(self, remote_path: str, upload_id: str | None) -> None:
+        """Discard a multipart upload and its parts."""
+        self.client.abort_multipart_upload(
+            Bucket=self.bucket_name, Key=remote_path, UploadId=upload_id
+        )
+
+
+class S3MultipartWriter:
+    """Streams an object to S3 as a multipart upload, one part in memory at a time.
+
+    Objects smaller than one part are sent with a single ``put_object``.
+    """
+
+    def __init__(self, storage: S3Storage, remote_path: str, content_type: str, part_size: int):
+        self.storage = storage
+        self.remote_path = remote_path
+        self.content_type = content_type
+        self.part_size = part_size
+        self._buffer = bytearray()
+        self._upload_id: str | None = None
+        self._parts: list[dict[str, Any]] = []
+
+    def write(self, data: bytes) -> None:
+        """Buffer data, sending every full part."""
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+
+    def _upload_part(self, body: bytes) -> None:
+        client, bucket = self.storage.client, self.storage.bucket_name
+        if self._upload_id is None:
+            self._upload_id = client.create_multipart_upload(
+                Bucket=bucket, Key=self.remote_path, ContentType=self.content_type
+            )["UploadId"]
+        part_number = len(self._parts) + 1
+        response = client.upload_part(
+            Bucket=bucket,
+            Key=self.remote_path,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        self._parts.append({"part_number": part_number, "etag": response["ETag"]})
+
+    def close(self) -> str:
+        """Send the remaining data and finish the upload; returns the object URI."""
+        if self._upload_id is None:
+            self.storage.client.put_object(
+                Bucket=self.storage.bucket_name,
+                Key=self.remote_path,
+                Body=bytes(self._buffer),
+                ContentType=self.content_type,
+            )
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            self.storage.complete_resumable_upload(self.remote_path, self._upload_id, self._parts)
+        self._buffer.clear()
+        return self.storage.uri(self.remote_path)
+
+    def abort(self) -> None:
+        """Discard the upload; nothing is written to the object."""
+        self._buffer.clear()
+        if self._upload_id is not None:
+            self.storage.abort_resumable_upload(self.remote_path, self._upload_id)
+            self._upload_id = None
+
 
 class GCSStorage:
     """Google Cloud Storage wrapper."""
@@ -181,13 +349,101 @@ class GCSStorage:
         blob.upload_from_string(data, content_type=content_type)
         return f"gs://{self.bucket.name}/{remote_path}"
 
+    def uri(self, remote_path: str) -> str:
+        """Storage URI of an object."""
+        return f"gs://{self.bucket.name}/{remote_path}"
+
+    def exists(self, remote_path: str) -> bool:
+        """Whether an object exists at the path."""
+        return self.bucket.blob(remote_path).exists()
+
+    def open_upload(
+        self, remote_path: str, content_type: str, chunk_size: int
+    ) -> "GCSResumableWriter":
+        """Open a streaming upload; memory is bounded by one chunk of ``chunk_size``."""
+        return GCSResumableWriter(self, remote_path, content_type, chunk_size)
+
+    def create_resumable_upload(
+        self,
+        remote_path: str,
+        content_type: str,
+        size: int,
+        chunk_size: int,
+        expiration: int = 3600,
+        origin: str | None = None,
+    ) -> dict[str, Any]:
+        """Start a GCS resumable upload session the browser uploads to directly.
+
+        The client PUTs ``Content-Range`` chunks to the session URL and, after
+        an interruption, asks it for the committed offset to resume from.
+        """
+        session_url = self.bucket.blob(remote_path).create_resumable_upload_session(
+            content_type=content_type, size=size, origin=origin
+        )
+        return {"protocol": "gcs-resumable", "session_url": session_url, "part_size": chunk_size}
+
+    def complete_resumable_upload(
+        self, remote_path: str, upload_id: str | None, parts: list[dict[str, Any]]
+    ) -> str:
+        """GCS finalizes a session with its last chunk; check the object exists."""
+        if not self.exists(remote_path):
+            raise FileNotFoundError(f"Upload not finished: {remote_path}")
+        return self.uri(remote_path)
+
+    def abort_resumable_upload(self, remote_path: str, upload_id: str | None) -> None:
+        """Unfinished GCS sessions expire on their own."""
+
+
+class GCSResumableWriter:
+    """Streams an object to GCS as a resumable upload, one chunk in memory at a time."""
+
+    def __init__(self, storage: GCSStorage, remote_path: str, content_type: str, chunk_size: int):
+        self.storage = storage
+        self.remote_path = remote_path
+        self._writer = storage.bucket.blob(remote_path, chunk_size=chunk_size).open(
+            "wb", content_type=content_type
+        )
+
+    def write(self, data: bytes) -> None:
+        """Buffer data, sending every full chunk."""
+        self._writer.write(data)
+
+    def close(self) -> str:
+        """Send the remaining data and finalize the object; returns the object URI."""
+        self._writer.close()
+        return self.storage.uri(self.remote_path)
+
+    def abort(self) -> None:
+        """Cancel the session; nothing is written to the object."""
+        self._writer.terminate()
+
 
 StorageDep = Annotated[S3Storage | GCSStorage, Depends(get_storage_client)]
 
 
+@lru_cache
+def get_url_signer() -> UrlSigner:
+    """Get the shared download URL signer, so its cache spans requests."""
+    cdn = None
+    if settings.cdn_base_url and settings.cdn_key_name and settings.cdn_key:
+        cdn = CdnPrefixSigner(settings.cdn_base_url, settings.cdn_key_name, settings.cdn_key)
+    return UrlSigner(
+        get_storage_client(),
+        expiration=settings.signed_url_expiration_seconds,
+        refresh=settings.signed_url_refresh_seconds,
+        cache_size=settings.signed_url_cache_size,
+        concurrency=settings.signed_url_concurrency,
+        cdn=cdn,
+    )
+
+
+SignerDep = Annotated[UrlSigner, Depends(get_url_signer)]
+
+
 # Pub/Sub client
+@lru_cache
 def get_pubsub_client():
-    """Get Pub/Sub client."""
+    """Get the shared Pub/Sub publisher (thread-safe; one gRPC channel per process)."""
     import os
 
     from google.cloud import pubsub_v1
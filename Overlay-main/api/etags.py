@@ -0,0 +1,65 @@
+"""ETags and conditional GET for polled JSON endpoints.
+
+Routes derive a weak ETag from what their response is built from, usually
+the newest ``updated_at`` (plus a row count, so deletions change it) and the
+query parameters that shape the body. A client polling with the ETag it last
+received in ``If-None-Match`` gets an empty ``304 Not Modified`` while nothing
+changed:
+
+    GET /api/drawings/d1/status
+    ETag: W/"5d41402abc4b2a76b9719d911017c592"
+
+    GET /api/drawings/d1/status
+    If-None-Match: W/"5d41402abc4b2a76b9719d911017c592"
+    -> 304 Not Modified
+
+The tags are weak because they identify the content, not its bytes, so the
+same tag is valid for the gzip, brotli and identity encodings of a response.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any
+
+from fastapi import Request, Response, status
+
+# Bodies depend on the user and change at any time: caches must revalidate
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts: Any) -> str:
+    """Weak ETag over the given version parts (timestamps, counts, parameters)."""
+    digest = hashlib.sha1(usedforsecurity=False)
+    for part in parts:
+        value = part.isoformat() if isinstance(part, datetime) else repr(part)
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\x00")
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(",")
+    )
+
+
+def check_etag(request: Request, response: Response, etag: str) -> Response | None:
+    """Set ``etag`` on the response, or return a 304 if the client already has it.
+
+    Usage in a route::
+
+        not_modified = check_etag(request, response, weak_etag(...))
+        if not_modified:
+            return not_modified
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
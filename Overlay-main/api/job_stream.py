@@ -0,0 +1,176 @@
+"""Push job status updates from the worker to WebSocket and SSE clients.
+
+The worker announces every job lifecycle event on the ``job_status`` Postgres
+channel (``pg_notify``, delivered on commit); so does the API when it cancels
+a job. Each API instance keeps one
+dedicated connection LISTENing on that channel and fans notifications out to
+the clients subscribed to a job, so every replica sees every update without
+clients polling the status endpoints.
+
+A subscription to a job receives updates for the job itself and for its child
+jobs (e.g. the sheet jobs of a drawing preprocess job). Bursts are coalesced:
+a client gets at most one batch per ``job_status_coalesce_seconds``, holding
+the latest update of each job that changed. Clients should subscribe first and
+then fetch the current status once, so no transition falls in between.
+Notifications sent while the listener is reconnecting are lost, so after a
+reconnect every subscriber gets a ``{"eventType": "resync"}`` update telling
+it to fetch the status again.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Any
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from api.config import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUS_CHANNEL = "job_status"
+_POLL_SECONDS = 1.0
+_MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+
+def job_status_notification(job: Any, event: dict[str, Any]) -> str:
+    """Status payload for the job status channel, as the worker sends it."""
+    return json.dumps(
+        {
+            "jobId": job.id,
+            "parentId": job.parent_id,
+            "type": job.type,
+            "targetType": job.target_type,
+            "targetId": job.target_id,
+            "status": event.get("status"),
+            "eventType": event.get("eventType"),
+            "createdAt": event.get("createdAt"),
+        },
+        separators=(",", ":"),
+    )
+
+
+class JobStatusSubscription:
+    """Updates for one subscriber, coalesced to the latest per job."""
+
+    def __init__(self, job_id: str, coalesce_seconds: float):
+        self.job_id = job_id
+        self.coalesce_seconds = coalesce_seconds
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, update: dict[str, Any]) -> None:
+        """Queue an update, replacing any pending one for the same job."""
+        self._pending[update.get("jobId") or ""] = update
+        self._ready.set()
+
+    async def next_batch(self) -> list[dict[str, Any]]:
+        """Wait for updates, then return everything that arrived within the coalesce window."""
+        await self._ready.wait()
+        await asyncio.sleep(self.coalesce_seconds)
+        self._ready.clear()
+        batch = list(self._pending.values())
+        self._pending.clear()
+        return batch
+
+
+class JobStatusHub:
+    """LISTENs on the job status channel and fans updates out to subscribers.
+
+    The listener runs on a daemon thread with its own connection (outside the
+    request pool) and reconnects with backoff if the connection drops.
+    Subscriptions live on the event loop passed to ``start``.
+    """
+
+    def __init__(self, coalesce_seconds: float = 0.25):
+        self.coalesce_seconds = coalesce_seconds
+        self._subscribers: dict[str, set[JobStatusSubscription]] = defaultdict(set)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start listening; updates are dispatched on ``loop``."""
+        self._loop = loop
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._listen, name="job-status-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop listening and wait for the listener thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=_POLL_SECONDS * 2)
+            self._thread = None
+
+    def subscribe(self, job_id: str) -> JobStatusSubscription:
+        """Subscribe to updates of a job and its child jobs (call on the event loop)."""
+        subscription = JobStatusSubscription(job_id, self.coalesce_seconds)
+        self._subscribers[job_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: JobStatusSubscription) -> None:
+        """Remove a subscription (call on the event loop)."""
+        subscribers = self._subscribers.get(subscription.job_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.job_id]
+
+    def dispatch(self, payload: str) -> None:
+        """Deliver one notification payload to matching subscribers (on the event loop)."""
+        try:
+            update = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring malformed job status notification: {payload[:200]}")
+            return
+        for key in {update.get("jobId"), update.get("parentId")}:
+            for subscription in self._subscribers.get(key, ()):
+                subscription.push(update)
+
+    def resync(self) -> None:
+        """Tell every subscriber that updates may have been missed (on the event loop)."""
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.push({"jobId": None, "eventType": "resync"})
+
+    def _listen(self) -> None:
+        engine = create_engine(settings.get_database_url(), poolclass=NullPool)
+        delay = 1.0
+        reconnecting = False
+        while not self._stop.is_set():
+            try:
+                connection = engine.raw_connection()
+                try:
+                    dbapi_connection = connection.driver_connection
+                    dbapi_connection.autocommit = True
+                    with dbapi_connection.cursor() as cursor:
+                        cursor.execute(f"LISTEN {JOB_STATUS_CHANNEL}")
+                    logger.info(f"Listening for job status updates on '{JOB_STATUS_CHANNEL}'")
+                    if reconnecting:
+                        self._loop.call_soon_threadsafe(self.resync)
+                    delay = 1.0
+                    while not self._stop.is_set():
+                        if select.select([dbapi_connection], [], [], _POLL_SECONDS) == ([], [], []):
+                            continue
+                        dbapi_connection.poll()
+                        while dbapi_connection.notifies:
+                            notify = dbapi_connection.notifies.pop(0)
+                            self._loop.call_soon_threadsafe(self.dispatch, notify.payload)
+                finally:
+                    connection.close()
+            except Exception as e:
+                reconnecting = True
+                logger.warning(f"Job status listener disconnected, retrying in {delay:.0f}s: {e}")
+                self._stop.wait(delay)
+                delay = min(delay * 2, _MAX_RECONNECT_DELAY_SECONDS)
+        engine.dispose()
+
+
+job_status_hub = JobStatusHub(coalesce_seconds=settings.job_status_coalesce_seconds)
@@ -7,13 +7,19 @@ This module provides the main FastAPI application that:
 - Offers WebSocket for real-time job status updates
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.compression import CompressionMiddleware
 from api.config import settings
+from api.job_stream import job_status_hub
+from api.outbox import outbox_relay
+from api.pagination import NEXT_CURSOR_HEADER
 from api.routes import alignment, analysis, auth, comparisons, drawings, google_auth, jobs, projects, uploads
 
 # Configure logging
@@ -28,8 +34,17 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan context manager."""
     logger.info("Starting BuildTrace API server...")
+    # Routes that touch the database or storage are sync and run on this bounded
+    # pool, so a slow call ties up one thread instead of the event loop
+    to_thread.current_default_thread_limiter().total_tokens = settings.route_threads
+    if settings.job_status_stream:
+        job_status_hub.start(asyncio.get_running_loop())
+    if settings.outbox_relay:
+        outbox_relay.start()
     yield
     logger.info("Shutting down BuildTrace API server...")
+    outbox_relay.stop()
+    job_status_hub.stop()
 
 
 app = FastAPI(
@@ -39,6 +54,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+
 # CORS middleware for frontend access
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +68,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Readable by browser clients: next-page cursor and conditional GET tag
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Include routers
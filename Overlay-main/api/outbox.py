@@ -0,0 +1,169 @@
+"""Transactional outbox for job messages published by the API.
+
+Routes never publish to Pub/Sub inline. ``enqueue_job`` adds the job's
+message to ``job_outbox`` in the same session as the ``Job`` row, so both are
+committed together: a request neither leaves a job without a message nor
+waits on Pub/Sub. The ``outbox_relay`` thread (started with the app) claims
+pending rows with ``FOR UPDATE SKIP LOCKED``, publishes them as one batch and
+deletes the ones Pub/Sub accepted; failed ones are retried with exponential
+backoff. The worker runs the same relay for its fan-outs.
+
+Delivery is at least once: a relay that dies between publishing and deleting
+publishes the batch again, which job handlers already tolerate (redelivery).
+"""
+
+import json
+import logging
+import threading
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import Column, delete
+from sqlalchemy.dialects.postgresql import JSON
+from sqlmodel import Field, Session, SQLModel, select
+
+from api.config import settings
+from api.dependencies import engine, get_pubsub_client
+
+logger = logging.getLogger(__name__)
+
+
+class JobOutbox(SQLModel, table=True):
+    """Job message waiting to be published (matches Prisma schema)."""
+
+    __tablename__ = "job_outbox"
+
+    id: str = Field(primary_key=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    job_id: str = Field(unique=True)
+    topic: str
+    message: dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))
+    attributes: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
+    attempts: int = 0
+    available_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    last_error: str | None = None
+
+
+def generate_cuid() -> str:
+    """Generate a CUID-like ID."""
+    import secrets
+    import time
+
+    timestamp = hex(int(time.time() * 1000))[2:]
+    return f"c{timestamp}{secrets.token_hex(8)}"[:25]
+
+
+def enqueue_job(
+    session: Session,
+    job_id: str,
+    job_type: str,
+    payload: dict[str, Any],
+    topic: str | None = None,
+) -> None:
+    """Add a job's message to the outbox (caller commits, then ``outbox_relay.wake()``).
+
+    The message is the envelope the worker expects: ``{"type", "id", "payload"}``.
+    """
+    session.add(
+        JobOutbox(
+            id=generate_cuid(),
+            job_id=job_id,
+            topic=topic or settings.vision_topic,
+            message={"type": job_type, "id": job_id, "payload": payload},
+            attributes={"type": job_type, "id": job_id},
+        )
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before publishing a message again after ``attempts`` failures."""
+    return min(settings.outbox_max_backoff_seconds, 2.0 ** min(attempts, 30))
+
+
+class OutboxRelay:
+    """Background thread publishing ``job_outbox`` rows in batches."""
+
+    def __init__(self, batch_size: int = 500, poll_seconds: float = 0.5):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def wake(self) -> None:
+        """Publish now instead of at the next poll (call after committing messages)."""
+        self._wake.set()
+
+    def relay_once(self, session: Session, publisher) -> int:
+        """Publish one batch of due messages; returns how many were claimed."""
+        now = datetime.now(UTC)
+        rows = session.exec(
+            select(JobOutbox)
+            .where(JobOutbox.available_at <= now)
+            .order_by(JobOutbox.available_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            session.rollback()
+            return 0
+
+        # Hand every message to the publisher first so the client batches them
+        futures = [
+            publisher.publish(
+                publisher.topic_path(settings.pubsub_project_id, row.topic),
+                json.dumps(row.message).encode("utf-8"),
+                **{str(k): str(v) for k, v in (row.attributes or {}).items()},
+            )
+            for row in rows
+        ]
+        sent_ids = []
+        for row, future in zip(rows, futures):
+            try:
+                future.result(timeout=30.0)
+                sent_ids.append(row.id)
+            except Exception as e:
+                row.attempts += 1
+                row.available_at = now + timedelta(seconds=retry_delay(row.attempts))
+                row.last_error = f"{type(e).__name__}: {e}"[:1000]
+                session.add(row)
+                logger.warning(
+                    f"Failed to publish job {row.job_id} (attempt {row.attempts}): {row.last_error}"
+                )
+        if sent_ids:
+            session.exec(delete(JobOutbox).where(JobOutbox.id.in_(sent_ids)))
+        session.commit()
+        logger.info(f"Published {len(sent_ids)}/{len(rows)} outbox messages")
+        return len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            claimed = 0
+            try:
+                with Session(engine) as session:
+                    claimed = self.relay_once(session, get_pubsub_client())
+            except Exception as e:
+                logger.warning(f"Outbox relay error: {e}")
+            if claimed >= self.batch_size:
+                continue  # More are waiting
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Start the relay thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the relay thread after its current batch."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 30)
+            self._thread = None
+
+
+outbox_relay = OutboxRelay(
+    batch_size=settings.outbox_batch_size, poll_seconds=settings.outbox_poll_seconds
+)
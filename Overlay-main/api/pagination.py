@@ -0,0 +1,90 @@
+"""Keyset pagination for list endpoints.
+
+Lists are ordered newest first by ``(created_at, id)`` and return one page
+of ``limit`` rows (``DEFAULT_LIMIT`` if not given). The response body stays a
+plain list; when more rows exist, the opaque cursor for the next page is
+returned in the ``X-Next-Cursor`` header (exposed to browsers through CORS):
+
+    GET /api/comparisons/project/p1?limit=50
+    X-Next-Cursor: eyJjIjoiMjAyNi0x...
+
+    GET /api/comparisons/project/p1?limit=50&cursor=eyJjIjoiMjAyNi0x...
+
+Unlike OFFSET, each page is a range read from where the previous one ended,
+so its cost does not grow with how deep the client has paged.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Row, tuple_
+from sqlmodel import Session
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+PageLimit = Annotated[int, Query(ge=1, le=MAX_LIMIT, description="Page size")]
+PageCursor = Annotated[
+    str | None, Query(description=f"Cursor from the previous page's {NEXT_CURSOR_HEADER}")
+]
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque cursor pointing just after the given row."""
+    payload = json.dumps({"c": created_at.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor from ``encode_cursor``; malformed cursors are a 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["c"]), str(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from e
+
+
+def paginate(
+    session: Session,
+    statement: Any,
+    model: Any,
+    *,
+    cursor: str | None,
+    limit: int,
+    response: Response,
+) -> list[Any]:
+    """Run one page of ``statement``, newest ``model`` rows first.
+
+    Args:
+        session: Database session
+        statement: Select whose first entity is ``model`` (extra columns allowed),
+            or of columns that include ``created_at`` and ``id``
+        model: Table model with ``created_at`` and ``id`` columns
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+        response: Response to set the next-page cursor header on
+
+    Returns:
+        Up to ``limit`` rows, as returned by ``session.exec``
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(model.created_at, model.id) < (created_at, row_id))
+    statement = statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+    rows = list(session.exec(statement).all())
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if isinstance(last, Row) and "created_at" not in last._fields:
+            last = last[0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
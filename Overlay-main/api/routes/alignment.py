@@ -1,7 +1,5 @@
 """Manual alignment routes for user-defined point correspondences."""
 
-import json
-from datetime import datetime, timezone
 from typing import Any
 
 import numpy as np
@@ -9,8 +7,8 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
 from sqlmodel import select
 
-from api.config import settings
-from api.dependencies import CurrentUser, SessionDep, get_pubsub_client
+from api.dependencies import CurrentUser, SessionDep
+from api.outbox import enqueue_job, outbox_relay
 
 router = APIRouter()
 
@@ -131,7 +129,7 @@ def compute_affine_from_points(
 
 
 @router.post("/manual", response_model=ManualAlignmentResponse)
-async def submit_manual_alignment(
+def submit_manual_alignment(
     request: ManualAlignmentRequest,
     session: SessionDep,
     user: CurrentUser,
@@ -181,40 +179,32 @@ async def submit_manual_alignment(
             detail=f"Invalid rotation: {rotation_deg:.1f}°. Must be within ±45°",
         )
 
-    # Generate job ID
-    import secrets
-    import time
-
-    timestamp = hex(int(time.time() * 1000))[2:]
-    random_part = secrets.token_hex(8)
-    job_id = f"c{timestamp}{random_part}"[:25]
-
-    # Submit job to Pub/Sub
-    try:
-        pubsub = get_pubsub_client()
-        topic_path = pubsub.topic_path(settings.pubsub_project_id, settings.vision_topic)
-
-        job_payload = {
-            "type": "vision.block.overlay.manual_align",
-            "jobId": job_id,
-            "payload": {
-                "overlayId": request.overlay_id,
-                "alignmentMatrix": matrix.tolist(),
-                "sourcePoints": [[p.x, p.y] for p in request.source_points],
-                "targetPoints": [[p.x, p.y] for p in request.target_points],
-            },
-        }
-
-        pubsub.publish(
-            topic_path,
-            json.dumps(job_payload).encode("utf-8"),
-            type="vision.block.overlay.manual_align",
-        )
-    except Exception as e:
-        import logging
-
-        logging.warning(f"Failed to publish manual alignment job: {e}")
-        # Don't fail - return preview data anyway
+    # Create Job record first (worker expects it to exist)
+    from api.routes.jobs import Job, generate_cuid
+
+    job_type = "vision.block.overlay.manual_align"
+    parent_job = session.get(Job, overlay.job_id) if overlay.job_id else None
+    job_id = generate_cuid()
+    job_payload = {
+        "overlayId": request.overlay_id,
+        "alignmentMatrix": matrix.tolist(),
+        "sourcePoints": [[p.x, p.y] for p in request.source_points],
+        "targetPoints": [[p.x, p.y] for p in request.target_points],
+    }
+    job = Job(
+        id=job_id,
+        project_id=parent_job.project_id if parent_job else None,
+        target_type="overlay",
+        target_id=request.overlay_id,
+        type=job_type,
+        status="Queued",
+        payload=job_payload,
+    )
+    session.add(job)
+    # Job message goes out with the job row (outbox)
+    enqueue_job(session, job_id, job_type, job_payload)
+    session.commit()
+    outbox_relay.wake()
 
     return ManualAlignmentResponse(
         overlay_id=request.overlay_id,
@@ -229,7 +219,7 @@ async def submit_manual_alignment(
 
 
 @router.post("/preview", response_model=dict)
-async def preview_alignment(
+def preview_alignment(
     request: ManualAlignmentRequest,
     user: CurrentUser,
 ):
@@ -1,14 +1,13 @@
 """AI Analysis routes for change detection and cost estimation."""
 
-import json
 from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
 
-from api.config import settings
-from api.dependencies import CurrentUser, OptionalUser, SessionDep, get_pubsub_client
+from api.dependencies import CurrentUser, OptionalUser, SessionDep
+from api.outbox import enqueue_job, outbox_relay
 from api.routes.jobs import Job  # Import existing Job model
 
 router = APIRouter()
@@ -48,7 +47,7 @@ def generate_cuid() -> str:
 
 
 @router.post("/detect-changes", response_model=AnalysisJobResponse)
-async def detect_changes(
+def detect_changes(
     request: DetectChangesRequest,
     session: SessionDep,
     user: CurrentUser,
@@ -73,35 +72,18 @@ async def detect_changes(
         },
     )
     session.add(job)
+    # Job message goes out with the job row (outbox)
+    enqueue_job(
+        session,
+        job_id,
+        "vision.overlay.change.detect",
+        {
+            "overlayId": request.overlay_id,
+            "includeCostEstimate": request.include_cost_estimate,
+        },
+    )
     session.commit()
-
-    # Submit job to Pub/Sub
-    try:
-        pubsub = get_pubsub_client()
-        topic_path = pubsub.topic_path(settings.pubsub_project_id, settings.vision_topic)
-
-        job_payload = {
-            "type": "vision.overlay.change.detect",
-            "id": job_id,
-            "payload": {
-                "overlayId": request.overlay_id,
-                "includeCostEstimate": request.include_cost_estimate,
-            },
-        }
-
-        pubsub.publish(
-            topic_path,
-            json.dumps(job_payload).encode("utf-8"),
-            type="vision.overlay.change.detect",
-        )
-    except Exception as e:
-        import logging
-
-        logging.warning(f"Failed to publish change detection job: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to submit change detection job",
-        )
+    outbox_relay.wake()
 
     return AnalysisJobResponse(
         job_id=job_id,
@@ -112,7 +94,7 @@ async def detect_changes(
 
 
 @router.post("/cost-analysis", response_model=AnalysisJobResponse)
-async def analyze_costs(
+def analyze_costs(
     request: CostAnalysisRequest,
     session: SessionDep,
     user: CurrentUser,
@@ -124,34 +106,19 @@ async def analyze_costs(
     """
     job_id = generate_cuid()
 
-    # Submit job to Pub/Sub
-    try:
-        pubsub = get_pubsub_client()
-        topic_path = pubsub.topic_path(settings.pubsub_project_id, settings.vision_topic)
-
-        job_payload = {
-            "type": "vision.overlay.cost.analysis",
-            "id": job_id,
-            "payload": {
-                "overlayId": request.overlay_id,
-                "projectId": request.project_id,
-                "includeSchedule": True,
-            },
-        }
-
-        pubsub.publish(
-            topic_path,
-            json.dumps(job_payload).encode("utf-8"),
-            type="vision.overlay.cost.analysis",
-        )
-    except Exception as e:
-        import logging
-
-        logging.warning(f"Failed to publish cost analysis job: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to submit cost analysis job",
-        )
+    # Queue job message for Pub/Sub (outbox)
+    enqueue_job(
+        session,
+        job_id,
+        "vision.overlay.cost.analysis",
+        {
+            "overlayId": request.overlay_id,
+            "projectId": request.project_id,
+            "includeSchedule": True,
+        },
+    )
+    session.commit()
+    outbox_relay.wake()
 
     return AnalysisJobResponse(
         job_id=job_id,
@@ -162,7 +129,7 @@ async def analyze_costs(
 
 
 @router.get("/summary/{overlay_id}")
-async def get_analysis_summary(
+def get_analysis_summary(
     overlay_id: str,
     session: SessionDep,
     user: OptionalUser = None,
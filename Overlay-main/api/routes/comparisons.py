@@ -1,16 +1,18 @@
 """Comparison routes."""
 
-import json
 from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import Column
+from fastapi import APIRouter, HTTPException, Response, status
+from sqlalchemy import Column, func
 from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.orm import defer
 from sqlmodel import Field, SQLModel, select
 
-from api.config import settings
-from api.dependencies import CurrentUser, OptionalUser, SessionDep, StorageDep, get_pubsub_client, get_storage_client
+from api.dependencies import CurrentUser, OptionalUser, SessionDep, SignerDep
+from api.outbox import enqueue_job, outbox_relay
+from api.pagination import DEFAULT_LIMIT, PageCursor, PageLimit, paginate
+from api.routes.drawings import Block, Drawing, Sheet
 from api.schemas.comparison import (
     ChangeCreate,
     ChangeResponse,
@@ -19,6 +21,9 @@ from api.schemas.comparison import (
     ComparisonResponse,
     ComparisonUpdate,
 )
+from api.schemas.tiles import TileSourceResponse
+from api.signing import UrlSigner
+from api.tiles import redirect_to_tile, tile_url_template
 
 router = APIRouter()
 
@@ -78,26 +83,74 @@ def generate_cuid() -> str:
     return f"c{timestamp}{random_part}"[:25]
 
 
-def s3_uri_to_download_url(uri: str | None, storage) -> str | None:
+def s3_uri_to_path(uri: str | None) -> str | None:
+    """Object path of an s3://bucket/path URI, or None for anything else."""
+    if uri and uri.startswith("s3://"):
+        parts = uri[5:].split("/", 1)
+        if len(parts) == 2:
+            return parts[1]
+    return None
+
+
+def s3_uri_to_download_url(uri: str | None, signer: UrlSigner) -> str | None:
     """Convert an S3 URI to a browser-accessible download URL."""
     if not uri:
         return None
-    # Parse s3://bucket/path format
-    if uri.startswith("s3://"):
-        parts = uri[5:].split("/", 1)
-        if len(parts) == 2:
-            _, path = parts
-            return storage.generate_download_url(path)
-    return uri
+    path = s3_uri_to_path(uri)
+    return signer.download_url(path) if path else uri
+
+
+def overlay_tile_source(overlay: Overlay, signer: UrlSigner) -> TileSourceResponse | None:
+    """Build the deep-zoom tile source for an overlay, if the worker wrote one."""
+    manifest = (overlay.summary or {}).get("tiles")
+    return TileSourceResponse.from_manifest(
+        manifest, tile_url_template(f"/api/comparisons/{overlay.id}", manifest, signer)
+    )
+
+
+def manual_alignment_preview_url(overlay: Overlay, signer: UrlSigner) -> str | None:
+    """Download URL of the quick preview while a manual re-render is in progress."""
+    manual = (overlay.summary or {}).get("manualAlignment") or {}
+    if manual.get("status") != "preview":
+        return None
+    return s3_uri_to_download_url(manual.get("previewUri"), signer)
 
 
 @router.get("/project/{project_id}", response_model=list[ComparisonResponse])
-async def list_comparisons(project_id: str, session: SessionDep, storage: StorageDep, user: OptionalUser = None):
-    """List all comparisons for a project."""
-    # For now, return overlays grouped by their parent job
-    # In production, you'd have a proper Comparison table
-    statement = select(Overlay).where(Overlay.deleted_at.is_(None))
-    overlays = session.exec(statement).all()
+def list_comparisons(
+    project_id: str,
+    session: SessionDep,
+    signer: SignerDep,
+    response: Response,
+    user: OptionalUser = None,
+    limit: PageLimit = DEFAULT_LIMIT,
+    cursor: PageCursor = None,
+):
+    """List comparisons for a project, newest first.
+
+    Overlays are scoped to the project through their first block's sheet and
+    drawing. The change and clash arrays are not loaded; only the change count
+    is computed in the database. Pass the ``X-Next-Cursor`` header of a page as
+    ``cursor`` to fetch the next one.
+    """
+    change_count = func.coalesce(func.cardinality(Overlay.changes), 0)
+    statement = (
+        select(Overlay, change_count)
+        .options(defer(Overlay.changes), defer(Overlay.clashes))
+        .join(Block, Block.id == Overlay.block_a_id)
+        .join(Sheet, Sheet.id == Block.sheet_id)
+        .join(Drawing, Drawing.id == Sheet.drawing_id)
+        .where(Drawing.project_id == project_id, Overlay.deleted_at.is_(None))
+    )
+    rows = paginate(session, statement, Overlay, cursor=cursor, limit=limit, response=response)
+
+    # Sign the whole page in one concurrent batch; the per-row lookups below hit the cache
+    signer.download_urls(
+        path
+        for o, _ in rows
+        for path in map(s3_uri_to_path, (o.uri, o.addition_uri, o.deletion_uri))
+        if path
+    )
 
     return [
         ComparisonResponse(
@@ -108,18 +161,19 @@ async def list_comparisons(project_id: str, session: SessionDep, storage: Storag
             status="completed" if o.uri else "processing",
             created_at=o.created_at,
             updated_at=o.updated_at,
-            overlay_uri=s3_uri_to_download_url(o.uri, storage),
-            addition_uri=s3_uri_to_download_url(o.addition_uri, storage),
-            deletion_uri=s3_uri_to_download_url(o.deletion_uri, storage),
+            overlay_uri=s3_uri_to_download_url(o.uri, signer),
+            addition_uri=s3_uri_to_download_url(o.addition_uri, signer),
+            deletion_uri=s3_uri_to_download_url(o.deletion_uri, signer),
             score=o.score,
-            change_count=len(o.changes) if o.changes else 0,
+            tiles=overlay_tile_source(o, signer),
+            change_count=count,
         )
-        for o in overlays
+        for o, count in rows
     ]
 
 
 @router.post("", response_model=ComparisonResponse, status_code=status.HTTP_201_CREATED)
-async def create_comparison(
+def create_comparison(
     comparison_data: ComparisonCreate,
     session: SessionDep,
     user: OptionalUser = None,
@@ -194,9 +248,8 @@ async def create_comparison(
         block_b_id=block_b_id,
     )
     session.add(overlay)
-    session.commit()
+    session.flush()
 
-    # Submit job to Pub/Sub
     import logging
     logger = logging.getLogger("api.routes.comparisons")
     
@@ -206,7 +259,8 @@ async def create_comparison(
     
     job_id = generate_cuid()
     
-    # Create Job record in database first (worker expects it to exist)
+    # Create Job record (worker expects it to exist); the overlay, job and its
+    # Pub/Sub message (outbox) are committed together
     from api.routes.jobs import Job as JobModel
     job = JobModel(
         id=job_id,
@@ -221,63 +275,19 @@ async def create_comparison(
         },
     )
     session.add(job)
-    session.commit()  # Commit job first
+    enqueue_job(
+        session,
+        job_id,
+        "vision.block.overlay.generate",
+        {"blockAId": block_a_id, "blockBId": block_b_id},
+    )
+    session.flush()
     
-    # Update overlay with job_id (job now exists in DB)
+    # Link overlay to its job (job now exists in DB)
     overlay.job_id = job_id
     session.commit()
-    
-    # Worker expects: { "type": "...", "id": "...", "payload": {...} }
-    job_payload = {
-        "type": "vision.block.overlay.generate",
-        "id": job_id,
-        "payload": {
-            "blockAId": block_a_id,
-            "blockBId": block_b_id,
-        },
-    }
-
-    # Publish to Pub/Sub
-    try:
-        print(f"[COMPARISON] Publishing job {job_id} to Pub/Sub...", flush=True)
-        logger.info(f"Publishing job {job_id} to topic {settings.vision_topic}")
-        
-        pubsub = get_pubsub_client()
-        topic_path = pubsub.topic_path(settings.pubsub_project_id, settings.vision_topic)
-        
-        print(f"[COMPARISON] Topic path: {topic_path}", flush=True)
-        print(f"[COMPARISON] Payload: {json.dumps(job_payload)}", flush=True)
-        
-        future = pubsub.publish(
-            topic_path,
-            json.dumps(job_payload).encode("utf-8"),
-            type="vision.block.overlay.generate",
-            id=job_id,
-        )
-        message_id = future.result(timeout=10.0)
-        print(f"[COMPARISON] Successfully published job {job_id}, message_id={message_id}", flush=True)
-        logger.info(f"Successfully published job {job_id}, message_id={message_id}")
-    except Exception as e:
-        # Log error but don't fail - job can be retried manually
-        print(f"[COMPARISON] ERROR: Failed to publish job {job_id} to Pub/Sub: {e}", flush=True)
-        import traceback
-        print(f"[COMPARISON] Traceback: {traceback.format_exc()}", flush=True)
-        logger.error(f"Failed to publish job {job_id} to Pub/Sub: {e}", exc_info=True)
-        # Update job status to indicate publish failure
-        job.status = "Failed"
-        job.events = job.events or []
-        job.events.append({
-            "type": "failed",
-            "status": "Failed",
-            "event_type": "publish_failed",
-            "metadata": {
-                "error": str(e),
-                "errorType": type(e).__name__,
-            },
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        })
-        session.add(job)
-        session.commit()
+    outbox_relay.wake()
+    logger.info(f"Queued job {job_id} for overlay {overlay_id}")
 
     return ComparisonResponse(
         id=overlay.id,
@@ -293,7 +303,7 @@ async def create_comparison(
 
 
 @router.get("/{comparison_id}", response_model=ComparisonResponse)
-async def get_comparison(comparison_id: str, session: SessionDep, storage: StorageDep, user: OptionalUser = None):
+def get_comparison(comparison_id: str, session: SessionDep, signer: SignerDep, user: OptionalUser = None):
     """Get a comparison by ID."""
     overlay = session.get(Overlay, comparison_id)
 
@@ -335,16 +345,38 @@ async def get_comparison(comparison_id: str, session: SessionDep, storage: Stora
         status=status_value,
         created_at=overlay.created_at,
         updated_at=overlay.updated_at,
-        overlay_uri=s3_uri_to_download_url(overlay.uri, storage),
-        addition_uri=s3_uri_to_download_url(overlay.addition_uri, storage),
-        deletion_uri=s3_uri_to_download_url(overlay.deletion_uri, storage),
+        overlay_uri=s3_uri_to_download_url(overlay.uri, signer),
+        addition_uri=s3_uri_to_download_url(overlay.addition_uri, signer),
+        deletion_uri=s3_uri_to_download_url(overlay.deletion_uri, signer),
         score=overlay.score,
+        tiles=overlay_tile_source(overlay, signer),
+        preview_uri=manual_alignment_preview_url(overlay, signer),
         change_count=len(overlay.changes) if overlay.changes else 0,
     )
 
 
+@router.get("/{comparison_id}/tiles/{level}/{column}_{row}.png")
+def get_comparison_tile(
+    comparison_id: str,
+    level: int,
+    column: int,
+    row: int,
+    session: SessionDep,
+    signer: SignerDep,
+    user: OptionalUser = None,
+):
+    """Redirect to a signed URL for one deep-zoom tile of the overlay image."""
+    overlay = session.get(Overlay, comparison_id)
+    if not overlay or overlay.deleted_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comparison not found",
+        )
+    return redirect_to_tile((overlay.summary or {}).get("tiles"), level, column, row, signer)
+
+
 @router.get("/{comparison_id}/changes", response_model=list[ChangeResponse])
-async def list_changes(comparison_id: str, session: SessionDep, user: OptionalUser = None):
+def list_changes(comparison_id: str, session: SessionDep, user: OptionalUser = None):
     """List all changes for a comparison."""
     statement = select(Change).where(
         Change.overlay_id == comparison_id,
@@ -374,7 +406,7 @@ async def list_changes(comparison_id: str, session: SessionDep, user: OptionalUs
 
 
 @router.post("/{comparison_id}/changes", response_model=ChangeResponse, status_code=status.HTTP_201_CREATED)
-async def create_change(
+def create_change(
     comparison_id: str,
     change_data: ChangeCreate,
     session: SessionDep,
@@ -430,7 +462,7 @@ async def create_change(
 
 
 @router.patch("/changes/{change_id}", response_model=ChangeResponse)
-async def update_change(
+def update_change(
     change_id: str,
     change_data: ChangeUpdate,
     session: SessionDep,
@@ -482,7 +514,7 @@ async def update_change(
 
 
 @router.delete("/changes/{change_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_change(change_id: str, session: SessionDep, user: CurrentUser):
+def delete_change(change_id: str, session: SessionDep, user: CurrentUser):
     """Soft delete a change."""
     change = session.get(Change, change_id)
 
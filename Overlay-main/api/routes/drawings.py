@@ -1,18 +1,24 @@
 """Drawing routes."""
 
-import json
 import logging
 from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import Column
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from sqlalchemy import Column, func, null
 from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.orm import defer
 from sqlmodel import Field, SQLModel, select
 
-from api.config import settings
-from api.dependencies import CurrentUser, OptionalUser, SessionDep, get_pubsub_client
+from api.dependencies import CurrentUser, OptionalUser, SessionDep, SignerDep
+from api.etags import check_etag, weak_etag
+from api.outbox import enqueue_job, outbox_relay
+from api.pagination import DEFAULT_LIMIT, PageCursor, PageLimit, paginate
+from api.responses import fast_json, rows_to_dicts
 from api.schemas.drawing import BlockResponse, DrawingCreate, DrawingResponse, SheetResponse
+from api.schemas.tiles import TileSourceResponse
+from api.signing import UrlSigner
+from api.tiles import redirect_to_tile, tile_url_template
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +77,22 @@ class Block(SQLModel, table=True):
     metadata_: dict[str, Any] | None = Field(default=None, sa_column=Column("metadata", JSON))
 
 
+class DrawingProgress(SQLModel, table=True):
+    """Preprocessing progress of a drawing, maintained by the vision worker."""
+
+    __tablename__ = "drawing_progress"
+
+    drawing_id: str = Field(primary_key=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    job_id: str | None = None
+    job_status: str = "Queued"
+    sheets_total: int = 0
+    sheets_completed: int = 0
+    sheets_failed: int = 0
+    block_count: int = 0
+
+
 def generate_cuid() -> str:
     """Generate a CUID-like ID."""
     import secrets
@@ -81,8 +103,32 @@ def generate_cuid() -> str:
     return f"c{timestamp}{random_part}"[:25]
 
 
+def block_columns(include_ocr: bool) -> tuple:
+    """``BlockResponse`` fields as labeled ``blocks`` columns; OCR only when asked for."""
+    return (
+        Block.id,
+        Block.sheet_id,
+        Block.type,
+        Block.uri,
+        Block.bounds,
+        (Block.ocr if include_ocr else null()).label("ocr"),
+        Block.description,
+        Block.metadata_.label("metadata"),
+        Block.created_at,
+        Block.updated_at,
+    )
+
+
+def sheet_tile_source(sheet: Sheet, signer: UrlSigner) -> TileSourceResponse | None:
+    """Build the deep-zoom tile source for a sheet, if the worker wrote one."""
+    manifest = (sheet.metadata_ or {}).get("tiles")
+    return TileSourceResponse.from_manifest(
+        manifest, tile_url_template(f"/api/drawings/sheets/{sheet.id}", manifest, signer)
+    )
+
+
 @router.get("/project/{project_id}", response_model=list[DrawingResponse])
-async def list_drawings(project_id: str, session: SessionDep, user: OptionalUser = None):
+def list_drawings(project_id: str, session: SessionDep, user: OptionalUser = None):
     """List all drawings for a project."""
     statement = select(Drawing).where(
         Drawing.project_id == project_id,
@@ -105,7 +151,7 @@ async def list_drawings(project_id: str, session: SessionDep, user: OptionalUser
 
 
 @router.post("", response_model=DrawingResponse, status_code=status.HTTP_201_CREATED)
-async def create_drawing(
+def create_drawing(
     drawing_data: DrawingCreate,
     session: SessionDep,
     user: CurrentUser,
@@ -143,10 +189,9 @@ async def create_drawing(
     )
 
     session.add(drawing)
-    session.commit()
-    session.refresh(drawing)
-    
-    # Create preprocessing job
+    session.flush()
+
+    # Create preprocessing job; its message is committed with it (outbox)
     job_id = generate_cuid()
     job = JobModel(
         id=job_id,
@@ -158,43 +203,12 @@ async def create_drawing(
         payload={"drawing_id": drawing.id},
     )
     session.add(job)
+    session.add(DrawingProgress(drawing_id=drawing.id, job_id=job_id, job_status="Queued"))
+    enqueue_job(session, job_id, "vision.drawing.preprocess", {"drawingId": drawing.id})
     session.commit()
-    
-    # Publish preprocessing job to Pub/Sub
-    job_payload = {
-        "type": "vision.drawing.preprocess",
-        "id": job_id,
-        "payload": {
-            "drawingId": drawing.id,
-        },
-    }
-    
-    try:
-        logger.info(f"Publishing preprocessing job {job_id} for drawing {drawing.id}")
-        pubsub = get_pubsub_client()
-        topic_path = pubsub.topic_path(settings.pubsub_project_id, settings.vision_topic)
-        
-        future = pubsub.publish(
-            topic_path,
-            json.dumps(job_payload).encode("utf-8"),
-            type="vision.drawing.preprocess",
-            id=job_id,
-        )
-        message_id = future.result(timeout=10.0)
-        logger.info(f"Successfully published preprocessing job {job_id}, message_id={message_id}")
-    except Exception as e:
-        logger.error(f"Failed to publish preprocessing job {job_id}: {e}", exc_info=True)
-        # Update job status to indicate publish failure
-        job.status = "Failed"
-        job.events = job.events or []
-        job.events.append({
-            "type": "failed",
-            "event_type": "publish_failed",
-            "metadata": {"error": str(e)},
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        })
-        session.add(job)
-        session.commit()
+    session.refresh(drawing)
+    outbox_relay.wake()
+    logger.info(f"Queued preprocessing job {job_id} for drawing {drawing.id}")
 
     return DrawingResponse(
         id=drawing.id,
@@ -209,36 +223,37 @@ async def create_drawing(
 
 
 @router.get("/blocks", response_model=list[BlockResponse])
-async def list_all_blocks(session: SessionDep, user: OptionalUser = None, block_type: str | None = None):
-    """List all blocks, optionally filtered by type."""
+def list_all_blocks(
+    session: SessionDep,
+    response: Response,
+    user: OptionalUser = None,
+    block_type: str | None = None,
+    project_id: str | None = None,
+    include_ocr: bool = False,
+    limit: PageLimit = DEFAULT_LIMIT,
+    cursor: PageCursor = None,
+):
+    """List blocks newest first, optionally filtered by type and project.
+
+    OCR text is left out unless ``include_ocr`` is set. Pass the
+    ``X-Next-Cursor`` header of a page as ``cursor`` to fetch the next one.
+    """
+    statement = select(*block_columns(include_ocr)).where(Block.deleted_at.is_(None))
     if block_type:
-        statement = select(Block).where(
-            Block.deleted_at.is_(None),
-            Block.type == block_type,
+        statement = statement.where(Block.type == block_type)
+    if project_id:
+        statement = (
+            statement.join(Sheet, Sheet.id == Block.sheet_id)
+            .join(Drawing, Drawing.id == Sheet.drawing_id)
+            .where(Drawing.project_id == project_id, Sheet.deleted_at.is_(None))
         )
-    else:
-        statement = select(Block).where(Block.deleted_at.is_(None))
-    blocks = session.exec(statement).all()
+    blocks = paginate(session, statement, Block, cursor=cursor, limit=limit, response=response)
 
-    return [
-        BlockResponse(
-            id=b.id,
-            sheet_id=b.sheet_id,
-            type=b.type,
-            uri=b.uri,
-            bounds=b.bounds,
-            ocr=b.ocr,
-            description=b.description,
-            metadata=b.metadata_,
-            created_at=b.created_at,
-            updated_at=b.updated_at,
-        )
-        for b in blocks
-    ]
+    return fast_json(rows_to_dicts(blocks), response)
 
 
 @router.get("/{drawing_id}", response_model=DrawingResponse)
-async def get_drawing(drawing_id: str, session: SessionDep, user: OptionalUser = None):
+def get_drawing(drawing_id: str, session: SessionDep, user: OptionalUser = None):
     """Get a drawing by ID."""
     drawing = session.get(Drawing, drawing_id)
 
@@ -260,7 +275,7 @@ async def get_drawing(drawing_id: str, session: SessionDep, user: OptionalUser =
 
 
 @router.get("/{drawing_id}/sheets", response_model=list[SheetResponse])
-async def list_sheets(drawing_id: str, session: SessionDep, user: CurrentUser):
+def list_sheets(drawing_id: str, session: SessionDep, signer: SignerDep, user: CurrentUser):
     """List all sheets for a drawing."""
     statement = select(Sheet).where(
         Sheet.drawing_id == drawing_id,
@@ -278,6 +293,7 @@ async def list_sheets(drawing_id: str, session: SessionDep, user: CurrentUser):
             sheet_number=s.sheet_number,
             discipline=s.discipline,
             metadata=s.metadata_,
+            tiles=sheet_tile_source(s, signer),
             created_at=s.created_at,
             updated_at=s.updated_at,
         )
@@ -286,7 +302,7 @@ async def list_sheets(drawing_id: str, session: SessionDep, user: CurrentUser):
 
 
 @router.get("/sheets/{sheet_id}", response_model=SheetResponse)
-async def get_sheet(sheet_id: str, session: SessionDep, user: CurrentUser):
+def get_sheet(sheet_id: str, session: SessionDep, signer: SignerDep, user: CurrentUser):
     """Get a sheet by ID."""
     sheet = session.get(Sheet, sheet_id)
 
@@ -305,78 +321,102 @@ async def get_sheet(sheet_id: str, session: SessionDep, user: CurrentUser):
         sheet_number=sheet.sheet_number,
         discipline=sheet.discipline,
         metadata=sheet.metadata_,
+        tiles=sheet_tile_source(sheet, signer),
         created_at=sheet.created_at,
         updated_at=sheet.updated_at,
     )
 
 
-@router.get("/sheets/{sheet_id}/blocks", response_model=list[BlockResponse])
-async def list_blocks(sheet_id: str, session: SessionDep, user: OptionalUser = None):
-    """List all blocks for a sheet."""
-    statement = select(Block).where(
-        Block.sheet_id == sheet_id,
-        Block.deleted_at.is_(None),
-    )
-    blocks = session.exec(statement).all()
-
-    return [
-        BlockResponse(
-            id=b.id,
-            sheet_id=b.sheet_id,
-            type=b.type,
-            uri=b.uri,
-            bounds=b.bounds,
-            ocr=b.ocr,
-            description=b.description,
-            metadata=b.metadata_,
-            created_at=b.created_at,
-            updated_at=b.updated_at,
+@router.get("/sheets/{sheet_id}/tiles/{level}/{column}_{row}.png")
+def get_sheet_tile(
+    sheet_id: str,
+    level: int,
+    column: int,
+    row: int,
+    session: SessionDep,
+    signer: SignerDep,
+    user: OptionalUser = None,
+):
+    """Redirect to a signed URL for one deep-zoom tile of the sheet image."""
+    sheet = session.get(Sheet, sheet_id)
+    if not sheet or sheet.deleted_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sheet not found",
         )
-        for b in blocks
-    ]
+    return redirect_to_tile((sheet.metadata_ or {}).get("tiles"), level, column, row, signer)
 
 
-@router.get("/{drawing_id}/blocks", response_model=list[BlockResponse])
-async def list_blocks_by_drawing(drawing_id: str, session: SessionDep, user: OptionalUser = None):
-    """List all blocks for a drawing (across all sheets)."""
-    # First get all sheets for this drawing
-    sheets = session.exec(
-        select(Sheet).where(
-            Sheet.drawing_id == drawing_id,
-            Sheet.deleted_at.is_(None),
+@router.get("/sheets/{sheet_id}/blocks", response_model=list[BlockResponse])
+def list_blocks(
+    sheet_id: str,
+    session: SessionDep,
+    response: Response,
+    user: OptionalUser = None,
+    include_ocr: bool = False,
+):
+    """List all blocks for a sheet; OCR text only when ``include_ocr`` is set."""
+    blocks = session.exec(
+        select(*block_columns(include_ocr)).where(
+            Block.sheet_id == sheet_id,
+            Block.deleted_at.is_(None),
         )
     ).all()
-    
-    sheet_ids = [s.id for s in sheets]
-    if not sheet_ids:
-        return []
-    
-    # Get all blocks for these sheets
-    statement = select(Block).where(
-        Block.sheet_id.in_(sheet_ids),
+
+    return fast_json(rows_to_dicts(blocks), response)
+
+
+@router.get("/{drawing_id}/blocks", response_model=list[BlockResponse])
+def list_blocks_by_drawing(
+    drawing_id: str,
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    user: OptionalUser = None,
+    include_ocr: bool = False,
+):
+    """List all blocks for a drawing (across all sheets).
+
+    OCR text is left out unless ``include_ocr`` is set. The ETag covers the
+    newest block ``updated_at`` and the block count, so a client polling with
+    ``If-None-Match`` gets a 304 until a block is added, changed or removed.
+    """
+    live_blocks = (
+        Sheet.drawing_id == drawing_id,
+        Sheet.deleted_at.is_(None),
         Block.deleted_at.is_(None),
     )
-    blocks = session.exec(statement).all()
+    latest, count = session.exec(
+        select(func.max(Block.updated_at), func.count(Block.id))
+        .join(Sheet, Sheet.id == Block.sheet_id)
+        .where(*live_blocks)
+    ).one()
+    not_modified = check_etag(
+        request, response, weak_etag("blocks", drawing_id, include_ocr, latest, count)
+    )
+    if not_modified:
+        return not_modified
 
-    return [
-        BlockResponse(
-            id=b.id,
-            sheet_id=b.sheet_id,
-            type=b.type,
-            uri=b.uri,
-            bounds=b.bounds,
-            ocr=b.ocr,
-            description=b.description,
-            metadata=b.metadata_,
-            created_at=b.created_at,
-            updated_at=b.updated_at,
-        )
-        for b in blocks
-    ]
+    blocks = session.exec(
+        select(*block_columns(include_ocr))
+        .join(Sheet, Sheet.id == Block.sheet_id)
+        .where(*live_blocks)
+    ).all()
+
+    return fast_json(rows_to_dicts(blocks), response)
 
 
 @router.get("/{drawing_id}/status")
-async def get_drawing_status(drawing_id: str, session: SessionDep, user: OptionalUser = None):
+def get_drawing_status(
+    drawing_id: str,
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    user: OptionalUser = None,
+    include_blocks: bool = False,
+    limit: PageLimit = DEFAULT_LIMIT,
+    cursor: PageCursor = None,
+):
     """Get the preprocessing status of a drawing.
     
     Status is determined by:
@@ -384,54 +424,49 @@ async def get_drawing_status(drawing_id: str, session: SessionDep, user: Optiona
     2. vision.sheet.preprocess jobs - extracts blocks from each sheet using Gemini
     
     Status is only 'completed' when ALL jobs are done.
+
+    Status, counts and progress come from the drawing's ``drawing_progress``
+    row, which the worker keeps current. Blocks are only listed when
+    ``include_blocks`` is set, one page of ``limit`` at a time.
+
+    The ETag follows the progress row's ``updated_at`` (and, with blocks,
+    the newest block change), so pollers get a 304 while nothing moved.
     """
-    from api.routes.jobs import Job as JobModel
-    
-    drawing = session.get(Drawing, drawing_id)
-    if not drawing or drawing.deleted_at is not None:
+    row = session.exec(
+        select(Drawing.deleted_at, DrawingProgress)
+        .outerjoin(DrawingProgress, DrawingProgress.drawing_id == Drawing.id)
+        .where(Drawing.id == drawing_id)
+    ).first()
+    if row is None or row[0] is not None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Drawing not found",
         )
-    
-    # Find the drawing preprocessing job
-    drawing_job = session.exec(
-        select(JobModel).where(
-            JobModel.target_id == drawing_id,
-            JobModel.target_type == "drawing",
-            JobModel.type == "vision.drawing.preprocess",
-        ).order_by(JobModel.created_at.desc())
-    ).first()
-    
-    # Count sheets and blocks
-    sheets = session.exec(
-        select(Sheet).where(
-            Sheet.drawing_id == drawing_id,
-            Sheet.deleted_at.is_(None),
+    progress_row = row[1] or DrawingProgress(drawing_id=drawing_id)
+    version: tuple = (progress_row.updated_at if row[1] else None,)
+    live_sheets = select(Sheet.id).where(
+        Sheet.drawing_id == drawing_id,
+        Sheet.deleted_at.is_(None),
+    )
+    if include_blocks:
+        version += tuple(
+            session.exec(
+                select(func.max(Block.updated_at), func.count(Block.id)).where(
+                    Block.sheet_id.in_(live_sheets), Block.deleted_at.is_(None)
+                )
+            ).one()
         )
-    ).all()
-    
-    sheet_ids = [s.id for s in sheets]
-    blocks = []
-    
-    # Find sheet preprocessing jobs (these extract blocks using Gemini)
-    sheet_jobs = []
-    if sheet_ids:
-        blocks = session.exec(
-            select(Block).where(
-                Block.sheet_id.in_(sheet_ids),
-                Block.deleted_at.is_(None),
-            )
-        ).all()
-        
-        # Check if any sheet preprocessing jobs are still running
-        sheet_jobs = session.exec(
-            select(JobModel).where(
-                JobModel.target_id.in_(sheet_ids),
-                JobModel.target_type == "sheet",
-                JobModel.type == "vision.sheet.preprocess",
-            )
-        ).all()
+    not_modified = check_etag(
+        request,
+        response,
+        weak_etag("status", drawing_id, include_blocks, limit, cursor, *version),
+    )
+    if not_modified:
+        return not_modified
+    job_status = progress_row.job_status
+    sheet_count = progress_row.sheets_total
+    completed_sheets = progress_row.sheets_completed
+    finished_sheets = completed_sheets + progress_row.sheets_failed
     
     status_map = {
         "Queued": "pending",
@@ -447,54 +482,43 @@ async def get_drawing_status(drawing_id: str, session: SessionDep, user: Optiona
     # - If all jobs are completed -> completed
     # - If any job failed -> failed
     
-    overall_status = "pending"
-    
-    if drawing_job:
-        if drawing_job.status in ("Queued", "Started"):
-            overall_status = status_map.get(drawing_job.status, "pending")
-        elif drawing_job.status in ("Failed", "Canceled"):
+    overall_status = status_map.get(job_status, "pending")
+    if job_status == "Completed" and sheet_count:
+        if progress_row.sheets_failed:
             overall_status = "failed"
-        elif drawing_job.status == "Completed":
-            # Drawing job done, check sheet jobs
-            if not sheets:
-                overall_status = "completed"  # No sheets = done
-            elif not sheet_jobs:
-                # Sheets exist but no sheet jobs yet - still processing
-                overall_status = "processing"
-            else:
-                # Check all sheet jobs
-                any_running = any(j.status in ("Queued", "Started") for j in sheet_jobs)
-                any_failed = any(j.status in ("Failed", "Canceled") for j in sheet_jobs)
-                
-                if any_failed:
-                    overall_status = "failed"
-                elif any_running:
-                    overall_status = "processing"
-                else:
-                    overall_status = "completed"
+        elif finished_sheets < sheet_count:
+            overall_status = "processing"
     
     # Calculate progress percentage
     progress = 0
-    if drawing_job:
-        if drawing_job.status == "Completed":
-            progress = 20  # Drawing preprocessing done (20%)
-            if sheet_jobs:
-                completed_sheets = sum(1 for j in sheet_jobs if j.status == "Completed")
-                total_sheets = len(sheet_jobs)
-                if total_sheets > 0:
-                    # Remaining 80% is for sheet preprocessing
-                    progress = 20 + int(80 * completed_sheets / total_sheets)
-        elif drawing_job.status == "Started":
-            progress = 10
+    if job_status == "Completed":
+        progress = 20  # Drawing preprocessing done (20%)
+        if sheet_count:
+            # Remaining 80% is for sheet preprocessing
+            progress = 20 + int(80 * completed_sheets / sheet_count)
+    elif job_status == "Started":
+        progress = 10
     
-    return {
+    result = {
         "drawing_id": drawing_id,
         "status": overall_status,
-        "job_id": drawing_job.id if drawing_job else None,
-        "sheet_count": len(sheets),
-        "block_count": len(blocks),
+        "job_id": progress_row.job_id,
+        "sheet_count": sheet_count,
+        "block_count": progress_row.block_count,
         "progress": progress,
-        "blocks": [
+    }
+    if include_blocks:
+        blocks = paginate(
+            session,
+            select(Block)
+            .options(defer(Block.ocr))
+            .where(Block.sheet_id.in_(live_sheets), Block.deleted_at.is_(None)),
+            Block,
+            cursor=cursor,
+            limit=limit,
+            response=response,
+        )
+        result["blocks"] = [
             {
                 "id": b.id,
                 "type": b.type,
@@ -502,6 +526,5 @@ async def get_drawing_status(drawing_id: str, session: SessionDep, user: Optiona
                 "uri": b.uri,
             }
             for b in blocks
-        ],
-    }
-
+        ]
+    return result
@@ -1,18 +1,44 @@
 """Job routes for tracking processing status."""
 
-from datetime import datetime, timezone
-from typing import Any
-
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
-from sqlalchemy import Column
-from sqlalchemy.dialects.postgresql import JSON
+import asyncio
+import json
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated, Any
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Column, func, literal, true, type_coerce, update
+from sqlalchemy.dialects.postgresql import JSON, JSONB
 from sqlmodel import Field, SQLModel, select
 
-from api.dependencies import CurrentUser, SessionDep
-from api.schemas.job import JobCreate, JobResponse, JobStatus
+from api.dependencies import CurrentUser, OptionalUser, SessionDep
+from api.etags import check_etag, weak_etag
+from api.job_stream import JOB_STATUS_CHANNEL, job_status_hub, job_status_notification
+from api.pagination import (
+    DEFAULT_LIMIT,
+    MAX_LIMIT,
+    NEXT_CURSOR_HEADER,
+    PageCursor,
+    PageLimit,
+    paginate,
+)
+from api.responses import fast_json, rows_to_dicts
+from api.schemas.job import JobCreate, JobEventsResponse, JobResponse, JobStatus
 
 router = APIRouter()
 
+SSE_KEEPALIVE_SECONDS = 15.0
+
 
 # SQLModel for Job (matches Prisma schema)
 class Job(SQLModel, table=True):
@@ -21,8 +47,8 @@ class Job(SQLModel, table=True):
     __tablename__ = "jobs"
 
     id: str = Field(primary_key=True)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     project_id: str | None = None
     parent_id: str | None = None
     target_type: str
@@ -31,6 +57,23 @@ class Job(SQLModel, table=True):
     status: str = "Queued"
     payload: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
     events: list[dict[str, Any]] | None = Field(default=None, sa_column=Column(JSON))
+    heartbeat_at: datetime | None = None
+
+
+# JobResponse fields as read from the table; events are fetched separately
+JOB_LIST_COLUMNS = (
+    Job.id,
+    Job.type,
+    Job.status,
+    Job.project_id,
+    Job.parent_id,
+    Job.target_type,
+    Job.target_id,
+    Job.payload,
+    Job.created_at,
+    Job.updated_at,
+    Job.heartbeat_at,
+)
 
 
 def generate_cuid() -> str:
@@ -44,44 +87,64 @@ def generate_cuid() -> str:
 
 
 @router.get("", response_model=list[JobResponse])
-async def list_jobs(
+def list_jobs(
     session: SessionDep,
     user: CurrentUser,
+    request: Request,
+    response: Response,
     project_id: str | None = None,
     status_filter: str | None = None,
-    limit: int = 50,
+    limit: PageLimit = DEFAULT_LIMIT,
+    cursor: PageCursor = None,
+    include_events: bool = False,
 ):
-    """List jobs with optional filters."""
-    statement = select(Job)
+    """List jobs newest first, with optional filters.
+
+    Event timelines are left out unless ``include_events`` is set; use
+    ``GET /jobs/{job_id}/events`` to page through a job's events. Pass the
+    ``X-Next-Cursor`` header of a page as ``cursor`` to fetch the next one.
+
+    The page is read without events first; its ETag covers each job's
+    ``updated_at`` and heartbeat, so a poller whose page did not change gets a
+    304 and the event timelines are never loaded.
+    """
+    statement = select(*JOB_LIST_COLUMNS)
 
     if project_id:
         statement = statement.where(Job.project_id == project_id)
     if status_filter:
         statement = statement.where(Job.status == status_filter)
 
-    statement = statement.order_by(Job.created_at.desc()).limit(limit)
-    jobs = session.exec(statement).all()
-
-    return [
-        JobResponse(
-            id=j.id,
-            type=j.type,
-            status=_map_status(j.status),
-            project_id=j.project_id,
-            parent_id=j.parent_id,
-            target_type=j.target_type,
-            target_id=j.target_id,
-            payload=j.payload,
-            events=j.events or [],
-            created_at=j.created_at,
-            updated_at=j.updated_at,
+    jobs = paginate(session, statement, Job, cursor=cursor, limit=limit, response=response)
+
+    not_modified = check_etag(
+        request,
+        response,
+        weak_etag(
+            "jobs",
+            include_events,
+            response.headers.get(NEXT_CURSOR_HEADER),
+            *((j.id, j.status, j.updated_at, j.heartbeat_at) for j in jobs),
+        ),
+    )
+    if not_modified:
+        return not_modified
+
+    events: dict[str, list[dict[str, Any]] | None] = {}
+    if include_events and jobs:
+        events = dict(
+            session.exec(select(Job.id, Job.events).where(Job.id.in_([j.id for j in jobs]))).all()
         )
-        for j in jobs
-    ]
+
+    items = rows_to_dicts(jobs)
+    for item in items:
+        item["status"] = _map_status(item["status"]).value
+        item["events"] = events.get(item["id"]) or []
+    return fast_json(items, response)
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-async def get_job(job_id: str, session: SessionDep, user: CurrentUser):
+def get_job(job_id: str, session: SessionDep, user: CurrentUser):
     """Get a job by ID."""
     job = session.get(Job, job_id)
 
@@ -103,11 +166,59 @@ async def get_job(job_id: str, session: SessionDep, user: CurrentUser):
         events=job.events or [],
         created_at=job.created_at,
         updated_at=job.updated_at,
+        heartbeat_at=job.heartbeat_at,
+    )
+
+
+@router.get("/{job_id}/events", response_model=JobEventsResponse)
+def list_job_events(
+    job_id: str,
+    session: SessionDep,
+    user: CurrentUser,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=MAX_LIMIT)] = DEFAULT_LIMIT,
+):
+    """Page through a job's event timeline, oldest first."""
+    events = type_coerce(Job.__table__.c.events, JSONB)
+    total = session.exec(
+        select(func.jsonb_array_length(func.coalesce(events, literal([], JSONB)))).where(
+            Job.id == job_id
+        )
+    ).first()
+
+    if total is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    elements = (
+        func.jsonb_array_elements(events)
+        .table_valued("value", with_ordinality="position")
+        .render_derived(name="event")
+        .lateral()
+    )
+    page = session.exec(
+        select(elements.c.value)
+        .select_from(Job.__table__)
+        .join(elements, true())
+        .where(Job.id == job_id)
+        .order_by(elements.c.position)
+        .offset(offset)
+        .limit(limit)
+    ).all()
+
+    return JobEventsResponse(
+        job_id=job_id,
+        events=list(page),
+        total=total,
+        offset=offset,
+        limit=limit,
     )
 
 
 @router.post("/{job_id}/cancel", response_model=JobResponse)
-async def cancel_job(job_id: str, session: SessionDep, user: CurrentUser):
+def cancel_job(job_id: str, session: SessionDep, user: CurrentUser):
     """Cancel a job."""
     job = session.get(Job, job_id)
 
@@ -123,9 +234,32 @@ async def cancel_job(job_id: str, session: SessionDep, user: CurrentUser):
             detail=f"Cannot cancel job with status: {job.status}",
         )
 
-    job.status = "Canceled"
-    job.updated_at = datetime.now(timezone.utc)
-    session.add(job)
+    now = datetime.now(UTC)
+    event = {
+        "id": str(uuid.uuid4()),
+        "jobType": job.type,
+        "jobId": job.id,
+        "status": "Canceled",
+        "eventType": "canceled",
+        "createdAt": now.isoformat(),
+        "drawingId": None,
+        "sheetId": None,
+        "blockId": None,
+        "metadata": None,
+    }
+    # Appended in place like the worker's events, so a concurrent worker append
+    # is not overwritten; the notification goes out with the commit
+    events = type_coerce(Job.__table__.c.events, JSONB)
+    session.exec(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(
+            status="Canceled",
+            updated_at=now,
+            events=func.coalesce(events, literal([], JSONB)).op("||")(literal([event], JSONB)),
+        )
+        .returning(func.pg_notify(JOB_STATUS_CHANNEL, job_status_notification(job, event)))
+    )
     session.commit()
     session.refresh(job)
 
@@ -141,46 +275,73 @@ async def cancel_job(job_id: str, session: SessionDep, user: CurrentUser):
         events=job.events or [],
         created_at=job.created_at,
         updated_at=job.updated_at,
+        heartbeat_at=job.heartbeat_at,
     )
 
 
-# WebSocket for real-time job updates
-connected_clients: dict[str, list[WebSocket]] = {}
+@router.get("/{job_id}/stream")
+async def stream_job_status(job_id: str, request: Request, user: OptionalUser = None):
+    """Server-sent events with status updates of a job and its child jobs.
+
+    Each ``data:`` line is a JSON list of coalesced updates; comment lines
+    keep the connection alive while nothing changes.
+    """
+    subscription = job_status_hub.subscribe(job_id)
+
+    async def events():
+        try:
+            yield ": subscribed\n\n"
+            while not await request.is_disconnected():
+                try:
+                    batch = await asyncio.wait_for(
+                        subscription.next_batch(), timeout=SSE_KEEPALIVE_SECONDS
+                    )
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(batch)}\n\n"
+        finally:
+            job_status_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.websocket("/ws/{job_id}")
 async def job_status_websocket(websocket: WebSocket, job_id: str):
-    """WebSocket endpoint for real-time job status updates."""
-    await websocket.accept()
-
-    # Add to connected clients
-    if job_id not in connected_clients:
-        connected_clients[job_id] = []
-    connected_clients[job_id].append(websocket)
+    """WebSocket with status updates of a job and its child jobs.
 
+    Sends ``{"job_id": ..., "updates": [...]}`` per coalesced batch.
+    """
+    await websocket.accept()
+    subscription = job_status_hub.subscribe(job_id)
+
+    async def receive():
+        # Keep connection alive; echo back any received data (for ping/pong)
+        try:
+            while True:
+                data = await websocket.receive_text()
+                await websocket.send_text(f"Received: {data}")
+        except WebSocketDisconnect:
+            pass
+
+    receiver = asyncio.create_task(receive())
     try:
-        while True:
-            # Keep connection alive and wait for messages
-            data = await websocket.receive_text()
-            # Echo back any received data (for ping/pong)
-            await websocket.send_text(f"Received: {data}")
+        while not receiver.done():
+            batch = asyncio.create_task(subscription.next_batch())
+            await asyncio.wait({batch, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if not batch.done():
+                batch.cancel()
+                break
+            await websocket.send_json({"job_id": job_id, "updates": batch.result()})
     except WebSocketDisconnect:
-        # Remove from connected clients
-        if job_id in connected_clients:
-            connected_clients[job_id].remove(websocket)
-            if not connected_clients[job_id]:
-                del connected_clients[job_id]
-
-
-async def broadcast_job_update(job_id: str, status: str, data: dict):
-    """Broadcast job update to all connected clients."""
-    if job_id in connected_clients:
-        message = {"job_id": job_id, "status": status, **data}
-        for websocket in connected_clients[job_id]:
-            try:
-                await websocket.send_json(message)
-            except Exception:
-                pass  # Client disconnected
+        pass
+    finally:
+        receiver.cancel()
+        job_status_hub.unsubscribe(subscription)
 
 
 def _map_status(db_status: str) -> JobStatus:
@@ -40,7 +40,7 @@ def generate_cuid() -> str:
 
 
 @router.get("", response_model=list[ProjectResponse])
-async def list_projects(session: SessionDep, user: CurrentUser):
+def list_projects(session: SessionDep, user: CurrentUser):
     """List all projects for the current user's organization."""
     org_id = user.get("organization_id", "default-org")
     statement = select(Project).where(
@@ -63,7 +63,7 @@ async def list_projects(session: SessionDep, user: CurrentUser):
 
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-async def create_project(
+def create_project(
     project_data: ProjectCreate,
     session: SessionDep,
     user: CurrentUser,
@@ -93,7 +93,7 @@ async def create_project(
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
-async def get_project(project_id: str, session: SessionDep, user: CurrentUser):
+def get_project(project_id: str, session: SessionDep, user: CurrentUser):
     """Get a project by ID."""
     project = session.get(Project, project_id)
 
@@ -114,7 +114,7 @@ async def get_project(project_id: str, session: SessionDep, user: CurrentUser):
 
 
 @router.patch("/{project_id}", response_model=ProjectResponse)
-async def update_project(
+def update_project(
     project_id: str,
     project_data: ProjectUpdate,
     session: SessionDep,
@@ -150,7 +150,7 @@ async def update_project(
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_project(project_id: str, session: SessionDep, user: CurrentUser):
+def delete_project(project_id: str, session: SessionDep, user: CurrentUser):
     """Soft delete a project."""
     project = session.get(Project, project_id)
 
@@ -1,33 +1,171 @@
-"""Upload routes for file handling."""
+"""Upload routes for file handling.
 
+Files can reach storage three ways:
+
+- ``/signed-url``: the browser PUTs the whole file to a presigned URL;
+- ``/resumable``: the browser uploads in chunks to a resumable session (S3
+  multipart or GCS resumable) and can resume after an interruption;
+- ``/stream`` (raw request body) and ``/direct`` (multipart form): the API
+  streams the body to storage chunk by chunk, so API memory stays bounded by
+  ``upload_chunk_size_bytes`` however large the file is.
+
+Streamed uploads compute the file's SHA-256 on the way through. A client that
+already knows the hash sends it in ``X-Content-SHA256``: the file is then
+stored at a content-addressed path, and if the same contents were uploaded to
+the project before, the stored copy is returned without uploading again.
+"""
+
+import hashlib
+import logging
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime
+from typing import Annotated
 
-from fastapi import APIRouter, File, UploadFile, HTTPException, status
+from fastapi import APIRouter, File, Header, UploadFile, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 
 from api.config import settings
-from api.dependencies import CurrentUser, OptionalUser, StorageDep
-from api.schemas.upload import SignedUrlRequest, SignedUrlResponse
+from api.dependencies import CurrentUser, OptionalUser, SignerDep, StorageDep
+from api.schemas.upload import (
+    CompleteUploadRequest,
+    ResumableUploadRequest,
+    ResumableUploadResponse,
+    SignedUrlRequest,
+    SignedUrlResponse,
+    UploadResponse,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+CONTENT_HASH_HEADER = "X-Content-SHA256"
+
+ContentHashHeader = Annotated[
+    str | None,
+    Header(
+        alias=CONTENT_HASH_HEADER,
+        pattern="^[0-9a-f]{64}$",
+        description="Hex SHA-256 of the file, if known; verified while streaming",
+    ),
+]
+
+
+def upload_path(
+    filename: str | None, project_id: str | None, content_hash: str | None = None
+) -> str:
+    """Storage path for an upload; content-addressed when the hash is known."""
+    extension = filename.rsplit(".", 1)[-1] if filename and "." in filename else "pdf"
+    prefix = f"projects/{project_id}/uploads" if project_id else "uploads"
+    if content_hash:
+        return f"{prefix}/sha256/{content_hash}.{extension}"
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    unique_id = uuid.uuid4().hex[:8]
+    return f"{prefix}/{timestamp}-{unique_id}.{extension}"
+
+
+async def stream_to_storage(
+    storage,
+    chunks: AsyncIterator[bytes],
+    remote_path: str,
+    content_type: str,
+    expected_hash: str | None = None,
+) -> tuple[str, int, str]:
+    """Stream chunks to storage while hashing them.
+
+    At most one ``upload_chunk_size_bytes`` chunk is held in memory. The upload
+    is aborted, leaving no object behind, if the stream fails or its SHA-256
+    does not match ``expected_hash``.
+
+    Returns:
+        Tuple of (storage URI, size in bytes, hex SHA-256)
+    """
+    chunk_size = settings.upload_chunk_size_bytes
+    writer = storage.open_upload(remote_path, content_type, chunk_size)
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    try:
+        async for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+            buffer += chunk
+            if len(buffer) >= chunk_size:
+                # Blocking SDK call: keep it off the event loop
+                await run_in_threadpool(writer.write, bytes(buffer))
+                buffer.clear()
+        content_hash = digest.hexdigest()
+        if expected_hash and content_hash != expected_hash:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File contents do not match {CONTENT_HASH_HEADER}",
+            )
+        if buffer:
+            await run_in_threadpool(writer.write, bytes(buffer))
+        uri = await run_in_threadpool(writer.close)
+    except BaseException:
+        try:
+            await run_in_threadpool(writer.abort)
+        except Exception as e:
+            logger.warning(f"Failed to abort upload of {remote_path}: {e}")
+        raise
+    return uri, size, content_hash
+
+
+async def _stored_copy(storage, remote_path: str, content_hash: str | None) -> bool:
+    """Whether the contents of a content-addressed upload are already stored."""
+    return bool(content_hash) and await run_in_threadpool(storage.exists, remote_path)
+
+
+async def _stream_upload(
+    storage,
+    chunks: AsyncIterator[bytes],
+    filename: str | None,
+    project_id: str | None,
+    content_type: str,
+    content_hash: str | None,
+) -> UploadResponse:
+    remote_path = upload_path(filename, project_id, content_hash)
+    try:
+        if await _stored_copy(storage, remote_path, content_hash):
+            return UploadResponse(
+                uri=storage.uri(remote_path),
+                remote_path=remote_path,
+                filename=filename,
+                content_type=content_type,
+                content_hash=content_hash,
+                deduplicated=True,
+            )
+        uri, size, content_hash = await stream_to_storage(
+            storage, chunks, remote_path, content_type, expected_hash=content_hash
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload file: {str(e)}",
+        )
+
+    return UploadResponse(
+        uri=uri,
+        remote_path=remote_path,
+        filename=filename,
+        content_type=content_type,
+        size=size,
+        content_hash=content_hash,
+    )
+
 
 @router.post("/signed-url", response_model=SignedUrlResponse)
-async def get_signed_upload_url(
+def get_signed_upload_url(
     request: SignedUrlRequest,
     storage: StorageDep,
     user: OptionalUser,  # Allow unauthenticated in dev mode
 ):
     """Generate a signed URL for uploading a file to storage."""
-    # Generate unique remote path
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    unique_id = uuid.uuid4().hex[:8]
-    extension = request.filename.rsplit(".", 1)[-1] if "." in request.filename else "pdf"
-
-    if request.project_id:
-        remote_path = f"projects/{request.project_id}/uploads/{timestamp}-{unique_id}.{extension}"
-    else:
-        remote_path = f"uploads/{timestamp}-{unique_id}.{extension}"
+    remote_path = upload_path(request.filename, request.project_id)
 
     try:
         upload_url = storage.generate_signed_url(remote_path)
@@ -44,61 +182,155 @@ async def get_signed_upload_url(
     )
 
 
-@router.post("/direct")
+@router.post("/direct", response_model=UploadResponse)
 async def upload_file_directly(
     file: UploadFile = File(...),
     project_id: str | None = None,
     storage: StorageDep = None,
     user: OptionalUser = None,  # Allow unauthenticated in dev mode
+    content_hash: ContentHashHeader = None,
 ):
-    """Upload a file directly (for smaller files or when signed URLs aren't supported)."""
+    """Upload a file directly (for smaller files or when signed URLs aren't supported).
+
+    The form file is streamed to storage in chunks rather than read into
+    memory; prefer ``/stream``, which also skips the form parser's spool file.
+    """
     if storage is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Storage not configured",
         )
 
-    # Generate unique remote path
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    unique_id = uuid.uuid4().hex[:8]
-    extension = file.filename.rsplit(".", 1)[-1] if file.filename and "." in file.filename else "pdf"
-    
-    if project_id:
-        remote_path = f"projects/{project_id}/uploads/{timestamp}-{unique_id}.{extension}"
-    else:
-        remote_path = f"uploads/{timestamp}-{unique_id}.{extension}"
+    async def chunks() -> AsyncIterator[bytes]:
+        while chunk := await file.read(settings.upload_chunk_size_bytes):
+            yield chunk
+
+    return await _stream_upload(
+        storage,
+        chunks(),
+        file.filename,
+        project_id,
+        file.content_type or "application/octet-stream",
+        content_hash,
+    )
 
+
+@router.put("/stream", response_model=UploadResponse)
+async def upload_file_stream(
+    request: Request,
+    filename: str,
+    storage: StorageDep,
+    user: OptionalUser,  # Allow unauthenticated in dev mode
+    project_id: str | None = None,
+    content_hash: ContentHashHeader = None,
+):
+    """Upload a file sent as the raw request body, streaming it to storage.
+
+    The body is piped to an S3 multipart / GCS resumable upload as it
+    arrives, so large drawing sets never sit in API memory or on local disk.
+    """
+    return await _stream_upload(
+        storage,
+        request.stream(),
+        filename,
+        project_id,
+        request.headers.get("content-type") or "application/octet-stream",
+        content_hash,
+    )
+
+
+@router.post("/resumable", response_model=ResumableUploadResponse)
+def create_resumable_upload(
+    request_data: ResumableUploadRequest,
+    request: Request,
+    storage: StorageDep,
+    user: OptionalUser,  # Allow unauthenticated in dev mode
+):
+    """Create a resumable upload session for a browser client.
+
+    If ``content_hash`` matches a file already streamed to the project, the
+    stored copy is returned instead of a session. Session uploads bypass the
+    API, so their hash cannot be verified; they are stored at a unique path
+    rather than the content-addressed one. Finish with ``/resumable/complete``.
+    """
+    hashed_path = upload_path(
+        request_data.filename, request_data.project_id, request_data.content_hash
+    )
     try:
-        contents = await file.read()
-        uri = storage.upload_from_bytes(
-            contents,
+        if request_data.content_hash and storage.exists(hashed_path):
+            return ResumableUploadResponse(
+                remote_path=hashed_path,
+                uri=storage.uri(hashed_path),
+                deduplicated=True,
+            )
+        remote_path = upload_path(request_data.filename, request_data.project_id)
+        expiration = settings.resumable_upload_expiration_seconds
+        session = storage.create_resumable_upload(
             remote_path,
-            content_type=file.content_type or "application/octet-stream",
+            request_data.content_type,
+            request_data.size,
+            settings.upload_chunk_size_bytes,
+            expiration=expiration,
+            origin=request.headers.get("origin"),
         )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to upload file: {str(e)}",
+            detail=f"Failed to create upload session: {str(e)}",
         )
 
-    return {
-        "uri": uri,
-        "remote_path": remote_path,
-        "filename": file.filename,
-        "content_type": file.content_type,
-        "size": len(contents),
-    }
+    return ResumableUploadResponse(remote_path=remote_path, expires_in=expiration, **session)
+
+
+@router.post("/resumable/complete")
+def complete_resumable_upload(
+    request_data: CompleteUploadRequest,
+    storage: StorageDep,
+    user: OptionalUser,  # Allow unauthenticated in dev mode
+):
+    """Finish a resumable upload (S3 assembles the parts; GCS is already final)."""
+    try:
+        uri = storage.complete_resumable_upload(
+            request_data.remote_path,
+            request_data.upload_id,
+            [part.model_dump() for part in request_data.parts],
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to complete upload: {str(e)}",
+        )
+
+    return {"uri": uri, "remote_path": request_data.remote_path}
+
+
+@router.post("/resumable/abort", status_code=status.HTTP_204_NO_CONTENT)
+def abort_resumable_upload(
+    request_data: CompleteUploadRequest,
+    storage: StorageDep,
+    user: OptionalUser,  # Allow unauthenticated in dev mode
+):
+    """Discard an unfinished resumable upload and its uploaded parts."""
+    try:
+        storage.abort_resumable_upload(request_data.remote_path, request_data.upload_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to abort upload: {str(e)}",
+        )
 
 
 @router.get("/download-url/{remote_path:path}")
-async def get_download_url(
+def get_download_url(
     remote_path: str,
-    storage: StorageDep,
+    signer: SignerDep,
     user: OptionalUser,  # Allow unauthenticated in dev mode
 ):
     """Generate a signed URL for downloading a file."""
     try:
-        download_url = storage.generate_download_url(remote_path)
+        download_url = signer.download_url(remote_path)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -108,6 +340,6 @@ async def get_download_url(
     return {
         "download_url": download_url,
         "remote_path": remote_path,
-        "expires_in": 3600,
+        "expires_in": signer.min_validity_seconds,
     }
 
@@ -15,8 +15,9 @@ from api.schemas.drawing import (
     SheetResponse,
     BlockResponse,
 )
-from api.schemas.job import JobCreate, JobResponse, JobStatus
+from api.schemas.job import JobCreate, JobEventsResponse, JobResponse, JobStatus
 from api.schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate
+from api.schemas.tiles import TileSourceResponse
 from api.schemas.upload import SignedUrlRequest, SignedUrlResponse
 
 __all__ = [
@@ -39,12 +40,15 @@ __all__ = [
     "BlockResponse",
     # Job
     "JobCreate",
+    "JobEventsResponse",
     "JobResponse",
     "JobStatus",
     # Project
     "ProjectCreate",
     "ProjectResponse",
     "ProjectUpdate",
+    # Tiles
+    "TileSourceResponse",
     # Upload
     "SignedUrlRequest",
     "SignedUrlResponse",
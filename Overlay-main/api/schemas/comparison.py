@@ -5,6 +5,8 @@ from typing import Any
 
 from pydantic import BaseModel
 
+from api.schemas.tiles import TileSourceResponse
+
 
 class ComparisonCreate(BaseModel):
     """Comparison creation request."""
@@ -40,6 +42,8 @@ class ComparisonResponse(BaseModel):
     addition_uri: str | None = None
     deletion_uri: str | None = None
     score: float | None = None
+    tiles: TileSourceResponse | None = None
+    preview_uri: str | None = None  # Low-res overlay while a manual re-render is running
 
     # Change summary
     change_count: int = 0
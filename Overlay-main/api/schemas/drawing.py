@@ -5,6 +5,8 @@ from typing import Any
 
 from pydantic import BaseModel
 
+from api.schemas.tiles import TileSourceResponse
+
 
 class DrawingCreate(BaseModel):
     """Drawing creation request."""
@@ -44,6 +46,7 @@ class SheetResponse(BaseModel):
     sheet_number: str | None = None
     discipline: str | None = None
     metadata: dict[str, Any] | None = None
+    tiles: TileSourceResponse | None = None
     created_at: datetime
     updated_at: datetime
 
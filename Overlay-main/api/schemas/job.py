@@ -41,7 +41,17 @@ class JobResponse(BaseModel):
     events: list[dict[str, Any]] = []
     created_at: datetime
     updated_at: datetime
+    heartbeat_at: datetime | None = None
 
     class Config:
         from_attributes = True
 
+
+class JobEventsResponse(BaseModel):
+    """A page of a job's event timeline."""
+
+    job_id: str
+    events: list[dict[str, Any]] = []
+    total: int
+    offset: int
+    limit: int
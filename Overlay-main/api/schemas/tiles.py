@@ -0,0 +1,42 @@
+"""Deep-zoom tile pyramid schemas."""
+
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class TileSourceResponse(BaseModel):
+    """Deep-zoom (DZI) tile source for a large overlay or sheet image.
+
+    ``url_template`` uses XYZ-style placeholders: ``{z}`` is the DZI level,
+    ``{x}``/``{y}`` are the tile column/row.
+    """
+
+    url_template: str
+    format: str = "dzi"
+    tile_format: str = "png"
+    tile_size: int
+    overlap: int = 0
+    width: int
+    height: int
+    min_level: int
+    max_level: int
+
+    @classmethod
+    def from_manifest(
+        cls, manifest: dict[str, Any] | None, url_template: str
+    ) -> "TileSourceResponse | None":
+        """Build a tile source from a worker-written manifest, if present."""
+        if not manifest:
+            return None
+        return cls(
+            url_template=url_template,
+            format=manifest.get("format", "dzi"),
+            tile_format=manifest.get("tileFormat", "png"),
+            tile_size=manifest["tileSize"],
+            overlap=manifest.get("overlap", 0),
+            width=manifest["width"],
+            height=manifest["height"],
+            min_level=manifest["minLevel"],
+            max_level=manifest["maxLevel"],
+        )
@@ -1,6 +1,6 @@
 """Upload schemas."""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SignedUrlRequest(BaseModel):
@@ -18,3 +18,58 @@ class SignedUrlResponse(BaseModel):
     remote_path: str
     expires_in: int = 3600
 
+
+
+class UploadResponse(BaseModel):
+    """Result of an upload streamed through the API."""
+
+    uri: str
+    remote_path: str
+    filename: str | None = None
+    content_type: str | None = None
+    size: int | None = None  # None when an existing copy was reused unread
+    content_hash: str  # Hex SHA-256 of the file contents
+    deduplicated: bool = False  # The same contents were already stored
+
+
+class ResumableUploadRequest(BaseModel):
+    """Request for a browser resumable upload session."""
+
+    filename: str
+    size: int = Field(gt=0)
+    content_type: str = "application/pdf"
+    project_id: str | None = None
+    content_hash: str | None = Field(
+        default=None,
+        pattern="^[0-9a-f]{64}$",
+        description="Hex SHA-256 of the file, if known; skips uploading stored contents",
+    )
+
+
+class ResumableUploadResponse(BaseModel):
+    """Resumable upload session, or the stored copy of the same contents."""
+
+    remote_path: str
+    uri: str | None = None  # Set when the contents already exist
+    deduplicated: bool = False
+    protocol: str | None = None  # "s3-multipart" or "gcs-resumable"
+    upload_id: str | None = None  # S3 multipart upload ID
+    session_url: str | None = None  # GCS resumable session URL
+    part_size: int | None = None
+    part_urls: list[str] = []  # Presigned S3 part URLs, in part order
+    expires_in: int | None = None
+
+
+class UploadedPart(BaseModel):
+    """A part of an S3 multipart upload sent by the client."""
+
+    part_number: int = Field(ge=1)
+    etag: str
+
+
+class CompleteUploadRequest(BaseModel):
+    """Request to finish a resumable upload."""
+
+    remote_path: str
+    upload_id: str | None = None
+    parts: list[UploadedPart] = []
@@ -0,0 +1,193 @@
+"""
+Response Serialization Benchmark
+
+Compares the two ways list endpoints build their JSON at a large row count:
+
+- current: ORM rows -> one ``*Response`` model per row -> FastAPI validates
+  the list against ``response_model`` again -> standard library JSON
+- fast: labeled column rows -> dicts in bulk -> ``ORJSONResponse``
+  (``api.responses``), as ``list_all_blocks`` and ``list_jobs`` now do
+
+Rows live in an in-memory SQLite database, so the timings cover query row
+handling and serialization, not Postgres. Both paths are checked to produce
+the same JSON before timing. Routes return at most one page (200 rows) per
+request; the benchmark builds all rows in one response to measure per-row cost.
+
+Usage (from Overlay-main/):
+    DB_HOST=x DB_USER=x DB_PASSWORD=x python api/scripts/benchmark_responses.py \
+        --rows 10000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+# Add Overlay-main to path for api imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from api.responses import ORJSONResponse, rows_to_dicts
+from api.routes.drawings import Block, block_columns
+from api.routes.jobs import JOB_LIST_COLUMNS, Job, _map_status
+from api.schemas.drawing import BlockResponse
+from api.schemas.job import JobResponse
+
+OCR_MARKDOWN = (
+    "| Mark | Size | Qty | Notes |\n|---|---|---|---|\n"
+    + "| D-101 | 3'-0\" x 7'-0\" | 2 | Hollow metal frame, see detail 4/A-501 |\n" * 12
+)
+
+
+def seed(session: Session, rows: int) -> None:
+    """Insert ``rows`` blocks with OCR text and ``rows`` jobs with event timelines."""
+    start = datetime(2026, 10, 1, tzinfo=UTC)
+    for i in range(rows):
+        created = start + timedelta(seconds=i)
+        session.add(
+            Block(
+                id=f"block-{i:06d}",
+                sheet_id=f"sheet-{i // 40:04d}",
+                type="Plan",
+                uri=f"s3://overlay-uploads/blocks/block-{i:06d}.png",
+                bounds={"x": 120, "y": 340, "width": 2200, "height": 1400},
+                ocr=OCR_MARKDOWN,
+                description="Door schedule for level 2 with hardware groups",
+                metadata_={"confidence": 0.93, "page": i // 40},
+                created_at=created,
+                updated_at=created,
+            )
+        )
+        session.add(
+            Job(
+                id=f"job-{i:06d}",
+                project_id="project-1",
+                target_type="sheet",
+                target_id=f"sheet-{i // 40:04d}",
+                type="vision.sheet.preprocess",
+                status="Completed",
+                payload={"sheet_id": f"sheet-{i // 40:04d}"},
+                events=[
+                    {"eventType": event, "status": event.title(), "createdAt": created.isoformat()}
+                    for event in ("created", "started", "completed")
+                ],
+                created_at=created,
+                updated_at=created,
+            )
+        )
+    session.commit()
+
+
+def current_blocks(session: Session) -> bytes:
+    blocks = session.exec(select(Block).order_by(Block.created_at.desc())).all()
+    content = [
+        BlockResponse(
+            id=b.id,
+            sheet_id=b.sheet_id,
+            type=b.type,
+            uri=b.uri,
+            bounds=b.bounds,
+            ocr=b.ocr,
+            description=b.description,
+            metadata=b.metadata_,
+            created_at=b.created_at,
+            updated_at=b.updated_at,
+        )
+        for b in blocks
+    ]
+    return fastapi_render(TypeAdapter(list[BlockResponse]), content)
+
+
+def fast_blocks(session: Session) -> bytes:
+    rows = session.exec(select(*block_columns(True)).order_by(Block.created_at.desc())).all()
+    return ORJSONResponse(rows_to_dicts(rows)).body
+
+
+def current_jobs(session: Session) -> bytes:
+    jobs = session.exec(select(Job).order_by(Job.created_at.desc())).all()
+    content = [
+        JobResponse(
+            id=j.id,
+            type=j.type,
+            status=_map_status(j.status),
+            project_id=j.project_id,
+            parent_id=j.parent_id,
+            target_type=j.target_type,
+            target_id=j.target_id,
+            payload=j.payload,
+            events=j.events or [],
+            created_at=j.created_at,
+            updated_at=j.updated_at,
+            heartbeat_at=j.heartbeat_at,
+        )
+        for j in jobs
+    ]
+    return fastapi_render(TypeAdapter(list[JobResponse]), content)
+
+
+def fast_jobs(session: Session) -> bytes:
+    rows = session.exec(select(*JOB_LIST_COLUMNS).order_by(Job.created_at.desc())).all()
+    events = dict(session.exec(select(Job.id, Job.events)).all())
+    items = rows_to_dicts(rows)
+    for item in items:
+        item["status"] = _map_status(item["status"]).value
+        item["events"] = events.get(item["id"]) or []
+    return ORJSONResponse(items).body
+
+
+def fastapi_render(adapter: TypeAdapter, content: list) -> bytes:
+    """What FastAPI does with a returned list: validate, dump to JSON types, render."""
+    validated = adapter.validate_python(content, from_attributes=True)
+    return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+
+def timed(engine, build, repeat: int) -> tuple[float, bytes]:
+    """Median seconds of ``build`` over ``repeat`` runs, each in a fresh session."""
+    times = []
+    body = b""
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            body = build(session)
+            times.append(time.perf_counter() - started)
+    return statistics.median(times), body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per list")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path (median)")
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine, tables=[Block.__table__, Job.__table__])
+    print(f"Seeding {args.rows} blocks and {args.rows} jobs...")
+    with Session(engine) as session:
+        seed(session, args.rows)
+
+    print(f"{'endpoint':<16}{'current':>12}{'fast':>12}{'speedup':>10}{'body':>12}")
+    for name, current, fast in (
+        ("list_all_blocks", current_blocks, fast_blocks),
+        ("list_jobs", current_jobs, fast_jobs),
+    ):
+        current_seconds, current_body = timed(engine, current, args.repeat)
+        fast_seconds, fast_body = timed(engine, fast, args.repeat)
+        if json.loads(current_body) != json.loads(fast_body):
+            raise SystemExit(f"{name}: fast path JSON differs from current path")
+        print(
+            f"{name:<16}{current_seconds * 1000:>10.1f}ms{fast_seconds * 1000:>10.1f}ms"
+            f"{current_seconds / fast_seconds:>9.1f}x{len(fast_body) / 1e6:>10.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Threadpool Load Test
+
+Drives sync routes shaped like the API's job routes through the ASGI app while
+the outbox relay publishes slowly, and reports request latency percentiles:
+
+- ``POST /jobs``: adds an outbox message and commits, then wakes the relay
+  (like every route that queues a job)
+- ``GET /jobs``: one read on a pooled connection (like the list routes)
+
+Each request holds its connection for ``--query-ms`` to stand in for query
+time. The relay runs ``OutboxRelay.relay_once`` on its own thread against a
+publisher whose futures resolve after ``--slow-publish-ms``, holding one
+pooled connection per batch like the real relay. Requests never publish
+inline, so request p99 should stay flat between fast and slow publishes.
+
+Each scenario runs with the threadpool the app uses (``settings.route_threads``:
+DB pool + overflow + spare threads) and with ``--uncapped-threads`` threads for
+comparison; extra threads only wait in the pool's checkout and, past
+``db_pool_timeout_seconds``, fail. ``published`` counts the messages the relay
+published while the requests ran.
+
+Rows live in a temporary SQLite file (WAL, so the relay's read does not block
+writers) unless ``--database-url`` points at Postgres.
+
+Usage (from Overlay-main/):
+    DB_HOST=x DB_USER=x DB_PASSWORD=x python api/scripts/load_test_threadpool.py \
+        --requests 2000 --concurrency 60 --slow-publish-ms 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+import httpx
+from anyio import to_thread
+from fastapi import Depends, FastAPI
+from sqlalchemy import event, func
+from sqlmodel import Session, SQLModel, create_engine, select
+
+# Add Overlay-main to path for api imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from api.config import settings
+from api.dependencies import _pool_options
+from api.outbox import JobOutbox, OutboxRelay, generate_cuid
+
+
+class SlowPublisher:
+    """Pub/Sub publisher stand-in whose futures resolve after ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.published = 0
+        self._lock = threading.Lock()
+
+    def topic_path(self, project: str, topic: str) -> str:
+        return f"projects/{project}/topics/{topic}"
+
+    def publish(self, topic: str, data: bytes, **attributes) -> Future:
+        future: Future = Future()
+        timer = threading.Timer(self.delay, self._resolve, (future,))
+        timer.daemon = True
+        timer.start()
+        return future
+
+    def _resolve(self, future: Future) -> None:
+        with self._lock:
+            self.published += 1
+        future.set_result("message-id")
+
+
+def build_engine(database_url: str | None):
+    if database_url:
+        return create_engine(database_url, **_pool_options())
+    path = os.path.join(tempfile.mkdtemp(), "load_test.db")
+    engine = create_engine(f"sqlite:///{path}", **_pool_options())
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(connection, _record):
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=10000")
+        cursor.close()
+
+    return engine
+
+
+def build_app(engine, relay: OutboxRelay, query_seconds: float) -> FastAPI:
+    app = FastAPI()
+
+    def get_session():
+        with Session(engine) as session:
+            yield session
+
+    @app.post("/jobs")
+    def create_job(session: Session = Depends(get_session)):
+        session.add(
+            JobOutbox(
+                id=generate_cuid(),
+                job_id=generate_cuid(),
+                topic=settings.vision_topic,
+                message={"type": "vision.load_test", "payload": {}},
+            )
+        )
+        session.connection()
+        time.sleep(query_seconds)
+        session.commit()
+        relay.wake()
+        return {"queued": True}
+
+    @app.get("/jobs")
+    def list_jobs(session: Session = Depends(get_session)):
+        session.connection()
+        time.sleep(query_seconds)
+        pending = session.exec(select(func.count()).select_from(JobOutbox)).one()
+        return {"pending": pending}
+
+    return app
+
+
+def run_relay(engine, relay: OutboxRelay, publisher: SlowPublisher, stop: threading.Event):
+    """``OutboxRelay._run`` against this script's engine and publisher."""
+    while not stop.is_set():
+        with Session(engine) as session:
+            claimed = relay.relay_once(session, publisher)
+        if claimed >= relay.batch_size:
+            continue
+        relay._wake.wait(relay.poll_seconds)
+        relay._wake.clear()
+
+
+async def drive(app: FastAPI, args, threads: int) -> tuple[list[float], int]:
+    """Send the requests; returns per-request seconds and the failed count."""
+    to_thread.current_default_thread_limiter().total_tokens = threads
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    failed = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+
+        async def one(i: int) -> None:
+            nonlocal failed
+            async with gate:
+                started = time.perf_counter()
+                if i % args.enqueue_every == 0:
+                    response = await client.post("/jobs")
+                else:
+                    response = await client.get("/jobs")
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    failed += 1
+
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+    return latencies, failed
+
+
+def percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=60, help="Requests in flight")
+    parser.add_argument("--enqueue-every", type=int, default=5, help="Every Nth request queues")
+    parser.add_argument("--query-ms", type=float, default=20.0, help="Connection hold per request")
+    parser.add_argument("--slow-publish-ms", type=float, default=2000.0, help="Slow publish time")
+    parser.add_argument("--uncapped-threads", type=int, default=40, help="Comparison pool size")
+    parser.add_argument("--database-url", help="Postgres URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    engine = build_engine(args.database_url)
+    SQLModel.metadata.create_all(engine, tables=[JobOutbox.__table__])
+    print(
+        f"DB pool {settings.db_pool_size}+{settings.db_max_overflow}, "
+        f"timeout {settings.db_pool_timeout_seconds:.0f}s; "
+        f"{args.requests} requests, {args.concurrency} in flight, {args.query_ms:.0f}ms each"
+    )
+    print(
+        f"{'threads':>8}{'publish':>10}{'p50':>10}{'p99':>10}{'max':>10}"
+        f"{'failed':>8}{'published':>11}"
+    )
+    for threads in (settings.route_threads, args.uncapped_threads):
+        for publish_ms in (0.0, args.slow_publish_ms):
+            relay = OutboxRelay(batch_size=settings.outbox_batch_size, poll_seconds=0.1)
+            publisher = SlowPublisher(publish_ms / 1000)
+            stop = threading.Event()
+            relay_thread = threading.Thread(
+                target=run_relay, args=(engine, relay, publisher, stop), daemon=True
+            )
+            relay_thread.start()
+            app = build_app(engine, relay, args.query_ms / 1000)
+            latencies, failed = asyncio.run(drive(app, args, threads))
+            stop.set()
+            relay.wake()
+            relay_thread.join()
+            print(
+                f"{threads:>8}{publish_ms:>8.0f}ms"
+                f"{percentile(latencies, 50) * 1000:>8.1f}ms"
+                f"{percentile(latencies, 99) * 1000:>8.1f}ms"
+                f"{max(latencies) * 1000:>8.1f}ms"
+                f"{failed:>8}{publisher.published:>11}"
+            )
+            with Session(engine) as session:
+                session.exec(JobOutbox.__table__.delete())
+                session.commit()
+
+
+if __name__ == "__main__":
+    main()
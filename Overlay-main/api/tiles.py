@@ -0,0 +1,74 @@
+"""Deep-zoom tile helpers shared by comparison and sheet routes.
+
+The vision worker writes DZI tile pyramids next to large overlay and sheet
+images and records a manifest (``Overlay.summary["tiles"]`` /
+``Sheet.metadata["tiles"]``). The API exposes a stable URL template per
+record; each tile URL redirects to a short-lived signed storage URL so the
+viewer only downloads the tiles inside its viewport. With a signed CDN
+configured, the template instead points straight at the CDN with one signed
+URL prefix covering the whole pyramid.
+"""
+
+from typing import Any
+
+from fastapi import HTTPException, status
+from fastapi.responses import RedirectResponse
+
+from api.signing import UrlSigner
+
+
+def tile_url_template(
+    route_prefix: str, manifest: dict[str, Any] | None = None, signer: UrlSigner | None = None
+) -> str:
+    """Return an XYZ-style URL template for a record's tiles.
+
+    Points at the record's tile endpoint, or directly at the CDN when the
+    signer has CDN prefix signing and the record has a pyramid.
+    """
+    if signer is not None and signer.cdn is not None and manifest and "basePath" in manifest:
+        base_path = manifest["basePath"]
+        tile_format = manifest.get("tileFormat", "png")
+        query = signer.prefix_query(f"{base_path}/")
+        return f"{signer.cdn.url(base_path)}/{{z}}/{{x}}_{{y}}.{tile_format}?{query}"
+    return f"{route_prefix}/tiles/{{z}}/{{x}}_{{y}}.png"
+
+
+def redirect_to_tile(
+    manifest: dict[str, Any] | None,
+    level: int,
+    column: int,
+    row: int,
+    signer: UrlSigner,
+) -> RedirectResponse:
+    """Redirect to a signed download URL for one tile of a pyramid.
+
+    Raises:
+        HTTPException: 404 if the record has no pyramid or the tile is out of range
+    """
+    if not manifest or "basePath" not in manifest:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tiles not available")
+
+    min_level = manifest.get("minLevel", 0)
+    max_level = manifest.get("maxLevel", 0)
+    if not min_level <= level <= max_level:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile level out of range")
+
+    # Level dimensions follow DZI: halve (rounding up) per level below max.
+    scale = 2 ** (max_level - level)
+    tile_size = manifest["tileSize"]
+    level_width = -(-manifest["width"] // scale)
+    level_height = -(-manifest["height"] // scale)
+    if column * tile_size >= level_width or row * tile_size >= level_height:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile out of range")
+
+    base_path = manifest["basePath"]
+    path = f"{base_path}/{level}/{column}_{row}.{manifest.get('tileFormat', 'png')}"
+    if signer.cdn is not None:
+        url = f"{signer.cdn.url(path)}?{signer.prefix_query(f'{base_path}/')}"
+    else:
+        url = signer.download_url(path)
+    return RedirectResponse(
+        url,
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        headers={"Cache-Control": f"private, max-age={signer.min_validity_seconds // 2}"},
+    )
@@ -1,7 +1,10 @@
 """Database engine and connection management using SQLModel."""
 
 import logging
+from typing import Any
+
 from sqlalchemy.engine import URL
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, create_engine
 
 from config import config
@@ -11,6 +14,43 @@ logger = logging.getLogger(__name__)
 # Module-level engine instance
 _engine = None
 
+# Jobs this process runs at once (see configure_pool); None means the worker default
+_concurrent_jobs: int | None = None
+
+
+def configure_pool(concurrent_jobs: int) -> None:
+    """Size the connection pool for a process running ``concurrent_jobs`` jobs at once.
+
+    Must be called before the engine is created. Worker pool processes run one
+    job at a time, so they keep a single connection instead of the parent's pool.
+    """
+    global _concurrent_jobs
+    _concurrent_jobs = concurrent_jobs
+
+
+def pool_options() -> dict[str, Any]:
+    """Engine pooling arguments derived from config and this process's job concurrency.
+
+    A job holds one session at a time; the overflow leaves room for heartbeat
+    writes and admission estimates that open a second, short-lived session.
+    """
+    if config.db_external_pooler:
+        # pgbouncer (transaction mode) does the pooling across instances
+        return {"poolclass": NullPool}
+
+    concurrent_jobs = _concurrent_jobs or config.worker_max_concurrent_messages
+    pool_size = config.db_pool_size or max(1, concurrent_jobs)
+    max_overflow = config.db_max_overflow if config.db_max_overflow is not None else pool_size
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": config.db_pool_timeout_seconds,
+        "pool_recycle": config.db_pool_recycle_seconds,
+        "pool_pre_ping": config.db_pool_pre_ping,
+        # Reuse the most recent connection so surplus ones go idle and get recycled
+        "pool_use_lifo": True,
+    }
+
 
 def get_engine():
     """
@@ -46,13 +86,22 @@ def get_engine():
             )
             logger.info(f"[db.connection] Using TCP connection: {config.db_host}:{config.db_port}")
 
+        # Without pre-ping, a connection dropped by the server or proxy fails its
+        # first statement; SQLAlchemy then invalidates the whole pool and the job
+        # is redelivered (transient error) onto fresh connections.
+        options = pool_options()
         _engine = create_engine(
             connection_string,
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True,  # Verify connections before using
             echo=False,  # Set to True for SQL logging
+            **options,
         )
+        if "pool_size" in options:
+            logger.info(
+                f"[db.pool] size={options['pool_size']} overflow={options['max_overflow']} "
+                f"recycle={options['pool_recycle']}s pre_ping={options['pool_pre_ping']}"
+            )
+        else:
+            logger.info("[db.pool] external pooler, no client-side pool")
 
     return _engine
 
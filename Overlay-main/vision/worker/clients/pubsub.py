@@ -85,6 +85,51 @@ class PubSubClient:
         except Exception as e:
             raise OSError(f"Failed to publish to {topic_name}: {str(e)}") from e
 
+    def publish_many(
+        self,
+        topic_name: str,
+        messages: list[tuple[dict, dict | None]],
+        timeout: float = 30.0,
+    ) -> list[str | Exception]:
+        """
+        Publish messages to a topic as one batch.
+
+        All messages are handed to the publisher before waiting on any of them,
+        so the client library batches them into few requests.
+
+        Args:
+            topic_name: Name of the topic (e.g., "vision")
+            messages: (payload, attributes) pairs; payloads are JSON-encoded
+            timeout: Maximum time to wait for each publish confirmation (seconds)
+
+        Returns:
+            Per message, in order: the Pub/Sub message ID, or the exception
+            that made its publish fail
+        """
+        if not topic_name:
+            raise ValueError("Topic name cannot be empty")
+
+        topic_path = self.publisher.topic_path(self.project_id, topic_name)
+        trace_attributes = get_trace_attributes()
+        futures = []
+        for message, attributes in messages:
+            merged_attributes = {**trace_attributes, **(attributes or {})}
+            futures.append(
+                self.publisher.publish(
+                    topic_path,
+                    json.dumps(message).encode("utf-8"),
+                    **{str(key): str(value) for key, value in merged_attributes.items()},
+                )
+            )
+
+        results: list[str | Exception] = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=timeout))
+            except Exception as e:
+                results.append(e)
+        return results
+
     def subscribe(
         self,
         subscription_name: str,
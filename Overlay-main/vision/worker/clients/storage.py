@@ -1,13 +1,13 @@
 """Cloud storage client supporting both S3 (MinIO) and Google Cloud Storage."""
 
+import os
 from io import BytesIO
 from typing import Protocol
 
-import boto3
 from botocore.exceptions import ClientError
-from google.cloud import storage
 
 from config import config
+from utils.metrics import record_storage_bytes
 
 
 class StorageClient(Protocol):
@@ -78,6 +78,9 @@ class S3StorageClient:
         self.bucket_name = bucket_name
         self.endpoint_url = endpoint_url
 
+        # Deferred: only one storage backend's SDK is needed per worker
+        import boto3
+
         self.client = boto3.client(
             "s3",
             endpoint_url=endpoint_url,
@@ -118,6 +121,7 @@ class S3StorageClient:
                 remote_path,
                 ExtraArgs={"ContentType": content_type},
             )
+            record_storage_bytes("out", os.path.getsize(local_path))
             return f"s3://{self.bucket_name}/{remote_path}"
         except FileNotFoundError as e:
             raise FileNotFoundError(f"Local file not found: {local_path}") from e
@@ -153,6 +157,7 @@ class S3StorageClient:
                 )
 
             self.client.download_file(self.bucket_name, remote_path, local_path)
+            record_storage_bytes("in", os.path.getsize(local_path))
             return local_path
         except FileNotFoundError:
             raise
@@ -197,6 +202,7 @@ class S3StorageClient:
                 remote_path,
                 ExtraArgs={"ContentType": content_type},
             )
+            record_storage_bytes("out", len(data))
             return f"s3://{self.bucket_name}/{remote_path}"
         except ClientError as e:
             raise OSError(f"Upload failed for {remote_path}: {str(e)}") from e
@@ -229,7 +235,9 @@ class S3StorageClient:
 
             file_obj = BytesIO()
             self.client.download_fileobj(self.bucket_name, remote_path, file_obj)
-            return file_obj.getvalue()
+            data = file_obj.getvalue()
+            record_storage_bytes("in", len(data))
+            return data
         except FileNotFoundError:
             raise
         except ClientError as e:
@@ -281,6 +289,8 @@ class GCSStorageClient:
         if not bucket_name:
             raise ValueError("Bucket name is required")
 
+        from google.cloud import storage
+
         self.bucket_name = bucket_name
         self.client = storage.Client()
         self.bucket = self.client.bucket(self.bucket_name)
@@ -313,6 +323,7 @@ class GCSStorageClient:
         try:
             blob = self.bucket.blob(remote_path)
             blob.upload_from_filename(local_path, content_type=content_type)
+            record_storage_bytes("out", os.path.getsize(local_path))
             return f"gs://{self.bucket_name}/{remote_path}"
         except FileNotFoundError as e:
             raise FileNotFoundError(f"Local file not found: {local_path}") from e
@@ -347,6 +358,7 @@ class GCSStorageClient:
                 )
 
             blob.download_to_filename(local_path)
+            record_storage_bytes("in", os.path.getsize(local_path))
             return local_path
         except FileNotFoundError:
             raise
@@ -380,6 +392,7 @@ class GCSStorageClient:
         try:
             blob = self.bucket.blob(remote_path)
             blob.upload_from_string(data, content_type=content_type)
+            record_storage_bytes("out", len(data))
             return f"gs://{self.bucket_name}/{remote_path}"
         except Exception as e:
             raise OSError(f"Upload failed for {remote_path}: {str(e)}") from e
@@ -409,7 +422,9 @@ class GCSStorageClient:
                     f"Remote file not found: gs://{self.bucket_name}/{remote_path}"
                 )
 
-            return blob.download_as_bytes()
+            data = blob.download_as_bytes()
+            record_storage_bytes("in", len(data))
+            return data
         except FileNotFoundError:
             raise
         except Exception as e:
@@ -22,6 +22,35 @@ class Config(BaseSettings):
     db_name: str = "odin_dev"
     db_user: str
     db_password: str
+    db_pool_size: int | None = Field(
+        default=None,
+        description=(
+            "Connections kept open per process; defaults to the jobs the process runs at "
+            "once (worker_max_concurrent_messages, or 1 in a worker process)"
+        ),
+    )
+    db_max_overflow: int | None = Field(
+        default=None,
+        description="Extra short-lived connections above db_pool_size; defaults to db_pool_size",
+    )
+    db_pool_timeout_seconds: float = Field(
+        default=30.0, description="How long a session waits for a free pooled connection"
+    )
+    db_pool_recycle_seconds: int = Field(
+        default=1_800,
+        description="Reopen pooled connections older than this, before proxies drop them",
+    )
+    db_pool_pre_ping: bool = Field(
+        default=False,
+        description="Test every connection on checkout (one extra round trip per session)",
+    )
+    db_external_pooler: bool = Field(
+        default=False,
+        description=(
+            "Connect through a transaction-mode pooler such as pgbouncer: "
+            "no client-side pool, each session opens and closes its own connection"
+        ),
+    )
 
     # Storage Backend Configuration
     storage_backend: Literal["s3", "gcs"] = Field(
@@ -83,6 +112,76 @@ class Config(BaseSettings):
         default=500 * 1024 * 1024,  # 500MB
         description="Max memory for in-flight messages in bytes (recommended: 500MB for 1GB RAM machines)",
     )
+    worker_process_concurrency: int = Field(
+        default=0,
+        description=(
+            "Worker processes for CPU-bound jobs (block overlay, drawing render); "
+            "0 runs them on threads. worker_max_concurrent_messages bounds thread jobs."
+        ),
+    )
+    admission_enabled: bool = Field(
+        default=True, description="Start jobs only when their memory estimate fits the budget"
+    )
+    admission_memory_budget_bytes: int | None = Field(
+        default=None,
+        description="Memory budget for running jobs; defaults to a fraction of the memory limit",
+    )
+    admission_memory_fraction: float = Field(
+        default=0.75, description="Fraction of container/machine memory used as the job budget"
+    )
+    admission_max_wait_seconds: float = Field(
+        default=10.0,
+        description="How long a job holds its callback thread waiting for memory (max 30)",
+    )
+    admission_retry_delay_seconds: int = Field(
+        default=60, description="Delay before a deferred job is redelivered (seconds, 10-600)"
+    )
+    admission_job_base_bytes: int = Field(
+        default=64 * 1024 * 1024,  # 64MB
+        description="Fixed per-job overhead added to pixel-based memory estimates",
+    )
+    admission_default_job_bytes: int = Field(
+        default=256 * 1024 * 1024,  # 256MB
+        description="Memory estimate for jobs without a pixel-based model",
+    )
+    worker_throughput_log_interval_seconds: int = Field(
+        default=300, description="Window (seconds) for jobs/min/core throughput logs"
+    )
+    job_heartbeat_enabled: bool = Field(
+        default=True, description="Extend leases and stamp jobs.heartbeat_at while jobs run"
+    )
+    job_heartbeat_interval_seconds: float = Field(
+        default=30.0, description="Seconds between job heartbeats"
+    )
+    job_heartbeat_ack_extension_seconds: int = Field(
+        default=120, description="Ack deadline set on each heartbeat (seconds, max 600)"
+    )
+    job_heartbeat_stale_seconds: float = Field(
+        default=120.0,
+        description="A Started job with an older heartbeat is considered stuck, not running",
+    )
+    job_heartbeat_stall_seconds: float = Field(
+        default=900.0,
+        description="Stop extending the lease after this long without progress (thread jobs)",
+    )
+    outbox_relay_enabled: bool = Field(
+        default=True, description="Publish queued job messages from the job_outbox table"
+    )
+    outbox_poll_seconds: float = Field(
+        default=0.5, description="Seconds between outbox polls when the relay is idle"
+    )
+    outbox_batch_size: int = Field(
+        default=500, description="Outbox messages claimed and published per batch"
+    )
+    outbox_max_backoff_seconds: float = Field(
+        default=300.0, description="Longest delay before retrying a message that failed to publish"
+    )
+    job_profile_sampling_enabled: bool = Field(
+        default=False, description="Run jobs under cProfile and keep reports for slow jobs"
+    )
+    job_profile_slow_threshold_seconds: float = Field(
+        default=300.0, description="Jobs at least this slow upload a cProfile report to storage"
+    )
     worker_max_lease_duration_seconds: int = Field(
         default=1_800,
         description="Max time to hold a Pub/Sub message lease during processing (seconds)",
@@ -132,6 +231,59 @@ class Config(BaseSettings):
         description="Minimum intensity difference (0-255) to classify as real change vs artifact",
     )
 
+    # Alignment Quality (Job 4: Overlay Generation)
+    alignment_quality_threshold: float = Field(
+        default=0.45,
+        description="Alignment quality score (0-1) below which a pair is re-aligned",
+    )
+    alignment_quality_max_dim: int = Field(
+        default=1_024, description="Longest edge (px) of the downsampled quality scoring band"
+    )
+    alignment_realign_enabled: bool = Field(
+        default=True, description="Re-align pairs whose alignment quality is below threshold"
+    )
+    alignment_refine_downsample_scale: float = Field(
+        default=1.0, description="SIFT downsample scale used for the re-alignment refine pass"
+    )
+
+    # Manual Alignment (interactive re-render)
+    manual_align_preview_max_dim: int = Field(
+        default=1_024, description="Longest edge (px) of the quick manual-alignment preview"
+    )
+    image_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,  # 256MB
+        description="Byte budget for the in-process decoded block image cache",
+    )
+
+    # Batched Sheet Overlays (render all block pairs of a sheet pair in one job)
+    sheet_overlay_batch_enabled: bool = Field(
+        default=False,
+        description="Render block pairs inside the sheet overlay job instead of fanning out",
+    )
+    sheet_overlay_batch_workers: int = Field(
+        default=2,
+        description=(
+            "Block pairs a batched sheet overlay job renders at once; each render "
+            "takes a worker_process_concurrency slot and memory admission"
+        ),
+    )
+
+    # Deep-zoom Tile Pyramids (viewport-based loading in the web viewer)
+    overlay_tiles_enabled: bool = Field(
+        default=True, description="Write a DZI tile pyramid next to each block overlay image"
+    )
+    sheet_tiles_enabled: bool = Field(
+        default=False, description="Write a DZI tile pyramid next to each sheet image"
+    )
+    tile_size: int = Field(default=256, description="Tile edge length in pixels (256-512)")
+    tile_min_image_size: int = Field(
+        default=1_024,
+        description="Skip tile pyramids for images whose longest edge is below this size",
+    )
+    tile_upload_concurrency: int = Field(
+        default=8, description="Number of parallel tile uploads per pyramid"
+    )
+
     @field_validator("storage_backend")
     @classmethod
     def validate_storage_backend(cls, v: str) -> str:
@@ -140,6 +292,14 @@ class Config(BaseSettings):
             raise ValueError("storage_backend must be either 's3' or 'gcs'")
         return v
 
+    @field_validator("tile_size")
+    @classmethod
+    def validate_tile_size(cls, v: int) -> int:
+        """Validate tile size is within the supported DZI range."""
+        if not 256 <= v <= 512:
+            raise ValueError("tile_size must be between 256 and 512")
+        return v
+
 
 _config: Config | None = None
 
@@ -0,0 +1,320 @@
+"""Memory-aware admission control for job messages.
+
+Pub/Sub flow control only bounds message payload bytes (a few hundred bytes
+of JSON), not what a job allocates. A block overlay job can take gigabytes,
+so a few large overlays arriving together can OOM the worker. Before a job
+starts, the runner estimates its peak memory and only starts it when the
+estimate fits the worker's memory budget. Otherwise the message waits briefly
+while smaller jobs that do fit go ahead. Waiting holds a Pub/Sub callback
+thread, so the wait is capped at ``MAX_WAIT_SECONDS``; if the budget does not
+free up by then, the message is deferred and redelivered after
+``admission_retry_delay_seconds``.
+
+Estimates come from the pixel size of the images a job will decode:
+- Block jobs: block bounds (normalized 0-1000) x sheet pixel size
+- Sheet jobs: sheet pixel size
+
+Pixels are converted to bytes with a per-job-type bytes-per-pixel factor.
+The factor is calibrated (EWMA) from RSS samples taken while jobs run.
+Only uncontended measurements are used: jobs in a worker process, or thread
+jobs that ran alone.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlmodel import Session
+
+from config import config
+from jobs.types import JobType
+from models import Block, Overlay, Sheet
+from utils.log_utils import PSUTIL_AVAILABLE, get_memory_mb
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Initial bytes per decoded pixel, before calibration. Overlay jobs hold both
+# RGB crops, their expanded-canvas warps, grayscale/edge bands and the render.
+DEFAULT_BYTES_PER_PIXEL: dict[str, float] = {
+    JobType.BLOCK_OVERLAY_GENERATE: 48.0,
+    JobType.MANUAL_ALIGN: 40.0,
+    JobType.SHEET_PREPROCESS: 12.0,
+}
+
+# Calibrated factors are kept within this range of their default
+CALIBRATION_BOUNDS = (0.25, 8.0)
+
+# Longest a job may hold its callback thread waiting for memory, well under the
+# ack deadline the Pub/Sub client keeps extending meanwhile
+MAX_WAIT_SECONDS = 30.0
+
+
+class AdmissionDeferred(RuntimeError):
+    """Job did not fit the memory budget in time; the message is redelivered.
+
+    A RuntimeError, so it is classified as transient; the message is released
+    for redelivery after ``deferred_redelivery_seconds()``.
+    """
+
+
+def deferred_redelivery_seconds() -> int:
+    """Ack deadline for a deferred message (Pub/Sub accepts 10 to 600 seconds)."""
+    return max(10, min(600, config.admission_retry_delay_seconds))
+
+
+def _default_sheet_pixels() -> int:
+    # 36x24in (ARCH D) at the conversion DPI, for sheets without a recorded size
+    dpi = config.pdf_conversion_dpi
+    return 36 * dpi * 24 * dpi
+
+
+def sheet_pixels(sheet: Sheet | None) -> tuple[int, int] | None:
+    """Sheet (width, height) in pixels from metadata, or None if unknown."""
+    metadata = (sheet.metadata_ if sheet else None) or {}
+    width = metadata.get("width") or (metadata.get("tiles") or {}).get("width")
+    height = metadata.get("height") or (metadata.get("tiles") or {}).get("height")
+    if not width or not height:
+        return None
+    return int(width), int(height)
+
+
+def block_pixels(session: Session, block: Block | None) -> int:
+    """Decoded pixel count of a block crop."""
+    if block is None:
+        return 0
+    size = sheet_pixels(session.get(Sheet, block.sheet_id))
+    bounds = block.bounds or {}
+    try:
+        fraction = (
+            (bounds["xmax"] - bounds["xmin"]) / 1000 * (bounds["ymax"] - bounds["ymin"]) / 1000
+        )
+    except (KeyError, TypeError):
+        fraction = 1.0
+    fraction = min(max(fraction, 0.0), 1.0)
+    total = size[0] * size[1] if size else _default_sheet_pixels()
+    return int(total * fraction)
+
+
+def block_pair_pixels(session: Session, block_a_id: str, block_b_id: str) -> int:
+    return block_pixels(session, session.get(Block, block_a_id)) + block_pixels(
+        session, session.get(Block, block_b_id)
+    )
+
+
+def estimate_block_overlay_pixels(session: Session, payload) -> int:
+    return block_pair_pixels(session, payload.block_a_id, payload.block_b_id)
+
+
+def estimate_manual_align_pixels(session: Session, payload) -> int | None:
+    overlay = session.get(Overlay, payload.overlay_id)
+    if overlay is None:
+        return None
+    return block_pair_pixels(session, overlay.block_a_id, overlay.block_b_id)
+
+
+def estimate_sheet_pixels(session: Session, payload) -> int:
+    size = sheet_pixels(session.get(Sheet, payload.sheet_id))
+    return size[0] * size[1] if size else _default_sheet_pixels()
+
+
+class MemoryModel:
+    """Per-job-type bytes-per-pixel factors, calibrated from observed peaks."""
+
+    def __init__(
+        self,
+        *,
+        base_bytes: int,
+        default_job_bytes: int,
+        bytes_per_pixel: dict[str, float] | None = None,
+        alpha: float = 0.2,
+    ) -> None:
+        self.base_bytes = base_bytes
+        self.default_job_bytes = default_job_bytes
+        self.alpha = alpha
+        self._defaults = dict(bytes_per_pixel or DEFAULT_BYTES_PER_PIXEL)
+        self._factors = dict(self._defaults)
+        self._lock = threading.Lock()
+
+    def bytes_per_pixel(self, job_type: str) -> float | None:
+        with self._lock:
+            return self._factors.get(job_type)
+
+    def estimate(self, job_type: str, pixels: int | None) -> int:
+        """Estimated peak bytes for a job of ``pixels`` decoded pixels."""
+        factor = self.bytes_per_pixel(job_type)
+        if pixels is None or factor is None:
+            return self.default_job_bytes
+        return int(self.base_bytes + pixels * factor)
+
+    def observe(self, job_type: str, pixels: int | None, peak_bytes: int | None) -> None:
+        """Fold a measured peak into the job type's factor."""
+        if not pixels or peak_bytes is None or job_type not in self._defaults:
+            return
+        sample = max(peak_bytes - self.base_bytes, 0) / pixels
+        low, high = (self._defaults[job_type] * bound for bound in CALIBRATION_BOUNDS)
+        sample = min(max(sample, low), high)
+        with self._lock:
+            factor = self._factors[job_type]
+            # RSS rarely shrinks after a large job, so later growth readings run
+            # low; follow increases quickly and decreases slowly.
+            alpha = self.alpha if sample > factor else self.alpha / 4
+            self._factors[job_type] = (1 - alpha) * factor + alpha * sample
+        logger.debug(
+            "[admission.calibrated] %s bytes_per_pixel=%.1f (sample=%.1f)",
+            job_type,
+            self._factors[job_type],
+            sample,
+        )
+
+
+class _Ticket:
+    def __init__(self, estimate_bytes: int, solo: bool) -> None:
+        self.estimate_bytes = estimate_bytes
+        self.solo = solo
+
+
+class AdmissionController:
+    """Admits jobs while the sum of their memory estimates fits the budget."""
+
+    def __init__(self, budget_bytes: int, *, max_wait_seconds: float) -> None:
+        self.budget_bytes = budget_bytes
+        self.max_wait_seconds = max_wait_seconds
+        self._cond = threading.Condition()
+        self._active: list[_Ticket] = []
+        self._reserved_bytes = 0
+
+    @property
+    def reserved_bytes(self) -> int:
+        return self._reserved_bytes
+
+    def _fits(self, estimate_bytes: int) -> bool:
+        # An oversized job still runs once the worker is otherwise idle
+        return not self._active or self._reserved_bytes + estimate_bytes <= self.budget_bytes
+
+    @contextmanager
+    def admit(self, job_type: str, estimate_bytes: int) -> Iterator[_Ticket]:
+        """Block until the job fits, then reserve its estimate for its duration.
+
+        Raises:
+            AdmissionDeferred: The job did not fit within max_wait_seconds
+        """
+        deadline = time.monotonic() + self.max_wait_seconds
+        with self._cond:
+            if not self._fits(estimate_bytes):
+                logger.info(
+                    "[admission.waiting] %s estimate=%dmb reserved=%dmb budget=%dmb",
+                    job_type,
+                    estimate_bytes // MB,
+                    self._reserved_bytes // MB,
+                    self.budget_bytes // MB,
+                )
+            while not self._fits(estimate_bytes):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise AdmissionDeferred(
+                        f"{job_type} needs ~{estimate_bytes // MB}mb; "
+                        f"{self._reserved_bytes // MB}/{self.budget_bytes // MB}mb reserved"
+                    )
+                self._cond.wait(remaining)
+            for other in self._active:
+                other.solo = False
+            ticket = _Ticket(estimate_bytes, solo=not self._active)
+            self._active.append(ticket)
+            self._reserved_bytes += estimate_bytes
+        try:
+            yield ticket
+        finally:
+            with self._cond:
+                self._active.remove(ticket)
+                self._reserved_bytes -= estimate_bytes
+                self._cond.notify_all()
+
+
+class PeakMemorySampler:
+    """Samples process RSS on a background thread and records the peak growth."""
+
+    def __init__(self, interval_seconds: float = 0.25) -> None:
+        self.interval_seconds = interval_seconds
+        self.peak_bytes: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start_mb: float | None = None
+        self._peak_mb: float | None = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            current = get_memory_mb()
+            if current is not None and (self._peak_mb is None or current > self._peak_mb):
+                self._peak_mb = current
+
+    def __enter__(self) -> PeakMemorySampler:
+        self._start_mb = get_memory_mb()
+        if self._start_mb is None:
+            return self
+        self._peak_mb = self._start_mb
+        self._thread = threading.Thread(target=self._sample, name="MemorySampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        final = get_memory_mb()
+        peak = max(self._peak_mb or 0.0, final or 0.0)
+        self.peak_bytes = int(max(peak - (self._start_mb or 0.0), 0.0) * MB)
+
+
+def _container_memory_limit() -> int | None:
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            value = Path(path).read_text().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports a huge sentinel when unlimited
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    if PSUTIL_AVAILABLE:
+        import psutil
+
+        return int(psutil.virtual_memory().total)
+    return None
+
+
+def resolve_memory_budget() -> int | None:
+    """Configured budget, else a fraction of the container/machine memory limit."""
+    if config.admission_memory_budget_bytes:
+        return config.admission_memory_budget_bytes
+    limit = _container_memory_limit()
+    if limit is None:
+        return None
+    return int(limit * config.admission_memory_fraction)
+
+
+def build_admission() -> tuple[AdmissionController, MemoryModel] | None:
+    """Admission controller and memory model for this worker, or None if disabled."""
+    if not config.admission_enabled:
+        return None
+    budget = resolve_memory_budget()
+    if budget is None:
+        logger.warning(
+            "[admission.disabled] memory limit unknown; set ADMISSION_MEMORY_BUDGET_BYTES"
+        )
+        return None
+    logger.info(f"[admission.enabled] budget={budget // MB}mb")
+    controller = AdmissionController(
+        budget, max_wait_seconds=min(config.admission_max_wait_seconds, MAX_WAIT_SECONDS)
+    )
+    model = MemoryModel(
+        base_bytes=config.admission_job_base_bytes,
+        default_job_bytes=config.admission_default_job_bytes,
+    )
+    return controller, model
@@ -11,15 +11,23 @@ import tempfile
 import time
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import NamedTuple
 
 import numpy as np
-from pydantic import BaseModel, Field
 from sqlmodel import Session, select
 
 from clients.storage import get_storage_client
 from config import config
 from jobs.envelope import JobEnvelope
+from jobs.overlay_cache import (
+    apply_overlay_result,
+    compute_content_hash,
+    find_overlay_result,
+    save_overlay_result,
+)
+from jobs.payloads import BlockOverlayGeneratePayload
 from jobs.types import JobType
+from lib.alignment_quality import AlignmentQuality, score_alignment
 from lib.grid_alignment import align_with_grid
 from lib.overlay_render import generate_overlay_merge_mode
 from lib.sift_alignment import (
@@ -28,10 +36,11 @@ from lib.sift_alignment import (
     _load_image_from_bytes,
     sift_align,
 )
+from lib.tile_pyramid import RenderedPyramid, render_tile_pyramid, upload_tile_pyramid
 from models import Block, BlockType, Job, JobStatus, Overlay
 from utils.id_utils import generate_cuid
 from utils.job_errors import is_permanent_job_error
-from utils.job_events import append_job_event_if_missing, create_job_event
+from utils.job_events import create_job_event, record_job_event
 from utils.log_utils import (
     log_job_completed,
     log_job_started,
@@ -53,19 +62,6 @@ VIEW_BLOCK_TYPES = {
 }
 
 
-class BlockOverlayGeneratePayload(BaseModel):
-    """Input payload for block overlay generation job messages."""
-
-    model_config = {"extra": "forbid"}
-
-    block_a_id: str = Field(..., description="UUID of the source block (old)")
-    block_b_id: str = Field(..., description="UUID of the target block (new)")
-    sheet_a_id: str | None = Field(default=None, description="UUID of the source sheet")
-    sheet_b_id: str | None = Field(default=None, description="UUID of the target sheet")
-    drawing_a_id: str | None = Field(default=None, description="UUID of the source drawing")
-    drawing_b_id: str | None = Field(default=None, description="UUID of the target drawing")
-
-
 def ensure_overlay(
     session: Session,
     payload: BlockOverlayGeneratePayload,
@@ -260,14 +256,131 @@ def _align_blocks(
     raise RuntimeError("Alignment failed: no successful alignment method")
 
 
+def _score_alignment(aligned_a: np.ndarray, aligned_b: np.ndarray) -> AlignmentQuality:
+    return score_alignment(aligned_a, aligned_b, max_dim=config.alignment_quality_max_dim)
+
+
+def _needs_realignment(quality: AlignmentQuality) -> bool:
+    return (
+        config.alignment_realign_enabled
+        and quality.sufficient_edges
+        and quality.score < config.alignment_quality_threshold
+    )
+
+
+def _realign_blocks(
+    img_a: np.ndarray,
+    img_b: np.ndarray,
+    path_a: Path | None,
+    path_b: Path | None,
+    has_grid: bool,
+    current: tuple[np.ndarray, np.ndarray, AlignmentStats, AlignmentQuality],
+) -> tuple[np.ndarray, np.ndarray, AlignmentStats, AlignmentQuality, list[dict[str, object]]]:
+    """Retry alignment for a low-quality pair and keep the best-scoring result.
+
+    Candidates, in order:
+    1. SIFT refine: finer pyramid level (config.alignment_refine_downsample_scale)
+       with twice the feature budget
+    2. Grid: when the block has grid callouts and grid was not already used
+
+    Args:
+        img_a: Image A in RGB format (old/source)
+        img_b: Image B in RGB format (new/target)
+        path_a: Path to image A file (required for grid alignment)
+        path_b: Path to image B file (required for grid alignment)
+        has_grid: Whether block has grid callouts (enables grid candidate)
+        current: (aligned_a, aligned_b, stats, quality) from the first alignment
+
+    Returns:
+        (aligned_a, aligned_b, stats, quality, attempts) where attempts records
+        every candidate's method and score
+    """
+    best = current
+    attempts: list[dict[str, object]] = []
+
+    try:
+        aligned_a, aligned_b, stats = sift_align(
+            img_a,
+            img_b,
+            downsample_scale=config.alignment_refine_downsample_scale,
+            n_features=config.sift_n_features * 2,
+            ratio_threshold=config.sift_ratio_threshold,
+            ransac_threshold=config.ransac_reproj_threshold,
+            max_iters=config.ransac_max_iters,
+            scale_min=config.transform_scale_min,
+            scale_max=config.transform_scale_max,
+            rotation_deg_min=config.transform_rotation_deg_min,
+            rotation_deg_max=config.transform_rotation_deg_max,
+            normalize_size=True,
+            contrast_threshold=0.02,
+            expand_canvas=True,
+        )
+        quality = _score_alignment(aligned_a, aligned_b)
+        attempts.append({"method": "sift_refine", "score": round(quality.score, 4)})
+        if quality.score > best[3].score:
+            best = (aligned_a, aligned_b, stats, quality)
+        del aligned_a, aligned_b
+    except RuntimeError as e:
+        attempts.append({"method": "sift_refine", "error": str(e)})
+        logger.debug("[alignment.realign.sift_failed] error=%s", str(e))
+
+    if has_grid and current[2].method != "grid" and path_a is not None and path_b is not None:
+        try:
+            aligned_a, aligned_b, stats = align_with_grid(img_a, img_b, path_a, path_b)
+            if aligned_a is not None:
+                quality = _score_alignment(aligned_a, aligned_b)
+                attempts.append({"method": "grid", "score": round(quality.score, 4)})
+                if quality.score > best[3].score:
+                    best = (aligned_a, aligned_b, stats, quality)
+                del aligned_a, aligned_b
+            else:
+                attempts.append({"method": "grid", "error": "insufficient grid lines"})
+        except RuntimeError as e:
+            attempts.append({"method": "grid", "error": str(e)})
+            logger.debug("[alignment.realign.grid_failed] error=%s", str(e))
+
+    gc.collect()
+    logger.info(
+        "[alignment.realign] initial=%.3f best=%.3f method=%s attempts=%d",
+        current[3].score,
+        best[3].score,
+        best[2].method,
+        len(attempts),
+    )
+    return (*best, attempts)
+
+
+def _render_overlay_tiles(overlay_img: np.ndarray) -> RenderedPyramid | None:
+    """Render a deep-zoom tile pyramid for the overlay if enabled and worthwhile."""
+    if not config.overlay_tiles_enabled:
+        return None
+    if max(overlay_img.shape[:2]) < config.tile_min_image_size:
+        return None
+    return render_tile_pyramid(overlay_img, tile_size=config.tile_size)
+
+
+class OverlayAssets(NamedTuple):
+    """Rendered overlay outputs and alignment diagnostics."""
+
+    overlay_bytes: bytes
+    addition_bytes: bytes
+    deletion_bytes: bytes
+    overlay_score: float
+    alignment_stats: AlignmentStats
+    alignment_quality: dict[str, object]
+    tiles: RenderedPyramid | None
+
+
 def _generate_overlay_assets(
     img_a_bytes: bytes,
     img_b_bytes: bytes,
     block_a: Block,
-) -> tuple[bytes, bytes, bytes, float, AlignmentStats]:
+) -> OverlayAssets:
     """Generate overlay assets from block images.
 
     Uses SIFT-first alignment with Grid fallback, and merge-mode rendering.
+    The aligned pair is scored with a cheap edge-agreement metric; pairs below
+    config.alignment_quality_threshold are re-aligned and the best result kept.
 
     Args:
         img_a_bytes: PNG bytes for block A (old)
@@ -275,7 +388,7 @@ def _generate_overlay_assets(
         block_a: Block A model for metadata access
 
     Returns:
-        (overlay_bytes, addition_bytes, deletion_bytes, overlay_score, alignment_stats)
+        OverlayAssets (tiles is None when tiling is disabled or skipped)
 
     Raises:
         RuntimeError: If alignment fails
@@ -296,67 +409,134 @@ def _generate_overlay_assets(
             path_b = Path(f_b.name)
             f_b.write(img_b_bytes)
 
-    # Decode images to numpy arrays
-    img_a = _load_image_from_bytes(img_a_bytes)
-    img_b = _load_image_from_bytes(img_b_bytes)
-
     try:
-        # Align blocks using SIFT-first with Grid fallback
-        aligned_a, aligned_b, stats = _align_blocks(img_a, img_b, path_a, path_b, has_grid)
-
-        # Release original images - no longer needed after alignment
-        del img_a, img_b
-        gc.collect()
-
-        # Calculate overlay score
-        if stats.method == "grid":
-            # For grid alignment, use match count as score proxy
-            total_matches = (stats.h_matches or 0) + (stats.v_matches or 0)
-            overlay_score = min(1.0, total_matches / 10.0)  # Normalize to 0-1
-        else:
-            # For SIFT, use inlier ratio
-            overlay_score = stats.inlier_ratio or 0.0
-
-        # Generate overlay using merge-mode (FR-005, FR-006)
-        # Note: merge mode returns None for deletion/addition to save memory
-        h, w = aligned_a.shape[:2]
-        overlay_img, _, _ = generate_overlay_merge_mode(
-            aligned_a,
-            aligned_b,
-            tint_strength=0.5,  # Default from generate_overlay.py
+        # Decode inline so no reference outlives the aligned copies
+        return _render_overlay_assets(
+            _load_image_from_bytes(img_a_bytes),
+            _load_image_from_bytes(img_b_bytes),
+            path_a,
+            path_b,
+            has_grid,
         )
+    finally:
+        # Clean up temporary files
+        if path_a and path_a.exists():
+            path_a.unlink()
+        if path_b and path_b.exists():
+            path_b.unlink()
 
-        # Release aligned images - no longer needed after overlay generation
-        del aligned_a, aligned_b
-        gc.collect()
-
-        # Encode overlay first, then create white images lazily (one at a time)
-        overlay_bytes = _encode_image_to_png(overlay_img)
-        del overlay_img
-        gc.collect()
-
-        # Create and encode deletion (white image) - lazy to reduce peak memory
-        deletion_img = np.full((h, w, 3), 255, dtype=np.uint8)
-        deletion_bytes = _encode_image_to_png(deletion_img)
-        del deletion_img
-        gc.collect()
-
-        # Create and encode addition (white image) - lazy to reduce peak memory
-        addition_img = np.full((h, w, 3), 255, dtype=np.uint8)
-        addition_bytes = _encode_image_to_png(addition_img)
-        del addition_img
-        gc.collect()
 
-        return overlay_bytes, addition_bytes, deletion_bytes, overlay_score, stats
+def render_overlay_assets_from_images(
+    img_a: np.ndarray,
+    img_b: np.ndarray,
+    has_grid: bool,
+) -> OverlayAssets:
+    """Align and render a pair of already-decoded block images.
 
+    Used by the batched sheet overlay path, which crops blocks from decoded
+    sheet images instead of downloading block PNGs. Grid fallback needs files
+    on disk, so crops are only encoded to temp PNGs for grid-callout blocks.
+    """
+    path_a: Path | None = None
+    path_b: Path | None = None
+    if has_grid:
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f_a:
+            path_a = Path(f_a.name)
+            f_a.write(_encode_image_to_png(img_a))
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f_b:
+            path_b = Path(f_b.name)
+            f_b.write(_encode_image_to_png(img_b))
+    try:
+        return _render_overlay_assets(img_a, img_b, path_a, path_b, has_grid)
     finally:
-        # Clean up temporary files
         if path_a and path_a.exists():
             path_a.unlink()
         if path_b and path_b.exists():
             path_b.unlink()
 
 
+def _render_overlay_assets(
+    img_a: np.ndarray,
+    img_b: np.ndarray,
+    path_a: Path | None,
+    path_b: Path | None,
+    has_grid: bool,
+) -> OverlayAssets:
+    """Align, score, render and encode an overlay from decoded block images."""
+    # Align blocks using SIFT-first with Grid fallback
+    aligned_a, aligned_b, stats = _align_blocks(img_a, img_b, path_a, path_b, has_grid)
+
+    # Score alignment and re-align only the pairs that need it
+    quality = _score_alignment(aligned_a, aligned_b)
+    initial_score = quality.score
+    attempts: list[dict[str, object]] = []
+    if _needs_realignment(quality):
+        aligned_a, aligned_b, stats, quality, attempts = _realign_blocks(
+            img_a, img_b, path_a, path_b, has_grid, (aligned_a, aligned_b, stats, quality)
+        )
+    alignment_quality = {
+        **quality.to_summary(),
+        "method": stats.method,
+        "threshold": config.alignment_quality_threshold,
+        "realigned": bool(attempts),
+        **({"initialScore": round(initial_score, 4), "attempts": attempts} if attempts else {}),
+    }
+
+    # Release original images - no longer needed after alignment
+    del img_a, img_b
+    gc.collect()
+
+    # Calculate overlay score
+    if stats.method == "grid":
+        # For grid alignment, use match count as score proxy
+        total_matches = (stats.h_matches or 0) + (stats.v_matches or 0)
+        overlay_score = min(1.0, total_matches / 10.0)  # Normalize to 0-1
+    else:
+        # For SIFT, use inlier ratio
+        overlay_score = stats.inlier_ratio or 0.0
+
+    # Generate overlay using merge-mode (FR-005, FR-006)
+    # Note: merge mode returns None for deletion/addition to save memory
+    h, w = aligned_a.shape[:2]
+    overlay_img, _, _ = generate_overlay_merge_mode(
+        aligned_a,
+        aligned_b,
+        tint_strength=0.5,  # Default from generate_overlay.py
+    )
+
+    # Release aligned images - no longer needed after overlay generation
+    del aligned_a, aligned_b
+    gc.collect()
+
+    # Encode overlay first, then create white images lazily (one at a time)
+    overlay_bytes = _encode_image_to_png(overlay_img)
+    overlay_tiles = _render_overlay_tiles(overlay_img)
+    del overlay_img
+    gc.collect()
+
+    # Create and encode deletion (white image) - lazy to reduce peak memory
+    deletion_img = np.full((h, w, 3), 255, dtype=np.uint8)
+    deletion_bytes = _encode_image_to_png(deletion_img)
+    del deletion_img
+    gc.collect()
+
+    # Create and encode addition (white image) - lazy to reduce peak memory
+    addition_img = np.full((h, w, 3), 255, dtype=np.uint8)
+    addition_bytes = _encode_image_to_png(addition_img)
+    del addition_img
+    gc.collect()
+
+    return OverlayAssets(
+        overlay_bytes=overlay_bytes,
+        addition_bytes=addition_bytes,
+        deletion_bytes=deletion_bytes,
+        overlay_score=overlay_score,
+        alignment_stats=stats,
+        alignment_quality=alignment_quality,
+        tiles=overlay_tiles,
+    )
+
+
 def _upload_overlay_assets(
     storage_client,
     overlay_id: str,
@@ -393,6 +573,17 @@ def _upload_overlay_assets(
     return overlay_uri, addition_uri, deletion_uri
 
 
+def _load_blocks(session: Session, payload: BlockOverlayGeneratePayload) -> tuple[Block, Block]:
+    """Load both blocks of the pair, validating they can be rendered."""
+    block_a = session.get(Block, payload.block_a_id)
+    block_b = session.get(Block, payload.block_b_id)
+    if not block_a or not block_b:
+        raise ValueError("Blocks not found for overlay generation")
+    if not block_a.uri or not block_b.uri:
+        raise ValueError("Blocks missing image URI for overlay generation")
+    return block_a, block_b
+
+
 def run_block_overlay_generate_job(
     session: Session,
     payload: BlockOverlayGeneratePayload,
@@ -439,11 +630,23 @@ def run_block_overlay_generate_job(
         block_id=payload.block_a_id,
         metadata=metadata,
     )
-    job.events = append_job_event_if_missing(job.events, started_event)
+    record_job_event(session, job, started_event)
     session.add(job)
     session.commit()
 
     try:
+        block_a = block_b = None
+        cache_hit = False
+        if not (overlay.uri and overlay.addition_uri and overlay.deletion_uri):
+            block_a, block_b = _load_blocks(session, payload)
+            # Same crops already rendered under other block IDs: reuse their assets
+            cached_result = find_overlay_result(session, block_a, block_b)
+            if cached_result is not None:
+                apply_overlay_result(overlay, cached_result)
+                session.add(overlay)
+                cache_hit = True
+                logger.info(f"[overlay.cache.hit] overlay {overlay.id} key={cached_result.key}")
+
         # Check if overlay already exists
         if overlay.uri and overlay.addition_uri and overlay.deletion_uri:
             overlay_score = overlay.score
@@ -463,9 +666,10 @@ def run_block_overlay_generate_job(
                         if overlay_score is not None
                         else {}
                     ),
+                    **({"overlayCacheHit": True} if cache_hit else {}),
                 },
             )
-            job.events = append_job_event_if_missing(job.events, completed_event)
+            record_job_event(session, job, completed_event)
             session.add(job)
             session.commit()
             log_job_completed(
@@ -478,28 +682,28 @@ def run_block_overlay_generate_job(
             )
             return
 
-        # Load blocks
-        block_a = session.get(Block, payload.block_a_id)
-        block_b = session.get(Block, payload.block_b_id)
-        if not block_a or not block_b:
-            raise ValueError("Blocks not found for overlay generation")
-        if not block_a.uri or not block_b.uri:
-            raise ValueError("Blocks missing image URI for overlay generation")
-
         storage_client = get_storage_client()
 
         with log_phase(logger, "Download block images", block_id=payload.block_a_id):
             img_a_bytes = _download_block_image(storage_client, block_a.uri)
             img_b_bytes = _download_block_image(storage_client, block_b.uri)
 
+        # Backfill hashes for blocks extracted before content hashing existed
+        for block, block_bytes in ((block_a, img_a_bytes), (block_b, img_b_bytes)):
+            if not block.content_hash:
+                block.content_hash = compute_content_hash(block_bytes)
+                session.add(block)
+
         with log_phase(logger, "Align and render overlay", block_id=payload.block_a_id):
-            (
-                overlay_bytes,
-                addition_bytes,
-                deletion_bytes,
-                overlay_score,
-                alignment_stats,
-            ) = _generate_overlay_assets(img_a_bytes, img_b_bytes, block_a)
+            assets = _generate_overlay_assets(img_a_bytes, img_b_bytes, block_a)
+        overlay_bytes = assets.overlay_bytes
+        addition_bytes = assets.addition_bytes
+        deletion_bytes = assets.deletion_bytes
+        overlay_score = assets.overlay_score
+        alignment_stats = assets.alignment_stats
+        alignment_quality = assets.alignment_quality
+        overlay_tiles = assets.tiles
+        del assets
 
         if overlay_score < LOW_CONFIDENCE_SCORE:
             logger.warning(
@@ -507,6 +711,13 @@ def run_block_overlay_generate_job(
                 overlay_score,
                 alignment_stats.method,
             )
+        if alignment_quality["score"] < config.alignment_quality_threshold:
+            logger.warning(
+                "[overlay.low_alignment_quality] score=%.3f method=%s realigned=%s",
+                alignment_quality["score"],
+                alignment_stats.method,
+                alignment_quality["realigned"],
+            )
 
         with log_phase(logger, "Upload overlay assets", overlay_id=overlay.id):
             overlay_uri, addition_uri, deletion_uri = _upload_overlay_assets(
@@ -517,13 +728,30 @@ def run_block_overlay_generate_job(
                 deletion_bytes,
             )
 
+        tiles_manifest = None
+        if overlay_tiles is not None:
+            with log_phase(logger, "Upload overlay tiles", overlay_id=overlay.id):
+                tiles_manifest = upload_tile_pyramid(
+                    storage_client,
+                    overlay_tiles,
+                    f"block-overlays/{overlay.id}_files",
+                    max_workers=config.tile_upload_concurrency,
+                )
+            del overlay_tiles
+
         # Update overlay record
         overlay.uri = overlay_uri
         overlay.addition_uri = addition_uri
         overlay.deletion_uri = deletion_uri
         overlay.score = overlay_score
+        overlay.summary = {
+            **(overlay.summary or {}),
+            "alignmentQuality": alignment_quality,
+            **({"tiles": tiles_manifest} if tiles_manifest is not None else {}),
+        }
         overlay.updated_at = datetime.now(UTC)
         session.add(overlay)
+        save_overlay_result(session, block_a, block_b, overlay)
 
         # Build completed event metadata with alignment stats
         completed_metadata = {
@@ -531,6 +759,8 @@ def run_block_overlay_generate_job(
             "overlayScore": overlay_score,
             "overlayLowConfidence": overlay_score < LOW_CONFIDENCE_SCORE,
             "alignmentMethod": alignment_stats.method,
+            "alignmentQuality": alignment_quality["score"],
+            "alignmentRealigned": alignment_quality["realigned"],
         }
 
         # Add method-specific stats
@@ -555,7 +785,7 @@ def run_block_overlay_generate_job(
             block_id=payload.block_a_id,
             metadata=completed_metadata,
         )
-        job.events = append_job_event_if_missing(job.events, completed_event)
+        record_job_event(session, job, completed_event)
         session.add(job)
         session.commit()
 
@@ -605,6 +835,6 @@ def _fail_job(
             "permanent": is_permanent_job_error(error),
         },
     )
-    job.events = append_job_event_if_missing(job.events, failed_event)
+    record_job_event(session, job, failed_event)
     session.add(job)
     session.commit()
@@ -0,0 +1,299 @@
+"""Manual-alignment overlay re-render job handler.
+
+Re-renders an existing block overlay using the affine matrix the user derived
+from three point correspondences in the web viewer. SIFT and grid alignment
+are skipped entirely; the job only warps, renders and uploads.
+
+This is the interactive path, so it is tuned for latency:
+- Decoded block images come from the process-local image cache, so repeated
+  adjustments of the same pair skip download and PNG decode.
+- A low-resolution preview overlay is rendered and published on the overlay
+  record first, then the full-resolution assets replace it.
+- Outputs are written under a per-job key so a re-render never overwrites an
+  object a browser or CDN may still be caching.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+from datetime import UTC, datetime
+
+import numpy as np
+from pydantic import BaseModel, Field, field_validator
+from sqlmodel import Session
+
+from clients.storage import get_storage_client
+from config import config
+from jobs.block_overlay_generate import (
+    _download_block_image,
+    _fail_job,
+    _render_overlay_tiles,
+    _upload_overlay_assets,
+)
+from jobs.envelope import JobEnvelope
+from jobs.types import JobType
+from lib.alignment_quality import score_alignment
+from lib.image_cache import CachedImage, get_image_cache
+from lib.overlay_render import generate_overlay_merge_mode
+from lib.sift_alignment import _encode_image_to_png, _expand_canvas, _load_image_from_bytes
+from lib.tile_pyramid import upload_tile_pyramid
+from models import Block, Job, JobStatus, Overlay
+from utils.job_events import create_job_event, record_job_event
+from utils.log_utils import log_job_completed, log_job_started, log_phase, log_storage_upload
+
+logger = logging.getLogger(__name__)
+
+
+class ManualAlignPayload(BaseModel):
+    """Input payload for manual alignment job messages."""
+
+    model_config = {"extra": "forbid"}
+
+    overlay_id: str = Field(..., description="ID of the overlay to re-render")
+    alignment_matrix: list[list[float]] = Field(
+        ..., description="2x3 affine matrix mapping block A pixels onto block B pixels"
+    )
+    source_points: list[list[float]] | None = Field(
+        default=None, description="User-selected points on block A (old)"
+    )
+    target_points: list[list[float]] | None = Field(
+        default=None, description="User-selected points on block B (new)"
+    )
+
+    @field_validator("alignment_matrix")
+    @classmethod
+    def validate_alignment_matrix(cls, v: list[list[float]]) -> list[list[float]]:
+        """Validate the matrix is a finite 2x3 affine transform."""
+        if len(v) != 2 or any(len(row) != 3 for row in v):
+            raise ValueError("alignment_matrix must be a 2x3 matrix")
+        if not np.all(np.isfinite(np.array(v, dtype=np.float64))):
+            raise ValueError("alignment_matrix must contain finite values")
+        return v
+
+
+def _block_cache_key(block: Block) -> str:
+    # Include the URI so a re-extracted block never hits a stale decode
+    return f"{block.id}:{block.uri}"
+
+
+def _load_block_image(storage_client, block: Block) -> CachedImage:
+    """Full-resolution decoded block image, via the shared image cache."""
+    return get_image_cache().get_or_load(
+        _block_cache_key(block),
+        lambda: _load_image_from_bytes(_download_block_image(storage_client, block.uri)),
+    )
+
+
+def _scale_matrix(matrix: np.ndarray, scale_a: float, scale_b: float) -> np.ndarray:
+    """Re-express an A->B affine matrix for images downsampled by scale_a/scale_b."""
+    scaled = matrix.copy()
+    scaled[:, :2] *= scale_b / scale_a
+    scaled[:, 2] *= scale_b
+    return scaled
+
+
+def _render_manual_overlay(
+    img_a: np.ndarray,
+    img_b: np.ndarray,
+    matrix: np.ndarray,
+) -> tuple[np.ndarray, float]:
+    """Warp A onto B's expanded canvas and render the merge-mode overlay.
+
+    Returns:
+        (overlay_img, alignment_quality_score)
+    """
+    aligned_a, aligned_b, _, _, _ = _expand_canvas(img_a, img_b, matrix)
+    quality = score_alignment(aligned_a, aligned_b, max_dim=config.alignment_quality_max_dim)
+    overlay_img, _, _ = generate_overlay_merge_mode(aligned_a, aligned_b, tint_strength=0.5)
+    del aligned_a, aligned_b
+    return overlay_img, quality.score
+
+
+def run_manual_align_job(
+    session: Session,
+    payload: ManualAlignPayload,
+    message_id: str | None,
+    envelope: JobEnvelope,
+) -> None:
+    """Execute manual alignment overlay re-render job."""
+    job_type = JobType.MANUAL_ALIGN
+    job = session.get(Job, envelope.job_id)
+    if not job:
+        raise ValueError(f"Job {envelope.job_id} not found")
+
+    if job.status == JobStatus.CANCELED:
+        logger.info(f"[job.canceled] manual align job {job.id} canceled before start")
+        return
+
+    overlay = session.get(Overlay, payload.overlay_id)
+    if not overlay or overlay.deleted_at is not None:
+        raise ValueError(f"Overlay not found: {payload.overlay_id}")
+
+    metadata = {
+        "overlayId": overlay.id,
+        "blockAId": overlay.block_a_id,
+        "blockBId": overlay.block_b_id,
+    }
+
+    start_time = log_job_started(
+        logger,
+        job_type,
+        message_id or "",
+        job_id=str(envelope.job_id),
+    )
+
+    if job.status == JobStatus.QUEUED:
+        job.status = JobStatus.STARTED
+        job.updated_at = datetime.now(UTC)
+
+    started_event = create_job_event(
+        job_type=job_type,
+        job_id=str(job.id),
+        status=job.status.value,
+        event_type="started",
+        block_id=overlay.block_a_id,
+        metadata=metadata,
+    )
+    record_job_event(session, job, started_event)
+    session.add(job)
+    session.commit()
+
+    try:
+        block_a = session.get(Block, overlay.block_a_id)
+        block_b = session.get(Block, overlay.block_b_id)
+        if not block_a or not block_b:
+            raise ValueError("Blocks not found for manual alignment")
+        if not block_a.uri or not block_b.uri:
+            raise ValueError("Blocks missing image URI for manual alignment")
+
+        storage_client = get_storage_client()
+        cache = get_image_cache()
+        matrix = np.array(payload.alignment_matrix, dtype=np.float64)
+        asset_key = f"{overlay.id}_{job.id}"
+        manual_summary = {
+            "jobId": str(job.id),
+            "matrix": payload.alignment_matrix,
+            **({"sourcePoints": payload.source_points} if payload.source_points else {}),
+            **({"targetPoints": payload.target_points} if payload.target_points else {}),
+        }
+
+        with log_phase(logger, "Load block images", block_id=block_a.id):
+            full_a = _load_block_image(storage_client, block_a)
+            full_b = _load_block_image(storage_client, block_b)
+
+        # Preview: downsampled pair, published before the full render starts
+        with log_phase(logger, "Render preview overlay", overlay_id=overlay.id):
+            max_dim = config.manual_align_preview_max_dim
+            small_a = cache.get_or_load(
+                _block_cache_key(block_a), lambda image=full_a.image: image, max_dim
+            )
+            small_b = cache.get_or_load(
+                _block_cache_key(block_b), lambda image=full_b.image: image, max_dim
+            )
+            preview_img, _ = _render_manual_overlay(
+                small_a.image,
+                small_b.image,
+                _scale_matrix(matrix, small_a.scale, small_b.scale),
+            )
+            preview_bytes = _encode_image_to_png(preview_img)
+            del preview_img
+            preview_path = f"block-overlays/{asset_key}_preview.png"
+            preview_uri = storage_client.upload_from_bytes(
+                preview_bytes, preview_path, content_type="image/png"
+            )
+            log_storage_upload(logger, preview_path, size_bytes=len(preview_bytes))
+
+        manual_summary = {**manual_summary, "status": "preview", "previewUri": preview_uri}
+        overlay.summary = {**(overlay.summary or {}), "manualAlignment": manual_summary}
+        overlay.updated_at = datetime.now(UTC)
+        session.add(overlay)
+        session.commit()
+
+        with log_phase(logger, "Render full overlay", overlay_id=overlay.id):
+            overlay_img, quality_score = _render_manual_overlay(full_a.image, full_b.image, matrix)
+            del full_a, full_b
+            h, w = overlay_img.shape[:2]
+            overlay_bytes = _encode_image_to_png(overlay_img)
+            overlay_tiles = _render_overlay_tiles(overlay_img)
+            del overlay_img
+            gc.collect()
+            # Addition/deletion assets are white canvases, matching the merge-mode job
+            blank_bytes = _encode_image_to_png(np.full((h, w, 3), 255, dtype=np.uint8))
+
+        with log_phase(logger, "Upload overlay assets", overlay_id=overlay.id):
+            overlay_uri, addition_uri, deletion_uri = _upload_overlay_assets(
+                storage_client,
+                asset_key,
+                overlay_bytes,
+                blank_bytes,
+                blank_bytes,
+            )
+            tiles_manifest = None
+            if overlay_tiles is not None:
+                tiles_manifest = upload_tile_pyramid(
+                    storage_client,
+                    overlay_tiles,
+                    f"block-overlays/{asset_key}_files",
+                    max_workers=config.tile_upload_concurrency,
+                )
+            del overlay_tiles
+
+        overlay.uri = overlay_uri
+        overlay.addition_uri = addition_uri
+        overlay.deletion_uri = deletion_uri
+        overlay.job_id = str(job.id)
+        summary = {key: value for key, value in (overlay.summary or {}).items() if key != "tiles"}
+        overlay.summary = {
+            **summary,
+            "manualAlignment": {**manual_summary, "status": "completed"},
+            "alignmentQuality": {
+                **(summary.get("alignmentQuality") or {}),
+                "score": round(quality_score, 4),
+                "method": "manual",
+                "realigned": False,
+            },
+            **({"tiles": tiles_manifest} if tiles_manifest is not None else {}),
+        }
+        overlay.updated_at = datetime.now(UTC)
+        session.add(overlay)
+
+        job.status = JobStatus.COMPLETED
+        job.updated_at = datetime.now(UTC)
+        completed_event = create_job_event(
+            job_type=job_type,
+            job_id=str(job.id),
+            status=JobStatus.COMPLETED.value,
+            event_type="completed",
+            block_id=overlay.block_a_id,
+            metadata={
+                **metadata,
+                "alignmentMethod": "manual",
+                "alignmentQuality": round(quality_score, 4),
+                "previewUri": preview_uri,
+                "imageCacheHits": cache.hits,
+                "imageCacheMisses": cache.misses,
+            },
+        )
+        record_job_event(session, job, completed_event)
+        session.add(job)
+        session.commit()
+
+        log_job_completed(
+            logger,
+            job_type,
+            message_id or "",
+            start_time,
+            block_id=overlay.block_a_id,
+            job_id=str(envelope.job_id),
+        )
+    except Exception as error:
+        _fail_job(
+            session,
+            job,
+            job_type=job_type,
+            metadata=metadata,
+            block_id=overlay.block_a_id,
+            error=error,
+        )
+        raise
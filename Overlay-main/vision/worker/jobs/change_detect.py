@@ -17,9 +17,10 @@ from clients.storage import get_storage_client
 from config import config
 from jobs.envelope import JobEnvelope
 from jobs.types import JobType
+from lib.llm_usage import track_openai_usage
 from models import Block, Job, JobStatus, Overlay
 from utils.id_utils import generate_cuid
-from utils.job_events import append_job_event_if_missing, create_job_event
+from utils.job_events import create_job_event, record_job_event
 from utils.log_utils import log_job_completed, log_job_started, log_phase
 from utils.storage_utils import extract_remote_path
 
@@ -150,6 +151,8 @@ def _analyze_overlay_with_openai(
         response_format={"type": "json_object"},
     )
 
+    track_openai_usage("gpt-4o", getattr(response, "usage", None))
+
     response_text = response.choices[0].message.content
     if not response_text:
         raise RuntimeError("No response from OpenAI")
@@ -218,7 +221,7 @@ def run_change_detect_job(
         event_type="started",
         metadata=metadata,
     )
-    job.events = append_job_event_if_missing(job.events, started_event)
+    record_job_event(session, job, started_event)
     session.add(job)
     session.commit()
 
@@ -261,6 +264,7 @@ def run_change_detect_job(
             for c in result.changes
         ]
         overlay.summary = {
+            **(overlay.summary or {}),
             "total_cost_impact": result.total_cost_impact,
             "total_schedule_impact": result.total_schedule_impact,
             "biggest_cost_driver": result.biggest_cost_driver,
@@ -287,7 +291,7 @@ def run_change_detect_job(
             event_type="completed",
             metadata=completed_metadata,
         )
-        job.events = append_job_event_if_missing(job.events, completed_event)
+        record_job_event(session, job, completed_event)
         session.add(job)
         session.commit()
 
@@ -314,7 +318,7 @@ def run_change_detect_job(
                 "errorMessage": str(error),
             },
         )
-        job.events = append_job_event_if_missing(job.events, failed_event)
+        record_job_event(session, job, failed_event)
         session.add(job)
         session.commit()
         raise
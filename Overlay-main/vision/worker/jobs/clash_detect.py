@@ -15,7 +15,7 @@ from jobs.overlay_reports import (
 )
 from jobs.types import JobType
 from models import Job, JobStatus
-from utils.job_events import append_job_event_if_missing, create_job_event
+from utils.job_events import create_job_event, record_job_event
 from utils.log_utils import log_job_completed, log_job_started
 
 logger = logging.getLogger(__name__)
@@ -68,7 +68,7 @@ def run_compute_clashes_job(
         event_type="started",
         metadata=started_metadata,
     )
-    job.events = append_job_event_if_missing(job.events, started_event)
+    record_job_event(session, job, started_event)
     session.add(job)
     session.commit()
 
@@ -115,7 +115,7 @@ def run_compute_clashes_job(
                 "clashCount": len(report["clashes"]),
             },
         )
-        job.events = append_job_event_if_missing(job.events, completed_event)
+        record_job_event(session, job, completed_event)
         session.add(job)
         session.commit()
         log_job_completed(
@@ -174,6 +174,6 @@ def _fail_job(
         event_type="failed",
         metadata=failed_metadata,
     )
-    job.events = append_job_event_if_missing(job.events, failed_event)
+    record_job_event(session, job, failed_event)
     session.add(job)
     session.commit()
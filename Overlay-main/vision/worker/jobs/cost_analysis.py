@@ -20,7 +20,7 @@ from jobs.envelope import JobEnvelope
 from jobs.types import JobType
 from models import Job, JobStatus, Overlay, Sheet, Block
 from utils.id_utils import generate_cuid
-from utils.job_events import append_job_event_if_missing, create_job_event
+from utils.job_events import create_job_event, record_job_event
 from utils.log_utils import log_job_completed, log_job_started, log_phase
 from utils.storage_utils import extract_remote_path
 
@@ -216,7 +216,7 @@ def run_cost_analysis_job(
         event_type="started",
         metadata=metadata,
     )
-    job.events = append_job_event_if_missing(job.events, started_event)
+    record_job_event(session, job, started_event)
     session.add(job)
     session.commit()
 
@@ -283,7 +283,7 @@ def run_cost_analysis_job(
             event_type="completed",
             metadata=completed_metadata,
         )
-        job.events = append_job_event_if_missing(job.events, completed_event)
+        record_job_event(session, job, completed_event)
         session.add(job)
         session.commit()
 
@@ -310,7 +310,7 @@ def run_cost_analysis_job(
                 "errorMessage": str(error),
             },
         )
-        job.events = append_job_event_if_missing(job.events, failed_event)
+        record_job_event(session, job, failed_event)
         session.add(job)
         session.commit()
         raise
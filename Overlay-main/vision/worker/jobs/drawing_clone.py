@@ -0,0 +1,181 @@
+"""Clone a processed drawing's sheets and blocks onto a duplicate upload.
+
+Drawings are identified by the SHA-256 of their PDF (``drawings.content_hash``).
+When a drawing preprocess job finds an earlier drawing with the same contents
+whose sheets all processed successfully, it copies that drawing's sheet and
+block rows instead of rendering pages and running sheet analysis again. The
+copies point at the same storage objects (sheet images, tiles, block crops).
+
+The hash is computed by the worker from the downloaded PDF, so a drawing can
+only be cloned from a drawing whose PDF really has the same bytes. The one
+shortcut: uploads streamed through the API with a verified ``X-Content-SHA256``
+are stored at ``projects/<project_id>/uploads/sha256/<hash>.pdf``, a path
+nothing else writes. ``DrawingCreate.uri`` comes from the client, though, so a
+hash is only read from the URI when the path is under the drawing's own
+project and the object exists; any other URI is downloaded and hashed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from datetime import UTC, datetime
+
+from sqlalchemy import String, column, insert, literal, update, values
+from sqlmodel import Session, select
+
+from clients.storage import StorageClient
+from models import Block, Drawing, DrawingProgress, JobStatus, Sheet
+from utils.db_utils import upsert_returning
+from utils.id_utils import generate_cuid
+from utils.storage_utils import extract_remote_path
+
+# Block columns copied verbatim; ids, sheet and timestamps are set per copy
+_CLONED_BLOCK_COLUMNS = ("type", "uri", "bounds", "ocr", "description", "metadata", "content_hash")
+
+# Where the API stores verified streamed uploads (api/routes/uploads.py upload_path)
+_CONTENT_ADDRESSED_PATH = re.compile(
+    r"projects/(?P<project_id>[^/]+)/uploads/sha256/(?P<hash>[0-9a-f]{64})\.[^/]+"
+)
+
+
+def pdf_content_hash(pdf_bytes: bytes) -> str:
+    """Hex SHA-256 of a drawing PDF, as stored in ``drawings.content_hash``."""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def verified_upload_hash(storage_client: StorageClient, drawing: Drawing) -> str | None:
+    """Hash of a drawing stored at its project's content-addressed upload path, if it is.
+
+    The path must belong to the drawing's project and the object must exist;
+    otherwise the URI may be forged and None is returned.
+    """
+    try:
+        remote_path = extract_remote_path(drawing.uri)
+    except ValueError:
+        return None
+    match = _CONTENT_ADDRESSED_PATH.fullmatch(remote_path)
+    if not match or match["project_id"] != drawing.project_id:
+        return None
+    if not storage_client.file_exists(remote_path):
+        return None
+    return match["hash"]
+
+
+def find_processed_duplicate(session: Session, drawing_id: str, content_hash: str) -> str | None:
+    """Most recently processed other drawing with the same contents, if any.
+
+    Only drawings whose preprocess job completed and whose sheets all
+    completed (none failed) are cloned from.
+    """
+    return session.exec(
+        select(Drawing.id)
+        .join(DrawingProgress, DrawingProgress.drawing_id == Drawing.id)
+        .where(
+            Drawing.content_hash == content_hash,
+            Drawing.id != drawing_id,
+            Drawing.deleted_at.is_(None),
+            DrawingProgress.job_status == JobStatus.COMPLETED,
+            DrawingProgress.sheets_total > 0,
+            DrawingProgress.sheets_completed == DrawingProgress.sheets_total,
+            DrawingProgress.sheets_failed == 0,
+        )
+        .order_by(DrawingProgress.updated_at.desc())
+        .limit(1)
+    ).first()
+
+
+def clone_drawing_sheets(session: Session, source_drawing_id: str, drawing_id: str) -> list[Sheet]:
+    """Copy the source drawing's live sheets and blocks to ``drawing_id`` (caller commits).
+
+    Sheets are upserted on ``(drawing_id, index)`` and the target sheets'
+    previous blocks are soft-deleted first, so a retried job does not
+    duplicate blocks. Block rows are copied in one ``INSERT ... SELECT``;
+    OCR text and metadata never leave the database.
+
+    Returns:
+        The drawing's sheets, ordered by index
+    """
+    now = datetime.now(UTC)
+    source_sheets = session.exec(
+        select(Sheet)
+        .where(Sheet.drawing_id == source_drawing_id, Sheet.deleted_at.is_(None))
+        .order_by(Sheet.index)
+    ).all()
+    if not source_sheets:
+        return []
+
+    rows = [
+        Sheet(
+            id=generate_cuid(),
+            drawing_id=drawing_id,
+            index=source.index,
+            uri=source.uri,
+            title=source.title,
+            sheet_number=source.sheet_number,
+            discipline=source.discipline,
+            metadata_=source.metadata_,
+            created_at=now,
+            updated_at=now,
+        )
+        for source in source_sheets
+    ]
+
+    def on_conflict(excluded) -> dict:
+        # Existing sheet for this page: take the source's content and revive it
+        return {
+            "uri": excluded.uri,
+            "title": excluded.title,
+            "sheet_number": excluded.sheet_number,
+            "discipline": excluded.discipline,
+            "metadata": excluded.metadata,
+            "updated_at": excluded.updated_at,
+            "deleted_at": None,
+        }
+
+    sheets = sorted(
+        upsert_returning(
+            session, rows, conflict_columns=("drawing_id", "index"), update=on_conflict
+        ),
+        key=lambda sheet: sheet.index,
+    )
+    sheet_by_index = {sheet.index: sheet for sheet in sheets}
+    sheet_map = {source.id: sheet_by_index[source.index].id for source in source_sheets}
+
+    session.exec(
+        update(Block)
+        .where(Block.sheet_id.in_(list(sheet_map.values())), Block.deleted_at.is_(None))
+        .values(deleted_at=now, updated_at=now)
+    )
+
+    source_blocks = session.exec(
+        select(Block.id, Block.sheet_id).where(
+            Block.sheet_id.in_(list(sheet_map)), Block.deleted_at.is_(None)
+        )
+    ).all()
+    if source_blocks:
+        clone_map = values(
+            column("source_id", String),
+            column("block_id", String),
+            column("sheet_id", String),
+            name="clone_map",
+        ).data(
+            [
+                (block_id, generate_cuid(), sheet_map[source_sheet_id])
+                for block_id, source_sheet_id in source_blocks
+            ]
+        )
+        table = Block.__table__
+        session.execute(
+            insert(table).from_select(
+                ["id", "sheet_id", "created_at", "updated_at", *_CLONED_BLOCK_COLUMNS],
+                select(
+                    clone_map.c.block_id,
+                    clone_map.c.sheet_id,
+                    literal(now, table.c.created_at.type),
+                    literal(now, table.c.updated_at.type),
+                    *(table.c[name] for name in _CLONED_BLOCK_COLUMNS),
+                ).join_from(table, clone_map, clone_map.c.source_id == table.c.id),
+            )
+        )
+    return sheets
@@ -10,13 +10,14 @@ from datetime import UTC, datetime
 from pydantic import BaseModel, Field
 from sqlmodel import Session, select
 
-from clients.pubsub import get_pubsub_client
 from config import config
-from jobs.envelope import JobEnvelope, build_job_envelope
+from jobs.envelope import JobEnvelope
+from jobs.outbox import enqueue_jobs, wake_outbox_relay
 from jobs.types import JobType
 from models import Drawing, Job, JobStatus, Sheet
+from utils.db_utils import bulk_insert
 from utils.id_utils import generate_cuid
-from utils.job_events import append_job_event_if_missing, create_job_event
+from utils.job_events import create_job_event, record_job_event
 from utils.log_utils import log_coordination_published, log_job_completed, log_job_started
 
 logger = logging.getLogger(__name__)
@@ -290,12 +291,10 @@ def run_drawing_overlay_generate_job(
             "drawingBId": payload.drawing_b_id,
         },
     )
-    job.events = append_job_event_if_missing(job.events, started_event)
+    record_job_event(session, job, started_event)
     session.add(job)
     session.commit()
 
-    pubsub_client = get_pubsub_client()
-
     sheets_a = session.exec(
         select(Sheet).where(
             Sheet.drawing_id == payload.drawing_a_id,
@@ -323,15 +322,21 @@ def run_drawing_overlay_generate_job(
             sheet_stats.sheets_skipped_no_number,
             sheet_stats.sheets_skipped_no_match,
         )
+    # Earlier child jobs for all pairs in one query, instead of one per pair
+    existing_jobs: dict[str, Job] = {}
+    if sheet_pairs:
+        for existing in session.exec(
+            select(Job).where(
+                Job.parent_id == job.id,
+                Job.type == JobType.SHEET_OVERLAY_GENERATE,
+                Job.target_id.in_({sheet_b.id for _, sheet_b, _ in sheet_pairs}),
+            )
+        ).all():
+            existing_jobs.setdefault(existing.target_id, existing)
+
     try:
         for sheet_a, sheet_b, pairing_method in sheet_pairs:
-            existing_job = session.exec(
-                select(Job).where(
-                    Job.parent_id == job.id,
-                    Job.type == JobType.SHEET_OVERLAY_GENERATE,
-                    Job.target_id == sheet_b.id,
-                )
-            ).first()
+            existing_job = existing_jobs.get(sheet_b.id)
             if existing_job and existing_job.status in {
                 JobStatus.QUEUED,
                 JobStatus.STARTED,
@@ -371,20 +376,11 @@ def run_drawing_overlay_generate_job(
                 created_at=datetime.now(UTC),
                 updated_at=datetime.now(UTC),
             )
-            session.add(sheet_job)
             sheet_jobs.append(sheet_job)
+        bulk_insert(session, sheet_jobs)
+        enqueue_jobs(session, sheet_jobs)
         session.commit()
-
-        for sheet_job in sheet_jobs:
-            pubsub_client.publish(
-                config.vision_topic,
-                build_job_envelope(
-                    job_type=sheet_job.type,
-                    job_id=str(sheet_job.id),
-                    payload=sheet_job.payload,
-                ),
-                attributes={"type": sheet_job.type, "id": str(sheet_job.id)},
-            )
+        wake_outbox_relay()
 
         log_coordination_published(
             logger,
@@ -415,7 +411,7 @@ def run_drawing_overlay_generate_job(
                 "sheetsSkippedExisting": skipped_existing,
             },
         )
-        job.events = append_job_event_if_missing(job.events, completed_event)
+        record_job_event(session, job, completed_event)
         session.add(job)
         session.commit()
     except Exception:
@@ -432,7 +428,7 @@ def run_drawing_overlay_generate_job(
                 "drawingBId": payload.drawing_b_id,
             },
         )
-        job.events = append_job_event_if_missing(job.events, failed_event)
+        record_job_event(session, job, failed_event)
         session.add(job)
         session.commit()
         raise
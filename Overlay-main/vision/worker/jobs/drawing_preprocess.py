@@ -4,18 +4,30 @@ import logging
 import time
 from datetime import UTC, datetime
 
-from pydantic import BaseModel, Field
-from sqlmodel import Session, select
+from sqlalchemy import func, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Session
 
-from clients.pubsub import get_pubsub_client
 from clients.storage import StorageClient, get_storage_client
 from config import config
-from jobs.envelope import JobEnvelope, build_job_envelope
+from jobs.drawing_clone import (
+    clone_drawing_sheets,
+    find_processed_duplicate,
+    pdf_content_hash,
+    verified_upload_hash,
+)
+from jobs.drawing_progress import record_drawing_job_progress
+from jobs.envelope import JobEnvelope
+from jobs.outbox import enqueue_jobs, wake_outbox_relay
+from jobs.payloads import DrawingJobPayload
 from jobs.types import JobType
 from lib.pdf_converter import IndexedPages, convert_pdf_bytes_to_png_bytes
+from lib.sift_alignment import _load_image_from_bytes, read_png_size
+from lib.tile_pyramid import render_tile_pyramid, upload_tile_pyramid
 from models import Drawing, Job, JobStatus, Sheet
+from utils.db_utils import bulk_insert, upsert_returning
 from utils.id_utils import generate_cuid
-from utils.job_events import append_job_event_if_missing, create_job_event
+from utils.job_events import create_job_event, record_job_event
 from utils.log_utils import (
     log_coordination_published,
     log_job_completed,
@@ -30,14 +42,6 @@ from utils.storage_utils import extract_remote_path
 logger = logging.getLogger(__name__)
 
 
-class DrawingJobPayload(BaseModel):
-    """Input payload for drawing job messages."""
-
-    model_config = {"extra": "forbid"}
-
-    drawing_id: str = Field(..., description="UUID of the drawing")
-
-
 def _extract_remote_path(uri: str) -> str:
     return extract_remote_path(uri)
 
@@ -91,42 +95,80 @@ def _upload_sheet_image(
     return uri
 
 
+def _upload_sheet_tiles(
+    storage_client: StorageClient,
+    drawing_id: str,
+    page_index: int,
+    png_bytes: bytes,
+) -> dict | None:
+    """Write a deep-zoom tile pyramid next to the sheet image, if enabled."""
+    if not config.sheet_tiles_enabled:
+        return None
+    image = _load_image_from_bytes(png_bytes)
+    if max(image.shape[:2]) < config.tile_min_image_size:
+        return None
+    rendered = render_tile_pyramid(image, tile_size=config.tile_size)
+    del image
+    return upload_tile_pyramid(
+        storage_client,
+        rendered,
+        f"sheets/{drawing_id}/sheet_{page_index}_files",
+        max_workers=config.tile_upload_concurrency,
+    )
+
+
 def _upsert_sheets(
     session: Session,
     drawing_id: str,
     indexed_pages: IndexedPages,
     storage_client: StorageClient,
 ) -> list[Sheet]:
-    existing = session.exec(
-        select(Sheet).where(Sheet.drawing_id == drawing_id, Sheet.deleted_at.is_(None))
-    ).all()
-    existing_by_index = {sheet.index: sheet for sheet in existing}
-
-    sheets: list[Sheet] = []
+    """Upload page images and upsert their sheet rows in one statement (caller commits)."""
+    now = datetime.now(UTC)
+    rows: list[Sheet] = []
     for index in indexed_pages.indices:
         png_bytes = indexed_pages[index]
         uri = _upload_sheet_image(storage_client, drawing_id, index, png_bytes)
-        sheet = existing_by_index.get(index)
-        if sheet:
-            sheet.uri = uri
-            sheet.updated_at = datetime.now(UTC)
-            session.add(sheet)
-        else:
-            sheet = Sheet(
+        tiles = _upload_sheet_tiles(storage_client, drawing_id, index, png_bytes)
+        # Pixel size lets the worker estimate job memory before downloading anything
+        size = read_png_size(png_bytes)
+        image_metadata = {
+            **({"width": size[0], "height": size[1]} if size else {}),
+            **({"tiles": tiles} if tiles else {}),
+        }
+        rows.append(
+            Sheet(
                 id=generate_cuid(),
                 drawing_id=drawing_id,
                 index=index,
                 uri=uri,
-                created_at=datetime.now(UTC),
-                updated_at=datetime.now(UTC),
+                metadata_=image_metadata or None,
+                created_at=now,
+                updated_at=now,
             )
-            session.add(sheet)
-        sheets.append(sheet)
+        )
 
-    session.commit()
-    for sheet in sheets:
-        session.refresh(sheet)
-    return sheets
+    table = Sheet.__table__
+
+    def on_conflict(excluded) -> dict:
+        # Existing sheet for this page: new image, image metadata merged into
+        # the analysis metadata, and revived if it had been soft-deleted
+        metadata = type_coerce(table.c.metadata, JSONB)
+        return {
+            "uri": excluded.uri,
+            "metadata": func.coalesce(
+                metadata.op("||")(type_coerce(excluded.metadata, JSONB)),
+                excluded.metadata,
+                table.c.metadata,
+            ),
+            "updated_at": excluded.updated_at,
+            "deleted_at": None,
+        }
+
+    sheets = upsert_returning(
+        session, rows, conflict_columns=("drawing_id", "index"), update=on_conflict
+    )
+    return sorted(sheets, key=lambda sheet: sheet.index)
 
 
 def _create_sheet_jobs(
@@ -136,40 +178,88 @@ def _create_sheet_jobs(
     drawing_id: str,
     drawing_job: Job,
 ) -> list[Job]:
+    """Insert a queued sheet job per sheet in one statement (caller commits)."""
+    now = datetime.now(UTC)
     jobs: list[Job] = []
     for sheet in sheets:
         job_id = generate_cuid()
-        job = Job(
-            id=job_id,
-            type=JobType.SHEET_PREPROCESS,
-            status=JobStatus.QUEUED,
-            organization_id=drawing_job.organization_id,
-            project_id=drawing_job.project_id,
-            actor_id=drawing_job.actor_id,
-            target_type="sheet",
-            target_id=sheet.id,
-            payload={"sheetId": sheet.id, "drawingId": drawing_id},
-            events=[
-                create_job_event(
-                    job_type=JobType.SHEET_PREPROCESS,
-                    job_id=str(job_id),
-                    status=JobStatus.QUEUED.value,
-                    event_type="created",
-                    sheet_id=sheet.id,
-                    drawing_id=drawing_id,
-                )
-            ],
-            created_at=datetime.now(UTC),
-            updated_at=datetime.now(UTC),
+        jobs.append(
+            Job(
+                id=job_id,
+                type=JobType.SHEET_PREPROCESS,
+                status=JobStatus.QUEUED,
+                parent_id=drawing_job.id,
+                organization_id=drawing_job.organization_id,
+                project_id=drawing_job.project_id,
+                actor_id=drawing_job.actor_id,
+                target_type="sheet",
+                target_id=sheet.id,
+                payload={"sheetId": sheet.id, "drawingId": drawing_id},
+                events=[
+                    create_job_event(
+                        job_type=JobType.SHEET_PREPROCESS,
+                        job_id=str(job_id),
+                        status=JobStatus.QUEUED.value,
+                        event_type="created",
+                        sheet_id=sheet.id,
+                        drawing_id=drawing_id,
+                    )
+                ],
+                created_at=now,
+                updated_at=now,
+            )
         )
-        session.add(job)
-        jobs.append(job)
-    session.commit()
-    for job in jobs:
-        session.refresh(job)
+    bulk_insert(session, jobs)
     return jobs
 
 
+def _process_pdf(
+    session: Session,
+    pdf_bytes: bytes,
+    *,
+    drawing_id: str,
+    drawing_job: Job,
+    storage_client: StorageClient,
+) -> tuple[list[Sheet], IndexedPages]:
+    """Render pages to sheets and queue a sheet job per sheet."""
+    with log_phase(logger, "Convert PDF to PNG", drawing_id=drawing_id):
+        conversion_start = time.time()
+        indexed_pages = convert_pdf_bytes_to_png_bytes(
+            pdf_bytes=pdf_bytes,
+            dpi=config.pdf_conversion_dpi,
+        )
+        conversion_ms = int((time.time() - conversion_start) * 1000)
+        if indexed_pages.page_count > 0:
+            log_pdf_converted(
+                logger,
+                indexed_pages.page_count,
+                conversion_ms,
+                drawing_id=drawing_id,
+            )
+
+    with log_phase(logger, "Upload sheets", drawing_id=drawing_id):
+        sheets = _upsert_sheets(session, drawing_id, indexed_pages, storage_client)
+        sheet_jobs = _create_sheet_jobs(
+            session,
+            sheets=sheets,
+            drawing_id=drawing_id,
+            drawing_job=drawing_job,
+        )
+        record_drawing_job_progress(session, drawing_id, drawing_job, sheets=sheets)
+        enqueue_jobs(session, sheet_jobs)
+        # Sheets, their jobs, their messages and the reset progress counters land together
+        session.commit()
+    wake_outbox_relay()
+
+    log_coordination_published(
+        logger,
+        config.vision_topic,
+        len(sheet_jobs),
+        drawing_id=drawing_id,
+    )
+    return sheets, indexed_pages
+
+
 def run_drawing_job(
     session: Session,
     payload: DrawingJobPayload,
@@ -177,7 +267,6 @@ def run_drawing_job(
     envelope: JobEnvelope,
 ) -> None:
     storage_client = get_storage_client()
-    pubsub_client = get_pubsub_client()
 
     start_time = log_job_started(
         logger,
@@ -213,69 +302,52 @@ def run_drawing_job(
         event_type="started",
         drawing_id=payload.drawing_id,
     )
-    updated_events = append_job_event_if_missing(drawing_job.events, started_event)
-    should_commit = False
-    if updated_events is not drawing_job.events:
-        drawing_job.events = updated_events
-        should_commit = True
+    should_commit = record_job_event(session, drawing_job, started_event)
     if drawing_job.status == JobStatus.STARTED:
         should_commit = True
     if should_commit:
         drawing_job.updated_at = datetime.now(UTC)
         session.add(drawing_job)
+        record_drawing_job_progress(session, payload.drawing_id, drawing_job)
         session.commit()
 
     indexed_pages = IndexedPages(pages=[])
-    sheet_jobs: list[Job] = []
     sheets: list[Sheet] = []
+    source_drawing_id: str | None = None
     try:
-        with log_phase(logger, "Download PDF", drawing_id=payload.drawing_id):
-            pdf_bytes = _download_pdf(storage_client, drawing.uri, payload.drawing_id)
-            _validate_pdf_bytes(pdf_bytes, payload.drawing_id)
-
-        with log_phase(logger, "Convert PDF to PNG", drawing_id=payload.drawing_id):
-            conversion_start = time.time()
-            indexed_pages = convert_pdf_bytes_to_png_bytes(
-                pdf_bytes=pdf_bytes,
-                dpi=config.pdf_conversion_dpi,
-            )
-            conversion_ms = int((time.time() - conversion_start) * 1000)
-            if indexed_pages.page_count > 0:
-                log_pdf_converted(
-                    logger,
-                    indexed_pages.page_count,
-                    conversion_ms,
-                    drawing_id=payload.drawing_id,
+        # Verified content-addressed uploads can be matched before downloading
+        content_hash = verified_upload_hash(storage_client, drawing)
+        if content_hash:
+            source_drawing_id = find_processed_duplicate(session, payload.drawing_id, content_hash)
+        if source_drawing_id is None:
+            with log_phase(logger, "Download PDF", drawing_id=payload.drawing_id):
+                pdf_bytes = _download_pdf(storage_client, drawing.uri, payload.drawing_id)
+                _validate_pdf_bytes(pdf_bytes, payload.drawing_id)
+            content_hash = pdf_content_hash(pdf_bytes)
+            source_drawing_id = find_processed_duplicate(session, payload.drawing_id, content_hash)
+        if drawing.content_hash != content_hash:
+            drawing.content_hash = content_hash
+            session.add(drawing)
+
+        if source_drawing_id is not None:
+            with log_phase(logger, "Clone duplicate drawing", drawing_id=payload.drawing_id):
+                sheets = clone_drawing_sheets(session, source_drawing_id, payload.drawing_id)
+                record_drawing_job_progress(
+                    session, payload.drawing_id, drawing_job, sheets=sheets, completed=True
                 )
-
-        with log_phase(logger, "Upload sheets", drawing_id=payload.drawing_id):
-            sheets = _upsert_sheets(session, payload.drawing_id, indexed_pages, storage_client)
-            sheet_jobs = _create_sheet_jobs(
+            logger.info(
+                f"[drawing.cloned] drawing {payload.drawing_id} cloned {len(sheets)} sheets "
+                f"from duplicate drawing {source_drawing_id}"
+            )
+        else:
+            sheets, indexed_pages = _process_pdf(
                 session,
-                sheets=sheets,
+                pdf_bytes,
                 drawing_id=payload.drawing_id,
                 drawing_job=drawing_job,
+                storage_client=storage_client,
             )
 
-        with log_phase(logger, "Publish sheet jobs", drawing_id=payload.drawing_id):
-            for job, sheet in zip(sheet_jobs, sheets):
-                pubsub_client.publish(
-                    config.vision_topic,
-                    build_job_envelope(
-                        job_type=job.type,
-                        job_id=str(job.id),
-                        payload={"sheetId": sheet.id, "drawingId": payload.drawing_id},
-                    ),
-                    attributes={"type": job.type, "id": str(job.id)},
-                )
-
-        log_coordination_published(
-            logger,
-            config.vision_topic,
-            len(sheet_jobs),
-            drawing_id=payload.drawing_id,
-        )
-
         drawing_job.status = JobStatus.COMPLETED
         drawing_job.updated_at = datetime.now(UTC)
         completed_event = create_job_event(
@@ -284,9 +356,11 @@ def run_drawing_job(
             status=JobStatus.COMPLETED.value,
             event_type="completed",
             drawing_id=payload.drawing_id,
+            metadata={"clonedFrom": source_drawing_id} if source_drawing_id else None,
         )
-        drawing_job.events = append_job_event_if_missing(drawing_job.events, completed_event)
+        record_job_event(session, drawing_job, completed_event)
         session.add(drawing_job)
+        record_drawing_job_progress(session, payload.drawing_id, drawing_job)
         session.commit()
     except Exception:
         session.rollback()
@@ -299,8 +373,9 @@ def run_drawing_job(
             event_type="failed",
             drawing_id=payload.drawing_id,
         )
-        drawing_job.events = append_job_event_if_missing(drawing_job.events, failed_event)
+        record_job_event(session, drawing_job, failed_event)
         session.add(drawing_job)
+        record_drawing_job_progress(session, payload.drawing_id, drawing_job)
         session.commit()
         raise
 
@@ -311,7 +386,7 @@ def run_drawing_job(
         start_time,
         drawing_id=payload.drawing_id,
         job_id=str(envelope.job_id),
-        pages_total=len(indexed_pages),
+        pages_total=len(sheets),
         pages_new=len(indexed_pages),
-        pages_existing=0,
+        pages_existing=len(sheets) - len(indexed_pages),
     )
@@ -0,0 +1,125 @@
+"""Per-drawing preprocessing progress counters.
+
+The API's drawing status endpoint reads a single ``drawing_progress`` row
+instead of loading every sheet, block and sheet job of the drawing. The
+worker keeps the row current in the same transactions that record job events:
+
+- the drawing preprocess job upserts its status, and when it fans out sheet
+  jobs it resets the sheet counters and snapshots the live block count;
+- each sheet preprocess job adjusts the counters with atomic increments once
+  its "completed" or "failed" event is appended. Callers only do this when
+  ``record_job_event`` returned True, so a redelivered message cannot count a
+  sheet twice; a sheet job appends "completed" before replacing its blocks
+  and skips the replacement when the event was already there, so the block
+  count always matches the blocks it wrote.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+
+from models import Block, DrawingProgress, Job, JobStatus, Sheet
+from utils.job_events import has_event_type
+
+
+def record_drawing_job_progress(
+    session: Session,
+    drawing_id: str,
+    drawing_job: Job,
+    *,
+    sheets: list[Sheet] | None = None,
+    completed: bool = False,
+) -> None:
+    """Upsert the drawing job's status into the progress row (caller commits).
+
+    Args:
+        session: Database session
+        drawing_id: Drawing UUID
+        drawing_job: The drawing preprocess job
+        sheets: Sheets that sheet jobs were just queued for; resets the sheet
+            counters and recounts the sheets' live blocks
+        completed: The sheets are already processed (cloned from a duplicate
+            drawing) and count as completed
+    """
+    now = datetime.now(UTC)
+    values = {
+        "drawing_id": drawing_id,
+        "job_id": drawing_job.id,
+        "job_status": drawing_job.status,
+        "updated_at": now,
+    }
+    if sheets is not None:
+        sheet_ids = [sheet.id for sheet in sheets]
+        block_count = 0
+        if sheet_ids:
+            block_count = session.exec(
+                select(func.count(Block.id)).where(
+                    Block.sheet_id.in_(sheet_ids), Block.deleted_at.is_(None)
+                )
+            ).one()
+        values.update(
+            sheets_total=len(sheet_ids),
+            sheets_completed=len(sheet_ids) if completed else 0,
+            sheets_failed=0,
+            block_count=block_count,
+        )
+
+    statement = pg_insert(DrawingProgress.__table__).values(created_at=now, **values)
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["drawing_id"],
+            set_={key: statement.excluded[key] for key in values if key != "drawing_id"},
+        )
+    )
+
+
+def record_sheet_job_progress(
+    session: Session,
+    drawing_id: str,
+    sheet_job: Job,
+    status: JobStatus,
+    *,
+    block_delta: int = 0,
+) -> None:
+    """Count a sheet job reaching a terminal status (caller commits).
+
+    Call after ``record_job_event`` appended the job's terminal event. A job
+    that completes after an earlier failure (or the reverse) moves from one
+    counter to the other.
+
+    Args:
+        session: Database session
+        drawing_id: Drawing UUID the sheet belongs to
+        sheet_job: The sheet preprocess job
+        status: JobStatus.COMPLETED or JobStatus.FAILED
+        block_delta: Live blocks added minus live blocks removed by the job
+    """
+    table = DrawingProgress.__table__
+    completed, failed = table.c.sheets_completed, table.c.sheets_failed
+    if status == JobStatus.COMPLETED:
+        values = {"sheets_completed": completed + 1}
+        if has_event_type(sheet_job.events, "failed"):
+            values["sheets_failed"] = failed - 1
+    else:
+        values = {"sheets_failed": failed + 1}
+        if has_event_type(sheet_job.events, "completed"):
+            values["sheets_completed"] = completed - 1
+
+    conditions = [table.c.drawing_id == drawing_id]
+    if sheet_job.parent_id is not None:
+        # Ignore sheet jobs left over from an earlier run of the drawing job
+        conditions.append(table.c.job_id == sheet_job.parent_id)
+
+    session.execute(
+        update(table)
+        .where(*conditions)
+        .values(
+            block_count=table.c.block_count + block_delta,
+            updated_at=datetime.now(UTC),
+            **values,
+        )
+    )
@@ -0,0 +1,253 @@
+"""Execution classes for job handlers.
+
+Every Pub/Sub message is delivered on a callback thread. Handlers declare how
+they run through ``JobSpec.execution``:
+
+- ``"thread"``: inline on the callback thread. Used for I/O- and LLM-bound jobs
+  that spend their time waiting on the network.
+- ``"process"``: in a worker process from a shared ``ProcessPoolExecutor``.
+  Used for CPU-bound jobs (SIFT/RANSAC, warping, PNG encoding), which hold the
+  GIL long enough that extra threads add almost no parallelism.
+
+Each class has its own concurrency knob: ``worker_max_concurrent_messages``
+for threads and ``worker_process_concurrency`` for processes, so I/O-bound
+sheet jobs never stall behind overlay renders. Worker processes are spawned
+(the parent holds gRPC and DB threads) and warmed once by the initializer;
+DB, storage and Pub/Sub clients then stay cached per process across jobs.
+
+Handlers running on a thread can also hand CPU-bound pieces of their work to
+the same pool with ``ProcessJobExecutor.call`` (see ``JobRunner.run_process_task``),
+so that work shares the process slots and memory admission of process jobs.
+
+Throughput is reported per class as jobs per minute per core.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from utils.job_errors import JobProcessError
+from utils.log_utils import (
+    clear_trace_context,
+    configure_logging,
+    log_worker_throughput,
+    set_trace_context,
+)
+from utils.metrics import REGISTRY, update_rss_high_water
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_THREAD = "thread"
+EXECUTION_PROCESS = "process"
+
+
+class ThroughputMeter:
+    """Counts completed jobs for one execution class and logs jobs/min/core."""
+
+    def __init__(
+        self,
+        execution: str,
+        cores: int,
+        *,
+        window_seconds: float = 300.0,
+        clock=time.monotonic,
+    ) -> None:
+        self.execution = execution
+        self.cores = max(1, cores)
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._window_start = clock()
+        self._jobs = 0
+        self._busy_seconds = 0.0
+
+    def record(self, duration_seconds: float) -> None:
+        """Record one finished job (success or failure) and log when the window closes."""
+        with self._lock:
+            self._jobs += 1
+            self._busy_seconds += duration_seconds
+            elapsed = self._clock() - self._window_start
+            if elapsed < self.window_seconds:
+                return
+            snapshot = self._snapshot(elapsed)
+            self._window_start = self._clock()
+            self._jobs = 0
+            self._busy_seconds = 0.0
+        log_worker_throughput(logger, **snapshot)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current window statistics."""
+        with self._lock:
+            return self._snapshot(self._clock() - self._window_start)
+
+    def _snapshot(self, elapsed: float) -> dict[str, Any]:
+        minutes = max(elapsed, 1e-9) / 60
+        return {
+            "execution": self.execution,
+            "cores": self.cores,
+            "jobs": self._jobs,
+            "window_seconds": round(elapsed, 1),
+            "jobs_per_min_per_core": round(self._jobs / minutes / self.cores, 3),
+            "utilization": round(
+                min(1.0, self._busy_seconds / (max(elapsed, 1e-9) * self.cores)), 3
+            ),
+        }
+
+
+def _init_worker_process(log_level: str) -> None:
+    """Warm a pool process once: logging, DB pool size, handler imports, OpenCV threads."""
+    # Shutdown is driven by the parent; ignore the terminal's Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_logging(log_level)
+
+    import cv2
+
+    # One core per process - the pool supplies the parallelism
+    cv2.setNumThreads(1)
+
+    from clients.db import configure_pool
+    from jobs.registry import JOB_SPECS
+
+    # One job at a time per process: one pooled connection, not the parent's pool
+    configure_pool(concurrent_jobs=1)
+
+    # Handlers load lazily; pay the import cost here rather than in the first job
+    for spec in JOB_SPECS.values():
+        if spec.execution == EXECUTION_PROCESS:
+            spec.load()
+
+
+def _run_in_worker_process(
+    data: dict[str, Any],
+    message_id: str,
+    job_type_hint: str | None,
+    trace_context: dict | None,
+) -> tuple[int | None, dict]:
+    """Pool entrypoint: run one job message inline in this process.
+
+    Returns:
+        Peak RSS growth in bytes while the job ran (None without psutil; pool
+        processes run one job at a time, so this is the job's own footprint),
+        and the metrics the job recorded, for the parent to merge.
+
+    Raises:
+        JobProcessError: The handler failed; carries the job's metrics as well
+    """
+    from jobs.admission import PeakMemorySampler
+    from jobs.runner import JobRunner
+
+    set_trace_context(trace_context)
+    try:
+        with PeakMemorySampler() as sampler:
+            JobRunner(logger=logger).run_message(
+                data,
+                message_id=message_id,
+                job_type_hint=job_type_hint,
+                in_worker_process=True,
+            )
+        return sampler.peak_bytes, _drain_metrics()
+    except Exception as error:
+        process_error = JobProcessError.from_error(error)
+        process_error.metrics = _drain_metrics()
+        raise process_error from None
+    finally:
+        clear_trace_context()
+
+
+def _run_task_in_worker_process(fn: Callable[..., Any], args: tuple) -> tuple[Any, dict]:
+    """Pool entrypoint: run one task function and return its result with its metrics."""
+    try:
+        return fn(*args), _drain_metrics()
+    except Exception as error:
+        process_error = JobProcessError.from_error(error)
+        process_error.metrics = _drain_metrics()
+        raise process_error from None
+
+
+def _drain_metrics() -> dict:
+    update_rss_high_water()
+    return REGISTRY.drain()
+
+
+class ProcessJobExecutor:
+    """Lazily started process pool that survives crashed worker processes."""
+
+    def __init__(self, max_workers: int, *, log_level: str = "INFO") -> None:
+        self.max_workers = max_workers
+        self.log_level = log_level
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker_process,
+                    initargs=(self.log_level,),
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(
+        self,
+        data: dict[str, Any],
+        *,
+        message_id: str,
+        job_type_hint: str | None,
+        trace_context: dict | None,
+    ) -> int | None:
+        """Run a job message in a pool process and wait for it.
+
+        Returns:
+            Peak memory growth of the job in bytes, if it could be measured
+
+        Raises:
+            JobProcessError: The handler failed (carries the permanent/transient class)
+            RuntimeError: The worker process died (transient; the pool is replaced)
+        """
+        return self._submit(_run_in_worker_process, data, message_id, job_type_hint, trace_context)
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable module-level function in a pool process and wait for it.
+
+        Raises:
+            JobProcessError: The function failed
+            RuntimeError: The worker process died (the pool is replaced)
+        """
+        return self._submit(_run_task_in_worker_process, fn, args)
+
+    def _submit(self, entrypoint: Callable[..., tuple[Any, dict]], *args: Any) -> Any:
+        pool = self._get_pool()
+        try:
+            result, metrics = pool.submit(entrypoint, *args).result()
+        except JobProcessError as error:
+            REGISTRY.merge(error.metrics)
+            raise
+        except BrokenProcessPool as error:
+            # A worker was killed (typically OOM); start fresh for the next job
+            logger.error("[worker.process_pool.broken] %s", error)
+            self._discard_pool(pool)
+            raise RuntimeError(f"Worker process died: {error}") from None
+        REGISTRY.merge(metrics)
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,169 @@
+"""Heartbeats for running jobs.
+
+The Pub/Sub client only extends a message's lease up to
+``worker_max_lease_duration_seconds``; a longer job gets redelivered and
+starts a second time on another worker. While a handler runs, a heartbeat
+thread:
+
+- extends the message's ack deadline, so a long job that is making progress
+  keeps its lease, and
+- stamps ``jobs.heartbeat_at``, so a Started job with a stale heartbeat can be
+  detected as stuck (its worker died or hung).
+
+Progress comes from ``report_progress()`` (called by every ``log_phase``). When
+a thread job reports nothing for ``job_heartbeat_stall_seconds`` the heartbeat
+stops, its lease lapses and the message is redelivered. Jobs in a worker
+process cannot report progress to the parent; they keep their heartbeat while
+the process runs.
+
+A delivery whose job is already Started with a fresh heartbeat is a duplicate
+of a job running elsewhere and is rejected with ``DuplicateDelivery``. The
+duplicate is not acked: it is held for ``duplicate_redelivery_seconds()`` and
+released, so the owning worker's ack settles the message, while a nack or a
+dead owner lets it come back and be checked again.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlmodel import Session, update
+
+import clients.db as db
+from config import config
+from models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateDelivery(Exception):
+    """The job is already running elsewhere; the delivery is left to the owning worker."""
+
+
+def has_fresh_heartbeat(
+    job: Job | None, *, stale_seconds: float, now: datetime | None = None
+) -> bool:
+    """Whether the job is Started and its heartbeat is younger than ``stale_seconds``."""
+    if job is None or job.status != JobStatus.STARTED or job.heartbeat_at is None:
+        return False
+    heartbeat_at = job.heartbeat_at
+    if heartbeat_at.tzinfo is None:
+        heartbeat_at = heartbeat_at.replace(tzinfo=UTC)
+    return (now or datetime.now(UTC)) - heartbeat_at < timedelta(seconds=stale_seconds)
+
+
+def reject_duplicate_delivery(session: Session, job_id: str) -> None:
+    """Raise DuplicateDelivery if the job is already running with a fresh heartbeat."""
+    job = session.get(Job, job_id)
+    if has_fresh_heartbeat(job, stale_seconds=config.job_heartbeat_stale_seconds):
+        raise DuplicateDelivery(f"Job {job_id} is already running (heartbeat {job.heartbeat_at})")
+
+
+def duplicate_redelivery_seconds() -> int:
+    """Ack deadline for a duplicate delivery: until the owner's heartbeat could go stale.
+
+    Pub/Sub accepts ack deadlines of 10 to 600 seconds.
+    """
+    return max(10, min(600, math.ceil(config.job_heartbeat_stale_seconds)))
+
+
+def write_heartbeat(job_id: str) -> None:
+    """Stamp the job row's heartbeat in its own short transaction."""
+    with db.get_session() as session:
+        session.exec(update(Job).where(Job.id == job_id).values(heartbeat_at=datetime.now(UTC)))
+        session.commit()
+
+
+class JobHeartbeat:
+    """Background thread that keeps a running job's lease and heartbeat fresh."""
+
+    def __init__(
+        self,
+        job_id: str,
+        *,
+        extend_lease: Callable[[int], None] | None = None,
+        interval_seconds: float,
+        ack_extension_seconds: int,
+        stall_seconds: float | None,
+        write: Callable[[str], None] = write_heartbeat,
+        clock=time.monotonic,
+    ) -> None:
+        self.job_id = job_id
+        self.extend_lease = extend_lease
+        self.interval_seconds = interval_seconds
+        self.ack_extension_seconds = ack_extension_seconds
+        self.stall_seconds = stall_seconds
+        self._write = write
+        self._clock = clock
+        self._last_progress = clock()
+        self._stalled = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def progress(self) -> None:
+        """Record that the job made progress."""
+        self._last_progress = self._clock()
+
+    def stalled(self) -> bool:
+        if self.stall_seconds is None:
+            return False
+        return self._clock() - self._last_progress > self.stall_seconds
+
+    def beat(self) -> None:
+        """Extend the lease and stamp the heartbeat, unless the job has stalled."""
+        if self.stalled():
+            if not self._stalled:
+                logger.warning(
+                    f"[job.heartbeat.stalled] job-{self.job_id[:8]}: no progress for "
+                    f"{self.stall_seconds:.0f}s, letting the lease lapse"
+                )
+            self._stalled = True
+            return
+        self._stalled = False
+        if self.extend_lease is not None:
+            try:
+                self.extend_lease(self.ack_extension_seconds)
+            except Exception as error:
+                logger.warning(f"[job.heartbeat.lease_failed] {type(error).__name__}: {error}")
+        try:
+            self._write(self.job_id)
+        except Exception as error:
+            logger.warning(f"[job.heartbeat.write_failed] {type(error).__name__}: {error}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.beat()
+
+    def __enter__(self) -> JobHeartbeat:
+        self.beat()
+        self._thread = threading.Thread(target=self._run, name="JobHeartbeat", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def build_heartbeat(
+    job_id: str,
+    *,
+    extend_lease: Callable[[int], None] | None,
+    track_progress: bool,
+) -> JobHeartbeat | None:
+    """Heartbeat for a job from config, or None if heartbeats are disabled."""
+    if not config.job_heartbeat_enabled:
+        return None
+    return JobHeartbeat(
+        job_id,
+        extend_lease=extend_lease,
+        interval_seconds=config.job_heartbeat_interval_seconds,
+        ack_extension_seconds=config.job_heartbeat_ack_extension_seconds,
+        stall_seconds=config.job_heartbeat_stall_seconds if track_progress else None,
+    )
@@ -9,7 +9,7 @@ from typing import Any
 from sqlmodel import Session
 
 from models import Job, JobStatus
-from utils.job_events import append_job_event_if_missing
+from utils.job_events import record_job_event
 from utils.log_utils import log_job_completed, log_job_started
 
 EventBuilder = Callable[[str, str, dict[str, Any] | None], dict[str, Any]]
@@ -52,7 +52,7 @@ def run_stub_job(
     base_metadata = prepare_metadata() if prepare_metadata else None
     started_metadata = build_metadata("started", base_metadata) if build_metadata else base_metadata
     started_event = build_event("started", job.status.value, started_metadata)
-    job.events = append_job_event_if_missing(job.events, started_event)
+    record_job_event(session, job, started_event)
     session.add(job)
     session.commit()
 
@@ -63,7 +63,7 @@ def run_stub_job(
             build_metadata("completed", base_metadata) if build_metadata else base_metadata
         )
         completed_event = build_event("completed", JobStatus.COMPLETED.value, completed_metadata)
-        job.events = append_job_event_if_missing(job.events, completed_event)
+        record_job_event(session, job, completed_event)
         session.add(job)
         session.commit()
     except Exception:
@@ -74,7 +74,7 @@ def run_stub_job(
             build_metadata("failed", base_metadata) if build_metadata else base_metadata
         )
         failed_event = build_event("failed", JobStatus.FAILED.value, failed_metadata)
-        job.events = append_job_event_if_missing(job.events, failed_event)
+        record_job_event(session, job, failed_event)
         session.add(job)
         session.commit()
         raise
@@ -0,0 +1,180 @@
+"""Transactional outbox for job messages.
+
+Fan-outs do not publish to Pub/Sub themselves. ``enqueue_jobs`` writes each
+job's message to ``job_outbox`` in the same transaction as the job rows, so a
+job exists if and only if its message will be sent. ``OutboxRelay`` (a
+background thread in the worker and in the API) claims pending rows with
+``FOR UPDATE SKIP LOCKED``, publishes them as one batch and deletes the ones
+Pub/Sub accepted; failed ones are retried with exponential backoff.
+
+Delivery is at least once: a relay that dies between publishing and deleting
+publishes the batch again, which job handlers already tolerate (redelivery).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+
+from clients import db
+from config import config
+from jobs.envelope import build_job_envelope
+from models import Job, JobOutbox
+from utils.id_utils import generate_cuid
+
+logger = logging.getLogger(__name__)
+
+# Set after a commit that enqueued messages, so an idle relay in this process
+# publishes them without waiting for its next poll
+_wake = threading.Event()
+
+
+def enqueue_jobs(session: Session, jobs: Sequence[Job], topic: str | None = None) -> None:
+    """Queue the jobs' messages for publishing (caller commits, then ``wake_outbox_relay``).
+
+    A job that already has a pending message is not queued twice.
+    """
+    if not jobs:
+        return
+    now = datetime.now(UTC)
+    topic = topic or config.vision_topic
+    rows = [
+        {
+            "id": generate_cuid(),
+            "created_at": now,
+            "job_id": str(job.id),
+            "topic": topic,
+            "message": build_job_envelope(
+                job_type=job.type, job_id=str(job.id), payload=job.payload
+            ),
+            "attributes": {"type": job.type, "id": str(job.id)},
+            "attempts": 0,
+            "available_at": now,
+        }
+        for job in jobs
+    ]
+    session.execute(
+        pg_insert(JobOutbox.__table__)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["job_id"])
+    )
+
+
+def wake_outbox_relay() -> None:
+    """Have this process's relay publish now instead of at its next poll."""
+    _wake.set()
+
+
+def retry_delay(attempts: int, max_backoff_seconds: float) -> float:
+    """Seconds to wait before publishing a message again after ``attempts`` failures."""
+    return min(max_backoff_seconds, 2.0 ** min(attempts, 30))
+
+
+class OutboxRelay:
+    """Background thread publishing ``job_outbox`` rows in batches."""
+
+    def __init__(
+        self,
+        pubsub_client,
+        *,
+        batch_size: int,
+        poll_seconds: float,
+        max_backoff_seconds: float,
+    ) -> None:
+        self.pubsub_client = pubsub_client
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def relay_once(self, session: Session) -> int:
+        """Publish one batch of due messages; returns how many were claimed."""
+        now = datetime.now(UTC)
+        rows = session.exec(
+            select(JobOutbox)
+            .where(JobOutbox.available_at <= now)
+            .order_by(JobOutbox.available_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            session.rollback()
+            return 0
+
+        results: list[str | Exception] = [None] * len(rows)
+        by_topic: dict[str, list[int]] = {}
+        for position, row in enumerate(rows):
+            by_topic.setdefault(row.topic, []).append(position)
+        for topic, positions in by_topic.items():
+            published = self.pubsub_client.publish_many(
+                topic, [(rows[i].message, rows[i].attributes) for i in positions]
+            )
+            for i, result in zip(positions, published):
+                results[i] = result
+
+        sent_ids = []
+        for row, result in zip(rows, results):
+            if isinstance(result, Exception):
+                row.attempts += 1
+                row.available_at = now + timedelta(
+                    seconds=retry_delay(row.attempts, self.max_backoff_seconds)
+                )
+                row.last_error = f"{type(result).__name__}: {result}"[:1000]
+                session.add(row)
+                logger.warning(
+                    f"[outbox.publish_failed] job-{row.job_id[:8]} attempt {row.attempts}: "
+                    f"{row.last_error}"
+                )
+            else:
+                sent_ids.append(row.id)
+        if sent_ids:
+            session.exec(delete(JobOutbox).where(JobOutbox.id.in_(sent_ids)))
+        session.commit()
+        logger.info(f"[outbox.published] {len(sent_ids)}/{len(rows)} messages")
+        return len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            claimed = 0
+            try:
+                with db.get_session() as session:
+                    claimed = self.relay_once(session)
+            except Exception as error:
+                logger.warning(f"[outbox.relay_failed] {type(error).__name__}: {error}")
+            if claimed >= self.batch_size:
+                continue  # More are waiting
+            _wake.wait(self.poll_seconds)
+            _wake.clear()
+
+    def start(self) -> None:
+        """Start the relay thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="OutboxRelay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the relay thread after its current batch."""
+        self._stop.set()
+        _wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 30)
+            self._thread = None
+
+
+def build_outbox_relay(pubsub_client) -> OutboxRelay | None:
+    """Relay configured from settings, or None if disabled."""
+    if not config.outbox_relay_enabled:
+        return None
+    return OutboxRelay(
+        pubsub_client,
+        batch_size=config.outbox_batch_size,
+        poll_seconds=config.outbox_poll_seconds,
+        max_backoff_seconds=config.outbox_max_backoff_seconds,
+    )
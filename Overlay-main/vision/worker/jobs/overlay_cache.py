@@ -0,0 +1,153 @@
+"""Content-addressed cache of block overlay render results.
+
+Re-processing a sheet soft-deletes its blocks and recreates them with new IDs,
+so overlay lookups by block ID miss even when the crops are pixel-identical.
+Blocks therefore carry a ``content_hash`` (sha256 of the crop PNG), and each
+rendered overlay is recorded in ``overlay_results`` under
+``(hash A, hash B, alignment parameters)``. A later overlay for the same pair
+of crops, aligned with the same parameters, reuses the stored assets instead
+of re-aligning and re-rendering.
+
+Bump ALIGNMENT_PIPELINE_VERSION whenever alignment or rendering code changes
+its output, so stale results stop matching.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import UTC, datetime
+
+from sqlmodel import Session, select
+
+from config import config
+from models import Block, Overlay, OverlayResult
+from utils.db_utils import upsert_returning
+
+logger = logging.getLogger(__name__)
+
+ALIGNMENT_PIPELINE_VERSION = "1"
+
+# Overlay.summary keys produced by the render step (safe to share between overlays)
+CACHED_SUMMARY_KEYS = ("alignmentQuality", "tiles")
+
+
+def compute_content_hash(data: bytes) -> str:
+    """Return the sha256 hex digest used as block content identity."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def alignment_params_fingerprint(has_grid: bool) -> str:
+    """Fingerprint every setting that can change a block pair's rendered overlay."""
+    params = {
+        "version": ALIGNMENT_PIPELINE_VERSION,
+        "hasGrid": has_grid,
+        "siftNFeatures": config.sift_n_features,
+        "siftRatioThreshold": config.sift_ratio_threshold,
+        "ransacReprojThreshold": config.ransac_reproj_threshold,
+        "ransacMaxIters": config.ransac_max_iters,
+        "transformScale": [config.transform_scale_min, config.transform_scale_max],
+        "transformRotationDeg": [
+            config.transform_rotation_deg_min,
+            config.transform_rotation_deg_max,
+        ],
+        "alignmentQualityThreshold": config.alignment_quality_threshold,
+        "alignmentRealignEnabled": config.alignment_realign_enabled,
+        "alignmentRefineDownsampleScale": config.alignment_refine_downsample_scale,
+        "overlayTilesEnabled": config.overlay_tiles_enabled,
+        "tileSize": config.tile_size,
+        "tileMinImageSize": config.tile_min_image_size,
+    }
+    encoded = json.dumps(params, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def overlay_result_key(block_a: Block, block_b: Block) -> str | None:
+    """Cache key for a block pair, or None if either block has no content hash."""
+    if not block_a.content_hash or not block_b.content_hash:
+        return None
+    has_grid = bool((block_a.metadata_ or {}).get("has_grid_callouts", False))
+    params_hash = alignment_params_fingerprint(has_grid)
+    return f"{block_a.content_hash}:{block_b.content_hash}:{params_hash}"
+
+
+def find_overlay_results(session: Session, keys: list[str]) -> dict[str, OverlayResult]:
+    """Fetch cached results for many keys in one query."""
+    unique_keys = sorted(set(keys))
+    if not unique_keys:
+        return {}
+    results = session.exec(select(OverlayResult).where(OverlayResult.key.in_(unique_keys))).all()
+    return {result.key: result for result in results}
+
+
+def find_overlay_result(session: Session, block_a: Block, block_b: Block) -> OverlayResult | None:
+    """Fetch the cached result for a block pair, if any."""
+    key = overlay_result_key(block_a, block_b)
+    if key is None:
+        return None
+    return session.get(OverlayResult, key)
+
+
+def apply_overlay_result(overlay: Overlay, result: OverlayResult) -> None:
+    """Point an overlay at cached assets (caller adds and commits)."""
+    overlay.uri = result.uri
+    overlay.addition_uri = result.addition_uri
+    overlay.deletion_uri = result.deletion_uri
+    overlay.score = result.score
+    overlay.summary = {
+        **(overlay.summary or {}),
+        **(result.summary or {}),
+        "resultKey": result.key,
+    }
+    overlay.updated_at = datetime.now(UTC)
+
+
+def save_overlay_result(
+    session: Session,
+    block_a: Block,
+    block_b: Block,
+    overlay: Overlay,
+) -> OverlayResult | None:
+    """Record a freshly rendered overlay in the cache (caller commits).
+
+    Written as a single ``INSERT ... ON CONFLICT (key) DO UPDATE``, so overlays
+    of the same block pair rendered by concurrent jobs both succeed and the
+    last render wins.
+
+    Returns:
+        The stored OverlayResult, or None if the pair is not cacheable
+    """
+    key = overlay_result_key(block_a, block_b)
+    if key is None or not (overlay.uri and overlay.addition_uri and overlay.deletion_uri):
+        return None
+    summary = {k: v for k, v in (overlay.summary or {}).items() if k in CACHED_SUMMARY_KEYS}
+    now = datetime.now(UTC)
+    result = OverlayResult(
+        key=key,
+        created_at=now,
+        updated_at=now,
+        block_a_hash=block_a.content_hash,
+        block_b_hash=block_b.content_hash,
+        params_hash=key.rsplit(":", 1)[1],
+        uri=overlay.uri,
+        addition_uri=overlay.addition_uri,
+        deletion_uri=overlay.deletion_uri,
+        score=overlay.score,
+        summary=summary or None,
+    )
+
+    def on_conflict(excluded) -> dict:
+        # Key already cached (e.g. a concurrent render of the same pair): take the new render
+        return {
+            "uri": excluded.uri,
+            "addition_uri": excluded.addition_uri,
+            "deletion_uri": excluded.deletion_uri,
+            "score": excluded.score,
+            "summary": excluded.summary,
+            "updated_at": excluded.updated_at,
+        }
+
+    (stored,) = upsert_returning(session, [result], conflict_columns=("key",), update=on_conflict)
+    logger.debug("[overlay.cache.store] key=%s overlay_id=%s", key, overlay.id)
+    return stored
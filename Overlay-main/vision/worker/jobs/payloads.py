@@ -0,0 +1,30 @@
+"""Payload models of the jobs that run in the worker process pool.
+
+The parent process validates a message's payload (for logging and memory
+admission) before handing the message to a pool process. Keeping these models
+out of the handler modules means the parent never imports the handlers'
+libraries (OpenCV, PDF renderers); only the pool processes do.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class DrawingJobPayload(BaseModel):
+    """Input payload for drawing job messages."""
+
+    model_config = {"extra": "forbid"}
+
+    drawing_id: str = Field(..., description="UUID of the drawing")
+
+
+class BlockOverlayGeneratePayload(BaseModel):
+    """Input payload for block overlay generation job messages."""
+
+    model_config = {"extra": "forbid"}
+
+    block_a_id: str = Field(..., description="UUID of the source block (old)")
+    block_b_id: str = Field(..., description="UUID of the target block (new)")
+    sheet_a_id: str | None = Field(default=None, description="UUID of the source sheet")
+    sheet_b_id: str | None = Field(default=None, description="UUID of the target sheet")
+    drawing_a_id: str | None = Field(default=None, description="UUID of the source drawing")
+    drawing_b_id: str | None = Field(default=None, description="UUID of the target drawing")
@@ -1,97 +1,130 @@
-"""Job registry for vision worker jobs."""
+"""Job registry for vision worker jobs.
+
+Handlers and payload models are referenced by module path and imported on
+first use, so starting the worker does not load every handler's libraries
+(OpenCV, SciPy, PDF renderers, LLM SDKs) before the first message arrives.
+
+The parent validates every payload, but "process" handlers only run in the
+pool, so their payload models live in the light ``jobs.payloads`` module.
+"""
 
 from __future__ import annotations
 
+import importlib
 from collections.abc import Callable
 from dataclasses import dataclass
-from typing import Any, Generic, TypeVar
+from functools import cached_property
+from typing import Any, Generic, Literal, TypeVar
 
 from pydantic import BaseModel
 from sqlmodel import Session
 
-from jobs.block_overlay_generate import (
-    BlockOverlayGeneratePayload,
-    run_block_overlay_generate_job,
-)
-from jobs.change_detect import (
-    ComputeChangesPayload,
-    run_compute_changes_job,
-)
-from jobs.change_detect import (
-    resolve_overlay_job_id as resolve_changes_overlay_job_id,
-)
-from jobs.clash_detect import (
-    ComputeClashesPayload,
-    run_compute_clashes_job,
-)
-from jobs.clash_detect import (
-    resolve_overlay_job_id as resolve_clashes_overlay_job_id,
-)
-from jobs.drawing_overlay_generate import (
-    DrawingOverlayGeneratePayload,
-    run_drawing_overlay_generate_job,
+from jobs.admission import (
+    estimate_block_overlay_pixels,
+    estimate_manual_align_pixels,
+    estimate_sheet_pixels,
 )
-from jobs.drawing_preprocess import DrawingJobPayload, run_drawing_job
 from jobs.envelope import JobEnvelope
-from jobs.sheet_overlay_generate import (
-    SheetOverlayGeneratePayload,
-    run_sheet_overlay_generate_job,
-)
-from jobs.sheet_preprocess import SheetJobPayload, run_sheet_job
 from jobs.types import JobType
 
 PayloadT = TypeVar("PayloadT", bound=BaseModel)
 
+# "thread": run inline on the Pub/Sub callback thread (I/O- and LLM-bound work)
+# "process": run in the worker process pool (CPU-bound alignment and rendering)
+Execution = Literal["thread", "process"]
+
 
 @dataclass(frozen=True)
 class JobSpec(Generic[PayloadT]):
     job_type: str
-    payload_model: type[PayloadT]
-    handler: Callable[[Session, PayloadT, str | None, JobEnvelope], None]
+    # Module defining the handler (and the payload model), imported on first access
+    module: str
+    payload_name: str
+    handler_name: str
+    # Module defining the payload model, if not ``module`` (set for "process" jobs)
+    payload_module: str | None = None
     log_context: Callable[[PayloadT], dict[str, str | None]] | None = None
+    execution: Execution = "thread"
+    # Decoded pixels the job will hold, for memory admission (None: no pixel model)
+    work_pixels: Callable[[Session, PayloadT], int | None] | None = None
+
+    @cached_property
+    def payload_model(self) -> type[PayloadT]:
+        module = importlib.import_module(self.payload_module or self.module)
+        return getattr(module, self.payload_name)
+
+    @cached_property
+    def handler(self) -> Callable[[Session, PayloadT, str | None, JobEnvelope], None]:
+        return getattr(importlib.import_module(self.module), self.handler_name)
+
+    def load(self) -> None:
+        """Import the handler module now (e.g. to warm a worker process)."""
+        self.payload_model
+        self.handler
 
 
 JOB_SPECS: dict[str, JobSpec[Any]] = {
     JobType.DRAWING_PREPROCESS: JobSpec(
         job_type=JobType.DRAWING_PREPROCESS,
-        payload_model=DrawingJobPayload,
-        handler=run_drawing_job,
+        module="jobs.drawing_preprocess",
+        payload_name="DrawingJobPayload",
+        payload_module="jobs.payloads",
+        handler_name="run_drawing_job",
         log_context=lambda payload: {"drawing_id": payload.drawing_id},
+        execution="process",
     ),
     JobType.SHEET_PREPROCESS: JobSpec(
         job_type=JobType.SHEET_PREPROCESS,
-        payload_model=SheetJobPayload,
-        handler=run_sheet_job,
+        module="jobs.sheet_preprocess",
+        payload_name="SheetJobPayload",
+        handler_name="run_sheet_job",
         log_context=lambda payload: {"sheet_id": payload.sheet_id},
+        work_pixels=estimate_sheet_pixels,
     ),
     JobType.DRAWING_OVERLAY_GENERATE: JobSpec(
         job_type=JobType.DRAWING_OVERLAY_GENERATE,
-        payload_model=DrawingOverlayGeneratePayload,
-        handler=run_drawing_overlay_generate_job,
+        module="jobs.drawing_overlay_generate",
+        payload_name="DrawingOverlayGeneratePayload",
+        handler_name="run_drawing_overlay_generate_job",
         log_context=lambda payload: {"drawing_id": payload.drawing_a_id},
     ),
     JobType.SHEET_OVERLAY_GENERATE: JobSpec(
         job_type=JobType.SHEET_OVERLAY_GENERATE,
-        payload_model=SheetOverlayGeneratePayload,
-        handler=run_sheet_overlay_generate_job,
+        module="jobs.sheet_overlay_generate",
+        payload_name="SheetOverlayGeneratePayload",
+        handler_name="run_sheet_overlay_generate_job",
         log_context=lambda payload: {"sheet_id": payload.sheet_a_id},
     ),
     JobType.BLOCK_OVERLAY_GENERATE: JobSpec(
         job_type=JobType.BLOCK_OVERLAY_GENERATE,
-        payload_model=BlockOverlayGeneratePayload,
-        handler=run_block_overlay_generate_job,
+        module="jobs.block_overlay_generate",
+        payload_name="BlockOverlayGeneratePayload",
+        payload_module="jobs.payloads",
+        handler_name="run_block_overlay_generate_job",
         log_context=lambda payload: {"block_id": payload.block_a_id},
+        execution="process",
+        work_pixels=estimate_block_overlay_pixels,
+    ),
+    JobType.MANUAL_ALIGN: JobSpec(
+        job_type=JobType.MANUAL_ALIGN,
+        module="jobs.block_overlay_manual_align",
+        payload_name="ManualAlignPayload",
+        handler_name="run_manual_align_job",
+        log_context=lambda payload: {"overlay_id": payload.overlay_id},
+        work_pixels=estimate_manual_align_pixels,
     ),
     JobType.OVERLAY_CHANGE_DETECT: JobSpec(
         job_type=JobType.OVERLAY_CHANGE_DETECT,
-        payload_model=ComputeChangesPayload,
-        handler=run_compute_changes_job,
+        module="jobs.change_detect",
+        payload_name="ComputeChangesPayload",
+        handler_name="run_compute_changes_job",
         log_context=lambda payload: {"overlay_id": payload.overlay_id},
     ),
     JobType.OVERLAY_CLASH_DETECT: JobSpec(
         job_type=JobType.OVERLAY_CLASH_DETECT,
-        payload_model=ComputeClashesPayload,
-        handler=run_compute_clashes_job,
+        module="jobs.clash_detect",
+        payload_name="ComputeClashesPayload",
+        handler_name="run_compute_clashes_job",
         log_context=lambda payload: {"overlay_id": payload.overlay_id},
     ),
 }
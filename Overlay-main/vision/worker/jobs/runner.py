@@ -2,17 +2,157 @@
 
 from __future__ import annotations
 
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
 from typing import Any
 
 import clients.db as db
+from config import config
+from jobs.admission import AdmissionController, MemoryModel, PeakMemorySampler
 from jobs.envelope import JobEnvelope
+from jobs.executor import (
+    EXECUTION_PROCESS,
+    EXECUTION_THREAD,
+    ProcessJobExecutor,
+    ThroughputMeter,
+)
+from jobs.heartbeat import build_heartbeat, reject_duplicate_delivery
 from jobs.registry import JOB_SPECS
-from utils.log_utils import log_job_received
+from utils.job_profiler import profile_job
+from utils.log_utils import get_trace_context, log_job_received, set_progress_callback
+from utils.metrics import JOB_DURATION, JOBS_IN_FLIGHT
+
+# Runner of the thread job on the current thread, for handlers that hand work to the pool
+_CURRENT_RUNNER: ContextVar[JobRunner | None] = ContextVar("current_runner", default=None)
 
 
 class JobRunner:
-    def __init__(self, *, logger) -> None:
+    def __init__(
+        self,
+        *,
+        logger,
+        process_executor: ProcessJobExecutor | None = None,
+        thread_concurrency: int | None = None,
+        throughput_window_seconds: float = 300.0,
+        admission: AdmissionController | None = None,
+        memory_model: MemoryModel | None = None,
+    ) -> None:
         self.logger = logger
+        self.process_executor = process_executor
+        self.admission = admission
+        self.memory_model = memory_model
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._meters: dict[str, ThroughputMeter] = {}
+        if thread_concurrency:
+            self._slots[EXECUTION_THREAD] = threading.BoundedSemaphore(thread_concurrency)
+        self._meters[EXECUTION_THREAD] = ThroughputMeter(
+            EXECUTION_THREAD,
+            thread_concurrency or 1,
+            window_seconds=throughput_window_seconds,
+        )
+        if process_executor is not None:
+            self._slots[EXECUTION_PROCESS] = threading.BoundedSemaphore(
+                process_executor.max_workers
+            )
+            self._meters[EXECUTION_PROCESS] = ThroughputMeter(
+                EXECUTION_PROCESS,
+                process_executor.max_workers,
+                window_seconds=throughput_window_seconds,
+            )
+
+    def execution_for(self, execution: str) -> str:
+        """Effective execution class (process work runs on threads without a pool)."""
+        if execution == EXECUTION_PROCESS and self.process_executor is not None:
+            return EXECUTION_PROCESS
+        return EXECUTION_THREAD
+
+    @contextmanager
+    def _slot(self, execution: str):
+        # Wait for a free slot of this class so CPU-bound work cannot starve I/O-bound work
+        slot = self._slots.get(execution)
+        if slot is not None:
+            slot.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            if slot is not None:
+                slot.release()
+            self._meters[execution].record(time.monotonic() - start)
+
+    def _work_pixels(self, spec, payload) -> int | None:
+        if self.admission is None or spec.work_pixels is None:
+            return None
+        try:
+            with db.get_session() as session:
+                return spec.work_pixels(session, payload)
+        except Exception as error:
+            self.logger.warning(f"[admission.estimate_failed] {type(error).__name__}: {error}")
+            return None
+
+    @contextmanager
+    def _admitted(self, job_type: str, pixels: int | None):
+        if self.admission is None or self.memory_model is None:
+            yield None
+            return
+        estimate = self.memory_model.estimate(job_type, pixels)
+        with self.admission.admit(job_type, estimate) as ticket:
+            yield ticket
+
+    @contextmanager
+    def _heartbeat(self, job_id: str, extend_lease, execution: str):
+        heartbeat = build_heartbeat(
+            job_id,
+            extend_lease=extend_lease,
+            track_progress=execution == EXECUTION_THREAD,
+        )
+        if heartbeat is None:
+            yield
+            return
+        set_progress_callback(heartbeat.progress)
+        try:
+            with heartbeat:
+                yield
+        finally:
+            set_progress_callback(None)
+
+    @contextmanager
+    def _measured(self, job_type: str):
+        JOBS_IN_FLIGHT.inc(job_type=job_type)
+        start = time.monotonic()
+        outcome = "failure"
+        try:
+            yield
+            outcome = "success"
+        finally:
+            JOBS_IN_FLIGHT.dec(job_type=job_type)
+            JOB_DURATION.observe(time.monotonic() - start, job_type=job_type, outcome=outcome)
+
+    def run_process_task(
+        self,
+        task_type: str,
+        pixels: int | None,
+        fn: Callable[..., Any],
+        *args: Any,
+    ) -> Any:
+        """Run a CPU-bound piece of a thread job in the shared process pool.
+
+        The task waits for a process slot, then for memory admission (estimated
+        as ``task_type`` with ``pixels``), exactly like a process job. Without a
+        process pool it is admitted and runs inline on the calling thread; it
+        takes no thread slot, since its thread job already holds one.
+
+        Raises:
+            AdmissionDeferred: The task did not fit the memory budget in time
+        """
+        if self.process_executor is None:
+            with self._admitted(task_type, pixels):
+                return fn(*args)
+        with self._slot(EXECUTION_PROCESS), self._admitted(task_type, pixels):
+            return self.process_executor.call(fn, *args)
 
     def run_message(
         self,
@@ -20,7 +160,18 @@ class JobRunner:
         *,
         message_id: str,
         job_type_hint: str | None = None,
+        in_worker_process: bool = False,
+        extend_lease: Callable[[int], None] | None = None,
     ) -> None:
+        """Run one job message.
+
+        Args:
+            extend_lease: Sets the message's ack deadline in seconds; called by the
+                job heartbeat while the handler runs
+
+        Raises:
+            DuplicateDelivery: The job is already running with a fresh heartbeat
+        """
         envelope = JobEnvelope.from_message(data, job_type_hint=job_type_hint)
         if job_type_hint and envelope.job_type != job_type_hint:
             raise ValueError(
@@ -32,8 +183,62 @@ class JobRunner:
             raise ValueError(f"Unsupported job type: {envelope.job_type}")
 
         payload = spec.payload_model(**envelope.payload)
+
+        # Already dispatched by the parent's runner: just run the handler here
+        if in_worker_process:
+            with profile_job(envelope.job_type, envelope.job_id), db.get_session() as session:
+                spec.handler(session, payload, message_id, envelope)
+            return
+
         log_fields = spec.log_context(payload) if spec.log_context else {}
         log_job_received(self.logger, envelope.job_type, message_id, **log_fields)
 
-        with db.get_session() as session:
-            spec.handler(session, payload, message_id, envelope)
+        if config.job_heartbeat_enabled:
+            with db.get_session() as session:
+                reject_duplicate_delivery(session, envelope.job_id)
+
+        execution = self.execution_for(spec.execution)
+        pixels = self._work_pixels(spec, payload)
+        # Slot before admission: a job queued behind a busy slot reserves no memory
+        with (
+            self._slot(execution),
+            self._admitted(envelope.job_type, pixels) as ticket,
+            self._heartbeat(envelope.job_id, extend_lease, execution),
+            self._measured(envelope.job_type),
+        ):
+            if execution == EXECUTION_PROCESS:
+                peak_bytes = self.process_executor.run(
+                    data,
+                    message_id=message_id,
+                    job_type_hint=job_type_hint,
+                    trace_context=get_trace_context(),
+                )
+            else:
+                sampler = PeakMemorySampler() if ticket is not None else nullcontext()
+                token = _CURRENT_RUNNER.set(self)
+                try:
+                    with (
+                        sampler,
+                        profile_job(envelope.job_type, envelope.job_id),
+                        db.get_session() as session,
+                    ):
+                        spec.handler(session, payload, message_id, envelope)
+                finally:
+                    _CURRENT_RUNNER.reset(token)
+                # RSS growth is only attributable to this job if nothing else ran
+                peak_bytes = sampler.peak_bytes if ticket is not None and ticket.solo else None
+            if self.memory_model is not None:
+                self.memory_model.observe(envelope.job_type, pixels, peak_bytes)
+
+
+def process_task_runner() -> Callable[..., Any]:
+    """``JobRunner.run_process_task`` of the current thread job's runner.
+
+    Capture it on the handler's thread; the returned callable can then be used
+    from helper threads. Outside a runner (tests, scripts, jobs already in a
+    pool process) tasks run inline.
+    """
+    runner = _CURRENT_RUNNER.get()
+    if runner is None:
+        return lambda task_type, pixels, fn, *args: fn(*args)
+    return runner.run_process_task
@@ -0,0 +1,225 @@
+"""Batched block overlay rendering for one sheet pair.
+
+The default sheet overlay flow fans out one block overlay job per block pair,
+and each of those downloads and decodes its two block PNGs. Every block of a
+sheet pair is cut from the same two sheet images, so in batch mode the sheet
+overlay job downloads and decodes each sheet once, crops the blocks in memory
+by their stored bounds and aligns and renders the pairs in the worker's shared
+process pool. Each render takes a process slot and memory admission like a
+block overlay job, so batched jobs stay within ``worker_process_concurrency``
+and the memory budget. Nothing is written to the database while the pairs
+render; the caller records every overlay in a single transaction afterwards.
+
+Pairs that fail to render (including renders deferred by admission) are
+handed back to the caller, which queues them as regular block overlay jobs so
+they keep their per-job retries.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+import numpy as np
+from sqlmodel import Session
+
+from clients.storage import StorageClient, get_storage_client
+from config import config
+from jobs.block_overlay_generate import (
+    LOW_CONFIDENCE_SCORE,
+    OverlayAssets,
+    _download_block_image,
+    _has_grid_callouts,
+    _upload_overlay_assets,
+    render_overlay_assets_from_images,
+)
+from jobs.overlay_cache import save_overlay_result
+from jobs.runner import process_task_runner
+from jobs.sheet_preprocess import _download_sheet_image
+from jobs.types import JobType
+from lib.sift_alignment import _load_image_from_bytes
+from lib.tile_pyramid import upload_tile_pyramid
+from models import Block, Overlay, Sheet
+from utils.log_utils import log_phase, report_progress
+
+logger = logging.getLogger(__name__)
+
+
+class BatchPair(NamedTuple):
+    """A block pair to render, with the overlay row that receives the result."""
+
+    overlay: Overlay
+    block_a: Block
+    block_b: Block
+
+
+class BatchResult(NamedTuple):
+    """Outcome of a batched render."""
+
+    rendered: list[BatchPair]
+    failed: list[BatchPair]
+
+
+def crop_block(sheet_image: np.ndarray, bounds: dict | None) -> np.ndarray | None:
+    """Cut a block out of its decoded sheet using normalized (0-1000) bounds.
+
+    Mirrors the pixel rounding used when the block PNG was extracted, so the
+    crop matches the stored block image. Returns a view, or None when the
+    bounds are missing or empty.
+    """
+    if not bounds or not bounds.get("normalized", True):
+        return None
+    try:
+        height, width = sheet_image.shape[:2]
+        x1 = max(0, int(bounds["xmin"] * width / 1000))
+        y1 = max(0, int(bounds["ymin"] * height / 1000))
+        x2 = min(width, int(bounds["xmax"] * width / 1000))
+        y2 = min(height, int(bounds["ymax"] * height / 1000))
+    except (KeyError, TypeError):
+        return None
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return sheet_image[y1:y2, x1:x2]
+
+
+def _block_image(
+    storage_client: StorageClient,
+    sheet_image: np.ndarray,
+    block: Block,
+) -> np.ndarray:
+    crop = crop_block(sheet_image, block.bounds)
+    if crop is not None:
+        return crop
+    # No usable bounds: fall back to the stored block PNG
+    return _load_image_from_bytes(_download_block_image(storage_client, block.uri))
+
+
+def _publish_assets(
+    storage_client: StorageClient,
+    pair: BatchPair,
+    assets: OverlayAssets,
+) -> None:
+    """Upload rendered assets and point the overlay row at them (not added to a session)."""
+    overlay = pair.overlay
+    overlay_uri, addition_uri, deletion_uri = _upload_overlay_assets(
+        storage_client,
+        overlay.id,
+        assets.overlay_bytes,
+        assets.addition_bytes,
+        assets.deletion_bytes,
+    )
+    tiles_manifest = None
+    if assets.tiles is not None:
+        tiles_manifest = upload_tile_pyramid(
+            storage_client,
+            assets.tiles,
+            f"block-overlays/{overlay.id}_files",
+            max_workers=config.tile_upload_concurrency,
+        )
+
+    if assets.overlay_score < LOW_CONFIDENCE_SCORE:
+        logger.warning(
+            "[overlay.low_confidence] score=%.3f method=%s overlay_id=%s",
+            assets.overlay_score,
+            assets.alignment_stats.method,
+            overlay.id,
+        )
+
+    overlay.uri = overlay_uri
+    overlay.addition_uri = addition_uri
+    overlay.deletion_uri = deletion_uri
+    overlay.score = assets.overlay_score
+    overlay.summary = {
+        **(overlay.summary or {}),
+        "alignmentQuality": assets.alignment_quality,
+        **({"tiles": tiles_manifest} if tiles_manifest is not None else {}),
+    }
+    overlay.updated_at = datetime.now(UTC)
+
+
+def save_rendered_pairs(session: Session, pairs: list[BatchPair]) -> None:
+    """Add rendered overlays and their cache results to the session (caller commits)."""
+    for pair in pairs:
+        session.add(pair.overlay)
+        save_overlay_result(session, pair.block_a, pair.block_b, pair.overlay)
+
+
+def render_block_pairs(
+    pairs: list[BatchPair],
+    sheet_a: Sheet,
+    sheet_b: Sheet,
+    *,
+    max_workers: int | None = None,
+) -> BatchResult:
+    """Render all block pairs of a sheet pair from two shared sheet decodes.
+
+    Overlay rows get their new asset URIs but are not added to a session; pass
+    the rendered pairs to ``save_rendered_pairs`` to record them.
+
+    Args:
+        pairs: Block pairs with their target overlay rows
+        sheet_a: Sheet the A blocks were extracted from (old)
+        sheet_b: Sheet the B blocks were extracted from (new)
+        max_workers: Pairs in flight at once (defaults to
+            config.sheet_overlay_batch_workers; the shared pool's slots still
+            bound how many render at the same time)
+
+    Returns:
+        BatchResult with rendered and failed pairs
+    """
+    if not pairs:
+        return BatchResult(rendered=[], failed=[])
+
+    workers = max_workers or config.sheet_overlay_batch_workers
+    run_task = process_task_runner()
+    storage_client = get_storage_client()
+
+    with log_phase(logger, "Download and decode sheet images", sheet_id=sheet_a.id):
+        sheet_img_a = _load_image_from_bytes(
+            _download_sheet_image(storage_client, sheet_a.uri, sheet_a.id)
+        )
+        sheet_img_b = _load_image_from_bytes(
+            _download_sheet_image(storage_client, sheet_b.uri, sheet_b.id)
+        )
+
+    def render(pair: BatchPair) -> None:
+        image_a = _block_image(storage_client, sheet_img_a, pair.block_a)
+        image_b = _block_image(storage_client, sheet_img_b, pair.block_b)
+        pixels = image_a.shape[0] * image_a.shape[1] + image_b.shape[0] * image_b.shape[1]
+        assets = run_task(
+            JobType.BLOCK_OVERLAY_GENERATE,
+            pixels,
+            render_overlay_assets_from_images,
+            image_a,
+            image_b,
+            _has_grid_callouts(pair.block_a),
+        )
+        # Upload as each pair completes so rendered bytes do not pile up
+        _publish_assets(storage_client, pair, assets)
+
+    rendered: list[BatchPair] = []
+    failed: list[BatchPair] = []
+    with (
+        log_phase(logger, f"Render block overlays ({len(pairs)} pairs)", sheet_id=sheet_a.id),
+        ThreadPoolExecutor(max_workers=min(workers, len(pairs))) as executor,
+    ):
+        futures = {executor.submit(render, pair): pair for pair in pairs}
+        for future in as_completed(futures):
+            pair = futures[future]
+            report_progress()
+            try:
+                future.result()
+            except Exception as error:
+                logger.warning(
+                    "[overlay.batch.pair_failed] overlay_id=%s error=%s: %s",
+                    pair.overlay.id,
+                    type(error).__name__,
+                    error,
+                )
+                failed.append(pair)
+            else:
+                rendered.append(pair)
+
+    return BatchResult(rendered=rendered, failed=failed)
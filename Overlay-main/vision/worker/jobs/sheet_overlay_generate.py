@@ -2,6 +2,10 @@
 
 This module handles the generation of overlay jobs between two sheets by
 matching VIEW blocks (plan, elevation, section, detail) by their identifier field.
+
+With config.sheet_overlay_batch_enabled the pairs are rendered inside this job
+from one decode of each sheet (see jobs/sheet_overlay_batch.py) instead of
+being fanned out as block overlay jobs.
 """
 
 import logging
@@ -10,13 +14,16 @@ from datetime import UTC, datetime
 from pydantic import BaseModel, Field
 from sqlmodel import Session, select
 
-from clients.pubsub import get_pubsub_client
 from config import config
-from jobs.envelope import JobEnvelope, build_job_envelope
+from jobs.envelope import JobEnvelope
+from jobs.outbox import enqueue_jobs, wake_outbox_relay
+from jobs.overlay_cache import apply_overlay_result, find_overlay_results, overlay_result_key
+from jobs.sheet_overlay_batch import BatchPair, render_block_pairs, save_rendered_pairs
 from jobs.types import JobType
 from models import Block, BlockType, Job, JobStatus, Overlay, Sheet
+from utils.db_utils import bulk_insert
 from utils.id_utils import generate_cuid
-from utils.job_events import append_job_event_if_missing, create_job_event
+from utils.job_events import create_job_event, record_job_event
 from utils.log_utils import log_coordination_published, log_job_completed, log_job_started
 
 logger = logging.getLogger(__name__)
@@ -372,6 +379,104 @@ def _pair_view_blocks_by_identifier(
     return paired, stats
 
 
+def _build_block_overlay_job(
+    job: Job,
+    payload: SheetOverlayGeneratePayload,
+    block_a: Block,
+    block_b: Block,
+    pairing_method: str,
+    job_id: str,
+    overlay_id: str,
+) -> Job:
+    """Build a queued block overlay job for a pair (caller inserts it)."""
+    job_payload = {
+        "blockAId": block_a.id,
+        "blockBId": block_b.id,
+        "sheetAId": payload.sheet_a_id,
+        "sheetBId": payload.sheet_b_id,
+        "drawingAId": payload.drawing_a_id,
+        "drawingBId": payload.drawing_b_id,
+    }
+    job_event_metadata = {
+        **job_payload,
+        "overlayId": overlay_id,
+        "pairingMethod": pairing_method,
+    }
+    return Job(
+        id=job_id,
+        parent_id=job.id,
+        type=JobType.BLOCK_OVERLAY_GENERATE,
+        status=JobStatus.QUEUED,
+        organization_id=job.organization_id,
+        project_id=job.project_id,
+        actor_id=job.actor_id,
+        target_type="block",
+        target_id=block_b.id,
+        payload=job_payload,
+        events=[
+            create_job_event(
+                job_type=JobType.BLOCK_OVERLAY_GENERATE,
+                job_id=str(job_id),
+                status=JobStatus.QUEUED.value,
+                event_type="created",
+                block_id=block_a.id,
+                metadata=job_event_metadata,
+            )
+        ],
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+    )
+
+
+def _render_pairs_in_batch(
+    session: Session,
+    job: Job,
+    sheet_a: Sheet,
+    sheet_b: Sheet,
+    pending_pairs: list[tuple[Block, Block, str, Overlay | None]],
+) -> tuple[list[tuple[Block, Block, str, Overlay | None]], int]:
+    """Render pending pairs inside this job; return the pairs that still need a job.
+
+    The session is closed while the pairs render, so no connection is held
+    during the renders; the job and the rendered overlays are added back to it
+    afterwards (caller commits). Any other rows the caller still has to write
+    must be added after this returns.
+
+    Returns:
+        (pairs_to_queue, rendered_count)
+    """
+    batch_pairs: list[BatchPair] = []
+    pairing_methods: dict[str, str] = {}
+    for block_a, block_b, pairing_method, existing_overlay in pending_pairs:
+        overlay = existing_overlay or Overlay(
+            id=generate_cuid(),
+            block_a_id=block_a.id,
+            block_b_id=block_b.id,
+            created_at=datetime.now(UTC),
+        )
+        overlay.job_id = job.id
+        overlay.updated_at = datetime.now(UTC)
+        batch_pairs.append(BatchPair(overlay=overlay, block_a=block_a, block_b=block_b))
+        pairing_methods[overlay.id] = pairing_method
+
+    # Renders take minutes and write nothing: end the read transaction so the
+    # connection goes back to the pool. Closing detaches the loaded rows with
+    # their state intact; the sheets were expired by the "started" commit, so
+    # load them before they are detached.
+    session.refresh(sheet_a)
+    session.refresh(sheet_b)
+    session.close()
+    result = render_block_pairs(batch_pairs, sheet_a, sheet_b)
+    session.add(job)
+    save_rendered_pairs(session, result.rendered)
+    # Failed pairs fall back to regular block jobs, which keep their own retries
+    remaining = [
+        (pair.block_a, pair.block_b, pairing_methods[pair.overlay.id], pair.overlay)
+        for pair in result.failed
+    ]
+    return remaining, len(result.rendered)
+
+
 def run_sheet_overlay_generate_job(
     session: Session,
     payload: SheetOverlayGeneratePayload,
@@ -417,12 +522,10 @@ def run_sheet_overlay_generate_job(
             "drawingBId": payload.drawing_b_id,
         },
     )
-    job.events = append_job_event_if_missing(job.events, started_event)
+    record_job_event(session, job, started_event)
     session.add(job)
     session.commit()
 
-    pubsub_client = get_pubsub_client()
-
     blocks_a = session.exec(
         select(Block).where(
             Block.sheet_id == payload.sheet_a_id,
@@ -442,6 +545,18 @@ def run_sheet_overlay_generate_job(
     skipped_missing_uri = 0
     skipped_existing = 0
     skipped_inflight = 0
+    reused_from_cache = 0
+    rendered_in_batch = 0
+    pending_pairs: list[tuple[Block, Block, str, Overlay | None]] = []
+    reused_overlays: list[Overlay] = []
+    cached_results = find_overlay_results(
+        session,
+        [
+            key
+            for block_a, block_b, _ in block_pairs
+            if (key := overlay_result_key(block_a, block_b)) is not None
+        ],
+    )
 
     if not block_pairs:
         logger.warning(
@@ -450,19 +565,46 @@ def run_sheet_overlay_generate_job(
             payload.sheet_b_id,
             view_stats.non_view_blocks_skipped,
         )
+    # One query each for existing overlays, their jobs and earlier child jobs,
+    # instead of per-pair lookups
+    overlays_by_pair: dict[tuple[str, str], Overlay] = {}
+    child_jobs_by_target: dict[str, Job] = {}
+    overlay_jobs: dict[str, Job] = {}
+    if block_pairs:
+        block_a_ids = {block_a.id for block_a, _, _ in block_pairs}
+        block_b_ids = {block_b.id for _, block_b, _ in block_pairs}
+        for overlay in session.exec(
+            select(Overlay).where(
+                Overlay.block_a_id.in_(block_a_ids),
+                Overlay.block_b_id.in_(block_b_ids),
+                Overlay.deleted_at.is_(None),
+            )
+        ).all():
+            overlays_by_pair.setdefault((overlay.block_a_id, overlay.block_b_id), overlay)
+        overlay_job_ids = {
+            overlay.job_id for overlay in overlays_by_pair.values() if overlay.job_id
+        }
+        if overlay_job_ids:
+            overlay_jobs = {
+                existing.id: existing
+                for existing in session.exec(select(Job).where(Job.id.in_(overlay_job_ids))).all()
+            }
+        for existing in session.exec(
+            select(Job).where(
+                Job.parent_id == job.id,
+                Job.type == JobType.BLOCK_OVERLAY_GENERATE,
+                Job.target_id.in_(block_b_ids),
+            )
+        ).all():
+            child_jobs_by_target.setdefault(existing.target_id, existing)
+
     try:
         for block_a, block_b, pairing_method in block_pairs:
             if not block_a.uri or not block_b.uri:
                 skipped_missing_uri += 1
                 continue
 
-            existing_overlay = session.exec(
-                select(Overlay).where(
-                    Overlay.block_a_id == block_a.id,
-                    Overlay.block_b_id == block_b.id,
-                    Overlay.deleted_at.is_(None),
-                )
-            ).first()
+            existing_overlay = overlays_by_pair.get((block_a.id, block_b.id))
             if (
                 existing_overlay
                 and existing_overlay.uri
@@ -472,98 +614,74 @@ def run_sheet_overlay_generate_job(
                 skipped_existing += 1
                 continue
 
-            if existing_overlay and existing_overlay.job_id:
-                existing_job = session.get(Job, existing_overlay.job_id)
-                if existing_job and existing_job.status in {
-                    JobStatus.QUEUED,
-                    JobStatus.STARTED,
-                }:
-                    skipped_inflight += 1
-                    continue
-            elif not existing_overlay:
-                existing_job = session.exec(
-                    select(Job).where(
-                        Job.parent_id == job.id,
-                        Job.type == JobType.BLOCK_OVERLAY_GENERATE,
-                        Job.target_id == block_b.id,
-                    )
-                ).first()
-                if existing_job and existing_job.status in {
-                    JobStatus.QUEUED,
-                    JobStatus.STARTED,
-                }:
-                    skipped_inflight += 1
-                    continue
-
-            job_id = generate_cuid()
-            overlay = existing_overlay
-            if not overlay:
-                overlay = Overlay(
+            # Unchanged crops (same content hashes) reuse the stored render, no job needed
+            cached_result = cached_results.get(overlay_result_key(block_a, block_b) or "")
+            if cached_result is not None:
+                overlay = existing_overlay or Overlay(
                     id=generate_cuid(),
-                    job_id=job_id,
                     block_a_id=block_a.id,
                     block_b_id=block_b.id,
                     created_at=datetime.now(UTC),
-                    updated_at=datetime.now(UTC),
                 )
-                session.add(overlay)
+                apply_overlay_result(overlay, cached_result)
+                reused_overlays.append(overlay)
+                reused_from_cache += 1
+                continue
+
+            if existing_overlay and existing_overlay.job_id:
+                existing_job = overlay_jobs.get(existing_overlay.job_id)
+            elif not existing_overlay:
+                existing_job = child_jobs_by_target.get(block_b.id)
             else:
-                overlay.job_id = job_id
-                overlay.updated_at = datetime.now(UTC)
-                session.add(overlay)
+                existing_job = None
+            if existing_job and existing_job.status in {JobStatus.QUEUED, JobStatus.STARTED}:
+                skipped_inflight += 1
+                continue
 
-            job_payload = {
-                "blockAId": block_a.id,
-                "blockBId": block_b.id,
-                "sheetAId": payload.sheet_a_id,
-                "sheetBId": payload.sheet_b_id,
-                "drawingAId": payload.drawing_a_id,
-                "drawingBId": payload.drawing_b_id,
-            }
-            job_event_metadata = {
-                **job_payload,
-                "overlayId": overlay.id,
-                "pairingMethod": pairing_method,
-            }
-            block_job = Job(
-                id=job_id,
-                parent_id=job.id,
-                type=JobType.BLOCK_OVERLAY_GENERATE,
-                status=JobStatus.QUEUED,
-                organization_id=job.organization_id,
-                project_id=job.project_id,
-                actor_id=job.actor_id,
-                target_type="block",
-                target_id=block_b.id,
-                payload=job_payload,
-                events=[
-                    create_job_event(
-                        job_type=JobType.BLOCK_OVERLAY_GENERATE,
-                        job_id=str(job_id),
-                        status=JobStatus.QUEUED.value,
-                        event_type="created",
-                        block_id=block_a.id,
-                        metadata=job_event_metadata,
-                    )
-                ],
-                created_at=datetime.now(UTC),
-                updated_at=datetime.now(UTC),
+            pending_pairs.append((block_a, block_b, pairing_method, existing_overlay))
+
+        if config.sheet_overlay_batch_enabled and pending_pairs:
+            pending_pairs, rendered_in_batch = _render_pairs_in_batch(
+                session, job, sheet_a, sheet_b, pending_pairs
             )
-            session.add(block_job)
-            block_jobs.append(block_job)
-        session.commit()
 
-        for block_job in block_jobs:
-            pubsub_client.publish(
-                config.vision_topic,
-                build_job_envelope(
-                    job_type=block_job.type,
-                    job_id=str(block_job.id),
-                    payload=block_job.payload,
-                ),
-                attributes={"type": block_job.type, "id": str(block_job.id)},
+        new_overlays: list[Overlay] = []
+        relinked_overlays: list[tuple[Overlay, str]] = []
+        for block_a, block_b, pairing_method, existing_overlay in pending_pairs:
+            job_id = generate_cuid()
+            if existing_overlay:
+                overlay_id = existing_overlay.id
+                relinked_overlays.append((existing_overlay, job_id))
+            else:
+                overlay_id = generate_cuid()
+                new_overlays.append(
+                    Overlay(
+                        id=overlay_id,
+                        job_id=job_id,
+                        block_a_id=block_a.id,
+                        block_b_id=block_b.id,
+                        created_at=datetime.now(UTC),
+                        updated_at=datetime.now(UTC),
+                    )
+                )
+            block_jobs.append(
+                _build_block_overlay_job(
+                    job, payload, block_a, block_b, pairing_method, job_id, overlay_id
+                )
             )
 
+        # Jobs go in first: overlays reference them through overlays.job_id
+        bulk_insert(session, block_jobs)
+        bulk_insert(session, new_overlays)
+        session.add_all(reused_overlays)
+        for overlay, job_id in relinked_overlays:
+            overlay.job_id = job_id
+            overlay.updated_at = datetime.now(UTC)
+            session.add(overlay)
+        enqueue_jobs(session, block_jobs)
+        session.commit()
+        wake_outbox_relay()
+
         log_coordination_published(
             logger,
             config.vision_topic,
@@ -597,9 +715,11 @@ def run_sheet_overlay_generate_job(
                 "blocksSkippedMissingUri": skipped_missing_uri,
                 "blocksSkippedExisting": skipped_existing,
                 "blocksSkippedInflight": skipped_inflight,
+                "blocksReusedFromCache": reused_from_cache,
+                "blocksRenderedInBatch": rendered_in_batch,
             },
         )
-        job.events = append_job_event_if_missing(job.events, completed_event)
+        record_job_event(session, job, completed_event)
         session.add(job)
         session.commit()
     except Exception:
@@ -617,7 +737,7 @@ def run_sheet_overlay_generate_job(
                 "sheetBId": payload.sheet_b_id,
             },
         )
-        job.events = append_job_event_if_missing(job.events, failed_event)
+        record_job_event(session, job, failed_event)
         session.add(job)
         session.commit()
         raise
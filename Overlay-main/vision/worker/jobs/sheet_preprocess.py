@@ -5,17 +5,20 @@ import time
 from datetime import UTC, datetime
 
 from pydantic import BaseModel, Field
-from sqlmodel import Session, select
+from sqlmodel import Session, update
 
 from clients.gemini import get_gemini_client
 from clients.storage import StorageClient, get_storage_client
+from jobs.drawing_progress import record_sheet_job_progress
 from jobs.envelope import JobEnvelope
+from jobs.overlay_cache import compute_content_hash
 from jobs.types import JobType
 from lib.llm_usage import start_tracking, stop_tracking
 from lib.sheet_analyzer import SheetAnalysisResult, analyze_sheet
 from models import Block, BlockType, Job, JobStatus, Sheet
+from utils.db_utils import bulk_insert
 from utils.id_utils import generate_cuid
-from utils.job_events import append_job_event_if_missing, create_job_event
+from utils.job_events import create_job_event, record_job_event
 from utils.log_utils import (
     log_job_completed,
     log_job_started,
@@ -98,22 +101,28 @@ def _map_block_type(block_type: str) -> BlockType:
     return mapping.get(block_type, BlockType.PLAN)
 
 
-def _soft_delete_existing_blocks(session: Session, sheet_id: str) -> None:
-    existing = session.exec(
-        select(Block).where(Block.sheet_id == sheet_id, Block.deleted_at.is_(None))
-    ).all()
-    if not existing:
-        return
+def _soft_delete_existing_blocks(session: Session, sheet_id: str) -> int:
+    """Soft-delete the sheet's live blocks (caller commits); returns how many."""
     now = datetime.now(UTC)
-    for block in existing:
-        block.deleted_at = now
-        block.updated_at = now
-        session.add(block)
-    session.commit()
+    result = session.exec(
+        update(Block)
+        .where(Block.sheet_id == sheet_id, Block.deleted_at.is_(None))
+        .values(deleted_at=now, updated_at=now)
+    )
+    return result.rowcount
+
+
+# Sheet metadata written by the drawing preprocess job (image size, tile manifest)
+PRESERVED_SHEET_METADATA_KEYS = ("width", "height", "tiles")
 
 
 def _apply_sheet_metadata(sheet: Sheet, analysis: SheetAnalysisResult) -> None:
-    sheet.metadata_ = analysis.metadata
+    preserved = {
+        key: value
+        for key, value in (sheet.metadata_ or {}).items()
+        if key in PRESERVED_SHEET_METADATA_KEYS and value is not None
+    }
+    sheet.metadata_ = {**(analysis.metadata or {}), **preserved} if preserved else analysis.metadata
     title_block = analysis.metadata.get("title_block") if analysis.metadata else None
     if isinstance(title_block, dict):
         sheet.sheet_number = title_block.get("sheet_number") or sheet.sheet_number
@@ -164,11 +173,7 @@ def run_sheet_job(
         event_type="started",
         sheet_id=payload.sheet_id,
     )
-    updated_events = append_job_event_if_missing(sheet_job.events, started_event)
-    should_commit = False
-    if updated_events is not sheet_job.events:
-        sheet_job.events = updated_events
-        should_commit = True
+    should_commit = record_job_event(session, sheet_job, started_event)
     if sheet_job.status == JobStatus.STARTED:
         should_commit = True
     if should_commit:
@@ -187,8 +192,6 @@ def run_sheet_job(
             analysis = analyze_sheet(png_bytes, client)
 
         with log_phase(logger, "Upload blocks", sheet_id=payload.sheet_id):
-            _soft_delete_existing_blocks(session, sheet.id)
-
             new_blocks: list[Block] = []
             for index, block in enumerate(analysis.blocks):
                 block_uri = _upload_block_image(
@@ -210,6 +213,7 @@ def run_sheet_job(
                         sheet_id=sheet.id,
                         type=_map_block_type(block.block_type),
                         uri=block_uri,
+                        content_hash=compute_content_hash(block.crop_bytes),
                         bounds={
                             "xmin": block.bbox.xmin,
                             "ymin": block.bbox.ymin,
@@ -225,12 +229,6 @@ def run_sheet_job(
                     )
                 )
 
-            for block in new_blocks:
-                session.add(block)
-
-            _apply_sheet_metadata(sheet, analysis)
-            session.add(sheet)
-
         # Stop tracking and get LLM usage
         llm_usage = stop_tracking()
         llm_usage_dict = (
@@ -247,7 +245,26 @@ def run_sheet_job(
             sheet_id=payload.sheet_id,
             llm_usage=llm_usage_dict,
         )
-        sheet_job.events = append_job_event_if_missing(sheet_job.events, completed_event)
+        # The event goes first: appending it locks the job row, so of two
+        # deliveries only the one that completes the job replaces the blocks
+        # and counts them
+        if not record_job_event(session, sheet_job, completed_event):
+            session.rollback()
+            logger.info(f"[job.duplicate] sheet job {sheet_job.id} already completed")
+            return
+
+        # Old blocks are replaced in the same transaction as the job completes
+        deleted_blocks = _soft_delete_existing_blocks(session, sheet.id)
+        bulk_insert(session, new_blocks)
+        _apply_sheet_metadata(sheet, analysis)
+        session.add(sheet)
+        record_sheet_job_progress(
+            session,
+            sheet.drawing_id,
+            sheet_job,
+            JobStatus.COMPLETED,
+            block_delta=len(new_blocks) - deleted_blocks,
+        )
         session.add(sheet_job)
 
         session.commit()
@@ -269,7 +286,8 @@ def run_sheet_job(
             sheet_id=payload.sheet_id,
             llm_usage=llm_usage_dict,
         )
-        sheet_job.events = append_job_event_if_missing(sheet_job.events, failed_event)
+        if record_job_event(session, sheet_job, failed_event):
+            record_sheet_job_progress(session, sheet.drawing_id, sheet_job, JobStatus.FAILED)
         session.add(sheet_job)
         session.commit()
         raise
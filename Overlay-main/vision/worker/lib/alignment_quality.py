@@ -0,0 +1,144 @@
+"""Alignment quality scoring for aligned block image pairs.
+
+Measures how well two already-aligned drawings agree without re-running
+alignment. Both images are reduced to a small grayscale band (longest edge
+``max_dim``), edges are extracted, and two vectorized metrics are computed
+from a distance transform of each edge map:
+
+- Chamfer agreement: mean distance from each edge pixel to the nearest edge
+  pixel in the other image (symmetric, truncated), mapped to 0-1.
+- Edge overlap: F1 of edge pixels that land within ``tolerance_px`` of an
+  edge in the other image.
+
+Real revisions also lower both metrics, so the score is a misalignment
+signal rather than a change measure: well-aligned revisions typically keep
+most of their linework in place, while a bad transform moves all of it.
+
+Key functions:
+- score_alignment(): Compute AlignmentQuality for an aligned pair
+"""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+from pydantic import BaseModel
+
+DEFAULT_MAX_DIM = 1_024
+DEFAULT_TOLERANCE_PX = 2.0
+DEFAULT_DISTANCE_CAP_PX = 10.0
+MIN_EDGE_PIXELS = 200
+
+
+class AlignmentQuality(BaseModel):
+    """Alignment agreement metrics for an aligned image pair."""
+
+    score: float  # Combined 0-1 score (mean of chamfer_score and edge_overlap)
+    chamfer_score: float  # 1 - truncated symmetric chamfer distance / cap
+    edge_overlap: float  # F1 of edge pixels within tolerance of the other image
+    mean_distance_px: float  # Symmetric chamfer distance in full-resolution pixels
+    sample_scale: float  # Downsample factor used for scoring
+    edge_pixels_a: int
+    edge_pixels_b: int
+
+    @property
+    def sufficient_edges(self) -> bool:
+        """Whether both images had enough linework for the score to be meaningful."""
+        return min(self.edge_pixels_a, self.edge_pixels_b) >= MIN_EDGE_PIXELS
+
+    def to_summary(self) -> dict[str, float | int | bool]:
+        """Serialize for Overlay.summary (camelCase keys)."""
+        return {
+            "score": round(self.score, 4),
+            "chamferScore": round(self.chamfer_score, 4),
+            "edgeOverlap": round(self.edge_overlap, 4),
+            "meanDistancePx": round(self.mean_distance_px, 2),
+            "sampleScale": round(self.sample_scale, 4),
+            "edgePixelsA": self.edge_pixels_a,
+            "edgePixelsB": self.edge_pixels_b,
+            "sufficientEdges": self.sufficient_edges,
+        }
+
+
+def _edge_band(rgb_image: np.ndarray, scale: float) -> np.ndarray:
+    """Downsample to the scoring band and return a binary edge map."""
+    gray = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2GRAY)
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return cv2.Canny(gray, 50, 150)
+
+
+def _distance_to_edges(edges: np.ndarray) -> np.ndarray:
+    """Distance (px) from every pixel to the nearest edge pixel."""
+    # distanceTransform measures distance to the nearest zero pixel
+    return cv2.distanceTransform(cv2.bitwise_not(edges), cv2.DIST_L2, 3)
+
+
+def score_alignment(
+    aligned_a: np.ndarray,
+    aligned_b: np.ndarray,
+    *,
+    max_dim: int = DEFAULT_MAX_DIM,
+    tolerance_px: float = DEFAULT_TOLERANCE_PX,
+    distance_cap_px: float = DEFAULT_DISTANCE_CAP_PX,
+) -> AlignmentQuality:
+    """Score how well two aligned RGB images agree.
+
+    Args:
+        aligned_a: Aligned image A in RGB format (old/source)
+        aligned_b: Aligned image B in RGB format (new/target), same shape as A
+        max_dim: Longest edge of the downsampled scoring band
+        tolerance_px: Edge overlap tolerance in band pixels
+        distance_cap_px: Chamfer truncation distance in band pixels
+
+    Returns:
+        AlignmentQuality metrics
+
+    Raises:
+        ValueError: If image shapes differ
+    """
+    if aligned_a.shape != aligned_b.shape:
+        raise ValueError(f"Image dimensions must match: {aligned_a.shape} != {aligned_b.shape}")
+
+    scale = min(1.0, max_dim / max(aligned_a.shape[:2]))
+    edges_a = _edge_band(aligned_a, scale)
+    edges_b = _edge_band(aligned_b, scale)
+    mask_a = edges_a > 0
+    mask_b = edges_b > 0
+    count_a = int(np.count_nonzero(mask_a))
+    count_b = int(np.count_nonzero(mask_b))
+
+    if count_a == 0 or count_b == 0:
+        return AlignmentQuality(
+            score=0.0,
+            chamfer_score=0.0,
+            edge_overlap=0.0,
+            mean_distance_px=distance_cap_px / scale,
+            sample_scale=scale,
+            edge_pixels_a=count_a,
+            edge_pixels_b=count_b,
+        )
+
+    dist_a_to_b = _distance_to_edges(edges_b)[mask_a]
+    dist_b_to_a = _distance_to_edges(edges_a)[mask_b]
+
+    mean_distance = (float(dist_a_to_b.mean()) + float(dist_b_to_a.mean())) / 2
+    truncated = (
+        float(np.minimum(dist_a_to_b, distance_cap_px).mean())
+        + float(np.minimum(dist_b_to_a, distance_cap_px).mean())
+    ) / 2
+    chamfer_score = 1.0 - truncated / distance_cap_px
+
+    precision = float(np.count_nonzero(dist_a_to_b <= tolerance_px)) / count_a
+    recall = float(np.count_nonzero(dist_b_to_a <= tolerance_px)) / count_b
+    edge_overlap = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+
+    return AlignmentQuality(
+        score=(chamfer_score + edge_overlap) / 2,
+        chamfer_score=chamfer_score,
+        edge_overlap=edge_overlap,
+        mean_distance_px=mean_distance / scale,
+        sample_scale=scale,
+        edge_pixels_a=count_a,
+        edge_pixels_b=count_b,
+    )
@@ -0,0 +1,160 @@
+"""Process-local LRU cache of decoded (and downsampled) block images.
+
+Interactive jobs such as manual re-alignment touch the same pair of blocks
+repeatedly while a user nudges their control points. Decoding a 300 DPI
+block PNG costs far more than the warp itself, so decoded RGB arrays are kept
+in memory under a byte budget and evicted least-recently-used first.
+
+Entries are keyed by ``(key, max_dim)`` where ``max_dim`` is ``None`` for the
+full-resolution image. Downsampled variants are derived from a cached
+full-resolution image when one is present, otherwise from a fresh decode.
+
+Key functions:
+- get_image_cache(): Shared cache for the worker process
+- DecodedImageCache.get_or_load(): Fetch a cached image or decode it
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def downsample_to_max_dim(image: np.ndarray, max_dim: int) -> tuple[np.ndarray, float]:
+    """Downsample so the longest edge is at most ``max_dim``.
+
+    Returns:
+        (image, scale) where scale is 1.0 if no resize was needed
+    """
+    scale = min(1.0, max_dim / max(image.shape[:2]))
+    if scale >= 1.0:
+        return image, 1.0
+    resized = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return resized, scale
+
+
+class CachedImage(NamedTuple):
+    """Decoded RGB image and its scale relative to the full-resolution source."""
+
+    image: np.ndarray
+    scale: float
+
+
+class DecodedImageCache:
+    """Thread-safe LRU cache of decoded RGB images bounded by total bytes."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, int | None], CachedImage] = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, max_dim: int | None = None) -> CachedImage | None:
+        with self._lock:
+            entry = self._entries.get((key, max_dim))
+            if entry is not None:
+                self._entries.move_to_end((key, max_dim))
+            return entry
+
+    def put(self, key: str, entry: CachedImage, max_dim: int | None = None) -> None:
+        if entry.image.nbytes > self.max_bytes:
+            return
+        # Cached arrays are shared between jobs; guard against in-place edits.
+        entry.image.flags.writeable = False
+        with self._lock:
+            existing = self._entries.pop((key, max_dim), None)
+            if existing is not None:
+                self._size_bytes -= existing.image.nbytes
+            self._entries[(key, max_dim)] = entry
+            self._size_bytes += entry.image.nbytes
+            while self._size_bytes > self.max_bytes and self._entries:
+                (evicted_key, evicted_dim), evicted = self._entries.popitem(last=False)
+                self._size_bytes -= evicted.image.nbytes
+                logger.debug(
+                    "[image_cache.evict] key=%s max_dim=%s size_mb=%.1f",
+                    evicted_key,
+                    evicted_dim,
+                    evicted.image.nbytes / (1024 * 1024),
+                )
+
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], np.ndarray],
+        max_dim: int | None = None,
+    ) -> CachedImage:
+        """Return the cached image for ``key``, decoding it with ``loader`` on a miss.
+
+        Args:
+            key: Stable identity of the source image (e.g. block id + URI)
+            loader: Returns the full-resolution RGB image
+            max_dim: Longest edge of the requested variant, None for full resolution
+
+        Returns:
+            CachedImage with a read-only RGB array and its scale vs. full resolution
+        """
+        cached = self.get(key, max_dim)
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        full = self.get(key) if max_dim is not None else None
+        if full is None:
+            full = CachedImage(loader(), 1.0)
+            self.put(key, full)
+        if max_dim is None:
+            return full
+
+        small, scale = downsample_to_max_dim(full.image, max_dim)
+        if scale >= 1.0:
+            return full
+        entry = CachedImage(small, scale)
+        self.put(key, entry, max_dim)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+
+_image_cache: DecodedImageCache | None = None
+
+
+def get_image_cache() -> DecodedImageCache:
+    """Get or create the shared decoded image cache (singleton)."""
+    global _image_cache
+    if _image_cache is None:
+        from config import config
+
+        _image_cache = DecodedImageCache(max_bytes=config.image_cache_max_bytes)
+    return _image_cache
+
+
+def clear_image_cache() -> None:
+    """Drop the shared cache (tests and shutdown)."""
+    global _image_cache
+    if _image_cache is not None:
+        _image_cache.clear()
+    _image_cache = None
@@ -22,6 +22,8 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from utils.metrics import LLM_COST, LLM_TOKENS
+
 # Cost per 1M tokens by model
 LLM_COST_TABLE: dict[str, dict[str, float]] = {
     "gemini-2.5-flash": {"input": 0.30, "output": 2.50, "cached": 0.03},
@@ -38,6 +40,38 @@ class ModelUsage(BaseModel):
     thinking_tokens: int = 0
     cached_tokens: int = 0
 
+    @classmethod
+    def from_metadata(cls, usage_metadata: Any) -> ModelUsage:
+        """Token counts of a single Gemini response's usage_metadata."""
+        return cls(
+            input_tokens=getattr(usage_metadata, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage_metadata, "candidates_token_count", 0) or 0,
+            thinking_tokens=getattr(usage_metadata, "thoughts_token_count", 0) or 0,
+            cached_tokens=getattr(usage_metadata, "cached_content_token_count", 0) or 0,
+        )
+
+    def add(self, other: ModelUsage) -> None:
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.thinking_tokens += other.thinking_tokens
+        self.cached_tokens += other.cached_tokens
+
+    def cost(self, model_costs: dict[str, float]) -> float:
+        """Cost in USD at the given per-1M-token rates."""
+        # Cached tokens are billed at cached rate, remaining input at full rate
+        cached = self.cached_tokens
+        non_cached_input = self.input_tokens - cached
+
+        cached_cost = (cached / 1_000_000) * model_costs.get("cached", 0)
+        input_cost = (non_cached_input / 1_000_000) * model_costs.get("input", 0)
+
+        # Thinking tokens billed at output rate
+        output_cost = ((self.output_tokens + self.thinking_tokens) / 1_000_000) * model_costs.get(
+            "output", 0
+        )
+
+        return input_cost + cached_cost + output_cost
+
     def to_dict(self) -> dict[str, int]:
         """Convert to camelCase dict for JSON serialization."""
         return {
@@ -66,11 +100,7 @@ class LLMUsage(BaseModel):
         if model not in self.usage_by_model:
             self.usage_by_model[model] = ModelUsage()
 
-        usage = self.usage_by_model[model]
-        usage.input_tokens += getattr(usage_metadata, "prompt_token_count", 0) or 0
-        usage.output_tokens += getattr(usage_metadata, "candidates_token_count", 0) or 0
-        usage.thinking_tokens += getattr(usage_metadata, "thoughts_token_count", 0) or 0
-        usage.cached_tokens += getattr(usage_metadata, "cached_content_token_count", 0) or 0
+        self.usage_by_model[model].add(ModelUsage.from_metadata(usage_metadata))
 
     def calculate_cost(self, cost_table: dict[str, dict[str, float]] | None = None) -> float:
         """Calculate total cost in USD.
@@ -84,25 +114,9 @@ class LLMUsage(BaseModel):
         if cost_table is None:
             cost_table = LLM_COST_TABLE
 
-        total = 0.0
-        for model, usage in self.usage_by_model.items():
-            model_costs = cost_table.get(model, {"input": 0, "output": 0, "cached": 0})
-
-            # Cached tokens are billed at cached rate, remaining input at full rate
-            cached = usage.cached_tokens
-            non_cached_input = usage.input_tokens - cached
-
-            cached_cost = (cached / 1_000_000) * model_costs.get("cached", 0)
-            input_cost = (non_cached_input / 1_000_000) * model_costs.get("input", 0)
-
-            # Thinking tokens billed at output rate
-            output_cost = (
-                (usage.output_tokens + usage.thinking_tokens) / 1_000_000
-            ) * model_costs.get("output", 0)
-
-            total += input_cost + cached_cost + output_cost
-
-        return total
+        return sum(
+            usage.cost(cost_table.get(model, {})) for model, usage in self.usage_by_model.items()
+        )
 
     def to_event_dict(self) -> dict[str, Any]:
         """Convert to dict format for job event llmUsage field.
@@ -164,13 +178,51 @@ def track_usage(model: str, usage_metadata: Any) -> None:
         usage_metadata: The usage_metadata from a Gemini response
 
     Note:
-        Does nothing if tracking hasn't been started.
+        Worker metrics are always updated; the per-job tracker only if started.
     """
+    if usage_metadata is not None:
+        _record_usage_metrics(model, ModelUsage.from_metadata(usage_metadata))
     usage = _current_usage.get()
     if usage is not None:
         usage.track(model, usage_metadata)
 
 
+def _token_count(obj: Any, name: str) -> int:
+    value = getattr(obj, name, None)
+    return value if isinstance(value, int) else 0
+
+
+def track_openai_usage(model: str, usage: Any) -> None:
+    """Track usage from an OpenAI chat completion's ``usage`` for the current job."""
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    reasoning = _token_count(getattr(usage, "completion_tokens_details", None), "reasoning_tokens")
+    model_usage = ModelUsage(
+        input_tokens=_token_count(usage, "prompt_tokens"),
+        # completion_tokens includes reasoning tokens; keep them separate as thinking
+        output_tokens=max(_token_count(usage, "completion_tokens") - reasoning, 0),
+        thinking_tokens=reasoning,
+        cached_tokens=_token_count(details, "cached_tokens"),
+    )
+    _record_usage_metrics(model, model_usage)
+    tracker = _current_usage.get()
+    if tracker is not None:
+        tracker.usage_by_model.setdefault(model, ModelUsage()).add(model_usage)
+
+
+def _record_usage_metrics(model: str, usage: ModelUsage) -> None:
+    for kind, tokens in (
+        ("input", usage.input_tokens),
+        ("output", usage.output_tokens),
+        ("thinking", usage.thinking_tokens),
+        ("cached", usage.cached_tokens),
+    ):
+        if tokens:
+            LLM_TOKENS.inc(tokens, model=model, kind=kind)
+    LLM_COST.inc(usage.cost(LLM_COST_TABLE.get(model, {})), model=model)
+
+
 def stop_tracking() -> LLMUsage | None:
     """Stop tracking and return the accumulated usage.
 
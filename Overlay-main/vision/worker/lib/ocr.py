@@ -14,6 +14,7 @@ import fitz  # PyMuPDF
 from openai import OpenAI
 from PIL import Image
 
+from lib.llm_usage import track_openai_usage
 from utils.log_utils import log_ocr_completed
 
 logger = logging.getLogger(__name__)
@@ -178,6 +179,7 @@ def extract_drawing_no_with_vllm(
                 }
             ],
         )
+        track_openai_usage("gpt-5-mini", getattr(response, "usage", None))
         text = response.choices[0].message.content
 
         # Log OCR completion with character count
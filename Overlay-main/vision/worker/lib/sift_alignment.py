@@ -8,9 +8,11 @@ Key functions:
 - sift_align(): Main entry point for SIFT-based alignment
 - extract_sift_features(): Extract SIFT keypoints and descriptors
 - match_features(): Match features with Lowe's ratio test
+- read_png_size(): Image dimensions from the PNG header, without decoding
 """
 
 import gc
+import struct
 from enum import Enum
 from typing import Literal
 
@@ -59,6 +61,16 @@ class AlignmentStats(BaseModel):
 # Construction drawings at 300 DPI can be very large (e.g., 24x36 inch = 216M pixels)
 Image.MAX_IMAGE_PIXELS = 250_000_000  # 250 million pixels (~16,000 x 16,000)
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def read_png_size(data: bytes) -> tuple[int, int] | None:
+    """Return (width, height) from a PNG's IHDR chunk, or None if not a PNG."""
+    if len(data) < 24 or not data.startswith(PNG_SIGNATURE) or data[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", data[16:24])
+    return width, height
+
 
 def _load_image_from_bytes(png_bytes: bytes) -> np.ndarray:
     """Decode PNG bytes to NumPy array (RGB format).
@@ -0,0 +1,258 @@
+"""Deep-zoom tile pyramid generation for large overlay and sheet images.
+
+Builds a DZI-compatible pyramid (Deep Zoom Image layout, as consumed by
+OpenSeadragon and most XYZ tile viewers) so the frontend can fetch only the
+tiles in the current viewport instead of the full-resolution PNG.
+
+Layout (DZI conventions):
+- Level ``max_level`` is the full-resolution image, where
+  ``max_level = ceil(log2(max(width, height)))``.
+- Each lower level halves both dimensions (rounded up).
+- Levels below ``min_level`` (where the whole image fits in a single tile)
+  are not generated.
+- Tiles are stored at ``{base_path}/{level}/{column}_{row}.png``.
+
+Key functions:
+- plan_tile_pyramid(): Compute level geometry without touching pixels
+- render_tile_pyramid(): Encode every tile of every level to PNG bytes
+- upload_tile_pyramid(): Upload rendered tiles in parallel, return manifest
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple
+
+import cv2
+import numpy as np
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+MIN_TILE_SIZE = 256
+MAX_TILE_SIZE = 512
+DEFAULT_TILE_SIZE = 256
+TILE_FORMAT = "png"
+
+
+class TileLevel(BaseModel):
+    """Geometry of a single pyramid level."""
+
+    level: int = Field(..., description="DZI level number (max_level is full resolution)")
+    width: int = Field(..., description="Level width in pixels")
+    height: int = Field(..., description="Level height in pixels")
+    columns: int = Field(..., description="Number of tile columns")
+    rows: int = Field(..., description="Number of tile rows")
+
+
+class TilePyramid(BaseModel):
+    """Geometry of a full tile pyramid."""
+
+    width: int = Field(..., description="Full-resolution width in pixels")
+    height: int = Field(..., description="Full-resolution height in pixels")
+    tile_size: int = Field(..., description="Tile edge length in pixels")
+    min_level: int = Field(..., description="Lowest generated level (fits in one tile)")
+    max_level: int = Field(..., description="Full-resolution level")
+    levels: list[TileLevel] = Field(..., description="Generated levels, lowest first")
+
+    @property
+    def tile_count(self) -> int:
+        return sum(level.columns * level.rows for level in self.levels)
+
+    def to_manifest(self, base_path: str) -> dict[str, Any]:
+        """Serialize pyramid geometry for storage on an Overlay/Sheet record.
+
+        Args:
+            base_path: Storage path prefix holding ``{level}/{column}_{row}.png``
+
+        Returns:
+            JSON-serializable manifest with camelCase keys
+        """
+        return {
+            "format": "dzi",
+            "basePath": base_path,
+            "tileFormat": TILE_FORMAT,
+            "tileSize": self.tile_size,
+            "overlap": 0,
+            "width": self.width,
+            "height": self.height,
+            "minLevel": self.min_level,
+            "maxLevel": self.max_level,
+            "tileCount": self.tile_count,
+        }
+
+
+class Tile(NamedTuple):
+    """A single encoded tile."""
+
+    level: int
+    column: int
+    row: int
+    data: bytes
+
+
+class RenderedPyramid(NamedTuple):
+    """Pyramid geometry plus encoded tiles."""
+
+    pyramid: TilePyramid
+    tiles: list[Tile]
+
+
+def tile_path(base_path: str, level: int, column: int, row: int) -> str:
+    """Return the storage path of a tile under ``base_path``."""
+    return f"{base_path}/{level}/{column}_{row}.{TILE_FORMAT}"
+
+
+def _validate_tile_size(tile_size: int) -> None:
+    if not MIN_TILE_SIZE <= tile_size <= MAX_TILE_SIZE:
+        raise ValueError(
+            f"tile_size must be between {MIN_TILE_SIZE} and {MAX_TILE_SIZE}, got {tile_size}"
+        )
+
+
+def plan_tile_pyramid(width: int, height: int, tile_size: int = DEFAULT_TILE_SIZE) -> TilePyramid:
+    """Compute pyramid geometry for an image of the given size.
+
+    Args:
+        width: Full-resolution width in pixels
+        height: Full-resolution height in pixels
+        tile_size: Tile edge length (256-512)
+
+    Returns:
+        TilePyramid with levels ordered lowest (coarsest) first
+
+    Raises:
+        ValueError: If dimensions or tile size are invalid
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Image dimensions must be positive, got {width}x{height}")
+    _validate_tile_size(tile_size)
+
+    max_level = math.ceil(math.log2(max(width, height))) if max(width, height) > 1 else 0
+    levels: list[TileLevel] = []
+    level_w, level_h = width, height
+    for level in range(max_level, -1, -1):
+        levels.append(
+            TileLevel(
+                level=level,
+                width=level_w,
+                height=level_h,
+                columns=math.ceil(level_w / tile_size),
+                rows=math.ceil(level_h / tile_size),
+            )
+        )
+        if level_w <= tile_size and level_h <= tile_size:
+            break
+        level_w = max(1, math.ceil(level_w / 2))
+        level_h = max(1, math.ceil(level_h / 2))
+
+    levels.reverse()
+    return TilePyramid(
+        width=width,
+        height=height,
+        tile_size=tile_size,
+        min_level=levels[0].level,
+        max_level=max_level,
+        levels=levels,
+    )
+
+
+def _encode_tile(tile_rgb: np.ndarray) -> bytes:
+    tile_bgr = cv2.cvtColor(tile_rgb, cv2.COLOR_RGB2BGR)
+    success, encoded = cv2.imencode(".png", tile_bgr)
+    if not success:
+        raise RuntimeError("Failed to encode tile as PNG")
+    return encoded.tobytes()
+
+
+def iter_tiles(image: np.ndarray, pyramid: TilePyramid) -> Iterator[Tile]:
+    """Yield encoded tiles from full resolution down to ``min_level``.
+
+    Each level is derived from the previous one with area interpolation,
+    so only one intermediate level is held in memory at a time.
+
+    Args:
+        image: RGB image (H, W, 3) uint8 matching the pyramid dimensions
+        pyramid: Geometry from plan_tile_pyramid()
+
+    Yields:
+        Tile tuples with PNG-encoded data
+    """
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError(f"Expected RGB image with shape (H, W, 3), got {image.shape}")
+    if (image.shape[1], image.shape[0]) != (pyramid.width, pyramid.height):
+        raise ValueError(
+            f"Image size {image.shape[1]}x{image.shape[0]} does not match pyramid "
+            f"{pyramid.width}x{pyramid.height}"
+        )
+
+    size = pyramid.tile_size
+    level_img = image
+    for level in reversed(pyramid.levels):
+        if (level_img.shape[1], level_img.shape[0]) != (level.width, level.height):
+            level_img = cv2.resize(
+                level_img, (level.width, level.height), interpolation=cv2.INTER_AREA
+            )
+        for row in range(level.rows):
+            for column in range(level.columns):
+                tile = level_img[row * size : (row + 1) * size, column * size : (column + 1) * size]
+                yield Tile(level.level, column, row, _encode_tile(tile))
+
+
+def render_tile_pyramid(image: np.ndarray, tile_size: int = DEFAULT_TILE_SIZE) -> RenderedPyramid:
+    """Plan and encode a complete tile pyramid for an RGB image.
+
+    Args:
+        image: RGB image (H, W, 3) uint8
+        tile_size: Tile edge length (256-512)
+
+    Returns:
+        RenderedPyramid with geometry and all encoded tiles
+    """
+    pyramid = plan_tile_pyramid(image.shape[1], image.shape[0], tile_size)
+    return RenderedPyramid(pyramid=pyramid, tiles=list(iter_tiles(image, pyramid)))
+
+
+def upload_tile_pyramid(
+    storage_client,
+    rendered: RenderedPyramid,
+    base_path: str,
+    *,
+    max_workers: int = 8,
+) -> dict[str, Any]:
+    """Upload rendered tiles in parallel and return the pyramid manifest.
+
+    Args:
+        storage_client: Storage client exposing upload_from_bytes()
+        rendered: Output of render_tile_pyramid()
+        base_path: Storage path prefix for the pyramid
+        max_workers: Number of concurrent uploads
+
+    Returns:
+        Manifest dict (see TilePyramid.to_manifest)
+    """
+    start = time.time()
+
+    def _upload(tile: Tile) -> int:
+        storage_client.upload_from_bytes(
+            tile.data,
+            tile_path(base_path, tile.level, tile.column, tile.row),
+            content_type="image/png",
+        )
+        return len(tile.data)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        total_bytes = sum(executor.map(_upload, rendered.tiles))
+
+    logger.info(
+        "[storage.tiles_uploaded] path=%s tiles=%d size_kb=%.1f duration_ms=%d",
+        base_path,
+        len(rendered.tiles),
+        total_bytes / 1024,
+        int((time.time() - start) * 1000),
+    )
+    return rendered.pyramid.to_manifest(base_path)
@@ -33,6 +33,7 @@ from utils.log_utils import (
     log_worker_starting,
     set_trace_context,
 )
+from utils.metrics import render_metrics
 
 # Configure logging and PIL settings
 configure_logging(config.worker_log_level)
@@ -44,7 +45,7 @@ worker_healthy = False  # Set to True once worker is ready
 
 
 class HealthCheckHandler(BaseHTTPRequestHandler):
-    """Simple HTTP handler for Cloud Run health checks."""
+    """Simple HTTP handler for Cloud Run health checks and Prometheus metrics."""
     
     def do_GET(self):
         """Handle GET requests for health checks."""
@@ -59,6 +60,13 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
                 self.send_header("Content-type", "text/plain")
                 self.end_headers()
                 self.wfile.write(b"Not Ready")
+        elif self.path == "/metrics":
+            body = render_metrics().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
         else:
             self.send_response(404)
             self.end_headers()
@@ -204,6 +212,8 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
 
     log_worker_starting(logger)
+    process_executor = None
+    outbox_relay = None
 
     # Start health check server in background thread (for Cloud Run)
     health_thread = threading.Thread(
@@ -232,8 +242,10 @@ def main():
             max_lease_seconds=config.worker_max_lease_duration_seconds,
         )
 
+        # Thread and process slots are separate, so lease enough messages for both
         flow_control_kwargs = {
-            "max_messages": config.worker_max_concurrent_messages,
+            "max_messages": config.worker_max_concurrent_messages
+            + config.worker_process_concurrency,
             "max_bytes": config.worker_max_memory_bytes,
         }
         try:
@@ -270,9 +282,40 @@ def main():
         log_worker_ready(logger)
         worker_healthy = True  # Mark as healthy for Cloud Run health checks
 
+        from jobs.admission import (
+            AdmissionDeferred,
+            build_admission,
+            deferred_redelivery_seconds,
+        )
+        from jobs.executor import ProcessJobExecutor
+        from jobs.heartbeat import DuplicateDelivery, duplicate_redelivery_seconds
+        from jobs.outbox import build_outbox_relay
         from jobs.runner import JobRunner
 
-        job_runner = JobRunner(logger=logger)
+        # Publishes the job messages that fan-outs queue in the job_outbox table
+        outbox_relay = build_outbox_relay(pubsub_client)
+        if outbox_relay is not None:
+            outbox_relay.start()
+            logger.info("[outbox.relay] started")
+
+        if config.worker_process_concurrency > 0:
+            process_executor = ProcessJobExecutor(
+                config.worker_process_concurrency,
+                log_level=config.worker_log_level,
+            )
+            logger.info(
+                f"[worker.process_pool] {config.worker_process_concurrency} processes "
+                "for CPU-bound jobs"
+            )
+        admission = build_admission()
+        job_runner = JobRunner(
+            logger=logger,
+            process_executor=process_executor,
+            thread_concurrency=config.worker_max_concurrent_messages,
+            throughput_window_seconds=config.worker_throughput_log_interval_seconds,
+            admission=admission[0] if admission else None,
+            memory_model=admission[1] if admission else None,
+        )
 
         def handle_job_message(message):
             """Handle incoming job messages."""
@@ -288,11 +331,39 @@ def main():
                     data,
                     message_id=message.message_id,
                     job_type_hint=job_type,
+                    extend_lease=message.modify_ack_deadline,
                 )
 
                 log_message_acked(logger, message.message_id, job_label)
                 message.ack()
 
+            except DuplicateDelivery as e:
+                # Another worker holds this job. Acking here would settle the message
+                # even if that run fails; instead hold the delivery until the owner's
+                # heartbeat could go stale and release it without acking. The owner's
+                # ack settles it, otherwise it is redelivered and checked again.
+                redelivery_seconds = duplicate_redelivery_seconds()
+                logger.info(
+                    f"[job.duplicate] {job_label} msg-{message.message_id[:8]}: {e}; "
+                    f"redelivery in {redelivery_seconds}s unless the owner acks"
+                )
+                log_message_nacked(
+                    logger, message.message_id, job_label, reason="duplicate_delivery"
+                )
+                message.modify_ack_deadline(redelivery_seconds)
+                message.drop()
+
+            except AdmissionDeferred as e:
+                # Not enough memory for this job right now. A plain nack is redelivered
+                # at once, usually back to this busy worker; hold it back instead.
+                redelivery_seconds = deferred_redelivery_seconds()
+                logger.info(
+                    f"[admission.deferred] {job_label} msg-{message.message_id[:8]}: {e}; "
+                    f"redelivery in {redelivery_seconds}s"
+                )
+                log_message_nacked(logger, message.message_id, job_label, reason="memory_budget")
+                message.modify_ack_deadline(redelivery_seconds)
+                message.drop()
             except Exception as e:
                 if is_permanent_job_error(e):
                     log_job_failed_permanent(logger, job_label, message.message_id, e)
@@ -358,6 +429,12 @@ def main():
         sys.exit(1)
     finally:
         log_worker_shutdown(logger)
+        if outbox_relay is not None:
+            outbox_relay.stop()
+            logger.info("[outbox.relay] stopped")
+        if process_executor is not None:
+            process_executor.shutdown()
+            logger.info("[worker.process_pool] stopped")
         close_engine()
         logger.info("[db.closed] connection pool closed")
         logger.info("[worker.stopped]")
@@ -95,6 +95,51 @@ class Drawing(SQLModel, table=True):
     filename: str | None = Field(default=None, sa_column=Column("filename", String))
     name: str | None = Field(default=None, sa_column=Column("name", String))
     uri: str = Field(sa_column=Column("uri", String, nullable=False))
+    # sha256 of the PDF; drawings with the same contents are cloned, not reprocessed
+    content_hash: str | None = Field(
+        default=None, sa_column=Column("content_hash", String, nullable=True)
+    )
+
+
+class DrawingProgress(SQLModel, table=True):
+    """Preprocessing progress counters of a drawing, maintained by the worker."""
+
+    __tablename__ = "drawing_progress"
+
+    drawing_id: str = Field(
+        sa_column=Column("drawing_id", String, ForeignKey("drawings.id"), primary_key=True)
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column("created_at", DateTime(timezone=True), nullable=False),
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column("updated_at", DateTime(timezone=True), nullable=False),
+    )
+    job_id: str | None = Field(default=None, sa_column=Column("job_id", String, nullable=True))
+    job_status: JobStatus = Field(
+        default=JobStatus.QUEUED,
+        sa_column=Column(
+            "job_status",
+            SAEnum(
+                JobStatus,
+                name="JobStatus",
+                native_enum=True,
+                create_type=False,
+                values_callable=_enum_values,
+            ),
+            nullable=False,
+        ),
+    )
+    sheets_total: int = Field(default=0, sa_column=Column("sheets_total", Integer, nullable=False))
+    sheets_completed: int = Field(
+        default=0, sa_column=Column("sheets_completed", Integer, nullable=False)
+    )
+    sheets_failed: int = Field(
+        default=0, sa_column=Column("sheets_failed", Integer, nullable=False)
+    )
+    block_count: int = Field(default=0, sa_column=Column("block_count", Integer, nullable=False))
 
 
 class Project(SQLModel, table=True):
@@ -206,6 +251,9 @@ class Block(SQLModel, table=True):
         default=None,
         sa_column=Column("metadata", JSON, nullable=True),
     )
+    content_hash: str | None = Field(
+        default=None, sa_column=Column("content_hash", String, nullable=True)
+    )
 
 
 class Overlay(SQLModel, table=True):
@@ -262,6 +310,33 @@ class Overlay(SQLModel, table=True):
     )
 
 
+class OverlayResult(SQLModel, table=True):
+    """Content-addressed overlay render result, shared by overlays of identical block pairs."""
+
+    __tablename__ = "overlay_results"
+
+    key: str = Field(sa_column=Column("key", String, primary_key=True))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column("created_at", DateTime(timezone=True), nullable=False),
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column("updated_at", DateTime(timezone=True), nullable=False),
+    )
+    block_a_hash: str = Field(sa_column=Column("block_a_hash", String, nullable=False))
+    block_b_hash: str = Field(sa_column=Column("block_b_hash", String, nullable=False))
+    params_hash: str = Field(sa_column=Column("params_hash", String, nullable=False))
+    uri: str = Field(sa_column=Column("uri", String, nullable=False))
+    addition_uri: str = Field(sa_column=Column("addition_uri", String, nullable=False))
+    deletion_uri: str = Field(sa_column=Column("deletion_uri", String, nullable=False))
+    score: float | None = Field(default=None, sa_column=Column("score", Float, nullable=True))
+    summary: dict[str, Any] | None = Field(
+        default=None,
+        sa_column=Column("summary", JSON, nullable=True),
+    )
+
+
 class Job(SQLModel, table=True):
     """Tracks background processing for drawings, sheets, and overlays."""
 
@@ -310,3 +385,39 @@ class Job(SQLModel, table=True):
         default=None,
         sa_column=Column("events", JSON, nullable=True),
     )
+    heartbeat_at: datetime | None = Field(
+        default=None,
+        sa_column=Column("heartbeat_at", DateTime(timezone=True), nullable=True),
+    )
+
+
+class JobOutbox(SQLModel, table=True):
+    """Job message waiting to be published (transactional outbox).
+
+    Written in the same transaction as its job and deleted by the outbox
+    relay once Pub/Sub accepted it.
+    """
+
+    __tablename__ = "job_outbox"
+
+    id: str = Field(sa_column=Column("id", String, primary_key=True))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column("created_at", DateTime(timezone=True), nullable=False),
+    )
+    job_id: str = Field(sa_column=Column("job_id", String, nullable=False, unique=True))
+    topic: str = Field(sa_column=Column("topic", String, nullable=False))
+    message: dict[str, Any] = Field(sa_column=Column("message", JSON, nullable=False))
+    attributes: dict[str, Any] | None = Field(
+        default=None, sa_column=Column("attributes", JSON, nullable=True)
+    )
+    attempts: int = Field(
+        default=0, sa_column=Column("attempts", Integer, nullable=False, default=0)
+    )
+    available_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_column=Column("available_at", DateTime(timezone=True), nullable=False),
+    )
+    last_error: str | None = Field(
+        default=None, sa_column=Column("last_error", String, nullable=True)
+    )
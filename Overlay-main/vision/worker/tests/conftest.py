@@ -8,6 +8,86 @@ from pathlib import Path
 import pytest
 
 
+class RecordingResult:
+    """Query result stand-in for the accessors the worker uses."""
+
+    def __init__(self, rows=(), rowcount: int = 1):
+        self.rows = list(rows or ())
+        self.rowcount = rowcount
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def one(self):
+        (row,) = self.rows
+        return row
+
+
+class RecordingSession:
+    """Session stand-in that records statements and rows instead of running SQL.
+
+    ``exec`` and ``scalars`` serve the queued ``results`` (row lists) in call
+    order, then empty results; ``execute`` returns a result with ``rowcount``.
+    ``get`` serves ``rows`` by model and id. What SQL actually does with the
+    statements is covered by the Postgres tests in tests/integration.
+    """
+
+    def __init__(self, *results, rowcount: int = 1, rows=()):
+        self.results = list(results)
+        self.rowcount = rowcount
+        self.rows = {(type(row), row.id): row for row in rows}
+        self.executed = []
+        self.parameters = []
+        self.added = []
+        self.refreshed = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def _query(self, statement):
+        self.executed.append(statement)
+        return RecordingResult(self.results.pop(0) if self.results else (), self.rowcount)
+
+    def exec(self, statement):
+        return self._query(statement)
+
+    def scalars(self, statement):
+        return self._query(statement)
+
+    def execute(self, statement, params=None):
+        self.executed.append(statement)
+        if params is not None:
+            self.parameters.append(params)
+        return RecordingResult(rowcount=self.rowcount)
+
+    def get(self, model, row_id):
+        return self.rows.get((model, row_id))
+
+    def add(self, row):
+        self.added.append(row)
+
+    def refresh(self, row):
+        self.refreshed.append(row)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def recording_session():
+    """RecordingSession factory: ``recording_session(*results, rowcount=1, rows=())``."""
+    return RecordingSession
+
+
 @pytest.fixture(autouse=True, scope="session")
 def test_env_vars():
     """Provide required config env vars for tests."""
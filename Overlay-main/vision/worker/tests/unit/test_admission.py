@@ -0,0 +1,143 @@
+"""Unit tests for admission.py."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import config as config_module
+from config import Config
+from jobs.admission import (
+    MAX_WAIT_SECONDS,
+    AdmissionController,
+    AdmissionDeferred,
+    MemoryModel,
+    build_admission,
+    deferred_redelivery_seconds,
+    sheet_pixels,
+)
+from jobs.types import JobType
+from lib.sift_alignment import _encode_image_to_png, read_png_size
+from models import Sheet
+
+MB = 1024 * 1024
+
+
+class TestMemoryModel:
+    """Tests for pixel-based memory estimates and calibration."""
+
+    def test_estimate_scales_with_pixels(self):
+        """Test estimates are base plus pixels times the job type's factor."""
+        model = MemoryModel(
+            base_bytes=10 * MB,
+            default_job_bytes=100 * MB,
+            bytes_per_pixel={JobType.BLOCK_OVERLAY_GENERATE: 50.0},
+        )
+
+        assert model.estimate(JobType.BLOCK_OVERLAY_GENERATE, 1_000_000) == 10 * MB + 50_000_000
+        assert model.estimate(JobType.BLOCK_OVERLAY_GENERATE, None) == 100 * MB
+        assert model.estimate(JobType.SHEET_ANALYSIS, 1_000_000) == 100 * MB
+
+    def test_observe_moves_factor_towards_measurement(self):
+        """Test calibration pulls the factor towards observed peaks."""
+        model = MemoryModel(
+            base_bytes=0,
+            default_job_bytes=0,
+            bytes_per_pixel={JobType.BLOCK_OVERLAY_GENERATE: 50.0},
+            alpha=0.5,
+        )
+
+        model.observe(JobType.BLOCK_OVERLAY_GENERATE, 1_000_000, 100_000_000)
+        raised = model.bytes_per_pixel(JobType.BLOCK_OVERLAY_GENERATE)
+        model.observe(JobType.BLOCK_OVERLAY_GENERATE, 1_000_000, 10_000_000)
+        lowered = model.bytes_per_pixel(JobType.BLOCK_OVERLAY_GENERATE)
+
+        assert raised == pytest.approx(75.0)
+        # Decreases are damped
+        assert 60.0 < lowered < raised
+
+
+class TestAdmissionController:
+    """Tests for budget-based job admission."""
+
+    def test_smaller_job_is_admitted_while_larger_waits(self):
+        """Test a job that fits starts even while a larger one cannot."""
+        controller = AdmissionController(100 * MB, max_wait_seconds=0.05)
+
+        with controller.admit("a", 70 * MB):
+            with pytest.raises(AdmissionDeferred):
+                with controller.admit("b", 50 * MB):
+                    pass
+            with controller.admit("c", 20 * MB):
+                assert controller.reserved_bytes == 90 * MB
+
+        assert controller.reserved_bytes == 0
+
+    def test_oversized_job_runs_when_idle(self):
+        """Test a job larger than the budget is not starved forever."""
+        controller = AdmissionController(100 * MB, max_wait_seconds=0.05)
+
+        with controller.admit("big", 500 * MB) as ticket:
+            assert ticket.solo
+
+    def test_waiting_job_starts_when_memory_frees(self):
+        """Test a deferred job proceeds once a running job releases its reservation."""
+        controller = AdmissionController(100 * MB, max_wait_seconds=5)
+        started = threading.Event()
+
+        def waiter():
+            with controller.admit("b", 60 * MB):
+                started.set()
+
+        with controller.admit("a", 60 * MB) as first:
+            thread = threading.Thread(target=waiter)
+            thread.start()
+            time.sleep(0.05)
+            assert not started.is_set()
+        thread.join(timeout=5)
+
+        assert started.is_set()
+        assert first.solo
+
+    def test_wait_is_capped_below_the_ack_deadline(self, monkeypatch):
+        """Test a long configured wait cannot hold a callback thread past the cap."""
+        monkeypatch.setattr(
+            config_module,
+            "_config",
+            Config(admission_memory_budget_bytes=100 * MB, admission_max_wait_seconds=600),
+        )
+
+        controller, _ = build_admission()
+
+        assert controller.max_wait_seconds == MAX_WAIT_SECONDS
+
+    def test_deferred_redelivery_within_pubsub_limits(self, monkeypatch):
+        """Test the redelivery delay is clamped to the ack deadlines Pub/Sub accepts."""
+        for delay, expected in ((60, 60), (0, 10), (3600, 600)):
+            monkeypatch.setattr(
+                config_module, "_config", Config(admission_retry_delay_seconds=delay)
+            )
+            assert deferred_redelivery_seconds() == expected
+
+
+class TestSheetPixels:
+    """Tests for reading sheet sizes used by estimates."""
+
+    def test_reads_size_from_metadata_or_tiles(self):
+        """Test width/height come from sheet metadata, falling back to the tile manifest."""
+        direct = Sheet(drawing_id="d", index=0, uri="u", metadata_={"width": 30, "height": 20})
+        tiled = Sheet(
+            drawing_id="d", index=0, uri="u", metadata_={"tiles": {"width": 8, "height": 6}}
+        )
+
+        assert sheet_pixels(direct) == (30, 20)
+        assert sheet_pixels(tiled) == (8, 6)
+        assert sheet_pixels(Sheet(drawing_id="d", index=0, uri="u")) is None
+
+    def test_png_header_size(self):
+        """Test PNG dimensions are read without decoding."""
+        png = _encode_image_to_png(np.zeros((12, 34, 3), dtype=np.uint8))
+
+        assert read_png_size(png) == (34, 12)
+        assert read_png_size(b"not a png") is None
@@ -0,0 +1,61 @@
+"""Unit tests for alignment_quality.py."""
+
+import cv2
+import numpy as np
+import pytest
+
+from lib.alignment_quality import score_alignment
+
+
+def _line_drawing(offset: int = 0) -> np.ndarray:
+    """White RGB canvas with a black grid of lines and a few boxes."""
+    img = np.full((800, 800, 3), 255, dtype=np.uint8)
+    for pos in range(100, 800, 150):
+        cv2.line(img, (pos + offset, 0), (pos + offset, 799), (0, 0, 0), 2)
+        cv2.line(img, (0, pos + offset), (799, pos + offset), (0, 0, 0), 2)
+    cv2.rectangle(img, (220 + offset, 220 + offset), (380 + offset, 330 + offset), (0, 0, 0), 3)
+    return img
+
+
+class TestScoreAlignment:
+    """Tests for edge-agreement alignment scoring."""
+
+    def test_identical_images_score_high(self):
+        """Test a perfectly aligned pair scores close to 1."""
+        img = _line_drawing()
+
+        quality = score_alignment(img, img.copy())
+
+        assert quality.score > 0.99
+        assert quality.mean_distance_px == pytest.approx(0.0)
+        assert quality.sufficient_edges
+
+    def test_misaligned_images_score_low(self):
+        """Test a shifted pair scores well below an aligned pair."""
+        aligned = score_alignment(_line_drawing(), _line_drawing())
+        shifted = score_alignment(_line_drawing(), _line_drawing(offset=25))
+
+        assert shifted.score < 0.45
+        assert shifted.score < aligned.score
+        assert shifted.mean_distance_px > 5
+
+    def test_downsampled_band_reports_full_resolution_distance(self):
+        """Test distances are reported in full-resolution pixels after downsampling."""
+        quality = score_alignment(_line_drawing(), _line_drawing(offset=4), max_dim=400)
+
+        assert quality.sample_scale == pytest.approx(0.5)
+        assert 1.0 < quality.mean_distance_px < 10.0
+
+    def test_blank_images_have_insufficient_edges(self):
+        """Test blank inputs are flagged instead of scored as misaligned."""
+        blank = np.full((200, 200, 3), 255, dtype=np.uint8)
+
+        quality = score_alignment(blank, blank.copy())
+
+        assert not quality.sufficient_edges
+        assert quality.score == 0.0
+
+    def test_shape_mismatch_raises(self):
+        """Test mismatched shapes raise ValueError."""
+        with pytest.raises(ValueError):
+            score_alignment(np.zeros((10, 10, 3), np.uint8), np.zeros((10, 12, 3), np.uint8))
@@ -0,0 +1,107 @@
+"""Unit tests for connection pool sizing in clients/db.py."""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlmodel import Session
+
+import config as config_module
+from clients import db
+from config import Config
+
+
+@pytest.fixture
+def worker_config(monkeypatch):
+    def apply(**overrides):
+        monkeypatch.setattr(config_module, "_config", Config(**overrides))
+        monkeypatch.setattr(db, "_concurrent_jobs", None)
+
+    return apply
+
+
+class _ConnectionCounter:
+    """Tracks how many database connections are open at once."""
+
+    def __init__(self):
+        self.open = 0
+        self.peak_open = 0
+        self._lock = threading.Lock()
+
+    def attach(self, engine):
+        @event.listens_for(engine, "connect")
+        def on_connect(*_):
+            with self._lock:
+                self.open += 1
+                self.peak_open = max(self.peak_open, self.open)
+
+        @event.listens_for(engine, "close")
+        def on_close(*_):
+            with self._lock:
+                self.open -= 1
+
+
+class TestPoolOptions:
+    """Tests for pool sizing from worker concurrency."""
+
+    def test_sized_from_concurrent_messages(self, worker_config):
+        """Test the pool follows worker_max_concurrent_messages without pre-ping."""
+        worker_config(worker_max_concurrent_messages=4)
+
+        options = db.pool_options()
+
+        assert options["pool_size"] == 4
+        assert options["max_overflow"] == 4
+        assert options["pool_pre_ping"] is False
+        assert options["pool_recycle"] > 0
+
+    def test_worker_process_keeps_one_connection(self, worker_config):
+        """Test a process running one job at a time gets a single pooled connection."""
+        worker_config(worker_max_concurrent_messages=8, db_max_overflow=1)
+        db.configure_pool(concurrent_jobs=1)
+
+        options = db.pool_options()
+
+        assert (options["pool_size"], options["max_overflow"]) == (1, 1)
+
+    def test_external_pooler_disables_client_pool(self, worker_config):
+        """Test a transaction pooler gets no client-side pool."""
+        worker_config(db_external_pooler=True)
+
+        assert db.pool_options() == {"poolclass": NullPool}
+
+
+class TestBurstFanOut:
+    """Load test: connection counts stay bounded under a burst of sessions."""
+
+    def test_burst_reuses_bounded_connections(self, worker_config):
+        """Test bursts of 200 sessions from 32 threads never exceed the pool limit."""
+        worker_config(worker_max_concurrent_messages=3, db_pool_timeout_seconds=10)
+        options = db.pool_options()
+        limit = options["pool_size"] + options["max_overflow"]
+        engine = create_engine(
+            "sqlite://",
+            creator=lambda: sqlite3.connect(":memory:", check_same_thread=False),
+            poolclass=QueuePool,
+            **options,
+        )
+        counter = _ConnectionCounter()
+        counter.attach(engine)
+
+        def run_session(_):
+            with Session(engine) as session:
+                session.exec(text("SELECT 1"))
+                time.sleep(0.002)
+
+        for _ in range(3):
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                list(executor.map(run_session, range(200)))
+            # Overflow connections close on return; the steady pool stays open
+            assert counter.open == options["pool_size"]
+
+        assert counter.peak_open <= limit
+        engine.dispose()
@@ -0,0 +1,74 @@
+"""Unit tests for db_utils.py."""
+
+from datetime import UTC, datetime
+
+from sqlalchemy.dialects import postgresql
+
+from models import Job, JobStatus, Sheet
+from utils.db_utils import bulk_insert, column_values, upsert_returning
+
+
+def _sheet(index: int) -> Sheet:
+    return Sheet(
+        id=f"sheet-{index}",
+        drawing_id="drawing-1",
+        index=index,
+        uri=f"s3://bucket/{index}.png",
+        metadata_={"width": 100},
+        created_at=datetime.now(UTC),
+        updated_at=datetime.now(UTC),
+    )
+
+
+class TestColumnValues:
+    """Tests for mapping model instances to insert rows."""
+
+    def test_uses_column_names(self):
+        """Test attribute names are mapped to database column names."""
+        values = column_values(_sheet(0))
+
+        assert values["metadata"] == {"width": 100}
+        assert "metadata_" not in values
+
+    def test_skips_unset_server_defaults(self):
+        """Test None is left out for server-defaulted columns."""
+        sheet = _sheet(0)
+        sheet.id = None
+
+        assert "id" not in column_values(sheet)
+
+
+class TestBulkWrites:
+    """Tests for batched insert and upsert statements."""
+
+    def test_bulk_insert_is_one_statement(self, recording_session):
+        """Test all rows are sent with a single executemany insert."""
+        session = recording_session()
+        jobs = [
+            Job(id=f"job-{i}", type="vision.sheet.preprocess", status=JobStatus.QUEUED)
+            for i in range(3)
+        ]
+
+        bulk_insert(session, jobs)
+        bulk_insert(session, [])
+
+        (statement,) = session.executed
+        (rows,) = session.parameters
+        assert statement.table.name == "jobs"
+        assert [row["id"] for row in rows] == ["job-0", "job-1", "job-2"]
+
+    def test_upsert_compiles_on_conflict_returning(self, recording_session):
+        """Test upserts compile to a single ON CONFLICT ... RETURNING statement."""
+        session = recording_session()
+
+        upsert_returning(
+            session,
+            [_sheet(0), _sheet(1)],
+            conflict_columns=("drawing_id", "index"),
+            update=lambda excluded: {"uri": excluded.uri},
+        )
+
+        (statement,) = session.executed
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (drawing_id, index) DO UPDATE SET uri = excluded.uri" in sql
+        assert "RETURNING" in sql
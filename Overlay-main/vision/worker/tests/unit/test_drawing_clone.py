@@ -0,0 +1,151 @@
+"""Unit tests for drawing_clone.py."""
+
+import hashlib
+
+from sqlalchemy.dialects import postgresql
+
+from jobs.drawing_clone import (
+    clone_drawing_sheets,
+    find_processed_duplicate,
+    pdf_content_hash,
+    verified_upload_hash,
+)
+from models import Drawing, Sheet
+
+HASH = "ab" * 32
+
+
+class _Storage:
+    """Storage client whose bucket holds only the given paths."""
+
+    def __init__(self, *paths):
+        self.paths = set(paths)
+        self.checked = []
+
+    def file_exists(self, remote_path):
+        self.checked.append(remote_path)
+        return remote_path in self.paths
+
+
+def _drawing(uri: str, project_id: str = "p1") -> Drawing:
+    return Drawing(id="drawing-1", project_id=project_id, name="A", uri=uri)
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _sheet(sheet_id: str, drawing_id: str, index: int) -> Sheet:
+    return Sheet(
+        id=sheet_id,
+        drawing_id=drawing_id,
+        index=index,
+        uri=f"s3://bucket/sheets/src/sheet_{index}.png",
+        title=f"Sheet {index}",
+        metadata_={"width": 100, "height": 50},
+    )
+
+
+class TestContentHash:
+    """Tests for drawing content hashes."""
+
+    def test_pdf_content_hash_is_sha256(self):
+        """Test the PDF hash is the hex SHA-256 of its bytes."""
+        assert pdf_content_hash(b"%PDF-1.7") == hashlib.sha256(b"%PDF-1.7").hexdigest()
+
+    def test_hash_from_verified_upload(self):
+        """Test the hash is read from the project's own stored content-addressed upload."""
+        path = f"projects/p1/uploads/sha256/{HASH}.pdf"
+        storage = _Storage(path)
+
+        assert verified_upload_hash(storage, _drawing(f"s3://b/{path}")) == HASH
+        assert verified_upload_hash(storage, _drawing(f"gs://b/{path}")) == HASH
+
+    def test_forged_uri_does_not_clone(self):
+        """Test a hand-written content-addressed URI never skips downloading the PDF."""
+        other_project = f"projects/p2/uploads/sha256/{HASH}.pdf"
+        storage = _Storage(other_project)
+
+        # Another project's verified upload, a path outside projects/, a missing object
+        assert verified_upload_hash(storage, _drawing(f"s3://b/{other_project}")) is None
+        assert verified_upload_hash(storage, _drawing(f"s3://b/uploads/sha256/{HASH}.pdf")) is None
+        assert (
+            verified_upload_hash(
+                storage, _drawing(f"s3://b/x/projects/p1/uploads/sha256/{HASH}.pdf")
+            )
+            is None
+        )
+        assert (
+            verified_upload_hash(storage, _drawing(f"s3://b/projects/p1/uploads/sha256/{HASH}.pdf"))
+            is None
+        )
+        assert storage.checked == [f"projects/p1/uploads/sha256/{HASH}.pdf"]
+
+    def test_no_hash_from_other_uris(self):
+        """Test ordinary upload paths do not yield a hash."""
+        storage = _Storage()
+
+        assert verified_upload_hash(storage, _drawing("s3://b/projects/p1/uploads/x.pdf")) is None
+        assert verified_upload_hash(storage, _drawing("not a uri")) is None
+        assert storage.checked == []
+
+
+class TestFindProcessedDuplicate:
+    """Tests for choosing a drawing to clone from."""
+
+    def test_requires_fully_processed_duplicate(self, recording_session):
+        """Test only other live drawings whose sheets all completed qualify."""
+        session = recording_session(["drawing-0"])
+
+        assert find_processed_duplicate(session, "drawing-1", HASH) == "drawing-0"
+
+        sql = _sql(session.executed[0])
+        assert "drawings.content_hash = " in sql
+        assert "drawings.id != " in sql
+        assert "drawings.deleted_at IS NULL" in sql
+        assert "drawing_progress.sheets_completed = drawing_progress.sheets_total" in sql
+        assert "drawing_progress.sheets_failed = " in sql
+
+
+class TestCloneDrawingSheets:
+    """Tests for copying sheets and blocks."""
+
+    def test_copies_sheets_and_blocks_in_bulk(self, recording_session):
+        """Test sheets are upserted and blocks copied server-side onto the new sheets."""
+        source = [_sheet("src-0", "drawing-0", 0), _sheet("src-1", "drawing-0", 1)]
+        target = [_sheet("new-1", "drawing-1", 1), _sheet("new-0", "drawing-1", 0)]
+        # Sheet query, sheet upsert, block soft-delete, block query
+        session = recording_session(
+            source,
+            target,
+            None,
+            [("block-a", "src-0"), ("block-b", "src-1"), ("block-c", "src-1")],
+        )
+
+        sheets = clone_drawing_sheets(session, "drawing-0", "drawing-1")
+
+        assert [sheet.id for sheet in sheets] == ["new-0", "new-1"]
+        _, upsert, soft_delete, _, copy = session.executed
+        assert "ON CONFLICT (drawing_id, index) DO UPDATE" in _sql(upsert)
+        assert "UPDATE blocks SET" in _sql(soft_delete)
+
+        sql = _sql(copy)
+        assert sql.startswith("INSERT INTO blocks (id, sheet_id, created_at, updated_at, type")
+        assert "blocks.ocr" in sql
+        assert "JOIN (VALUES" in sql
+        # VALUES rows are (source block, new block id, new sheet) after the two timestamps
+        params = list(copy.compile(dialect=postgresql.dialect()).params.values())[2:]
+        rows = [params[i : i + 3] for i in range(0, len(params), 3)]
+        assert [(row[0], row[2]) for row in rows] == [
+            ("block-a", "new-0"),
+            ("block-b", "new-1"),
+            ("block-c", "new-1"),
+        ]
+        assert len({row[1] for row in rows}) == 3
+
+    def test_no_source_sheets(self, recording_session):
+        """Test a source without live sheets clones nothing."""
+        session = recording_session([])
+
+        assert clone_drawing_sheets(session, "drawing-0", "drawing-1") == []
+        assert len(session.executed) == 1
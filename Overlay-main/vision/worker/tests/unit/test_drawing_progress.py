@@ -0,0 +1,118 @@
+"""Unit tests for drawing_progress.py."""
+
+from sqlalchemy.dialects import postgresql
+
+from jobs.drawing_progress import record_drawing_job_progress, record_sheet_job_progress
+from models import Job, JobStatus, Sheet
+from utils.job_events import create_job_event
+
+
+def _sql(statement) -> str:
+    return str(
+        statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    )
+
+
+def _sheet_job(*event_types: str) -> Job:
+    job = Job(
+        id="sheet-job-1",
+        parent_id="drawing-job-1",
+        type="vision.sheet.preprocess",
+        status=JobStatus.STARTED,
+    )
+    job.events = [
+        create_job_event(job_type=job.type, job_id=job.id, status="Started", event_type=event_type)
+        for event_type in event_types
+    ]
+    return job
+
+
+class TestRecordDrawingJobProgress:
+    """Tests for the drawing job's progress upsert."""
+
+    def test_status_only_keeps_counters(self, recording_session):
+        """Test a plain status update does not touch the sheet counters."""
+        session = recording_session()
+        job = Job(id="drawing-job-1", type="vision.drawing.preprocess", status=JobStatus.COMPLETED)
+
+        record_drawing_job_progress(session, "drawing-1", job)
+
+        (statement,) = session.executed
+        sql = _sql(statement)
+        assert "ON CONFLICT (drawing_id) DO UPDATE SET" in sql
+        assert "job_status = excluded.job_status" in sql
+        assert "sheets_completed" not in sql
+
+    def test_fan_out_resets_counters(self, recording_session):
+        """Test queuing sheet jobs resets the counters and snapshots live blocks."""
+        session = recording_session([7])
+        job = Job(id="drawing-job-1", type="vision.drawing.preprocess", status=JobStatus.STARTED)
+        sheets = [
+            Sheet(id=f"sheet-{i}", drawing_id="drawing-1", index=i, uri="s3://b/s.png")
+            for i in range(3)
+        ]
+
+        record_drawing_job_progress(session, "drawing-1", job, sheets=sheets)
+
+        count, statement = session.executed
+        assert "count(blocks.id)" in _sql(count)
+        params = statement.compile(dialect=postgresql.dialect()).params
+        assert params["sheets_total"] == 3
+        assert params["sheets_completed"] == 0
+        assert params["sheets_failed"] == 0
+        assert params["block_count"] == 7
+        assert "sheets_completed = excluded.sheets_completed" in _sql(statement)
+
+    def test_cloned_sheets_count_as_completed(self, recording_session):
+        """Test sheets cloned from a duplicate drawing are counted as completed."""
+        session = recording_session([5])
+        job = Job(id="drawing-job-1", type="vision.drawing.preprocess", status=JobStatus.STARTED)
+        sheets = [
+            Sheet(id=f"sheet-{i}", drawing_id="drawing-1", index=i, uri="s3://b/s.png")
+            for i in range(2)
+        ]
+
+        record_drawing_job_progress(session, "drawing-1", job, sheets=sheets, completed=True)
+
+        params = session.executed[1].compile(dialect=postgresql.dialect()).params
+        assert params["sheets_total"] == 2
+        assert params["sheets_completed"] == 2
+        assert params["block_count"] == 5
+
+
+class TestRecordSheetJobProgress:
+    """Tests for atomic sheet counter updates."""
+
+    def test_completed_increments(self, recording_session):
+        """Test completion increments in SQL, scoped to the current drawing job."""
+        session = recording_session()
+
+        record_sheet_job_progress(
+            session,
+            "drawing-1",
+            _sheet_job("started", "completed"),
+            JobStatus.COMPLETED,
+            block_delta=4,
+        )
+
+        (statement,) = session.executed
+        sql = _sql(statement)
+        assert "sheets_completed=(drawing_progress.sheets_completed + 1)" in sql
+        assert "block_count=(drawing_progress.block_count + 4)" in sql
+        assert "sheets_failed" not in sql
+        assert "drawing_progress.job_id = 'drawing-job-1'" in sql
+
+    def test_completion_after_failure_moves_counter(self, recording_session):
+        """Test a retried sheet that completes is no longer counted as failed."""
+        session = recording_session()
+
+        record_sheet_job_progress(
+            session,
+            "drawing-1",
+            _sheet_job("started", "failed", "completed"),
+            JobStatus.COMPLETED,
+        )
+
+        sql = _sql(session.executed[0])
+        assert "sheets_completed=(drawing_progress.sheets_completed + 1)" in sql
+        assert "sheets_failed=(drawing_progress.sheets_failed - 1)" in sql
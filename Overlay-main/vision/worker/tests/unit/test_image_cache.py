@@ -0,0 +1,69 @@
+"""Unit tests for image_cache.py."""
+
+import numpy as np
+
+from lib.image_cache import DecodedImageCache
+
+
+def _image(size: int, value: int = 0) -> np.ndarray:
+    return np.full((size, size, 3), value, dtype=np.uint8)
+
+
+class TestDecodedImageCache:
+    """Tests for the decoded image LRU cache."""
+
+    def test_loader_called_once_per_key(self):
+        """Test repeated lookups reuse the decoded image."""
+        cache = DecodedImageCache(max_bytes=10_000_000)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return _image(100)
+
+        first = cache.get_or_load("block-1", loader)
+        second = cache.get_or_load("block-1", loader)
+
+        assert len(calls) == 1
+        assert first.image is second.image
+        assert first.scale == 1.0
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_downsampled_variant_derived_from_cached_full_image(self):
+        """Test preview variants reuse the full image and report their scale."""
+        cache = DecodedImageCache(max_bytes=10_000_000)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return _image(400)
+
+        cache.get_or_load("block-1", loader)
+        preview = cache.get_or_load("block-1", loader, max_dim=100)
+
+        assert len(calls) == 1
+        assert preview.image.shape == (100, 100, 3)
+        assert preview.scale == 0.25
+
+    def test_evicts_least_recently_used(self):
+        """Test the byte budget evicts the oldest untouched entry."""
+        one_image = _image(100).nbytes
+        cache = DecodedImageCache(max_bytes=one_image * 2)
+
+        cache.get_or_load("a", lambda: _image(100))
+        cache.get_or_load("b", lambda: _image(100))
+        cache.get_or_load("a", lambda: _image(100))
+        cache.get_or_load("c", lambda: _image(100))
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.size_bytes == one_image * 2
+
+    def test_cached_images_are_read_only(self):
+        """Test cached arrays cannot be mutated by a consumer."""
+        cache = DecodedImageCache(max_bytes=10_000_000)
+
+        entry = cache.get_or_load("a", lambda: _image(10))
+
+        assert not entry.image.flags.writeable
@@ -0,0 +1,89 @@
+"""Unit tests for job_events.py."""
+
+import json
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm.attributes import instance_state
+
+from models import Job, JobStatus
+from utils.job_events import JOB_STATUS_CHANNEL, create_job_event, record_job_event
+
+
+def _event(event_type: str) -> dict:
+    return create_job_event(
+        job_type="vision.sheet.preprocess",
+        job_id="job-1",
+        status="Started",
+        event_type=event_type,
+    )
+
+
+class TestRecordJobEvent:
+    """Tests for single-row JSONB event appends."""
+
+    def test_appends_with_jsonb_concat(self, recording_session):
+        """Test the event is appended with || rather than rewriting the array."""
+        session = recording_session()
+        job = Job(id="job-1", type="vision.sheet.preprocess", status=JobStatus.STARTED)
+        job.events = [_event("created")]
+
+        assert record_job_event(session, job, _event("started")) is True
+
+        (statement,) = session.executed
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "events=(coalesce(jobs.events" in sql
+        assert "||" in sql
+        assert "@>" in sql
+        assert "updated_at=now()" in sql
+        assert [event["eventType"] for event in job.events] == ["created", "started"]
+        assert "events" not in instance_state(job).committed_state
+
+    def test_skips_existing_event_type(self, recording_session):
+        """Test a repeated event type issues no update."""
+        session = recording_session()
+        job = Job(id="job-1", type="vision.sheet.preprocess", status=JobStatus.STARTED)
+        job.events = [_event("started")]
+
+        assert record_job_event(session, job, _event("started")) is False
+        assert session.executed == []
+
+    def test_reports_append_lost_to_concurrent_delivery(self, recording_session):
+        """Test False when the guarded update matched no row (another delivery won)."""
+        session = recording_session(rowcount=0)
+        job = Job(id="job-1", type="vision.sheet.preprocess", status=JobStatus.STARTED)
+        job.events = [_event("created")]
+
+        assert record_job_event(session, job, _event("completed")) is False
+        assert [event["eventType"] for event in job.events] == ["created"]
+
+    def test_announces_status_on_channel(self, recording_session):
+        """Test the update returns pg_notify with a compact status payload."""
+        session = recording_session()
+        job = Job(
+            id="job-1",
+            parent_id="job-0",
+            type="vision.sheet.preprocess",
+            status=JobStatus.STARTED,
+            target_type="sheet",
+            target_id="sheet-1",
+        )
+
+        record_job_event(session, job, _event("started"))
+
+        (statement,) = session.executed
+        compiled = statement.compile(dialect=postgresql.dialect())
+        assert "RETURNING pg_notify(" in str(compiled)
+        channel, payload = (
+            value for key, value in compiled.params.items() if key.startswith("pg_notify")
+        )
+        assert channel == JOB_STATUS_CHANNEL
+        assert json.loads(payload) == {
+            "jobId": "job-1",
+            "parentId": "job-0",
+            "type": "vision.sheet.preprocess",
+            "targetType": "sheet",
+            "targetId": "sheet-1",
+            "status": "Started",
+            "eventType": "started",
+            "createdAt": job.events[-1]["createdAt"],
+        }
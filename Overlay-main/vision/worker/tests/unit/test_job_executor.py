@@ -0,0 +1,154 @@
+"""Unit tests for executor.py and process-aware job error classification."""
+
+import pickle
+import threading
+import time
+
+import pytest
+
+from jobs.admission import MB, AdmissionController, AdmissionDeferred, MemoryModel
+from jobs.executor import EXECUTION_PROCESS, EXECUTION_THREAD, ProcessJobExecutor, ThroughputMeter
+from jobs.registry import JOB_SPECS
+from jobs.runner import JobRunner, process_task_runner
+from jobs.types import JobType
+from utils.job_errors import JobProcessError, is_permanent_job_error
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestThroughputMeter:
+    """Tests for jobs/min/core accounting."""
+
+    def test_reports_jobs_per_minute_per_core(self):
+        """Test throughput is normalized by elapsed minutes and cores."""
+        clock = _FakeClock()
+        meter = ThroughputMeter("process", cores=2, window_seconds=600, clock=clock)
+
+        for _ in range(6):
+            meter.record(20.0)
+        clock.now = 60.0
+        snapshot = meter.snapshot()
+
+        assert snapshot["jobs"] == 6
+        assert snapshot["jobs_per_min_per_core"] == pytest.approx(3.0)
+        assert snapshot["utilization"] == pytest.approx(1.0)
+
+    def test_window_resets_after_logging(self):
+        """Test counters restart once a window has been reported."""
+        clock = _FakeClock()
+        meter = ThroughputMeter("thread", cores=1, window_seconds=30, clock=clock)
+
+        meter.record(1.0)
+        clock.now = 31.0
+        meter.record(1.0)
+
+        assert meter.snapshot()["jobs"] == 0
+
+
+class TestJobProcessError:
+    """Tests for failures crossing the process boundary."""
+
+    def test_round_trips_through_pickle_with_classification(self):
+        """Test permanent and transient failures keep their class after pickling."""
+        permanent = pickle.loads(pickle.dumps(JobProcessError.from_error(ValueError("bad"))))
+        transient = pickle.loads(pickle.dumps(JobProcessError.from_error(ConnectionError("x"))))
+
+        assert is_permanent_job_error(permanent)
+        assert not is_permanent_job_error(transient)
+        assert permanent.error_type == "ValueError"
+        assert str(permanent) == "ValueError: bad"
+
+
+class TestJobRunnerExecution:
+    """Tests for routing job specs to execution classes."""
+
+    def test_cpu_bound_jobs_are_marked_process(self):
+        """Test overlay rendering runs in processes and LLM jobs stay on threads."""
+        assert JOB_SPECS[JobType.BLOCK_OVERLAY_GENERATE].execution == EXECUTION_PROCESS
+        assert JOB_SPECS[JobType.SHEET_PREPROCESS].execution == EXECUTION_THREAD
+
+    def test_process_jobs_fall_back_to_threads_without_pool(self):
+        """Test process work runs inline when no pool is configured."""
+        runner = JobRunner(logger=None)
+
+        assert runner.execution_for(EXECUTION_PROCESS) == EXECUTION_THREAD
+
+    def test_process_jobs_use_pool_when_configured(self):
+        """Test process work is routed to the pool when one exists."""
+        runner = JobRunner(logger=None, process_executor=ProcessJobExecutor(2))
+
+        assert runner.execution_for(EXECUTION_PROCESS) == EXECUTION_PROCESS
+        assert runner.execution_for(EXECUTION_THREAD) == EXECUTION_THREAD
+
+
+class _FakeExecutor:
+    """Stands in for the process pool and records the tasks it runs."""
+
+    max_workers = 1
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def call(self, fn, *args):
+        self.calls.append(args)
+        return fn(*args)
+
+
+class TestProcessTasks:
+    """Tests for thread jobs handing CPU-bound work to the process pool."""
+
+    def _runner(self, executor=None, *, max_wait_seconds=5.0) -> JobRunner:
+        return JobRunner(
+            logger=None,
+            process_executor=executor,
+            admission=AdmissionController(100 * MB, max_wait_seconds=max_wait_seconds),
+            memory_model=MemoryModel(base_bytes=0, default_job_bytes=60 * MB),
+        )
+
+    def test_task_waits_for_slot_before_reserving_memory(self):
+        """Test a task queued behind a busy pool holds no memory reservation."""
+        executor = _FakeExecutor()
+        runner = self._runner(executor)
+        slot = runner._slots[EXECUTION_PROCESS]
+        slot.acquire()
+        worker = threading.Thread(
+            target=runner.run_process_task,
+            args=(JobType.BLOCK_OVERLAY_GENERATE, None, sum, (1, 2)),
+        )
+        worker.start()
+        time.sleep(0.05)
+
+        assert runner.admission.reserved_bytes == 0
+        assert executor.calls == []
+
+        slot.release()
+        worker.join(timeout=5)
+        assert executor.calls == [((1, 2),)]
+        assert runner.admission.reserved_bytes == 0
+
+    def test_task_that_does_not_fit_is_deferred(self):
+        """Test a task over the memory budget raises instead of running."""
+        executor = _FakeExecutor()
+        runner = self._runner(executor, max_wait_seconds=0.05)
+
+        with runner.admission.admit("other", 50 * MB), pytest.raises(AdmissionDeferred):
+            runner.run_process_task(JobType.BLOCK_OVERLAY_GENERATE, None, sum, (1, 2))
+        assert executor.calls == []
+
+    def test_task_runs_inline_without_pool(self):
+        """Test tasks run on the calling thread when no pool is configured."""
+        runner = self._runner()
+
+        assert runner.run_process_task(JobType.BLOCK_OVERLAY_GENERATE, None, sum, (1, 2)) == 3
+
+    def test_tasks_run_inline_outside_a_runner(self):
+        """Test code called outside a job (tests, scripts) runs tasks directly."""
+        run_task = process_task_runner()
+
+        assert run_task(JobType.BLOCK_OVERLAY_GENERATE, None, sum, (1, 2)) == 3
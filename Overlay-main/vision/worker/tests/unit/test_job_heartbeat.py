@@ -0,0 +1,129 @@
+"""Unit tests for heartbeat.py."""
+
+import logging
+from datetime import UTC, datetime, timedelta
+
+import config as config_module
+from config import Config
+from jobs.heartbeat import JobHeartbeat, duplicate_redelivery_seconds, has_fresh_heartbeat
+from models import Job, JobStatus
+from utils.log_utils import log_phase, set_progress_callback
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _job(status: JobStatus, heartbeat_at: datetime | None) -> Job:
+    return Job(
+        id="job-1",
+        target_type="Block",
+        target_id="block-1",
+        type="vision.block.overlay.generate",
+        status=status,
+        payload={},
+        heartbeat_at=heartbeat_at,
+    )
+
+
+def _heartbeat(clock, stall_seconds=60.0):
+    leases: list[int] = []
+    writes: list[str] = []
+    heartbeat = JobHeartbeat(
+        "job-1",
+        extend_lease=leases.append,
+        interval_seconds=10,
+        ack_extension_seconds=120,
+        stall_seconds=stall_seconds,
+        write=writes.append,
+        clock=clock,
+    )
+    return heartbeat, leases, writes
+
+
+class TestDuplicateDetection:
+    """Tests for recognising deliveries of already-running jobs."""
+
+    def test_started_job_with_recent_heartbeat_is_running(self):
+        """Test a Started job with a fresh heartbeat counts as running elsewhere."""
+        now = datetime.now(UTC)
+        job = _job(JobStatus.STARTED, now - timedelta(seconds=30))
+
+        assert has_fresh_heartbeat(job, stale_seconds=120, now=now)
+
+    def test_stale_or_finished_jobs_are_not_running(self):
+        """Test stale heartbeats and non-Started jobs may be picked up again."""
+        now = datetime.now(UTC)
+
+        assert not has_fresh_heartbeat(
+            _job(JobStatus.STARTED, now - timedelta(seconds=300)), stale_seconds=120, now=now
+        )
+        assert not has_fresh_heartbeat(_job(JobStatus.STARTED, None), stale_seconds=120, now=now)
+        assert not has_fresh_heartbeat(
+            _job(JobStatus.FAILED, now - timedelta(seconds=5)), stale_seconds=120, now=now
+        )
+        assert not has_fresh_heartbeat(None, stale_seconds=120, now=now)
+
+    def test_duplicate_redelivery_waits_for_stale_heartbeat(self, monkeypatch):
+        """Test duplicates come back once the heartbeat could be stale, within Pub/Sub limits."""
+        for stale_seconds, expected in ((120.0, 120), (90.5, 91), (3.0, 10), (3600.0, 600)):
+            monkeypatch.setattr(
+                config_module, "_config", Config(job_heartbeat_stale_seconds=stale_seconds)
+            )
+            assert duplicate_redelivery_seconds() == expected
+
+
+class TestJobHeartbeat:
+    """Tests for lease extension and stall detection."""
+
+    def test_beat_extends_lease_and_writes_heartbeat(self):
+        """Test a beat sets the ack deadline and stamps the job row."""
+        heartbeat, leases, writes = _heartbeat(_FakeClock())
+
+        heartbeat.beat()
+
+        assert leases == [120]
+        assert writes == ["job-1"]
+
+    def test_stalled_job_lets_lease_lapse_until_progress(self):
+        """Test beats stop after the stall window and resume on progress."""
+        clock = _FakeClock()
+        heartbeat, leases, writes = _heartbeat(clock)
+
+        clock.now = 61.0
+        heartbeat.beat()
+        assert leases == []
+
+        heartbeat.progress()
+        heartbeat.beat()
+        assert leases == [120]
+
+    def test_without_stall_window_job_never_stalls(self):
+        """Test process jobs, which cannot report progress, keep their lease."""
+        clock = _FakeClock()
+        heartbeat, leases, _ = _heartbeat(clock, stall_seconds=None)
+
+        clock.now = 10_000.0
+        heartbeat.beat()
+
+        assert leases == [120]
+
+    def test_log_phase_reports_progress(self):
+        """Test phases logged by handlers count as progress."""
+        clock = _FakeClock()
+        heartbeat, _, _ = _heartbeat(clock)
+        clock.now = 50.0
+
+        set_progress_callback(heartbeat.progress)
+        try:
+            with log_phase(logging.getLogger(__name__), "Render"):
+                pass
+        finally:
+            set_progress_callback(None)
+        clock.now = 100.0
+
+        assert not heartbeat.stalled()
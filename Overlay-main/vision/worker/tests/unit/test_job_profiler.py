@@ -0,0 +1,81 @@
+"""Unit tests for job_profiler.py."""
+
+import logging
+import time
+
+import config as config_module
+from config import Config
+from utils import job_profiler
+from utils.job_events import create_job_event
+from utils.job_profiler import get_current_profile, profile_job
+from utils.log_utils import log_phase
+
+logger = logging.getLogger(__name__)
+
+
+def _event(event_type: str) -> dict:
+    return create_job_event(
+        job_type="vision.sheet.preprocess",
+        job_id="job-1",
+        status="Completed",
+        event_type=event_type,
+    )
+
+
+class TestPhaseTimings:
+    """Tests for per-phase timings on job events."""
+
+    def test_completed_event_carries_phase_breakdown(self):
+        """Test phases logged during a job appear in its completed event."""
+        with profile_job("vision.sheet.preprocess", "job-1"):
+            with log_phase(logger, "Download sheet image"):
+                time.sleep(0.01)
+            for _ in range(2):
+                with log_phase(logger, "Upload blocks"):
+                    pass
+            event = _event("completed")
+
+        timings = event["timings"]
+        phases = {phase["name"]: phase for phase in timings["phases"]}
+        assert phases["Download sheet image"]["wallMs"] >= 10
+        assert phases["Upload blocks"]["count"] == 2
+        assert {"cpuMs", "rssDeltaMb"} <= set(phases["Upload blocks"])
+        assert timings["totalMs"] >= phases["Download sheet image"]["wallMs"]
+
+    def test_only_terminal_events_get_timings(self):
+        """Test started events and events outside a job carry no timings."""
+        with profile_job("vision.sheet.preprocess", "job-1"):
+            started = _event("started")
+            failed = _event("failed")
+        outside = _event("completed")
+
+        assert "timings" not in started
+        assert "timings" in failed
+        assert "timings" not in outside
+        assert get_current_profile() is None
+
+
+class TestSlowJobReports:
+    """Tests for cProfile reports of slow jobs."""
+
+    def test_slow_job_uploads_report(self, monkeypatch):
+        """Test a job over the threshold uploads a cProfile report."""
+        monkeypatch.setattr(
+            config_module,
+            "_config",
+            Config(job_profile_sampling_enabled=True, job_profile_slow_threshold_seconds=0),
+        )
+        uploads = []
+        monkeypatch.setattr(
+            job_profiler,
+            "_upload_report",
+            lambda report, job_type, job_id: uploads.append((report, job_id)) or "s3://x",
+        )
+
+        with profile_job("vision.sheet.preprocess", "job-1"):
+            sum(range(1000))
+
+        assert len(uploads) == 1
+        report, job_id = uploads[0]
+        assert job_id == "job-1"
+        assert "function calls" in report
@@ -0,0 +1,40 @@
+"""Unit tests for block_overlay_manual_align.py pure helpers."""
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from jobs.block_overlay_manual_align import ManualAlignPayload, _scale_matrix
+
+
+class TestManualAlignPayload:
+    """Tests for manual alignment payload validation."""
+
+    def test_accepts_affine_matrix(self):
+        """Test a 2x3 matrix is accepted."""
+        payload = ManualAlignPayload(
+            overlay_id="ov1", alignment_matrix=[[1.0, 0.0, 5.0], [0.0, 1.0, -3.0]]
+        )
+
+        assert payload.alignment_matrix[0][2] == 5.0
+
+    def test_rejects_wrong_shape(self):
+        """Test non-2x3 matrices are rejected as permanent validation errors."""
+        with pytest.raises(ValidationError):
+            ManualAlignPayload(overlay_id="ov1", alignment_matrix=[[1.0, 0.0], [0.0, 1.0]])
+
+
+class TestScaleMatrix:
+    """Tests for re-expressing the user's matrix at preview resolution."""
+
+    def test_scaled_matrix_matches_downsampled_points(self):
+        """Test a point mapped at full resolution maps identically after downsampling."""
+        matrix = np.array([[1.2, -0.1, 40.0], [0.1, 1.2, -25.0]])
+        scale_a, scale_b = 0.25, 0.5
+        point_a = np.array([300.0, 200.0, 1.0])
+
+        full_b = matrix @ point_a
+        small_point_a = np.array([point_a[0] * scale_a, point_a[1] * scale_a, 1.0])
+        small_b = _scale_matrix(matrix, scale_a, scale_b) @ small_point_a
+
+        assert np.allclose(small_b, full_b * scale_b)
@@ -0,0 +1,109 @@
+"""Unit tests for metrics.py."""
+
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from lib.llm_usage import LLMUsage, track_usage
+from utils.metrics import (
+    LLM_TOKENS,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    phase_category,
+)
+
+
+def _registry():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("test_bytes_total", "Bytes", ("direction",)))
+    histogram = registry.register(
+        Histogram("test_duration_seconds", "Duration", ("phase",), buckets=(1, 10))
+    )
+    gauge = registry.register(Gauge("test_rss_bytes", "RSS", high_water=True))
+    return registry, counter, histogram, gauge
+
+
+class TestRendering:
+    """Tests for the Prometheus text format."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test buckets, sum and count follow the exposition format."""
+        registry, _, histogram, _ = _registry()
+
+        histogram.observe(0.5, phase="render")
+        histogram.observe(5, phase="render")
+        histogram.observe(50, phase="render")
+        text = registry.render()
+
+        assert "# TYPE test_duration_seconds histogram" in text
+        assert 'test_duration_seconds_bucket{phase="render",le="1.0"} 1' in text
+        assert 'test_duration_seconds_bucket{phase="render",le="10.0"} 2' in text
+        assert 'test_duration_seconds_bucket{phase="render",le="+Inf"} 3' in text
+        assert 'test_duration_seconds_sum{phase="render"} 55.5' in text
+        assert 'test_duration_seconds_count{phase="render"} 3' in text
+
+    def test_rejects_wrong_labels(self):
+        """Test label names must match the metric's declaration."""
+        _, counter, _, _ = _registry()
+
+        with pytest.raises(ValueError):
+            counter.inc(1, model="x")
+
+
+class TestProcessMerge:
+    """Tests for folding worker-process metrics into the parent."""
+
+    def test_drain_and_merge_adds_counts(self):
+        """Test child increments are added to the parent and reset in the child."""
+        parent, parent_counter, parent_histogram, parent_gauge = _registry()
+        child, child_counter, child_histogram, child_gauge = _registry()
+        parent_counter.inc(10, direction="in")
+        parent_gauge.set(500)
+        child_counter.inc(5, direction="in")
+        child_histogram.observe(2, phase="align")
+        child_gauge.set(300)
+
+        parent.merge(pickle.loads(pickle.dumps(child.drain())))
+
+        assert parent_counter.value(direction="in") == 15
+        assert parent_histogram.count(phase="align") == 1
+        assert parent_gauge.value() == 500
+        assert child_counter.value(direction="in") == 0
+
+
+class TestHooks:
+    """Tests for metrics recorded by existing instrumentation."""
+
+    def test_phase_names_map_to_fixed_categories(self):
+        """Test log_phase names collapse to a bounded set of phase labels."""
+        assert phase_category("Download block images") == "download"
+        assert phase_category("Align and render overlay") == "align"
+        assert phase_category("Render block overlays (12 pairs)") == "render"
+        assert phase_category("Analyze changes with AI") == "llm"
+        assert phase_category("Something new") == "other"
+
+    def test_llm_tokens_counted_without_job_tracking(self):
+        """Test token counters update even when no job tracker is active."""
+        before = LLM_TOKENS.value(model="test-model", kind="output")
+        metadata = SimpleNamespace(prompt_token_count=100, candidates_token_count=20)
+
+        track_usage("test-model", metadata)
+
+        assert LLM_TOKENS.value(model="test-model", kind="output") == before + 20
+
+    def test_job_cost_unchanged(self):
+        """Test per-job cost still uses input, cached and output rates."""
+        usage = LLMUsage()
+        usage.track(
+            "gemini-2.5-flash",
+            SimpleNamespace(
+                prompt_token_count=1_000_000,
+                candidates_token_count=1_000_000,
+                cached_content_token_count=0,
+            ),
+        )
+
+        assert usage.calculate_cost() == pytest.approx(0.30 + 2.50)
@@ -0,0 +1,125 @@
+"""Unit tests for outbox.py."""
+
+from datetime import UTC, datetime
+
+from sqlalchemy.dialects import postgresql
+
+from jobs.outbox import OutboxRelay, enqueue_jobs, retry_delay
+from models import Job, JobOutbox, JobStatus
+
+
+class _FakePublisher:
+    """publish_many stand-in failing the given job IDs."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.batches = []
+
+    def publish_many(self, topic, messages):
+        self.batches.append((topic, messages))
+        return [
+            RuntimeError("unavailable") if message["id"] in self.failing else f"msg-{message['id']}"
+            for message, _ in messages
+        ]
+
+
+def _job(job_id: str) -> Job:
+    return Job(
+        id=job_id,
+        type="vision.sheet.preprocess",
+        status=JobStatus.QUEUED,
+        payload={"sheetId": f"sheet-{job_id}"},
+    )
+
+
+def _row(job_id: str, topic: str = "vision") -> JobOutbox:
+    return JobOutbox(
+        id=f"outbox-{job_id}",
+        job_id=job_id,
+        topic=topic,
+        message={"type": "vision.sheet.preprocess", "id": job_id, "payload": {}},
+        attributes={"type": "vision.sheet.preprocess", "id": job_id},
+        available_at=datetime.now(UTC),
+    )
+
+
+def _relay(publisher) -> OutboxRelay:
+    return OutboxRelay(publisher, batch_size=10, poll_seconds=0.1, max_backoff_seconds=60)
+
+
+class TestEnqueueJobs:
+    """Tests for writing job messages to the outbox."""
+
+    def test_one_idempotent_insert(self, recording_session):
+        """Test all messages go in one insert that skips jobs already queued."""
+        session = recording_session()
+
+        enqueue_jobs(session, [_job("job-1"), _job("job-2")], topic="vision")
+
+        (statement,) = session.executed
+        compiled = statement.compile(dialect=postgresql.dialect())
+        assert "ON CONFLICT (job_id) DO NOTHING" in str(compiled)
+        assert compiled.params["job_id_m0"] == "job-1"
+        assert compiled.params["message_m1"] == {
+            "version": "v1",
+            "type": "vision.sheet.preprocess",
+            "id": "job-2",
+            "payload": {"sheetId": "sheet-job-2"},
+        }
+
+    def test_nothing_to_enqueue(self, recording_session):
+        """Test an empty fan-out writes nothing."""
+        session = recording_session()
+
+        enqueue_jobs(session, [])
+
+        assert session.executed == []
+
+
+class TestOutboxRelay:
+    """Tests for publishing outbox batches."""
+
+    def test_publishes_batch_and_deletes_sent(self, recording_session):
+        """Test claimed rows are published together and deleted once accepted."""
+        session = recording_session([_row("job-1"), _row("job-2")])
+        publisher = _FakePublisher()
+
+        assert _relay(publisher).relay_once(session) == 2
+
+        ((topic, messages),) = publisher.batches
+        assert topic == "vision"
+        assert [attributes["id"] for _, attributes in messages] == ["job-1", "job-2"]
+        claim, delete = session.executed
+        assert "FOR UPDATE SKIP LOCKED" in str(claim.compile(dialect=postgresql.dialect()))
+        assert "DELETE FROM job_outbox" in str(delete.compile(dialect=postgresql.dialect()))
+        assert session.commits == 1
+
+    def test_failed_messages_back_off(self, recording_session):
+        """Test a failed publish keeps the row with a later retry time and the error."""
+        failed = _row("job-2")
+        session = recording_session([_row("job-1"), failed])
+        before = datetime.now(UTC)
+
+        _relay(_FakePublisher(failing={"job-2"})).relay_once(session)
+
+        assert session.added == [failed]
+        assert failed.attempts == 1
+        assert failed.available_at > before
+        assert failed.last_error == "RuntimeError: unavailable"
+        delete = session.executed[1]
+        assert delete.compile().params["id_1"] == ["outbox-job-1"]
+
+    def test_idle_when_nothing_due(self, recording_session):
+        """Test an empty outbox publishes nothing."""
+        session = recording_session()
+        publisher = _FakePublisher()
+
+        assert _relay(publisher).relay_once(session) == 0
+        assert publisher.batches == []
+        assert session.rollbacks == 1
+
+    def test_retry_delay_is_capped(self):
+        """Test backoff doubles per attempt up to the configured maximum."""
+        assert retry_delay(1, 60) == 2
+        assert retry_delay(3, 60) == 8
+        assert retry_delay(50, 60) == 60
@@ -0,0 +1,127 @@
+"""Unit tests for overlay_cache.py."""
+
+from sqlalchemy.dialects import postgresql
+
+import config as config_module
+from jobs.overlay_cache import (
+    alignment_params_fingerprint,
+    apply_overlay_result,
+    compute_content_hash,
+    overlay_result_key,
+    save_overlay_result,
+)
+from models import Block, Overlay, OverlayResult
+
+
+def _block(content_hash: str | None, has_grid: bool = False) -> Block:
+    return Block(
+        id="blk",
+        sheet_id="sheet",
+        content_hash=content_hash,
+        metadata_={"has_grid_callouts": has_grid},
+    )
+
+
+class TestOverlayResultKey:
+    """Tests for content-addressed overlay cache keys."""
+
+    def test_identical_crops_share_key_across_block_ids(self):
+        """Test re-extracted blocks with the same bytes map to the same key."""
+        digest_a = compute_content_hash(b"crop-a")
+        digest_b = compute_content_hash(b"crop-b")
+        first = overlay_result_key(_block(digest_a), _block(digest_b))
+
+        block_a = _block(digest_a)
+        block_a.id = "other"
+        assert overlay_result_key(block_a, _block(digest_b)) == first
+
+    def test_key_is_directional(self):
+        """Test swapping old and new blocks produces a different key."""
+        digest_a = compute_content_hash(b"crop-a")
+        digest_b = compute_content_hash(b"crop-b")
+
+        assert overlay_result_key(_block(digest_a), _block(digest_b)) != overlay_result_key(
+            _block(digest_b), _block(digest_a)
+        )
+
+    def test_missing_hash_is_not_cacheable(self):
+        """Test blocks without a content hash never produce a key."""
+        assert overlay_result_key(_block(None), _block("abc")) is None
+
+    def test_grid_blocks_use_separate_params(self):
+        """Test grid and non-grid alignment do not share cached results."""
+        assert alignment_params_fingerprint(True) != alignment_params_fingerprint(False)
+
+    def test_alignment_config_changes_fingerprint(self, monkeypatch):
+        """Test changing an alignment setting invalidates previous results."""
+        before = alignment_params_fingerprint(False)
+        monkeypatch.setattr(
+            config_module._config, "sift_n_features", config_module.config.sift_n_features + 1
+        )
+
+        assert alignment_params_fingerprint(False) != before
+
+
+class TestSaveOverlayResult:
+    """Tests for recording rendered overlays in the cache."""
+
+    def test_upserts_on_key(self, recording_session):
+        """Test concurrent renders of a pair update the cached row instead of colliding."""
+        session = recording_session([OverlayResult(key="stored")])
+        overlay = Overlay(
+            id="ov",
+            block_a_id="a",
+            block_b_id="b",
+            uri="gs://bucket/o.png",
+            addition_uri="gs://bucket/a.png",
+            deletion_uri="gs://bucket/d.png",
+            summary={"changes": 3, "tiles": {"levels": 2}},
+        )
+
+        stored = save_overlay_result(session, _block("ha"), _block("hb"), overlay)
+
+        assert stored.key == "stored"
+        (statement,) = session.executed
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (key) DO UPDATE SET" in sql
+        assert "summary = excluded.summary" in sql
+        assert "created_at = excluded" not in sql
+        assert "RETURNING" in sql
+
+    def test_incomplete_overlay_is_not_cached(self, recording_session):
+        """Test overlays without all rendered assets are not recorded."""
+        session = recording_session()
+        overlay = Overlay(id="ov", block_a_id="a", block_b_id="b", uri="gs://bucket/o.png")
+
+        assert save_overlay_result(session, _block("ha"), _block("hb"), overlay) is None
+        assert session.executed == []
+
+
+class TestApplyOverlayResult:
+    """Tests for pointing overlays at cached assets."""
+
+    def test_copies_assets_and_keeps_existing_summary(self):
+        """Test cached URIs and render summary are applied without dropping other keys."""
+        overlay = Overlay(id="ov", block_a_id="a", block_b_id="b", summary={"changes": 3})
+        result = OverlayResult(
+            key="k",
+            block_a_hash="ha",
+            block_b_hash="hb",
+            params_hash="p",
+            uri="gs://bucket/o.png",
+            addition_uri="gs://bucket/a.png",
+            deletion_uri="gs://bucket/d.png",
+            score=0.9,
+            summary={"alignmentQuality": {"score": 0.8}},
+        )
+
+        apply_overlay_result(overlay, result)
+
+        assert overlay.uri == "gs://bucket/o.png"
+        assert overlay.deletion_uri == "gs://bucket/d.png"
+        assert overlay.score == 0.9
+        assert overlay.summary == {
+            "changes": 3,
+            "alignmentQuality": {"score": 0.8},
+            "resultKey": "k",
+        }
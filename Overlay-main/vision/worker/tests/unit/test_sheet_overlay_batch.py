@@ -0,0 +1,230 @@
+"""Unit tests for sheet_overlay_batch.py."""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+import jobs.sheet_overlay_batch as batch_module
+import jobs.sheet_overlay_generate as generate_module
+from jobs.block_overlay_generate import OverlayAssets
+from jobs.sheet_overlay_batch import BatchPair, crop_block, render_block_pairs
+from jobs.types import JobType
+from lib.sheet_analyzer import BoundingBox, _crop_bytes
+from models import Block, Job, JobStatus, Overlay, Sheet
+
+
+class TestCropBlock:
+    """Tests for cutting blocks out of a decoded sheet."""
+
+    def test_matches_extracted_block_png(self):
+        """Test an in-memory crop is pixel-identical to the stored block PNG."""
+        rng = np.random.default_rng(0)
+        sheet = rng.integers(0, 255, size=(733, 1021, 3), dtype=np.uint8)
+        bbox = BoundingBox(xmin=113, ymin=250, xmax=687, ymax=941)
+        stored = np.array(Image.open(io.BytesIO(_crop_bytes(Image.fromarray(sheet), bbox))))
+
+        crop = crop_block(sheet, {**bbox.model_dump(), "normalized": True})
+
+        assert crop is not None
+        assert np.array_equal(crop, stored)
+
+    def test_missing_or_empty_bounds_return_none(self):
+        """Test unusable bounds fall back to the stored block image."""
+        sheet = np.zeros((100, 100, 3), dtype=np.uint8)
+
+        assert crop_block(sheet, None) is None
+        assert crop_block(sheet, {"xmin": 10}) is None
+        assert crop_block(sheet, {"xmin": 500, "ymin": 0, "xmax": 500, "ymax": 100}) is None
+
+
+BOUNDS = {"xmin": 0, "ymin": 0, "xmax": 500, "ymax": 500, "normalized": True}
+
+
+def _pair(name: str) -> BatchPair:
+    return BatchPair(
+        overlay=Overlay(id=f"ov-{name}", block_a_id=f"{name}-a", block_b_id=f"{name}-b"),
+        block_a=Block(id=f"{name}-a", sheet_id="sheet-a", bounds=BOUNDS, content_hash=f"ha-{name}"),
+        block_b=Block(id=f"{name}-b", sheet_id="sheet-b", bounds=BOUNDS, content_hash=f"hb-{name}"),
+    )
+
+
+def _assets(score: float = 0.9) -> OverlayAssets:
+    return OverlayAssets(
+        overlay_bytes=b"overlay",
+        addition_bytes=b"addition",
+        deletion_bytes=b"deletion",
+        overlay_score=score,
+        alignment_stats=None,
+        alignment_quality={"score": score},
+        tiles=None,
+    )
+
+
+class _Renderer:
+    """Fakes storage and rendering; renders of ``fail_ids`` blocks raise."""
+
+    def __init__(self, monkeypatch, *, fail_render=(), fail_upload=()):
+        self.fail_render = set(fail_render)
+        self.fail_upload = set(fail_upload)
+        self.rendered = []
+        monkeypatch.setattr(batch_module, "get_storage_client", lambda: object())
+        monkeypatch.setattr(
+            batch_module, "_download_sheet_image", lambda client, uri, sheet_id: sheet_id
+        )
+        monkeypatch.setattr(
+            batch_module,
+            "_load_image_from_bytes",
+            lambda data: np.zeros((100, 100, 3), dtype=np.uint8),
+        )
+        monkeypatch.setattr(batch_module, "render_overlay_assets_from_images", self.render)
+        monkeypatch.setattr(batch_module, "_upload_overlay_assets", self.upload)
+
+    def render(self, image_a, image_b, has_grid):
+        self.rendered.append(image_a.shape)
+        if len(self.rendered) in self.fail_render:
+            raise RuntimeError("alignment failed")
+        return _assets()
+
+    def upload(self, client, overlay_id, overlay_bytes, addition_bytes, deletion_bytes):
+        if overlay_id in self.fail_upload:
+            raise OSError("upload failed")
+        return (
+            f"gs://bucket/{overlay_id}.png",
+            f"gs://bucket/{overlay_id}_addition.png",
+            f"gs://bucket/{overlay_id}_deletion.png",
+        )
+
+
+def _sheets() -> tuple[Sheet, Sheet]:
+    return (
+        Sheet(id="sheet-a", drawing_id="da", index=0, uri="gs://bucket/a.png"),
+        Sheet(id="sheet-b", drawing_id="db", index=0, uri="gs://bucket/b.png"),
+    )
+
+
+class TestRenderBlockPairs:
+    """Tests for rendering a sheet pair's blocks from shared decodes."""
+
+    def test_rendered_pairs_point_at_uploaded_assets(self, monkeypatch):
+        """Test each rendered overlay gets its asset URIs and alignment summary."""
+        _Renderer(monkeypatch)
+        pairs = [_pair("one"), _pair("two")]
+
+        result = render_block_pairs(pairs, *_sheets(), max_workers=2)
+
+        assert {pair.overlay.id for pair in result.rendered} == {"ov-one", "ov-two"}
+        assert result.failed == []
+        overlay = pairs[0].overlay
+        assert overlay.uri == "gs://bucket/ov-one.png"
+        assert overlay.deletion_uri == "gs://bucket/ov-one_deletion.png"
+        assert overlay.score == 0.9
+        assert overlay.summary == {"alignmentQuality": {"score": 0.9}}
+
+    def test_failed_render_or_upload_is_handed_back(self, monkeypatch):
+        """Test pairs whose render or upload fails are returned for block jobs."""
+        _Renderer(monkeypatch, fail_render={1}, fail_upload={"ov-three"})
+        pairs = [_pair("one"), _pair("two"), _pair("three")]
+
+        result = render_block_pairs(pairs, *_sheets(), max_workers=1)
+
+        assert [pair.overlay.id for pair in result.rendered] == ["ov-two"]
+        assert {pair.overlay.id for pair in result.failed} == {"ov-one", "ov-three"}
+        assert pairs[0].overlay.uri is None
+        assert pairs[2].overlay.uri is None
+
+    def test_renders_go_through_the_runner(self, monkeypatch):
+        """Test each pair is handed to the job runner with its crop pixels."""
+        renderer = _Renderer(monkeypatch)
+        calls = []
+
+        def run_task(task_type, pixels, fn, *args):
+            calls.append((task_type, pixels))
+            return fn(*args)
+
+        monkeypatch.setattr(batch_module, "process_task_runner", lambda: run_task)
+
+        render_block_pairs([_pair("one")], *_sheets())
+
+        assert calls == [(JobType.BLOCK_OVERLAY_GENERATE, 2 * 50 * 50)]
+        assert renderer.rendered == [(50, 50, 3)]
+
+
+def _cache_results(monkeypatch) -> list[tuple[str, str, str]]:
+    """Record ``save_overlay_result`` calls as (block A, block B, overlay) IDs."""
+    cached = []
+    monkeypatch.setattr(
+        batch_module,
+        "save_overlay_result",
+        lambda session, block_a, block_b, overlay: cached.append(
+            (block_a.id, block_b.id, overlay.id)
+        ),
+    )
+    return cached
+
+
+class TestRenderPairsInBatch:
+    """Tests for the sheet overlay job's batch step."""
+
+    def test_session_is_released_while_rendering(self, monkeypatch, recording_session):
+        """Test the connection is returned before rendering and rows are added back after."""
+        _cache_results(monkeypatch)
+        session = recording_session()
+        sheet_a, sheet_b = _sheets()
+
+        def render(pairs, sheet_a, sheet_b):
+            assert session.closed
+            assert session.added == []
+            return batch_module.BatchResult(rendered=pairs, failed=[])
+
+        monkeypatch.setattr(generate_module, "render_block_pairs", render)
+        job = Job(id="job", type=JobType.SHEET_OVERLAY_GENERATE, status=JobStatus.STARTED)
+        pair = _pair("one")
+
+        remaining, rendered = generate_module._render_pairs_in_batch(
+            session, job, sheet_a, sheet_b, [(pair.block_a, pair.block_b, "identifier", None)]
+        )
+
+        assert (remaining, rendered) == ([], 1)
+        assert session.refreshed == [sheet_a, sheet_b]
+        assert [row.id for row in session.added][0] == "job"
+
+    def test_batch_commit_records_rendered_overlays(self, monkeypatch, recording_session):
+        """Test rendered overlays are added with their cache results for one commit."""
+        _Renderer(monkeypatch)
+        cached = _cache_results(monkeypatch)
+        session = recording_session()
+        job = Job(id="job", type=JobType.SHEET_OVERLAY_GENERATE, status=JobStatus.STARTED)
+        pair = _pair("one")
+
+        remaining, rendered = generate_module._render_pairs_in_batch(
+            session, job, *_sheets(), [(pair.block_a, pair.block_b, "identifier", None)]
+        )
+
+        assert (remaining, rendered) == ([], 1)
+        job_row, overlay = session.added
+        assert job_row is job
+        assert overlay.uri == f"gs://bucket/{overlay.id}.png"
+        assert cached == [("one-a", "one-b", overlay.id)]
+        assert session.commits == 0
+
+    def test_failed_pairs_fall_back_to_block_jobs(self, monkeypatch, recording_session):
+        """Test a failed render is returned with its pairing method and overlay row."""
+        _Renderer(monkeypatch, fail_render={1})
+        cached = _cache_results(monkeypatch)
+        session = recording_session()
+        job = Job(id="job", type=JobType.SHEET_OVERLAY_GENERATE, status=JobStatus.STARTED)
+        pair = _pair("one")
+
+        remaining, rendered = generate_module._render_pairs_in_batch(
+            session,
+            job,
+            *_sheets(),
+            [(pair.block_a, pair.block_b, "identifier", pair.overlay)],
+        )
+
+        assert rendered == 0
+        assert remaining == [(pair.block_a, pair.block_b, "identifier", pair.overlay)]
+        assert pair.overlay.job_id == "job"
+        assert cached == []
+        assert session.added == [job]
@@ -0,0 +1,87 @@
+"""Unit tests for sheet_preprocess.py."""
+
+from types import SimpleNamespace
+
+import jobs.sheet_preprocess as sheet_module
+from jobs.envelope import JobEnvelope
+from jobs.sheet_preprocess import SheetJobPayload, run_sheet_job
+from lib.sheet_analyzer import BoundingBox
+from models import Job, JobStatus, Sheet
+from utils.job_events import create_job_event
+
+
+def _run(monkeypatch, session_factory, *, completed_elsewhere: bool):
+    """Run the sheet job on a fake session; returns it and the recorded block deltas."""
+    block = SimpleNamespace(
+        block_type="plan",
+        crop_bytes=b"crop",
+        name="Level 1",
+        storage_type="image",
+        identifier="1/A101",
+        has_grid_callouts=False,
+        bbox=BoundingBox(xmin=0, ymin=0, xmax=10, ymax=10),
+        ocr_text=None,
+        description=None,
+    )
+    monkeypatch.setattr(sheet_module, "get_gemini_client", lambda: None)
+    monkeypatch.setattr(sheet_module, "get_storage_client", lambda: None)
+    monkeypatch.setattr(sheet_module, "_download_sheet_image", lambda *args: b"png")
+    monkeypatch.setattr(
+        sheet_module,
+        "analyze_sheet",
+        lambda png, client: SimpleNamespace(blocks=[block] * 3, metadata={}),
+    )
+    monkeypatch.setattr(sheet_module, "_upload_block_image", lambda *args: "s3://b/block.png")
+
+    job = Job(id="sheet-job", type="vision.sheet.preprocess", status=JobStatus.STARTED)
+    job.events = [
+        create_job_event(job_type=job.type, job_id=job.id, status="Started", event_type="started")
+    ]
+    # A lost "completed" append updates no row
+    session = session_factory(
+        rowcount=0 if completed_elsewhere else 1,
+        rows=(
+            Sheet(id="sheet-1", drawing_id="drawing-1", index=0, uri="s3://b/sheet.png"),
+            job,
+        ),
+    )
+    block_deltas = []
+    monkeypatch.setattr(
+        sheet_module,
+        "record_sheet_job_progress",
+        lambda session, drawing_id, job, status, block_delta=0: block_deltas.append(block_delta),
+    )
+    envelope = JobEnvelope(type="vision.sheet.preprocess", id="sheet-job", payload={})
+
+    run_sheet_job(session, SheetJobPayload(sheet_id="sheet-1"), "message-1", envelope)
+    return session, block_deltas
+
+
+def _writes(session) -> list[tuple[str, str]]:
+    return [(type(statement).__name__, statement.table.name) for statement in session.executed]
+
+
+class TestRunSheetJob:
+    """Tests for replacing a sheet's blocks when its job completes."""
+
+    def test_completion_replaces_blocks_and_counts_them(self, monkeypatch, recording_session):
+        """Test the completing delivery rewrites the blocks and records their delta."""
+        session, block_deltas = _run(monkeypatch, recording_session, completed_elsewhere=False)
+
+        assert _writes(session) == [
+            ("Update", "jobs"),
+            ("Update", "blocks"),
+            ("Insert", "blocks"),
+        ]
+        assert [len(rows) for rows in session.parameters] == [3]
+        # Three new blocks, one soft-deleted (the fake's rowcount)
+        assert block_deltas == [2]
+        assert session.commits == 2
+
+    def test_redelivered_completion_leaves_blocks_alone(self, monkeypatch, recording_session):
+        """Test a delivery that loses the completed event neither rewrites nor counts blocks."""
+        session, block_deltas = _run(monkeypatch, recording_session, completed_elsewhere=True)
+
+        assert _writes(session) == [("Update", "jobs")]
+        assert block_deltas == []
+        assert session.rollbacks == 1
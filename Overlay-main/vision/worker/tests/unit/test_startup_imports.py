@@ -0,0 +1,105 @@
+"""Startup import benchmark for the worker entrypoint.
+
+Handlers and storage SDKs are imported lazily, so importing ``main`` and the
+job runner must stay cheap. The budget can be overridden with
+STARTUP_IMPORT_BUDGET_SECONDS on slow machines.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from jobs.registry import JOB_SPECS
+
+WORKER_DIR = Path(__file__).resolve().parents[2]
+STARTUP_MODULES = ("main", "jobs.runner")
+HEAVY_MODULES = (
+    "cv2",
+    "scipy",
+    "openai",
+    "google.genai",
+    "fitz",
+    "pypdfium2",
+    "boto3",
+    "google.cloud.storage",
+)
+DEFAULT_BUDGET_SECONDS = 2.0
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=WORKER_DIR,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    )
+
+
+def _cold_import_seconds() -> float:
+    """Cumulative import time of the startup modules, from ``-X importtime``."""
+    result = _run("-X", "importtime", "-c", f"import {', '.join(STARTUP_MODULES)}")
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Top-level imports are indented by a single space
+        if name.startswith("  ") or name.strip() not in STARTUP_MODULES:
+            continue
+        total_us += int(cumulative)
+    return total_us / 1_000_000
+
+
+class TestStartupImports:
+    """Tests for worker cold-start import cost."""
+
+    def test_startup_does_not_import_handler_libraries(self):
+        """Test heavy handler dependencies load on first use, not at startup."""
+        script = (
+            f"import sys, json, {', '.join(STARTUP_MODULES)}; "
+            f"print(json.dumps([m for m in {list(HEAVY_MODULES)!r} if m in sys.modules]))"
+        )
+
+        loaded = json.loads(_run("-c", script).stdout.strip().splitlines()[-1])
+
+        assert loaded == []
+
+    def test_cold_import_within_budget(self):
+        """Test importing the worker entrypoint stays within the startup budget."""
+        budget = float(os.environ.get("STARTUP_IMPORT_BUDGET_SECONDS", DEFAULT_BUDGET_SECONDS))
+
+        # Best of two runs, so a cold bytecode cache does not count against the budget
+        seconds = min(_cold_import_seconds() for _ in range(2))
+
+        assert 0 < seconds <= budget, f"startup imports took {seconds:.2f}s (budget {budget}s)"
+
+    @pytest.mark.parametrize(
+        "job_type",
+        sorted(job_type for job_type, spec in JOB_SPECS.items() if spec.execution == "process"),
+    )
+    def test_process_payloads_do_not_import_handlers(self, job_type):
+        """Test validating a process job's payload in the parent leaves its handler unloaded."""
+        module = JOB_SPECS[job_type].module
+        script = (
+            "import sys; from jobs.registry import JOB_SPECS; "
+            f"JOB_SPECS[{job_type!r}].payload_model; print({module!r} in sys.modules)"
+        )
+
+        assert _run("-c", script).stdout.strip().splitlines()[-1] == "False"
+
+    @pytest.mark.parametrize("job_type", sorted(JOB_SPECS))
+    def test_lazy_specs_resolve(self, job_type):
+        """Test every registered handler and payload model can be imported."""
+        spec = JOB_SPECS[job_type]
+
+        spec.load()
+
+        assert callable(spec.handler)
+        assert isinstance(spec.payload_model, type)
@@ -0,0 +1,78 @@
+"""Unit tests for tile_pyramid.py."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from lib.sift_alignment import _load_image_from_bytes
+from lib.tile_pyramid import (
+    plan_tile_pyramid,
+    render_tile_pyramid,
+    tile_path,
+    upload_tile_pyramid,
+)
+
+
+class TestPlanTilePyramid:
+    """Tests for pyramid geometry."""
+
+    def test_levels_follow_dzi_convention(self):
+        """Test max level is ceil(log2) of the longest edge and levels halve."""
+        pyramid = plan_tile_pyramid(1000, 600, tile_size=256)
+
+        assert pyramid.max_level == 10
+        assert [level.level for level in pyramid.levels] == [8, 9, 10]
+        assert (pyramid.levels[-1].width, pyramid.levels[-1].height) == (1000, 600)
+        assert (pyramid.levels[-1].columns, pyramid.levels[-1].rows) == (4, 3)
+        assert (pyramid.levels[1].width, pyramid.levels[1].height) == (500, 300)
+        assert (pyramid.levels[0].width, pyramid.levels[0].height) == (250, 150)
+        assert (pyramid.levels[0].columns, pyramid.levels[0].rows) == (1, 1)
+
+    def test_small_image_has_single_level(self):
+        """Test an image smaller than one tile produces a single level."""
+        pyramid = plan_tile_pyramid(200, 100, tile_size=256)
+
+        assert pyramid.min_level == pyramid.max_level
+        assert pyramid.tile_count == 1
+
+    def test_invalid_tile_size_raises(self):
+        """Test tile sizes outside 256-512 are rejected."""
+        with pytest.raises(ValueError):
+            plan_tile_pyramid(1000, 1000, tile_size=128)
+
+
+class TestRenderTilePyramid:
+    """Tests for tile rendering and upload."""
+
+    def test_tiles_cover_every_level(self):
+        """Test every planned tile is rendered with the expected size."""
+        image = np.full((600, 1000, 3), 255, dtype=np.uint8)
+        image[:, 500:] = [255, 0, 0]
+
+        rendered = render_tile_pyramid(image, tile_size=256)
+
+        assert len(rendered.tiles) == rendered.pyramid.tile_count
+        by_key = {(t.level, t.column, t.row): t for t in rendered.tiles}
+        edge_tile = _load_image_from_bytes(by_key[(10, 3, 2)].data)
+        assert edge_tile.shape == (600 - 512, 1000 - 768, 3)
+        assert np.array_equal(edge_tile[0, 0], [255, 0, 0])
+        top_tile = _load_image_from_bytes(by_key[(8, 0, 0)].data)
+        assert top_tile.shape == (150, 250, 3)
+
+    def test_upload_returns_manifest(self):
+        """Test upload writes every tile and returns a camelCase manifest."""
+        image = np.zeros((300, 300, 3), dtype=np.uint8)
+        rendered = render_tile_pyramid(image, tile_size=256)
+        storage = MagicMock()
+
+        manifest = upload_tile_pyramid(storage, rendered, "block-overlays/ov1_files")
+
+        uploaded = {call.args[1] for call in storage.upload_from_bytes.call_args_list}
+        assert uploaded == {
+            tile_path("block-overlays/ov1_files", t.level, t.column, t.row) for t in rendered.tiles
+        }
+        assert manifest["basePath"] == "block-overlays/ov1_files"
+        assert manifest["maxLevel"] == 9
+        assert manifest["minLevel"] == 8
+        assert manifest["tileCount"] == 5
@@ -0,0 +1,84 @@
+"""Bulk write helpers for fan-out jobs.
+
+Adding rows one ORM object at a time and refreshing each after commit costs a
+round trip per row. These helpers write a whole batch in one statement:
+
+- ``bulk_insert``: multi-row INSERT of model instances. The instances are not
+  attached to the session, so they keep their attributes after commit (no
+  per-row refresh SELECTs).
+- ``upsert_returning``: ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING`` that
+  loads the resulting rows as ORM objects in the same statement.
+
+Usage:
+    jobs = [Job(id=generate_cuid(), ...) for sheet in sheets]
+    bulk_insert(session, jobs)
+    session.commit()
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from sqlalchemy import insert, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, SQLModel, select
+
+
+def column_values(obj: SQLModel) -> dict[str, Any]:
+    """Column name -> value for a model instance.
+
+    None is left out for columns with a server default, so the database fills
+    them in as it would for an ORM insert.
+    """
+    values: dict[str, Any] = {}
+    for attr in inspect(type(obj)).column_attrs:
+        column = attr.columns[0]
+        value = getattr(obj, attr.key)
+        if value is None and column.server_default is not None:
+            continue
+        values[column.name] = value
+    return values
+
+
+def bulk_insert(session: Session, objects: Sequence[SQLModel]) -> None:
+    """Insert model instances of one type in a single statement (caller commits)."""
+    if not objects:
+        return
+    table = type(objects[0]).__table__
+    session.execute(insert(table), [column_values(obj) for obj in objects])
+
+
+def upsert_returning(
+    session: Session,
+    objects: Sequence[SQLModel],
+    *,
+    conflict_columns: Sequence[str],
+    update: Callable[[Any], dict[str, Any]],
+) -> list[Any]:
+    """Insert or update rows on a unique key and return them as ORM objects.
+
+    Args:
+        session: Database session (caller commits)
+        objects: Model instances of one type
+        conflict_columns: Columns of the unique constraint to upsert on
+        update: Given the ``excluded`` pseudo-table, the ``SET`` clause for
+            rows that already exist
+
+    Returns:
+        The inserted or updated rows as instances of the objects' model, loaded
+        into the session (in no particular order)
+    """
+    if not objects:
+        return []
+    model = type(objects[0])
+    table = model.__table__
+    statement = pg_insert(table).values([column_values(obj) for obj in objects])
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c[name] for name in conflict_columns],
+        set_=update(statement.excluded),
+    ).returning(*table.c)
+    orm_statement = (
+        select(model).from_statement(statement).execution_options(populate_existing=True)
+    )
+    return list(session.scalars(orm_statement).all())
@@ -7,5 +7,37 @@ from pydantic import ValidationError
 PERMANENT_JOB_ERRORS = (ValidationError, ValueError, FileNotFoundError)
 
 
+class JobProcessError(Exception):
+    """A job failure raised in a worker process and re-raised in the parent.
+
+    Arbitrary exceptions do not reliably pickle across the process boundary
+    (driver and client errors often hold connections), so the worker process
+    sends the original type name, message and classification instead, along
+    with the metrics the failed job recorded.
+    """
+
+    def __init__(
+        self,
+        error_type: str,
+        message: str,
+        permanent: bool,
+        metrics: dict | None = None,
+    ) -> None:
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+        self.message = message
+        self.permanent = permanent
+        self.metrics = metrics
+
+    def __reduce__(self):
+        return (type(self), (self.error_type, self.message, self.permanent, self.metrics))
+
+    @classmethod
+    def from_error(cls, error: BaseException) -> JobProcessError:
+        return cls(type(error).__name__, str(error), is_permanent_job_error(error))
+
+
 def is_permanent_job_error(error: BaseException) -> bool:
+    if isinstance(error, JobProcessError):
+        return error.permanent
     return isinstance(error, PERMANENT_JOB_ERRORS)
@@ -1,11 +1,31 @@
-"""Helpers for persisting job event timelines."""
+"""Helpers for persisting job event timelines.
+
+Handlers append events with ``record_job_event``, which adds one element to
+``jobs.events`` with a JSONB ``||`` update instead of writing the whole array
+back, so an event costs the same however long the timeline already is.
+
+Each appended event is also announced on the ``job_status`` Postgres channel
+(``pg_notify``), which API instances LISTEN on to push status to WebSocket
+and SSE clients. The notification is sent on commit, together with the event.
+"""
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+import json
+from datetime import UTC, datetime
+from typing import Any
 from uuid import uuid4
 
+from sqlalchemy import func, literal, not_, or_, type_coerce, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session
+
+from models import Job
+from utils.job_profiler import current_timings
+
+JOB_STATUS_CHANNEL = "job_status"
+
 
 def create_job_event(
     *,
@@ -13,12 +33,13 @@ def create_job_event(
     job_id: str,
     status: str,
     event_type: str,
-    drawing_id: Optional[str] = None,
-    sheet_id: Optional[str] = None,
-    block_id: Optional[str] = None,
-    metadata: Optional[Dict[str, Any]] = None,
-    llm_usage: Optional[Dict[str, Any]] = None,
-) -> Dict[str, Any]:
+    drawing_id: str | None = None,
+    sheet_id: str | None = None,
+    block_id: str | None = None,
+    metadata: dict[str, Any] | None = None,
+    llm_usage: dict[str, Any] | None = None,
+    timings: dict[str, Any] | None = None,
+) -> dict[str, Any]:
     """Create a job event dict for the events timeline.
 
     Args:
@@ -32,17 +53,20 @@ def create_job_event(
         metadata: Optional custom metadata dict
         llm_usage: Optional LLM usage dict from LLMUsage.to_event_dict()
             Format: {"models": {...}, "totalCostUsd": float}
+        timings: Optional phase timings from JobProfile.to_event_dict(). Completed
+            and failed events default to the current job's profile.
+            Format: {"totalMs": int, "cpuMs": int, "phases": [...]}
 
     Returns:
         Event dict for appending to Job.events
     """
-    event: Dict[str, Any] = {
+    event: dict[str, Any] = {
         "id": str(uuid4()),
         "jobType": job_type,
         "jobId": job_id,
         "status": status,
         "eventType": event_type,
-        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "createdAt": datetime.now(UTC).isoformat(),
         "drawingId": drawing_id,
         "sheetId": sheet_id,
         "blockId": block_id,
@@ -50,6 +74,10 @@ def create_job_event(
     }
     if llm_usage is not None:
         event["llmUsage"] = llm_usage
+    if timings is None and event_type in ("completed", "failed"):
+        timings = current_timings()
+    if timings is not None:
+        event["timings"] = timings
     return event
 
 
@@ -62,13 +90,72 @@ def has_event_type(current: Any, event_type: str) -> bool:
     return False
 
 
-def append_job_event(current: Any, event: Dict[str, Any]) -> list[Dict[str, Any]]:
+def append_job_event(current: Any, event: dict[str, Any]) -> list[dict[str, Any]]:
     if isinstance(current, list):
         return [*current, event]
     return [event]
 
 
-def append_job_event_if_missing(current: Any, event: Dict[str, Any]) -> Any:
+def append_job_event_if_missing(current: Any, event: dict[str, Any]) -> Any:
     if has_event_type(current, event.get("eventType")):
         return current
     return append_job_event(current, event)
+
+
+def job_status_notification(job: Job, event: dict[str, Any]) -> str:
+    """Compact status payload for the job status channel (NOTIFY caps it at 8000 bytes)."""
+    return json.dumps(
+        {
+            "jobId": job.id,
+            "parentId": job.parent_id,
+            "type": job.type,
+            "targetType": job.target_type,
+            "targetId": job.target_id,
+            "status": event.get("status"),
+            "eventType": event.get("eventType"),
+            "createdAt": event.get("createdAt"),
+        },
+        separators=(",", ":"),
+    )
+
+
+def record_job_event(session: Session, job: Job, event: dict[str, Any]) -> bool:
+    """Append an event to a job's timeline with a single-row JSONB append.
+
+    Skips events whose eventType the job already has, both in memory and in
+    the database (so a redelivered message cannot add a second "started").
+    The append locks the job row, so of two concurrent deliveries only one
+    sees True; side effects that must happen once per event can key off it.
+    ``job.events`` is updated in place without marking it dirty, so the ORM
+    never rewrites the array. The caller commits, which also delivers the
+    status notification.
+
+    Returns:
+        True if the event was appended
+    """
+    if has_event_type(job.events, event.get("eventType")):
+        return False
+
+    table = Job.__table__
+    events = type_coerce(table.c.events, JSONB)
+    result = session.execute(
+        update(table)
+        .where(
+            table.c.id == job.id,
+            or_(
+                events.is_(None),
+                not_(events.contains([{"eventType": event.get("eventType")}])),
+            ),
+        )
+        .values(
+            events=func.coalesce(events, literal([], JSONB)).op("||")(literal([event], JSONB)),
+            # Bumped with every event: API ETags for job lists follow updated_at
+            updated_at=func.now(),
+        )
+        # Evaluated per updated row, so only events that were appended are announced
+        .returning(func.pg_notify(JOB_STATUS_CHANNEL, job_status_notification(job, event)))
+    )
+    if result.rowcount == 0:
+        return False
+    set_committed_value(job, "events", append_job_event(job.events, event))
+    return True
@@ -0,0 +1,200 @@
+"""Per-job phase profiling for the job events timeline.
+
+Uses contextvars to keep one profile per job execution, like LLM usage
+tracking. Every ``log_phase`` records its wall time, CPU time and RSS delta
+into the current profile, and completed/failed job events carry the breakdown
+as ``timings``.
+
+Usage:
+    # Around a handler (done by JobRunner)
+    with profile_job(job_type, job_id):
+        handler(...)
+
+    # Phases are recorded automatically
+    with log_phase(logger, "Align and render overlay"):
+        ...
+
+    # create_job_event(..., event_type="completed") attaches:
+    # {"totalMs": 8123, "cpuMs": 7350, "phases": [{"name": ..., "wallMs": ...}, ...]}
+
+CPU time is the handler thread's own (``time.thread_time``); work handed to
+other threads or processes shows up as wall time only.
+
+With ``job_profile_sampling_enabled``, jobs also run under cProfile and a
+report for any job slower than ``job_profile_slow_threshold_seconds`` is
+uploaded to ``profiles/<job_type>/<job_id>.txt``.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_REPORT_LINES = 60
+
+
+class PhaseTiming(BaseModel):
+    """Accumulated timing for one phase name."""
+
+    name: str
+    count: int = 0
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    rss_delta_mb: float | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to camelCase dict for JSON serialization."""
+        return {
+            "name": self.name,
+            "count": self.count,
+            "wallMs": round(self.wall_ms),
+            "cpuMs": round(self.cpu_ms),
+            "rssDeltaMb": round(self.rss_delta_mb, 1) if self.rss_delta_mb is not None else None,
+        }
+
+
+class JobProfile(BaseModel):
+    """Phase timings for a single job execution."""
+
+    started_wall: float = Field(default_factory=time.perf_counter)
+    started_cpu: float = Field(default_factory=time.thread_time)
+    phases: dict[str, PhaseTiming] = Field(default_factory=dict)
+
+    def record(
+        self,
+        name: str,
+        wall_seconds: float,
+        cpu_seconds: float,
+        rss_delta_mb: float | None,
+    ) -> None:
+        """Add one run of a phase (repeated phase names are summed)."""
+        phase = self.phases.setdefault(name, PhaseTiming(name=name))
+        phase.count += 1
+        phase.wall_ms += wall_seconds * 1000
+        phase.cpu_ms += cpu_seconds * 1000
+        if rss_delta_mb is not None:
+            phase.rss_delta_mb = (phase.rss_delta_mb or 0.0) + rss_delta_mb
+
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started_wall
+
+    def to_event_dict(self) -> dict[str, Any]:
+        """Convert to dict format for the job event ``timings`` field."""
+        return {
+            "totalMs": round(self.elapsed_seconds() * 1000),
+            "cpuMs": round((time.thread_time() - self.started_cpu) * 1000),
+            "phases": [phase.to_dict() for phase in self.phases.values()],
+        }
+
+
+# Context variable for current job's profile
+_current_profile: ContextVar[JobProfile | None] = ContextVar("job_profile", default=None)
+
+# cProfile supports one active profiler per interpreter; concurrent jobs skip sampling
+_sampling_lock = threading.Lock()
+
+
+def start_profiling() -> JobProfile:
+    """Start profiling the current job."""
+    profile = JobProfile()
+    _current_profile.set(profile)
+    return profile
+
+
+def get_current_profile() -> JobProfile | None:
+    return _current_profile.get()
+
+
+def stop_profiling() -> JobProfile | None:
+    """Stop profiling and return the job's profile."""
+    profile = _current_profile.get()
+    _current_profile.set(None)
+    return profile
+
+
+def current_timings() -> dict[str, Any] | None:
+    """Timings of the current job for its events, or None outside a profiled job."""
+    profile = _current_profile.get()
+    return profile.to_event_dict() if profile is not None else None
+
+
+@contextmanager
+def profile_phase(name: str) -> Generator[None, None, None]:
+    """Record a phase into the current job's profile (no-op outside a job)."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    from utils.log_utils import get_memory_mb
+
+    start_rss = get_memory_mb()
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    try:
+        yield
+    finally:
+        end_rss = get_memory_mb()
+        profile.record(
+            name,
+            time.perf_counter() - start_wall,
+            time.thread_time() - start_cpu,
+            end_rss - start_rss if start_rss is not None and end_rss is not None else None,
+        )
+
+
+def _format_report(profiler: cProfile.Profile, job_type: str, job_id: str, seconds: float) -> str:
+    stream = io.StringIO()
+    stream.write(f"{job_type} {job_id} took {seconds:.1f}s\n\n")
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_REPORT_LINES)
+    return stream.getvalue()
+
+
+def _upload_report(report: str, job_type: str, job_id: str) -> str:
+    from clients.storage import get_storage_client
+
+    remote_path = f"profiles/{job_type}/{job_id}.txt"
+    return get_storage_client().upload_from_bytes(
+        report.encode("utf-8"), remote_path, content_type="text/plain"
+    )
+
+
+@contextmanager
+def profile_job(job_type: str, job_id: str) -> Generator[JobProfile, None, None]:
+    """Profile a job's phases, and sample it with cProfile if enabled."""
+    profile = start_profiling()
+    profiler: cProfile.Profile | None = None
+    if config.job_profile_sampling_enabled and _sampling_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield profile
+    finally:
+        stop_profiling()
+        if profiler is not None:
+            profiler.disable()
+            _sampling_lock.release()
+            seconds = profile.elapsed_seconds()
+            if seconds >= config.job_profile_slow_threshold_seconds:
+                try:
+                    uri = _upload_report(
+                        _format_report(profiler, job_type, job_id, seconds), job_type, job_id
+                    )
+                    logger.info(f"[job.profile.saved] {job_type} job-{job_id[:8]} {uri}")
+                except Exception as error:
+                    logger.warning(f"[job.profile.upload_failed] {type(error).__name__}: {error}")
@@ -17,6 +17,9 @@ from contextvars import ContextVar
 
 from PIL import Image
 
+from utils.job_profiler import profile_phase
+from utils.metrics import observe_phase
+
 # Try to import psutil for memory tracking, but make it optional
 try:
     import psutil
@@ -26,6 +29,7 @@ except ImportError:
     PSUTIL_AVAILABLE = False
 
 TRACE_CONTEXT = ContextVar("trace_context", default=None)
+PROGRESS_CALLBACK = ContextVar("progress_callback", default=None)
 
 CLOUD_TRACE_CONTEXT_RE = re.compile(r"^([a-fA-F0-9]{32})(?:/([0-9]+))?(?:;o=([01]))?$")
 TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
@@ -186,6 +190,23 @@ def clear_trace_context() -> None:
     TRACE_CONTEXT.set(None)
 
 
+def get_trace_context() -> dict | None:
+    """Return the trace context of the current worker thread."""
+    return TRACE_CONTEXT.get()
+
+
+def set_progress_callback(callback) -> None:
+    """Register a callback run whenever the current job reports progress."""
+    PROGRESS_CALLBACK.set(callback)
+
+
+def report_progress() -> None:
+    """Signal that the current job is still making progress (feeds its heartbeat)."""
+    callback = PROGRESS_CALLBACK.get()
+    if callback is not None:
+        callback()
+
+
 def extract_trace_context(attributes: dict | None, project_id: str) -> dict | None:
     """Extract trace context from Pub/Sub attributes."""
     if not attributes:
@@ -410,7 +431,8 @@ def log_phase(
 ) -> Generator[None, None, None]:
     """Context manager for logging phase timing at DEBUG level.
 
-    Logs processing phases with timing for performance profiling.
+    Logs processing phases with timing for performance profiling, and records
+    the phase into the current job's profile (see utils.job_profiler).
 
     Usage:
         with log_phase(logger, "Downloading PDF from storage", drawing_id=drawing_id):
@@ -429,12 +451,17 @@ def log_phase(
     context_str = f" ({context})" if context else ""
 
     logger.debug(f"{phase_name}...{context_str}")
+    report_progress()
     start_time = time.time()
 
     try:
-        yield
+        with profile_phase(phase_name):
+            yield
     finally:
-        duration_ms = int((time.time() - start_time) * 1000)
+        report_progress()
+        duration_seconds = time.time() - start_time
+        observe_phase(phase_name, duration_seconds)
+        duration_ms = int(duration_seconds * 1000)
         duration_str = format_duration(duration_ms)
         logger.debug(f"{phase_name} done ({duration_str})")
 
@@ -1006,6 +1033,32 @@ def log_connection_established(
         logger.info(f"[{service}.connected]")
 
 
+def log_worker_throughput(
+    logger: logging.Logger,
+    execution: str,
+    cores: int,
+    jobs: int,
+    window_seconds: float,
+    jobs_per_min_per_core: float,
+    utilization: float,
+) -> None:
+    """Log job throughput for one execution class.
+
+    Args:
+        logger: Logger instance
+        execution: Execution class ("thread" or "process")
+        cores: Concurrency slots of the class
+        jobs: Jobs finished in the window
+        window_seconds: Length of the measurement window
+        jobs_per_min_per_core: Throughput normalized by slots
+        utilization: Fraction of slot time spent running jobs (0-1)
+    """
+    logger.info(
+        f"[worker.throughput] {execution}: {jobs} jobs in {window_seconds:.0f}s, "
+        f"{jobs_per_min_per_core:.2f} jobs/min/core, {utilization:.0%} busy ({cores} cores)"
+    )
+
+
 def log_worker_ready(logger: logging.Logger) -> None:
     """Log worker ready state.
 
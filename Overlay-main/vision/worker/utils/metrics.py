@@ -0,0 +1,308 @@
+"""Prometheus-style metrics for the vision worker.
+
+A small in-process registry rendered in the Prometheus text exposition format
+on the health server's ``/metrics`` endpoint. It has no dependencies, so the
+worker image does not need prometheus_client.
+
+Jobs that run in worker processes record into that process's registry. After
+each job the child's increments are drained and merged into the parent
+(``drain``/``merge``), so ``/metrics`` covers the whole worker.
+
+Usage:
+    from utils.metrics import JOB_DURATION
+    JOB_DURATION.observe(12.5, job_type="vision.block.overlay.generate", outcome="success")
+"""
+
+from __future__ import annotations
+
+import resource
+import sys
+import threading
+from typing import Any
+
+# Seconds; spans sub-second phases up to the 30-minute lease
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# Leading word of a log_phase name -> phase label (keeps label cardinality fixed)
+PHASE_CATEGORIES: dict[str, str] = {
+    "download": "download",
+    "downloading": "download",
+    "load": "download",
+    "convert": "convert",
+    "align": "align",
+    "render": "render",
+    "encode": "encode",
+    "upload": "upload",
+    "publish": "publish",
+    "analyze": "llm",
+    "extract": "llm",
+    "segment": "llm",
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = [*zip(self.labelnames, key), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: tuple[str, ...], value: Any) -> list[str]:
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}"]
+
+    def drain(self) -> dict[tuple[str, ...], Any]:
+        """Take the increments recorded since the last drain."""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: dict[tuple[str, ...], Any]) -> None:
+        """Add increments drained from another process."""
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0.0) + value
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Current value. High-water gauges merge across processes by maximum."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        high_water: bool = False,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.high_water = high_water
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            if self.high_water:
+                value = max(value, self._values.get(key, 0.0))
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def drain(self) -> dict[tuple[str, ...], Any]:
+        # Plain gauges describe the process that owns them; only high-water marks travel
+        if not self.high_water:
+            return {}
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, values: dict[tuple[str, ...], Any]) -> None:
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = max(value, self._values.get(key, 0.0))
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = DURATION_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def _render_sample(self, key: tuple[str, ...], value: Any) -> list[str]:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            labels = self._labels(key, (("le", _format_value(bound)),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+    def merge(self, values: dict[tuple[str, ...], Any]) -> None:
+        with self._lock:
+            for key, (counts, total) in values.items():
+                current_counts, current_total = self._values.get(key) or (
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                )
+                merged = [a + b for a, b in zip(current_counts, counts)]
+                self._values[key] = (merged, current_total + total)
+
+
+class MetricsRegistry:
+    """Named collection of metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> dict[str, dict]:
+        """Increments of every metric since the last drain (picklable)."""
+        return {name: values for name, m in self._metrics.items() if (values := m.drain())}
+
+    def merge(self, delta: dict[str, dict] | None) -> None:
+        for name, values in (delta or {}).items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+
+REGISTRY = MetricsRegistry()
+
+JOB_DURATION: Histogram = REGISTRY.register(
+    Histogram(
+        "vision_worker_job_duration_seconds",
+        "Job handler wall time",
+        ("job_type", "outcome"),
+    )
+)
+JOBS_IN_FLIGHT: Gauge = REGISTRY.register(
+    Gauge("vision_worker_jobs_in_flight", "Jobs currently running", ("job_type",))
+)
+PHASE_DURATION: Histogram = REGISTRY.register(
+    Histogram("vision_worker_phase_duration_seconds", "Job phase wall time", ("phase",))
+)
+LLM_TOKENS: Counter = REGISTRY.register(
+    Counter("vision_worker_llm_tokens_total", "LLM tokens by model and kind", ("model", "kind"))
+)
+LLM_COST: Counter = REGISTRY.register(
+    Counter("vision_worker_llm_cost_usd_total", "Estimated LLM cost in USD", ("model",))
+)
+STORAGE_BYTES: Counter = REGISTRY.register(
+    Counter(
+        "vision_worker_storage_bytes_total",
+        "Object storage bytes transferred",
+        ("direction",),
+    )
+)
+RSS_HIGH_WATER: Gauge = REGISTRY.register(
+    Gauge(
+        "vision_worker_rss_high_water_bytes",
+        "Peak resident memory of any worker process",
+        high_water=True,
+    )
+)
+
+
+def phase_category(phase_name: str) -> str:
+    """Phase label for a log_phase name, from its leading verb."""
+    words = phase_name.split(maxsplit=1)
+    return PHASE_CATEGORIES.get(words[0].lower(), "other") if words else "other"
+
+
+def observe_phase(phase_name: str, seconds: float) -> None:
+    PHASE_DURATION.observe(seconds, phase=phase_category(phase_name))
+
+
+def record_storage_bytes(direction: str, size_bytes: int) -> None:
+    """Count object storage traffic ("in" = download, "out" = upload)."""
+    STORAGE_BYTES.inc(size_bytes, direction=direction)
+
+
+def update_rss_high_water() -> None:
+    """Fold this process's peak RSS into the high-water gauge."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    RSS_HIGH_WATER.set(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def render_metrics() -> str:
+    """Current metrics in the Prometheus text format."""
+    update_rss_high_water()
+    return REGISTRY.render()
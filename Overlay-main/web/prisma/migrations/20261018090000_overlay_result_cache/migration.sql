@@ -0,0 +1,25 @@
+-- AlterTable
+ALTER TABLE "blocks" ADD COLUMN "content_hash" TEXT;
+
+-- CreateTable
+CREATE TABLE "overlay_results" (
+    "key" TEXT NOT NULL,
+    "created_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMP(3) NOT NULL,
+    "block_a_hash" TEXT NOT NULL,
+    "block_b_hash" TEXT NOT NULL,
+    "params_hash" TEXT NOT NULL,
+    "uri" TEXT NOT NULL,
+    "addition_uri" TEXT NOT NULL,
+    "deletion_uri" TEXT NOT NULL,
+    "score" DOUBLE PRECISION,
+    "summary" JSONB,
+
+    CONSTRAINT "overlay_results_pkey" PRIMARY KEY ("key")
+);
+
+-- CreateIndex
+CREATE INDEX "blocks_content_hash_idx" ON "blocks"("content_hash");
+
+-- CreateIndex
+CREATE INDEX "overlay_results_block_a_hash_block_b_hash_idx" ON "overlay_results"("block_a_hash", "block_b_hash");
@@ -0,0 +1,5 @@
+-- AlterTable
+ALTER TABLE "jobs" ADD COLUMN "heartbeat_at" TIMESTAMP(3);
+
+-- CreateIndex
+CREATE INDEX "jobs_status_heartbeat_at_idx" ON "jobs"("status", "heartbeat_at");
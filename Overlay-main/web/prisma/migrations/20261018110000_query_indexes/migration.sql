@@ -0,0 +1,31 @@
+-- Composite indexes for the worker and API hot queries. Each ends in
+-- deleted_at (or the sort column) so "... AND deleted_at IS NULL" and
+-- "ORDER BY created_at DESC" are answered from the index. The indexes
+-- dropped here have the same leading columns as their replacements.
+
+-- DropIndex
+DROP INDEX "blocks_sheet_id_idx";
+
+-- DropIndex
+DROP INDEX "overlays_block_a_id_idx";
+
+-- DropIndex
+DROP INDEX "jobs_target_type_target_id_idx";
+
+-- DropIndex
+DROP INDEX "jobs_parent_id_idx";
+
+-- CreateIndex
+CREATE INDEX "sheets_drawing_id_deleted_at_idx" ON "sheets"("drawing_id", "deleted_at");
+
+-- CreateIndex
+CREATE INDEX "blocks_sheet_id_deleted_at_idx" ON "blocks"("sheet_id", "deleted_at");
+
+-- CreateIndex
+CREATE INDEX "overlays_block_a_id_block_b_id_deleted_at_idx" ON "overlays"("block_a_id", "block_b_id", "deleted_at");
+
+-- CreateIndex
+CREATE INDEX "jobs_target_id_target_type_type_created_at_idx" ON "jobs"("target_id", "target_type", "type", "created_at");
+
+-- CreateIndex
+CREATE INDEX "jobs_parent_id_type_target_id_idx" ON "jobs"("parent_id", "type", "target_id");
@@ -0,0 +1,18 @@
+-- Indexes matching the API's keyset pagination order, (created_at, id)
+-- descending, so each list page is a bounded index range scan. The project
+-- job index gains id as the tie-breaker.
+
+-- DropIndex
+DROP INDEX "jobs_project_id_created_at_idx";
+
+-- CreateIndex
+CREATE INDEX "blocks_created_at_id_idx" ON "blocks"("created_at", "id");
+
+-- CreateIndex
+CREATE INDEX "overlays_created_at_id_idx" ON "overlays"("created_at", "id");
+
+-- CreateIndex
+CREATE INDEX "jobs_project_id_created_at_id_idx" ON "jobs"("project_id", "created_at", "id");
+
+-- CreateIndex
+CREATE INDEX "jobs_created_at_id_idx" ON "jobs"("created_at", "id");
@@ -0,0 +1,52 @@
+-- CreateTable
+CREATE TABLE "drawing_progress" (
+    "drawing_id" TEXT NOT NULL,
+    "created_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMP(3) NOT NULL,
+    "job_id" TEXT,
+    "job_status" "JobStatus" NOT NULL DEFAULT 'Queued',
+    "sheets_total" INTEGER NOT NULL DEFAULT 0,
+    "sheets_completed" INTEGER NOT NULL DEFAULT 0,
+    "sheets_failed" INTEGER NOT NULL DEFAULT 0,
+    "block_count" INTEGER NOT NULL DEFAULT 0,
+
+    CONSTRAINT "drawing_progress_pkey" PRIMARY KEY ("drawing_id")
+);
+
+-- AddForeignKey
+ALTER TABLE "drawing_progress" ADD CONSTRAINT "drawing_progress_drawing_id_fkey" FOREIGN KEY ("drawing_id") REFERENCES "drawings"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+
+-- Backfill existing drawings: latest drawing preprocess job, live sheets and
+-- blocks, and each live sheet's latest sheet preprocess job status
+INSERT INTO "drawing_progress" (
+    "drawing_id", "updated_at", "job_id", "job_status",
+    "sheets_total", "sheets_completed", "sheets_failed", "block_count"
+)
+SELECT
+    d."id",
+    CURRENT_TIMESTAMP,
+    dj."id",
+    COALESCE(dj."status", 'Queued'),
+    COUNT(s."id"),
+    COUNT(s."id") FILTER (WHERE sj."status" = 'Completed'),
+    COUNT(s."id") FILTER (WHERE sj."status" IN ('Failed', 'Canceled')),
+    COALESCE(SUM(b."block_count"), 0)
+FROM "drawings" d
+LEFT JOIN LATERAL (
+    SELECT j."id", j."status" FROM "jobs" j
+    WHERE j."target_id" = d."id" AND j."target_type" = 'drawing'
+      AND j."type" = 'vision.drawing.preprocess'
+    ORDER BY j."created_at" DESC LIMIT 1
+) dj ON TRUE
+LEFT JOIN "sheets" s ON s."drawing_id" = d."id" AND s."deleted_at" IS NULL
+LEFT JOIN LATERAL (
+    SELECT j."status" FROM "jobs" j
+    WHERE j."target_id" = s."id" AND j."target_type" = 'sheet'
+      AND j."type" = 'vision.sheet.preprocess'
+    ORDER BY j."created_at" DESC LIMIT 1
+) sj ON TRUE
+LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS "block_count" FROM "blocks" bl
+    WHERE bl."sheet_id" = s."id" AND bl."deleted_at" IS NULL
+) b ON TRUE
+GROUP BY d."id", dj."id", dj."status";
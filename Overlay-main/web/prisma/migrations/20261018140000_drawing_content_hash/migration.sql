@@ -0,0 +1,5 @@
+-- AlterTable
+ALTER TABLE "drawings" ADD COLUMN "content_hash" TEXT;
+
+-- CreateIndex
+CREATE INDEX "drawings_content_hash_idx" ON "drawings"("content_hash");
@@ -0,0 +1,20 @@
+-- CreateTable
+CREATE TABLE "job_outbox" (
+    "id" TEXT NOT NULL,
+    "created_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "job_id" TEXT NOT NULL,
+    "topic" TEXT NOT NULL,
+    "message" JSONB NOT NULL,
+    "attributes" JSONB,
+    "attempts" INTEGER NOT NULL DEFAULT 0,
+    "available_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "last_error" TEXT,
+
+    CONSTRAINT "job_outbox_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "job_outbox_job_id_key" ON "job_outbox"("job_id");
+
+-- CreateIndex
+CREATE INDEX "job_outbox_available_at_idx" ON "job_outbox"("available_at");